@@ -4,12 +4,54 @@ import os
 from pathlib import Path
 from flask import Flask, request
 from flask_session import Session
-import yaml
+
+from config import LOGS_DIR, SESSION_FILE_DIR
 
 # Import blueprints
 from app.pdn_diagnose import pdn_diagnose_bp
 from app.pdn_admin import pdn_admin_bp, audio_bp
 from app.pdn_chat_ai import pdn_chat_ai_bp
+from app.utils import compression, content_registry, questionnaire_versions, static_assets, warmup
+
+
+def log_configuration(app, config_path, questions_path):
+    """Log the loaded configuration, questions structure and app config keys at debug level"""
+    logger = logging.getLogger(__name__)
+    logger.debug("=== CONFIGURATION DATA START ===")
+    logger.debug(f"Config file path: {config_path}")
+    logger.debug(f"Questions file path: {questions_path}")
+    logger.debug(f"Config file exists: {config_path.exists()}")
+    logger.debug(f"Questions file exists: {questions_path.exists()}")
+    
+    # Log PDN_CONFIG
+    logger.debug("PDN_CONFIG content:")
+    logger.debug(json.dumps(app.config['PDN_CONFIG'], indent=2, default=str))
+    
+    # Log QUESTIONS_FILE structure (be careful with large files)
+    questions_data = app.config['QUESTIONS_FILE']
+    logger.debug("QUESTIONS_FILE structure:")
+    logger.debug(f"Total phases: {len(questions_data.get('phases', {}))}")
+    logger.debug(f"Phase names: {list(questions_data.get('phases', {}).keys())}")
+    
+    
+    # Log environment variables
+    logger.debug("Environment variables:")
+    env_vars = ['FLASK_ENV', 'FLASK_DEBUG', 'ADMIN_PASSWORD']
+    for var in env_vars:
+        logger.debug(f"  {var}: {os.environ.get(var, 'NOT_SET')}")
+    
+    # Log app config keys
+    logger.debug("App config keys:")
+    for key in sorted(app.config.keys()):
+        if key not in ['SECRET_KEY']:  # Skip sensitive data
+            value = app.config[key]
+            if isinstance(value, (dict, list)):
+                logger.debug(f"  {key}: {type(value).__name__} with {len(value)} items")
+            else:
+                logger.debug(f"  {key}: {value}")
+    
+    logger.debug("=== CONFIGURATION DATA END ===")
+
 
 def create_app():
     """Application factory pattern for Flask app creation"""
@@ -18,12 +60,13 @@ def create_app():
     # Configure app
     app.config['SECRET_KEY'] = 'your-very-secret-key'
     app.config['SESSION_TYPE'] = 'filesystem'
+    app.config['SESSION_FILE_DIR'] = str(SESSION_FILE_DIR)
     
     # Initialize Flask-Session
     Session(app)
     
     # Ensure logs directory exists
-    os.makedirs('logs', exist_ok=True)
+    os.makedirs(LOGS_DIR, exist_ok=True)
     
     # Configure logging
     logging.basicConfig(
@@ -31,63 +74,30 @@ def create_app():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
             logging.StreamHandler(),  # Console handler
-            logging.FileHandler('logs/app.log')  # File handler
+            logging.FileHandler(LOGS_DIR / 'app.log')  # File handler
         ]
     )
     
     # Create logger
     logger = logging.getLogger(__name__)
     
-    # Load configuration
+    # Load configuration, parsed once by the content registry
     config_path = Path(__file__).resolve().parent / "app" / "data" / "config.yaml"
     questions_path = Path(__file__).resolve().parent / "app" / "data" / "questions.json"
+    registry = content_registry.get_content_registry()
     
     try:
         # Load config
-        with open(config_path, "r", encoding="utf-8") as f:
-            app.config['PDN_CONFIG'] = yaml.safe_load(f)
+        app.config['PDN_CONFIG'] = registry.get(content_registry.CONFIG)
         
         # Load questions
-        with open(questions_path, "r", encoding="utf-8") as f:
-            app.config['QUESTIONS_FILE'] = json.load(f)
+        app.config['QUESTIONS_FILE'] = registry.get(content_registry.QUESTIONS)
             
         logger.info("Configuration loaded successfully")
         
-        # Log all configuration data
-        logger.info("=== CONFIGURATION DATA START ===")
-        logger.info(f"Config file path: {config_path}")
-        logger.info(f"Questions file path: {questions_path}")
-        logger.info(f"Config file exists: {config_path.exists()}")
-        logger.info(f"Questions file exists: {questions_path.exists()}")
-        
-        # Log PDN_CONFIG
-        logger.info("PDN_CONFIG content:")
-        logger.info(json.dumps(app.config['PDN_CONFIG'], indent=2, default=str))
-        
-        # Log QUESTIONS_FILE structure (be careful with large files)
-        questions_data = app.config['QUESTIONS_FILE']
-        logger.info("QUESTIONS_FILE structure:")
-        logger.info(f"Total phases: {len(questions_data.get('phases', {}))}")
-        logger.info(f"Phase names: {list(questions_data.get('phases', {}).keys())}")
-        
-        
-        # Log environment variables
-        logger.info("Environment variables:")
-        env_vars = ['FLASK_ENV', 'FLASK_DEBUG', 'ADMIN_PASSWORD']
-        for var in env_vars:
-            logger.info(f"  {var}: {os.environ.get(var, 'NOT_SET')}")
-        
-        # Log app config keys
-        logger.info("App config keys:")
-        for key in sorted(app.config.keys()):
-            if key not in ['SECRET_KEY']:  # Skip sensitive data
-                value = app.config[key]
-                if isinstance(value, (dict, list)):
-                    logger.info(f"  {key}: {type(value).__name__} with {len(value)} items")
-                else:
-                    logger.info(f"  {key}: {value}")
-        
-        logger.info("=== CONFIGURATION DATA END ===")
+        # The full configuration is only dumped when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            log_configuration(app, config_path, questions_path)
         
     except Exception as e:
         logger.error(f"Error loading configuration: {e}")
@@ -95,6 +105,18 @@ def create_app():
         logger.error(f"Files in current directory: {os.listdir('.')}")
         app.config['PDN_CONFIG'] = {}
         app.config['QUESTIONS_FILE'] = {}
+
+    # Keep the questionnaire in the versions store, answers refer to it by version
+    try:
+        app.config['QUESTIONNAIRE_VERSION'] = questionnaire_versions.ensure_current_registered()
+    except OSError as e:
+        logger.warning(f"Could not register the questionnaire version: {e}")
+
+    # Reload config.yaml, questions.json and the reports when they change on disk
+    content_registry.init_app(app)
+
+    # Readiness probe, ready once the shared state is loaded (see gunicorn.conf.py)
+    warmup.init_app(app)
     
     # Register blueprints
     app.register_blueprint(pdn_diagnose_bp, url_prefix='/pdn-diagnose')
@@ -105,6 +127,12 @@ def create_app():
     # Mount static files
     app.static_folder = 'app/static'
     app.static_url_path = '/static'
+
+    # Fingerprinted, precompressed assets built by app.utils.static_assets
+    static_assets.init_app(app)
+
+    # gzip/brotli for JSON, HTML and other text responses
+    compression.init_app(app)
     
     # Root route
     @app.route('/')
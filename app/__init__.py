@@ -7,11 +7,20 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-try:
-    from app import create_app
-except ImportError:
-    # Fallback: try to import directly from the file
+
+def _load_create_app():
+    # app.py sits next to this package and is shadowed by it, so it is loaded from its file
     spec = importlib.util.spec_from_file_location("app_module", os.path.join(os.path.dirname(__file__), "..", "app.py"))
     app_module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(app_module)
-    create_app = app_module.create_app
+    return app_module.create_app
+
+
+def __getattr__(name):
+    # create_app imports every blueprint; it is loaded on first use so that
+    # importing a utility module (app.utils.*) does not pay for the whole app
+    if name == "create_app":
+        create_app = _load_create_app()
+        globals()["create_app"] = create_app
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
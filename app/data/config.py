@@ -1,14 +1,18 @@
-from pathlib import Path
+from typing import Optional
 
-import yaml
+from ..utils.content_registry import CONFIG, get_content_registry
 
 
 class Settings:
-    def __init__(self):
-        self._config = self.load_config()
+    def __init__(self, config: Optional[dict] = None):
+        self.apply(config if config is not None else self.load_config())
+
+    def apply(self, config: dict):
+        """Set the settings from a parsed config.yaml, e.g. after it was reloaded"""
+        self._config = config
         self.PROJECT_NAME: str = self._config['project']['name']
         self.VERSION: str = self._config['project']['version']
-        
+
         # RAG Configuration
         self.CHROMA_DB_PERSIST_DIR: str = self._config['rag']['chroma_db_persist_dir']
         self.RAG_CHUNK_SIZE: int = self._config['rag']['chunk_size']
@@ -16,9 +20,8 @@ class Settings:
         self.RAG_SEARCH_K: int = self._config['rag']['search_k']
 
     def load_config(self):
-        config_path = Path(__file__).parent / "config.yaml"
-        with open(config_path, 'r', encoding='utf-8') as file:
-            return yaml.safe_load(file)
+        return get_content_registry().get(CONFIG)
 
 
 settings = Settings()
+get_content_registry().subscribe(CONFIG, lambda config, _old: settings.apply(config))
@@ -1,17 +1,26 @@
 import csv
+import io
+import json
 import logging
 import secrets
 from pathlib import Path
 import os
 from datetime import datetime
 
-from flask import Blueprint, request, render_template, jsonify, current_app, send_file, abort
+from flask import Blueprint, request, render_template, jsonify, current_app, send_file, abort, Response, \
+    stream_with_context
+from pydantic import ValidationError
 
-from ..utils.answer_storage import load_answers
-from ..utils.csv_metadata_handler import UserMetadataHandler
+from ..utils.answer_storage import expand_answers, get_answers_question_index, load_answers, save_results
+from ..utils.audio_processing import load_recording_meta, resolve_recording
+from ..utils.bulk_rescore import WEB_RESCORE_WORKERS, rescore_all_users
+from ..utils.compression import gzip_stream
+from ..utils.csv_metadata_handler import get_metadata_handler
 from ..utils.email_sender import send_pdn_code_email
-from ..utils.pdn_calculator import calculate_pdn_code
+from ..utils.pdn_calculator import calculate_pdn_result, get_pdn_result
 from ..utils.pdn_file_path import PDNFilePath
+from ..utils.questionnaire_versions import list_versions
+from ..utils.schemas import DiagnoseBatchIn, DiagnoseIn, ErrorOut, error_messages
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -25,6 +34,94 @@ pdn_admin_bp = Blueprint('pdn_admin', __name__,
 admin_sessions = {}  # session_token -> user_info
 
 
+# Columns of the merged user export, in order
+EXPORT_FIELDS = [
+    "user_id", "email", "date", "pdn_code", "pdn_voice_code", "diagnose_pdn_code",
+    "diagnose_comments", "pdn_update_comments", "first_name", "last_name", "phone",
+    "native_language", "gender", "education_level", "job_title", "birth_year"
+]
+
+# Rows buffered per chunk when streaming an export
+EXPORT_CHUNK_ROWS = 500
+
+# Users returned per review queue page
+REVIEW_QUEUE_LIMIT = 10
+REVIEW_QUEUE_MAX_LIMIT = 50
+
+
+def iter_user_metadata():
+    """
+    Iterate over user metadata merged from the CSV file and JSON files.
+
+    Reads the CSV row by row and loads one user's answers file at a time,
+    so memory use does not grow with the number of users.
+
+    Yields:
+        Dictionary containing one user's metadata
+    """
+    csv_metadata_handler = get_metadata_handler()
+    logger.info(f"CSV file path: {csv_metadata_handler.csv_filename}")
+    if not csv_metadata_handler.csv_filename.exists():
+        logger.warning("user_metadata.csv file not found")
+        return
+
+    for row in csv_metadata_handler.read_metadata_generator():
+        # Skip empty rows
+        if not row.get("Email", "").strip():
+            continue
+
+        yield user_metadata_from_row(row, csv_metadata_handler)
+
+
+def user_metadata_from_row(row, csv_metadata_handler=None, answers=None):
+    """
+    Merge one user's CSV row with the metadata in their answers file.
+
+    Args:
+        row: CSV row as read by the metadata handler
+        csv_metadata_handler: Handler to load the answers file with
+        answers: The user's answers file, if already loaded
+
+    Returns:
+        Dictionary containing the user's metadata
+    """
+    csv_metadata_handler = csv_metadata_handler or get_metadata_handler()
+    email = row.get("Email", "").strip()
+
+    # Load additional metadata from JSON file
+    json_metadata = {}
+    try:
+        questionnaire_data = answers if answers is not None else csv_metadata_handler.get_user_files(email, "answers")
+        if questionnaire_data and 'metadata' in questionnaire_data:
+            json_metadata = questionnaire_data['metadata']
+    except Exception as e:
+        logger.warning(f"Could not load JSON metadata for {email}: {e}")
+
+    # Convert CSV column names to the expected format and merge with JSON metadata
+    return {
+        "user_id": (row.get("User ID") or "").strip(),
+        "email": email,
+        "date": (row.get("Date") or "").strip(),
+        "pdn_code": (row.get("PDN Code") or "").strip(),
+        "pdn_voice_code": (row.get("PDN Voice Code") or "").strip(),
+        "diagnose_pdn_code": (row.get("Diagnose PDN Code") or "").strip(),
+        "diagnose_comments": (row.get("Diagnose Comments") or "").strip(),
+        "pdn_update_comments": (row.get("PDN Update Comments") or "").strip(),
+        # Load from JSON metadata if available, otherwise use CSV or defaults
+        "first_name": (json_metadata.get("first_name") or row.get("First Name") or "").strip(),
+        "last_name": (json_metadata.get("last_name") or row.get("Last Name") or "").strip(),
+        "phone": (json_metadata.get("phone") or row.get("Phone") or "").strip(),
+        "native_language": (json_metadata.get("native_language") or json_metadata.get("mother_language") or row.get("Native Language") or "").strip(),
+        "gender": (json_metadata.get("gender") or row.get("Gender") or "").strip(),
+        "education_level": (json_metadata.get("education_level") or json_metadata.get("education") or row.get("Education Level") or "").strip(),
+        "job_title": (json_metadata.get("job_title") or row.get("Job Title") or "").strip(),
+        "birth_year": (json_metadata.get("birth_year") or row.get("Birth Year") or "").strip(),
+        "link_to_user": f"/user/{email}",
+        "questionnaire": f"/api/user/questionnaire/{email}",
+        "voice": f"/api/user/voice/{email}"
+    }
+
+
 def load_user_metadata():
     """
     Load user metadata from the CSV file and JSON files.
@@ -33,58 +130,7 @@ def load_user_metadata():
         List of dictionaries containing user metadata
     """
     try:
-        csv_file_path = Path(os.getenv('SAVED_RESULTS_DIR', 'saved_results') ) / 'user_metadata.csv'
-        logger.info(f"CSV file path: {csv_file_path}")
-        if not csv_file_path.exists():
-            logger.warning("user_metadata.csv file not found")
-            return []
-
-        metadata_list = []
-        csv_metadata_handler = UserMetadataHandler()
-        
-        with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                # Skip empty rows
-                if not row.get("Email", "").strip():
-                    continue
-
-                email = row.get("Email", "").strip()
-                
-                # Load additional metadata from JSON file
-                json_metadata = {}
-                try:
-                    questionnaire_data = csv_metadata_handler.get_user_files(email, "answers")
-                    if questionnaire_data and 'metadata' in questionnaire_data:
-                        json_metadata = questionnaire_data['metadata']
-                except Exception as e:
-                    logger.warning(f"Could not load JSON metadata for {email}: {e}")
-
-                # Convert CSV column names to the expected format and merge with JSON metadata
-                user_data = {
-                    "user_id": (row.get("User ID") or "").strip(),
-                    "email": email,
-                    "date": (row.get("Date") or "").strip(),
-                    "pdn_code": (row.get("PDN Code") or "").strip(),
-                    "pdn_voice_code": (row.get("PDN Voice Code") or "").strip(),
-                    "diagnose_pdn_code": (row.get("Diagnose PDN Code") or "").strip(),
-                    "diagnose_comments": (row.get("Diagnose Comments") or "").strip(),
-                    "pdn_update_comments": (row.get("PDN Update Comments") or "").strip(),
-                    # Load from JSON metadata if available, otherwise use CSV or defaults
-                    "first_name": (json_metadata.get("first_name") or row.get("First Name") or "").strip(),
-                    "last_name": (json_metadata.get("last_name") or row.get("Last Name") or "").strip(),
-                    "phone": (json_metadata.get("phone") or row.get("Phone") or "").strip(),
-                    "native_language": (json_metadata.get("native_language") or json_metadata.get("mother_language") or row.get("Native Language") or "").strip(),
-                    "gender": (json_metadata.get("gender") or row.get("Gender") or "").strip(),
-                    "education_level": (json_metadata.get("education_level") or json_metadata.get("education") or row.get("Education Level") or "").strip(),
-                    "job_title": (json_metadata.get("job_title") or row.get("Job Title") or "").strip(),
-                    "birth_year": (json_metadata.get("birth_year") or row.get("Birth Year") or "").strip(),
-                    "link_to_user": f"/user/{email}",
-                    "questionnaire": f"/api/user/questionnaire/{email}",
-                    "voice": f"/api/user/voice/{email}"
-                }
-                metadata_list.append(user_data)
-
+        metadata_list = list(iter_user_metadata())
         logger.info(f"Loaded {len(metadata_list)} user records from CSV and JSON")
         return metadata_list
 
@@ -93,6 +139,73 @@ def load_user_metadata():
         return []
 
 
+def iter_export_chunks(export_format: str):
+    """
+    Serialize merged user metadata as CSV or NDJSON text chunks.
+
+    Args:
+        export_format: 'csv' or 'ndjson'
+
+    Yields:
+        Text chunks of up to EXPORT_CHUNK_ROWS rows each
+    """
+    buffer = io.StringIO()
+    writer = None
+    if export_format == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+
+    rows_in_buffer = 0
+    for user_data in iter_user_metadata():
+        if writer is not None:
+            writer.writerow(user_data)
+        else:
+            export_row = {field: user_data.get(field, "") for field in EXPORT_FIELDS}
+            buffer.write(json.dumps(export_row, ensure_ascii=False))
+            buffer.write("\n")
+
+        rows_in_buffer += 1
+        if rows_in_buffer >= EXPORT_CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows_in_buffer = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_user_export(export_format: str, download_name: str = None):
+    """
+    Build a streaming response exporting all merged user metadata.
+
+    Args:
+        export_format: 'csv' or 'ndjson'
+        download_name: Attachment filename, defaults to user_metadata.<format>
+
+    Returns:
+        Flask Response streaming the export, gzip-encoded when the client accepts it
+    """
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({"error": "Unsupported export format, use csv or ndjson"}), 400
+
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    chunks = iter_export_chunks(export_format)
+    headers = {
+        "Content-Disposition": f"attachment; filename={download_name or f'user_metadata.{export_format}'}",
+        "Vary": "Accept-Encoding"
+    }
+
+    # Quality-aware, so gzip;q=0 is refused as the client asks
+    if request.accept_encodings["gzip"]:
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_stream(chunks)
+    else:
+        body = (chunk.encode('utf-8') for chunk in chunks)
+
+    return Response(stream_with_context(body), mimetype=f"{mimetype}; charset=utf-8", headers=headers)
+
+
 def get_user_metadata():
     """
     Get user metadata, loading from CSV if needed.
@@ -197,7 +310,7 @@ def get_metadata():
 
 @pdn_admin_bp.route('/metadata/csv')
 def get_metadata_csv():
-    """Get metadata as CSV download"""
+    """Get merged metadata, as JSON or streamed as CSV/NDJSON with ?format="""
     logger.debug("GET /pdn-admin/metadata/csv called")
     logger.info("Request: %s %s", request.method, request.url)
     logger.info("Response: %s", 200)
@@ -206,14 +319,46 @@ def get_metadata_csv():
 
     verify_session(session_token)
 
+    export_format = request.args.get('format')
+    if export_format:
+        return stream_user_export(export_format)
+
     metadata = get_user_metadata()
 
     return jsonify({"data": metadata})
 
 
+@pdn_admin_bp.route('/export')
+def export_metadata():
+    """Stream merged user metadata as CSV (default) or NDJSON"""
+    logger.debug("GET /pdn-admin/export called")
+    logger.info("Request: %s %s", request.method, request.url)
+
+    session_token = request.args.get('session_token')
+    verify_session(session_token)
+
+    return stream_user_export(request.args.get('format', 'csv'))
+
+
+@pdn_admin_bp.route('/statistics')
+def get_metadata_statistics():
+    """Get aggregate statistics over user metadata"""
+    logger.debug("GET /pdn-admin/statistics called")
+    logger.info("Request: %s %s", request.method, request.url)
+
+    session_token = request.args.get('session_token')
+    verify_session(session_token)
+
+    csv_metadata_handler = get_metadata_handler()
+    if request.args.get('recompute', '').lower() in ('1', 'true'):
+        return jsonify(csv_metadata_handler.recompute_statistics())
+
+    return jsonify(csv_metadata_handler.get_statistics())
+
+
 @pdn_admin_bp.route('/download/csv')
 def download_csv_file():
-    """Download the actual CSV file"""
+    """Download the metadata CSV file, or the merged user metadata export with ?merged=1"""
     logger.debug("GET /pdn-admin/download/csv called")
     logger.info("Request: %s %s", request.method, request.url)
 
@@ -221,13 +366,16 @@ def download_csv_file():
     verify_session(session_token)
 
     try:
-        csv_file_path = Path("saved_results/user_metadata.csv")
+        csv_file_path = get_metadata_handler().csv_filename
         if not csv_file_path.exists():
             logger.error("CSV file not found: %s", csv_file_path)
             return jsonify({"error": "CSV file not found"}), 404
 
+        if request.args.get('merged', '').lower() in ('1', 'true'):
+            return stream_user_export('csv', download_name="user_metadata.csv")
+
         return send_file(
-            csv_file_path,
+            csv_file_path.resolve(),
             as_attachment=True,
             download_name="user_metadata.csv",
             mimetype="text/csv"
@@ -246,6 +394,61 @@ def remove_none_keys(obj):
     else:
         return obj
 
+
+# Scoring state stored in answers files, the admin pages get the result as "scores"
+STORED_SCORING_KEYS = ("scoring", "results")
+
+
+def questionnaire_payload(questionnaire_data):
+    """Answers file contents for the admin pages, without the stored scoring state."""
+    return remove_none_keys({key: value for key, value in questionnaire_data.items()
+                             if key not in STORED_SCORING_KEYS})
+
+def load_user_questionnaire(email, user_metadata=None):
+    """
+    Load a user's answers file with their CSV metadata merged in.
+
+    Args:
+        email: User's email address
+        user_metadata: The user's CSV row, read from the CSV if not given
+
+    Returns:
+        Answers file contents with a 'metadata' entry, or None if the user has
+        no answers file
+    """
+    csv_metadata_handler = get_metadata_handler()
+    logger.info(f"Loading questionnaire data for {email}")
+
+    questionnaire_data = csv_metadata_handler.get_user_files(email, "answers")
+    logger.info(f"Questionnaire data loaded: {questionnaire_data is not None}")
+    if not questionnaire_data:
+        return None
+
+    # Get user metadata from CSV (including User ID)
+    if user_metadata is None:
+        logger.info(f"Loading CSV metadata for {email}")
+        user_metadata = csv_metadata_handler.get_user_by_email(email)
+        logger.info(f"CSV metadata loaded: {user_metadata is not None}")
+
+    if user_metadata:
+        # Merge CSV metadata with existing JSON metadata
+        if 'metadata' in questionnaire_data:
+            # Preserve JSON metadata and add CSV metadata
+            questionnaire_data['metadata'].update(user_metadata)
+        else:
+            questionnaire_data['metadata'] = user_metadata
+        logger.info(f"Successfully loaded questionnaire data for {email} with User ID: {user_metadata.get('User ID', 'N/A')}")
+    else:
+        logger.warning(f"No CSV metadata found for user: {email}")
+        # Create a minimal metadata structure
+        if 'metadata' not in questionnaire_data:
+            questionnaire_data['metadata'] = {
+                'email': email,
+                'User ID': 'N/A'
+            }
+    return questionnaire_data
+
+
 @pdn_admin_bp.route('/user/questionnaire/<email>')
 def get_user_questionnaire(email):
     """Get user questionnaire data"""
@@ -257,42 +460,16 @@ def get_user_questionnaire(email):
     verify_session(session_token)
 
     try:
-        # Find user in data
-        csv_metadata_handler = UserMetadataHandler()
-        logger.info(f"Loading questionnaire data for {email}")
-        
-        questionnaire_data = csv_metadata_handler.get_user_files(email, "answers")
-        logger.info(f"Questionnaire data loaded: {questionnaire_data is not None}")
-        
+        questionnaire_data = load_user_questionnaire(email)
         if not questionnaire_data:
             logger.warning(f"No questionnaire data found for user: {email}")
             return jsonify({"error": "User questionnaire not found"}), 404
         
-        # Get user metadata from CSV (including User ID)
-        logger.info(f"Loading CSV metadata for {email}")
-        user_metadata = csv_metadata_handler.get_user_by_email(email)
-        logger.info(f"CSV metadata loaded: {user_metadata is not None}")
-        
-        if user_metadata:
-            # Merge CSV metadata with existing JSON metadata
-            if 'metadata' in questionnaire_data:
-                # Preserve JSON metadata and add CSV metadata
-                questionnaire_data['metadata'].update(user_metadata)
-            else:
-                questionnaire_data['metadata'] = user_metadata
-            logger.info(f"Successfully loaded questionnaire data for {email} with User ID: {user_metadata.get('User ID', 'N/A')}")
-        else:
-            logger.warning(f"No CSV metadata found for user: {email}")
-            # Create a minimal metadata structure
-            if 'metadata' not in questionnaire_data:
-                questionnaire_data['metadata'] = {
-                    'email': email,
-                    'User ID': 'N/A'
-                }
-        
         logger.info(f"Returning questionnaire data with {len(questionnaire_data)} keys")
+        # Answers are stored without the question texts, join them for display
         # Clean None keys before returning
-        clean_data = remove_none_keys(questionnaire_data)
+        clean_data = questionnaire_payload(expand_answers(questionnaire_data))
+        clean_data["scores"] = questionnaire_data.get("results")
         return jsonify(clean_data)
         
     except Exception as e:
@@ -302,6 +479,65 @@ def get_user_questionnaire(email):
         return jsonify({"error": f"Failed to load questionnaire: {str(e)}"}), 500
 
 
+def get_recording_info(path: Path):
+    """
+    Describe a recording for the dashboard.
+
+    Args:
+        path: Recording path under its original name
+
+    Returns:
+        Filename, path and mimetype of the file to play, with the duration,
+        codec, size, loudness, silence ratio and waveform peaks once the
+        recording is processed, or None if not found
+    """
+    recording = resolve_recording(path)
+    if recording is None:
+        return None
+    file_path, mimetype = recording
+    info = {
+        'filename': path.name,
+        'path': str(file_path),
+        'mimetype': mimetype,
+        'exists': True
+    }
+    meta = load_recording_meta(path)
+    if meta and file_path.name == meta.get('canonical'):
+        info.update({key: meta.get(key) for key in ('duration', 'codec', 'size')})
+        analysis = meta.get('analysis') or {}
+        info.update({key: analysis.get(key) for key in ('rms_db', 'silence_ratio', 'peaks')})
+    return info
+
+
+def get_voice_recordings(email):
+    """
+    Find a user's voice recordings.
+
+    Args:
+        email: User's email address
+
+    Returns:
+        {"question1"/"question2"/"legacy": recording info}, empty if none
+    """
+    user_dir = PDNFilePath().resolve_user_dir(email)
+
+    # Look for both question recordings
+    voice_recordings = {}
+    for question in ('question1', 'question2'):
+        recording = get_recording_info(user_dir / f"{email}_{question}.wav")
+        if recording:
+            voice_recordings[question] = recording
+
+    # If no new format recordings found, try old format for backward compatibility
+    if not voice_recordings:
+        user_audio_path = get_metadata_handler().get_user_audio_path(email, "wav")
+        if user_audio_path:
+            recording = get_recording_info(Path(user_audio_path))
+            if recording:
+                voice_recordings['legacy'] = recording
+    return voice_recordings
+
+
 @pdn_admin_bp.route('/user/voice/<email>')
 def get_user_voice(email):
     """Get user voice recording URL"""
@@ -313,46 +549,7 @@ def get_user_voice(email):
     verify_session(session_token)
 
     try:
-        # Find user in data
-        csv_metadata_handler = UserMetadataHandler()
-        pdn_file_path = PDNFilePath()
-        user_dir = pdn_file_path.get_user_dir(email)
-        
-        # Look for both question recordings
-        question1_filename = f"{email}_question1.wav"
-        question2_filename = f"{email}_question2.wav"
-        
-        question1_path = user_dir / question1_filename
-        question2_path = user_dir / question2_filename
-        
-        voice_recordings = {}
-        
-        if question1_path.exists():
-            voice_recordings['question1'] = {
-                'filename': question1_filename,
-                'path': str(question1_path),
-                'exists': True
-            }
-        
-        if question2_path.exists():
-            voice_recordings['question2'] = {
-                'filename': question2_filename,
-                'path': str(question2_path),
-                'exists': True
-            }
-        
-        # If no new format recordings found, try old format for backward compatibility
-        if not voice_recordings:
-            user_audio_path = csv_metadata_handler.get_user_audio_path(email, "wav")
-            if user_audio_path:
-                audio_file_path = Path(user_audio_path)
-                if audio_file_path.exists():
-                    voice_recordings['legacy'] = {
-                        'filename': audio_file_path.name,
-                        'path': user_audio_path,
-                        'exists': True
-                    }
-
+        voice_recordings = get_voice_recordings(email)
         if not voice_recordings:
             return jsonify({"error": "User voice recording not found"}), 404
 
@@ -378,33 +575,25 @@ def update_user_diagnose(email):
     verify_session(session_token)
 
     try:
-        diagnose_data = request.get_json()
+        diagnose = DiagnoseIn.model_validate(request.get_json(silent=True))
+    except ValidationError as e:
+        errors = error_messages(e)
+        return jsonify(ErrorOut(error="Invalid diagnose", errors=errors).model_dump(exclude_none=True)), 400
 
-        # Find and update user in data
-        user_data = next((user for user in get_user_metadata() if user["email"] == email), None)
-        if not user_data:
+    try:
+        # Find the user's row by email instead of merging every user's metadata
+        csv_handler = get_metadata_handler()
+        row = csv_handler.get_user_by_email(email)
+        if not row:
             return jsonify({"error": "User not found"}), 404
+        user_data = user_metadata_from_row(row, csv_handler)
 
-        # Update diagnose fields with safe defaults
-        diagnose_pdn_code = ""
-        diagnose_comments = ""
-
-        if "diagnose_pdn_code" in diagnose_data:
-            diagnose_pdn_code = diagnose_data["diagnose_pdn_code"]
-            user_data["diagnose_pdn_code"] = diagnose_pdn_code
-        elif "diagnose_pdn_code" not in user_data:
-            diagnose_pdn_code = user_data.get("pdn_code", "")
-            user_data["diagnose_pdn_code"] = diagnose_pdn_code
-
-        if "diagnose_comments" in diagnose_data:
-            diagnose_comments = diagnose_data["diagnose_comments"]
-            user_data["diagnose_comments"] = diagnose_comments
-        elif "diagnose_comments" not in user_data:
-            user_data["diagnose_comments"] = ""
+        diagnose_pdn_code, diagnose_comments = get_diagnose_fields(user_data, diagnose)
+        user_data["diagnose_pdn_code"] = diagnose_pdn_code
+        user_data["diagnose_comments"] = diagnose_comments
 
         # Update CSV with the new diagnose information
         try:
-            csv_handler = UserMetadataHandler()
             csv_handler.update_diagnose_code(email, diagnose_pdn_code, diagnose_comments)
             logger.info(f"Successfully updated CSV with diagnose info for {email}")
         except Exception as csv_error:
@@ -421,6 +610,196 @@ def update_user_diagnose(email):
         return jsonify({"error": "Failed to update diagnose"}), 400
 
 
+def get_diagnose_fields(user_data, diagnose):
+    """
+    Diagnose code and comments after applying a verdict.
+
+    Args:
+        user_data: The user's current metadata
+        diagnose: DiagnoseIn with the fields to change
+
+    Returns:
+        (diagnose_pdn_code, diagnose_comments)
+    """
+    diagnose_pdn_code = diagnose.diagnose_pdn_code
+    if diagnose_pdn_code is None:
+        diagnose_pdn_code = user_data.get("diagnose_pdn_code", "")
+    diagnose_comments = diagnose.diagnose_comments
+    if diagnose_comments is None:
+        diagnose_comments = user_data.get("diagnose_comments", "")
+    return diagnose_pdn_code, diagnose_comments
+
+
+@pdn_admin_bp.route('/users/diagnose', methods=['PUT'])
+def update_users_diagnose():
+    """
+    Update the diagnose of several users with one metadata write.
+
+    Body: {"diagnoses": [{"email", "diagnose_pdn_code", "diagnose_comments"}]}.
+    A later verdict for the same user replaces an earlier one.
+    """
+    logger.info("Request: %s %s", request.method, request.url)
+
+    session_token = request.args.get('session_token')
+    verify_session(session_token)
+
+    data = request.get_json(silent=True)
+    try:
+        batch = DiagnoseBatchIn.model_validate(data)
+    except ValidationError as e:
+        errors = error_messages(e, data)
+        return jsonify(ErrorOut(error="Invalid diagnoses", errors=errors).model_dump(exclude_none=True)), 400
+
+    csv_handler = get_metadata_handler()
+    updates = {}
+    not_found = []
+    for diagnose in batch.diagnoses:
+        current = updates.get(diagnose.email)
+        if current is None:
+            row = csv_handler.get_user_by_email(diagnose.email)
+            if not row:
+                not_found.append(diagnose.email)
+                continue
+            current = {"Diagnose PDN Code": row.get("Diagnose PDN Code") or "",
+                       "Diagnose Comments": row.get("Diagnose Comments") or ""}
+        diagnose_pdn_code, diagnose_comments = get_diagnose_fields({
+            "diagnose_pdn_code": current["Diagnose PDN Code"],
+            "diagnose_comments": current["Diagnose Comments"]
+        }, diagnose)
+        updates[diagnose.email] = {"Diagnose PDN Code": diagnose_pdn_code, "Diagnose Comments": diagnose_comments}
+
+    if not csv_handler.update_users_bulk(updates):
+        return jsonify({"error": "Failed to update diagnoses"}), 500
+
+    logger.info(f"Updated diagnose of {len(updates)} users")
+    return jsonify({
+        "success": True,
+        "updated": list(updates),
+        "not_found": not_found
+    })
+
+
+def iter_pending_rows(after=None):
+    """
+    Iterate over the CSV rows of users without a diagnose, in CSV order.
+
+    Args:
+        after: Email of the last user already returned, to continue after it
+
+    Yields:
+        CSV rows
+    """
+    csv_metadata_handler = get_metadata_handler()
+    if not csv_metadata_handler.csv_filename.exists():
+        return
+
+    skipping = bool(after)
+    for row in csv_metadata_handler.read_metadata_generator():
+        email = (row.get("Email") or "").strip()
+        if not email:
+            continue
+        if skipping:
+            skipping = email != after
+            continue
+        if not (row.get("Diagnose PDN Code") or "").strip():
+            yield row
+
+
+def build_review_item(row):
+    """
+    Everything a reviewer needs for one user, with one answers file read.
+
+    Args:
+        row: The user's CSV row
+
+    Returns:
+        {"email", "user", "questionnaire", "scores", "voice_recordings"}, or
+        None if the user has no questionnaire to review. The questionnaire
+        is compact; the page carries the question texts once per version.
+    """
+    email = row["Email"].strip()
+    questionnaire_data = load_user_questionnaire(email, user_metadata=dict(row))
+    if not questionnaire_data:
+        return None
+
+    try:
+        scores = get_pdn_result(questionnaire_data).to_dict()
+    except Exception as e:
+        logger.warning(f"Could not score questionnaire of {email}: {e}")
+        scores = None
+
+    return {
+        "email": email,
+        "user": user_metadata_from_row(row, answers=questionnaire_data),
+        "questionnaire": questionnaire_payload(questionnaire_data),
+        "scores": scores,
+        "voice_recordings": get_voice_recordings(email)
+    }
+
+
+@pdn_admin_bp.route('/review-queue')
+def get_review_queue():
+    """
+    Get the next users waiting for a diagnose, with their questionnaire,
+    scores and voice recordings.
+
+    Query: limit (default 10, at most 50) and after, the next_cursor of the
+    previous page. Users diagnosed in the meantime drop out of the queue. If
+    the cursor's user is no longer in the CSV, the queue starts over from the
+    beginning and cursor_reset is true.
+    Question texts and options are sent once per page, under "questionnaires"
+    by questionnaire version.
+    """
+    logger.info("Request: %s %s", request.method, request.url)
+
+    session_token = request.args.get('session_token')
+    verify_session(session_token)
+
+    limit = min(max(request.args.get('limit', REVIEW_QUEUE_LIMIT, type=int), 1), REVIEW_QUEUE_MAX_LIMIT)
+    after = request.args.get('after')
+    users = []
+    next_cursor = None
+    try:
+        # A removed user's cursor would skip every row
+        cursor_reset = bool(after) and get_metadata_handler().get_user_by_email(after) is None
+        if cursor_reset:
+            logger.warning(f"Review queue cursor {after} is not in the CSV, starting over")
+            after = None
+
+        for row in iter_pending_rows(after):
+            if len(users) == limit:
+                next_cursor = users[-1]["email"]
+                break
+            item = build_review_item(row)
+            if item:
+                users.append(item)
+    except Exception as e:
+        logger.error(f"Error building review queue: {e}")
+        return jsonify({"error": "Failed to load review queue"}), 500
+
+    questionnaires = {}
+    for user in users:
+        index = get_answers_question_index(user["questionnaire"])
+        user["questionnaire_version"] = index.version
+        if index.version not in questionnaires:
+            questionnaires[index.version] = {
+                str(question.number): {"text": question.text, "options": question.options} for question in index
+            }
+    return jsonify({"users": users, "next_cursor": next_cursor, "cursor_reset": cursor_reset,
+                    "questionnaires": questionnaires})
+
+
+@pdn_admin_bp.route('/questionnaire-versions')
+def get_questionnaire_versions():
+    """List the stored questionnaire versions, oldest first"""
+    logger.info("Request: %s %s", request.method, request.url)
+
+    session_token = request.args.get('session_token')
+    verify_session(session_token)
+
+    return jsonify({"versions": list_versions()})
+
+
 @pdn_admin_bp.route('/user/send_email/<email>', methods=['POST'])
 def send_user_email(email):
     """Send PDN report email to user"""
@@ -437,8 +816,8 @@ def send_user_email(email):
         if not user_answers:
             return jsonify({"error": "User answers not found"}), 404
         
-        # Calculate PDN code
-        pdn_code = calculate_pdn_code(user_answers)
+        # Use the stored result, calculating it if there is none
+        pdn_code = get_pdn_result(user_answers).pdn_code
 
         logger.info(f"send_email PDN code: {pdn_code} for user {email}")
 
@@ -478,8 +857,10 @@ def recalculate_user_pdn(email):
         if not user_answers:
             return jsonify({"error": "User answers not found"}), 404
         
-        # Calculate PDN code using the calculate_pdn_code function
-        pdn_code = calculate_pdn_code(user_answers)
+        # Calculate PDN code and store the full result with the answers
+        pdn_result = calculate_pdn_result(user_answers)
+        pdn_code = pdn_result.pdn_code
+        save_results(email, pdn_result.to_dict())
 
         logger.info(f"recalculate_pdn PDN code: {pdn_code} for user {email}")
 
@@ -488,7 +869,7 @@ def recalculate_user_pdn(email):
 
         # Update CSV with the new PDN code and current date
         try:
-            csv_handler = UserMetadataHandler()
+            csv_handler = get_metadata_handler()
             
             # Get user info from session
             user_info = get_session_user_info(session_token)
@@ -529,6 +910,30 @@ def recalculate_user_pdn(email):
         return jsonify({"error": f"Error recalculating PDN code: {str(e)}"}), 500
 
 
+@pdn_admin_bp.route('/users/recalculate_pdn', methods=['POST'])
+def recalculate_all_users_pdn():
+    """Recalculate PDN codes for all users, streaming progress as NDJSON
+
+    ?dry_run=1 only reports changes; ?questionnaire_version= limits the
+    rescore to users who answered that questionnaire version.
+    """
+    logger.debug("POST /pdn-admin/users/recalculate_pdn called")
+    logger.info("Request: %s %s", request.method, request.url)
+
+    session_token = request.args.get('session_token')
+    verify_session(session_token)
+
+    user_info = get_session_user_info(session_token)
+    updated_by = user_info.get("username", "Admin") if user_info else "Admin"
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true')
+    questionnaire_version = request.args.get('questionnaire_version') or None
+
+    events = rescore_all_users(dry_run=dry_run, workers=WEB_RESCORE_WORKERS, updated_by=updated_by,
+                               questionnaire_version=questionnaire_version)
+    body = (json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+    return Response(stream_with_context(body), mimetype='application/x-ndjson; charset=utf-8')
+
+
 @pdn_admin_bp.route('/audio/<path:file_path>')
 def serve_audio(file_path):
     """Serve audio files with authentication."""
@@ -577,17 +982,19 @@ def serve_audio(file_path):
         logger.error(f"Path resolution error: {e}")
         abort(400, description="Invalid file path")
 
-    # Check if file exists
-    if not audio_path.exists():
+    # Check if file exists; processed recordings are found through their metadata
+    recording = resolve_recording(audio_path)
+    if recording is None:
         logger.warning(f"File not found: {audio_path}")
         abort(404, description="Audio file not found")
+    audio_path, mimetype = recording
 
     logger.debug(f"File found, serving: {audio_path}")
 
     try:
         return send_file(
             audio_path,
-            mimetype='audio/wav',
+            mimetype=mimetype,
             as_attachment=False,
             download_name=audio_path.name
         )
@@ -2,11 +2,15 @@ import logging
 from datetime import datetime
 from pathlib import Path
 import os
+import uuid
 
 from flask import Blueprint, request, jsonify, send_file, Response
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestedRangeNotSatisfiable
 
+from ..utils.audio_processing import resolve_recording, submit_recording
+from ..utils.audio_upload import UploadOffsetError, abort_upload, create_upload, finalize_upload, get_upload, \
+    write_chunk
 from ..utils.pdn_file_path import PDNFilePath
 
 logger = logging.getLogger(__name__)
@@ -24,10 +28,11 @@ def serve_audio(filename):
         import urllib.parse
         decoded_filename = urllib.parse.unquote(filename)
         
-        # The filename format is: useremail/filename.wav
-        # Split to get user directory and actual filename
+        # The filename format is: useremail/filename.wav, or ab/cd/useremail/filename.wav
+        # for the sharded layout. Split to get user directory and actual filename
         if '/' in decoded_filename:
-            user_part, actual_filename = decoded_filename.split('/', 1)
+            user_path, actual_filename = decoded_filename.rsplit('/', 1)
+            user_part = user_path.rsplit('/', 1)[-1]
         else:
             # Fallback if no user directory in path
             user_part = "default"
@@ -35,15 +40,18 @@ def serve_audio(filename):
         
         # Get the user directory
         pdn_file_path = PDNFilePath()
-        user_dir = pdn_file_path.get_user_dir(user_part)
+        user_dir = pdn_file_path.resolve_user_dir(user_part)
         
         # Construct the full file path
         file_path = user_dir / actual_filename
         
-        # Check if file exists
-        if not file_path.exists():
+        # Recordings are requested by their original name; once processed they
+        # are stored in another container, found through their metadata
+        recording = resolve_recording(file_path)
+        if recording is None:
             logger.error(f"Audio file not found: {file_path}")
             return jsonify({"error": "Audio file not found"}), 404
+        file_path, mimetype = recording
         
         # Get file size
         file_size = os.path.getsize(file_path)
@@ -74,7 +82,7 @@ def serve_audio(filename):
                     data = f.read(end - start + 1)
                 
                 # Create response with range headers
-                response = Response(data, 206, mimetype='audio/wav')
+                response = Response(data, 206, mimetype=mimetype)
                 response.headers.add('Content-Range', f'bytes {start}-{end}/{file_size}')
                 response.headers.add('Accept-Ranges', 'bytes')
                 response.headers.add('Content-Length', str(end - start + 1))
@@ -87,9 +95,9 @@ def serve_audio(filename):
         # Serve full file if no range request
         return send_file(
             file_path,
-            mimetype='audio/wav',
+            mimetype=mimetype,
             as_attachment=False,
-            download_name=actual_filename
+            download_name=file_path.name
         )
         
     except Exception as e:
@@ -113,16 +121,27 @@ def save_audio():
             return jsonify({"error": "Audio file is required"}), 400
 
         pdn_file_path = PDNFilePath()
-        user_dir = pdn_file_path.get_user_dir(username)
-        user_dir.mkdir(parents=True, exist_ok=True)
+        user_dir = pdn_file_path.ensure_user_dir(username)
 
-        # Use the filename sent from frontend (e.g., username_question1.wav)
-        filename = secure_filename(audio.filename) if audio.filename else f"{username}_audio.wav"
+        # Use the filename sent from frontend (e.g., username_question1.wav), as
+        # the admin views look it up by the user's email
+        if audio.filename and is_safe_filename(audio.filename):
+            filename = audio.filename
+        else:
+            filename = secure_filename(audio.filename or '') or f"{username}_audio.wav"
         file_path = user_dir / filename
 
-        # Save the file
-        audio.save(file_path)
+        # Save the file under a temporary name and move it into place, so a
+        # recording being processed under the same name is never rewritten
+        tmp_path = file_path.with_name(f"{file_path.name}.{uuid.uuid4().hex}.upload")
+        try:
+            audio.save(tmp_path)
+            os.replace(tmp_path, file_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
         logger.info(f"Audio saved successfully: {file_path}")
+        submit_recording(file_path)
 
         return jsonify({
             "success": True,
@@ -137,4 +156,120 @@ def save_audio():
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 
+def is_safe_filename(filename: str) -> bool:
+    """Check a filename stays inside the user directory; unlike secure_filename, keeps the '@' of emails"""
+    return bool(filename) and not filename.startswith('.') and '/' not in filename \
+        and '\\' not in filename and '\0' not in filename
+
+
+def get_audio_filename(username: str, question: str) -> str:
+    """Filename of a recording, matching saveUserAudio in audio-handler.js"""
+    if question in ('question1', 'question2'):
+        filename = f"{username}_{question}.wav"
+    else:
+        filename = f"{username}_audio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
+    if not is_safe_filename(filename):
+        raise ValueError("Invalid username")
+    return filename
+
+
+def upload_response(upload: dict):
+    """JSON body describing an upload's progress"""
+    body = {
+        "upload_id": upload["upload_id"],
+        "offset": upload["offset"],
+        "finalized": upload.get("finalized", False),
+        "filename": upload["filename"]
+    }
+    if upload.get("file_path"):
+        body["file_path"] = upload["file_path"]
+    return jsonify(body)
+
+
+@audio_bp.route('/api/audio-uploads', methods=['POST'])
+def start_audio_upload():
+    """
+    Start a chunked audio upload.
+
+    Body: {"username": ..., "question": "question1"}. Chunks are then PUT to
+    /api/audio-uploads/<upload_id>?offset=<n> and the upload is finished with
+    POST /api/audio-uploads/<upload_id>/finalize.
+    """
+    logger.info("Request: %s %s", request.method, request.url)
+    data = request.get_json(silent=True) or {}
+    username = (data.get('username') or '').strip()
+    if not username:
+        return jsonify({"error": "Username is required"}), 400
+
+    try:
+        upload = create_upload(username, get_audio_filename(username, data.get('question', 'audio')))
+        return upload_response(upload), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error starting audio upload: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@audio_bp.route('/api/audio-uploads/<upload_id>', methods=['GET'])
+def get_audio_upload(upload_id):
+    """Get the number of bytes received, to resume an interrupted upload"""
+    logger.info("Request: %s %s", request.method, request.url)
+    upload = get_upload(upload_id)
+    if upload is None:
+        return jsonify({"error": "Upload not found"}), 404
+    return upload_response(upload)
+
+
+@audio_bp.route('/api/audio-uploads/<upload_id>', methods=['PUT'])
+def put_audio_chunk(upload_id):
+    """Append the request body at ?offset=<n>; resending a chunk is safe"""
+    logger.info("Request: %s %s", request.method, request.url)
+    offset = request.args.get('offset', type=int)
+    if offset is None or offset < 0:
+        return jsonify({"error": "offset is required"}), 400
+
+    try:
+        received = write_chunk(upload_id, offset, request.get_data(cache=False))
+        return jsonify({"upload_id": upload_id, "offset": received})
+    except KeyError:
+        return jsonify({"error": "Upload not found"}), 404
+    except UploadOffsetError as e:
+        # The client resumes from the offset the server has
+        return jsonify({"error": str(e), "offset": e.offset}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error writing audio chunk for upload {upload_id}: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@audio_bp.route('/api/audio-uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_audio_upload(upload_id):
+    """Move a complete upload into the user's directory; body {"size": total bytes}"""
+    logger.info("Request: %s %s", request.method, request.url)
+    data = request.get_json(silent=True) or {}
+    size = data.get('size')
+    if size is not None and not isinstance(size, int):
+        return jsonify({"error": "size must be an integer"}), 400
+
+    try:
+        upload = finalize_upload(upload_id, size)
+        submit_recording(Path(upload["file_path"]))
+        return upload_response(upload)
+    except KeyError:
+        return jsonify({"error": "Upload not found"}), 404
+    except UploadOffsetError as e:
+        return jsonify({"error": str(e), "offset": e.offset}), 409
+    except Exception as e:
+        logger.error(f"Error finalizing audio upload {upload_id}: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
 
+@audio_bp.route('/api/audio-uploads/<upload_id>', methods=['DELETE'])
+def delete_audio_upload(upload_id):
+    """Discard an upload, e.g. a recording that was too short"""
+    logger.info("Request: %s %s", request.method, request.url)
+    if not abort_upload(upload_id):
+        return jsonify({"error": "Upload not found"}), 404
+    return jsonify({"success": True})
@@ -7,7 +7,8 @@ from flask import Blueprint, request, render_template, jsonify, session, current
 
 from .logger import setup_logger
 from ..utils.answer_storage import load_answers
-from ..utils.pdn_calculator import calculate_pdn_code
+from ..utils.content_registry import CONFIG, get_content_registry
+from ..utils.pdn_calculator import get_pdn_result
 from ..utils.report_generator import load_pdn_report
 from ..utils.conversation_history import conversation_history
 
@@ -30,6 +31,23 @@ def get_rag_system():
             _rag_system = None
     return _rag_system
 
+
+def reset_rag_system():
+    """Drop the RAG system, e.g. one inherited from the process that forked this one"""
+    global _rag_system
+    _rag_system = None
+
+
+def _config_changed(config, old_config):
+    """Rebuild the RAG system on next use if its settings changed"""
+    global _rag_system
+    if config.get('rag') != (old_config or {}).get('rag'):
+        _rag_system = None
+        logger.info("RAG settings changed, the RAG system will be rebuilt")
+
+
+get_content_registry().subscribe(CONFIG, _config_changed)
+
 # Create blueprint
 pdn_chat_ai_bp = Blueprint('pdn_chat_ai', __name__,
                            template_folder='templates',
@@ -87,14 +105,16 @@ def get_user_context():
         # Load user answers
         user_answers = load_answers(email)
         if user_answers:
-            # Calculate PDN code
-            pdn_code = calculate_pdn_code(user_answers)
+            # Use the stored result, calculating it if there is none
+            pdn_result = get_pdn_result(user_answers)
+            pdn_code = pdn_result.pdn_code
             if pdn_code:
                 # Load report data
                 report_data = load_pdn_report(pdn_code)
                 if report_data:
                     user_context = {
                         'pdn_code': pdn_code,
+                        'results': pdn_result.to_dict(),
                         'report_data': report_data,
                         'user_answers': user_answers
                     }
@@ -10,6 +10,7 @@ import os
 import logging
 from ..utils.conversation_history import conversation_history
 from ..data.config import settings
+from .retrieval_service import RetrievalClient
 
 # Configure logging
 logging.basicConfig(
@@ -22,13 +23,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Check if OpenAI API key is set in environment
-if not os.getenv("OPENAI_API_KEY"):
-    raise ValueError("OPENAI_API_KEY environment variable is not set. Please set it before running the application.")
-
 # Import system prompt from prompts module
 from ..prompts import BINT_CHAT_SOURCE_PROMPT
 
+def build_vectorstore(docs_path: str, persist_dir: str = None, persist: bool = True):
+    """
+    Load the persisted Chroma vector store, or build it from the documents.
+    :param docs_path: Path to the Hebrew text documents.
+    :param persist_dir: Directory for Chroma vector database persistence.
+    :param persist: Whether to persist and reuse Chroma DB.
+    :return: The Chroma vector store.
+    """
+    # Use config default if persist_dir not provided
+    if persist_dir is None:
+        persist_dir = settings.CHROMA_DB_PERSIST_DIR
+
+    embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+
+    # Load persisted DB if exists
+    if persist and Path(persist_dir).exists():
+        logger.info("Loading existing Chroma vectorstore...")
+        vectorstore = Chroma(persist_directory=persist_dir, embedding_function=embeddings)
+        logger.info("Chroma vectorstore loaded successfully.")
+    else:
+        # Load and prepare documents
+        logger.info("Loading documents...")
+        docs = PDNRAG.load_documents(docs_path)
+        logger.info(f"Loaded {len(docs)} documents")
+
+        logger.info("Splitting documents...")
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=settings.RAG_CHUNK_SIZE,
+            chunk_overlap=settings.RAG_CHUNK_OVERLAP
+        )
+        docs = splitter.split_documents(docs)
+
+        logger.info("Creating embeddings and vector store...")
+        vectorstore = Chroma.from_documents(docs, embeddings, persist_directory=persist_dir)
+        logger.info("Chroma vectorstore created successfully.")
+    return vectorstore
+
+
 class PDNRAG:
 
     @staticmethod
@@ -57,44 +92,34 @@ class PDNRAG:
     ):
         """
         Initialize the RAG pipeline.
+
+        When RETRIEVAL_SOCKET is set, searches go to the retrieval service
+        listening there (see retrieval_service), which owns the vector store
+        for all workers, and no vector store is loaded here.
         :param docs_path: Path to the Hebrew text documents.
         :param persist_dir: Directory for Chroma vector database persistence.
         :param persist: Whether to persist and reuse Chroma DB.
         """
-        # Use config default if persist_dir not provided
-        if persist_dir is None:
-            persist_dir = settings.CHROMA_DB_PERSIST_DIR
-            
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
-        
-        # Load persisted DB if exists
-        if persist and Path(persist_dir).exists():
-            logger.info("Loading existing Chroma vectorstore...")
-            self.vectorstore = Chroma(persist_directory=persist_dir, embedding_function=embeddings)
-            logger.info("Chroma vectorstore loaded successfully.")  
-        else:
-            # Load and prepare documents
-            logger.info("Loading documents...")
-            docs = self.load_documents(docs_path)
-            logger.info(f"Loaded {len(docs)} documents")
-
-            logger.info("Splitting documents...")
-            splitter = RecursiveCharacterTextSplitter(
-                chunk_size=settings.RAG_CHUNK_SIZE, 
-                chunk_overlap=settings.RAG_CHUNK_OVERLAP
-            )
-            docs = splitter.split_documents(docs)
+        # Checked here rather than at import, so the module can be imported without a key
+        if not os.getenv("OPENAI_API_KEY"):
+            raise ValueError("OPENAI_API_KEY environment variable is not set. Please set it before running the application.")
 
-            logger.info("Creating embeddings and vector store...")
-            self.vectorstore = Chroma.from_documents(docs, embeddings, persist_directory=persist_dir)
-            logger.info("Chroma vectorstore created successfully.")
+        retrieval_socket = os.getenv("RETRIEVAL_SOCKET")
+        if retrieval_socket:
+            logger.info(f"Using the retrieval service at {retrieval_socket}")
+            self.retrieval_client = RetrievalClient(retrieval_socket)
+            self.vectorstore = None
+            self.retriever = None
+        else:
+            self.retrieval_client = None
+            self.vectorstore = build_vectorstore(docs_path, persist_dir, persist)
 
-        # Setup retriever
-        logger.info("Setting up retriever and QA chain...")
-        self.retriever = self.vectorstore.as_retriever(
-            search_type="similarity", 
-            search_kwargs={"k": settings.RAG_SEARCH_K}
-        )
+            # Setup retriever
+            logger.info("Setting up retriever and QA chain...")
+            self.retriever = self.vectorstore.as_retriever(
+                search_type="similarity",
+                search_kwargs={"k": settings.RAG_SEARCH_K}
+            )
 
         # Build prompt template with PDN chat source prompt
         self.prompt = ChatPromptTemplate.from_messages([
@@ -144,11 +169,14 @@ class PDNRAG:
         
         logger.info(f"Querying: {user_query}{user_info}")  
         try:
-            # Retrieve relevant documents
-            docs = self.retriever.get_relevant_documents(user_query)
-            
+            # Retrieve relevant documents, from the retrieval service if there is one
+            if self.retrieval_client:
+                contents = [doc["page_content"] for doc in self.retrieval_client.search(user_query, settings.RAG_SEARCH_K)]
+            else:
+                contents = [doc.page_content for doc in self.retriever.get_relevant_documents(user_query)]
+
             # Combine context from documents
-            context = "\n\n".join([doc.page_content for doc in docs])
+            context = "\n\n".join(contents)
             
             # Add conversation history if user_id is provided
             conversation_context = ""
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Retrieval service: one process per host that owns the Chroma vector store.
+
+Without it every web worker loads its own PDNRAG vector store and Chroma
+client over the same persistent directory. The service loads the store once
+and answers searches over a Unix socket; PDNRAG sends its searches here when
+RETRIEVAL_SOCKET is set, and keeps only the LLM chain in the worker.
+
+The protocol is one JSON request line and one JSON response line per
+connection:
+
+    {"op": "search", "queries": ["..."], "k": 6}  ->  {"results": [[{"page_content", "metadata"}, ...], ...]}
+    {"op": "ping"}                                ->  {"ok": true}
+
+Errors are answered as {"error": "..."}. The queries of one request are
+embedded in a single embeddings call, and query embeddings are cached.
+
+Usage:
+    python -m app.pdn_chat_ai.retrieval_service [--socket /tmp/pdn-retrieval.sock] [--docs ./rag] [--persist-dir ./chroma_db]
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/tmp/pdn-retrieval.sock"
+
+# Request limits
+MAX_REQUEST_BYTES = 1024 * 1024
+MAX_QUERIES = 64
+MAX_K = 50
+
+# search(queries, k) -> one list of documents per query
+SearchFunction = Callable[[List[str], int], List[List[Dict[str, Any]]]]
+
+
+class RetrievalServiceError(Exception):
+    """The retrieval service could not be reached or rejected the request."""
+
+
+class VectorStoreSearch:
+    """Batched similarity search over a vector store, with an LRU cache of query embeddings."""
+
+    def __init__(self, vectorstore, embeddings, cache_size: int = 1024):
+        """
+        Args:
+            vectorstore: Store with similarity_search_by_vector(embedding, k), e.g. Chroma
+            embeddings: Embeddings with embed_documents(texts), e.g. OpenAIEmbeddings
+            cache_size: Number of query embeddings kept
+        """
+        self.vectorstore = vectorstore
+        self.embeddings = embeddings
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed(self, queries: Sequence[str]) -> List[List[float]]:
+        """
+        Embed queries, in one embeddings call for those not cached.
+
+        Args:
+            queries: Query texts
+
+        Returns:
+            One embedding per query
+        """
+        found = {}
+        with self._lock:
+            for query in queries:
+                if query in self._cache:
+                    self._cache.move_to_end(query)
+                    found[query] = self._cache[query]
+
+        missing = [query for query in dict.fromkeys(queries) if query not in found]
+        if missing:
+            vectors = self.embeddings.embed_documents(missing)
+            found.update(zip(missing, vectors))
+            with self._lock:
+                self._cache.update(zip(missing, vectors))
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return [found[query] for query in queries]
+
+    def __call__(self, queries: List[str], k: int) -> List[List[Dict[str, Any]]]:
+        return [
+            [{"page_content": doc.page_content, "metadata": dict(doc.metadata or {})}
+             for doc in self.vectorstore.similarity_search_by_vector(vector, k=k)]
+            for vector in self.embed(queries)
+        ]
+
+
+def handle_request(search: SearchFunction, request: Any) -> Dict[str, Any]:
+    """
+    Answer one protocol request.
+
+    Args:
+        search: Search function of the service
+        request: Parsed request
+
+    Returns:
+        Response object
+
+    Raises:
+        ValueError: If the request is malformed
+    """
+    if not isinstance(request, dict):
+        raise ValueError("Request must be an object")
+
+    op = request.get("op", "search")
+    if op == "ping":
+        return {"ok": True}
+    if op != "search":
+        raise ValueError(f"Unknown op: {op}")
+
+    queries = request.get("queries")
+    if not isinstance(queries, list) or not queries or not all(isinstance(query, str) for query in queries):
+        raise ValueError("queries must be a non-empty list of strings")
+    if len(queries) > MAX_QUERIES:
+        raise ValueError(f"At most {MAX_QUERIES} queries per request")
+    k = request.get("k")
+    if not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be an integer from 1 to {MAX_K}")
+
+    return {"results": search(queries, k)}
+
+
+class RetrievalHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline(MAX_REQUEST_BYTES)
+        try:
+            response = handle_request(self.server.search, json.loads(line))
+        except ValueError as e:
+            response = {"error": str(e)}
+        except Exception as e:
+            logger.error(f"Search failed: {e}")
+            response = {"error": f"Search failed: {e}"}
+        self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+class RetrievalServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server answering searches, one thread per connection."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, search: SearchFunction):
+        """
+        Args:
+            socket_path: Unix socket to listen on; a stale socket file is replaced
+            search: Search function, e.g. a VectorStoreSearch
+        """
+        self.search = search
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, RetrievalHandler)
+        # Web workers run as the same user or group
+        os.chmod(socket_path, 0o660)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class RetrievalClient:
+    """Client of the retrieval service, one connection per request."""
+
+    def __init__(self, socket_path: str, timeout: float = 30.0):
+        """
+        Args:
+            socket_path: Unix socket the service listens on
+            timeout: Seconds to wait for the service
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                sock.sendall((json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8"))
+                with sock.makefile("rb") as f:
+                    line = f.readline()
+        except OSError as e:
+            raise RetrievalServiceError(f"Retrieval service at {self.socket_path} is unavailable: {e}")
+
+        try:
+            response = json.loads(line)
+        except ValueError:
+            raise RetrievalServiceError("Retrieval service sent an invalid response")
+        if "error" in response:
+            raise RetrievalServiceError(response["error"])
+        return response
+
+    def search_batch(self, queries: List[str], k: int) -> List[List[Dict[str, Any]]]:
+        """
+        Search several queries in one request.
+
+        Args:
+            queries: Query texts
+            k: Documents per query
+
+        Returns:
+            For each query, its documents as {"page_content", "metadata"}
+
+        Raises:
+            RetrievalServiceError: If the service is unavailable or rejects the request
+        """
+        return self._call({"op": "search", "queries": list(queries), "k": k})["results"]
+
+    def search(self, query: str, k: int) -> List[Dict[str, Any]]:
+        """
+        Search one query.
+
+        Args:
+            query: Query text
+            k: Number of documents
+
+        Returns:
+            Documents as {"page_content", "metadata"}
+        """
+        return self.search_batch([query], k)[0]
+
+    def ping(self) -> bool:
+        """Check that the service is up."""
+        try:
+            return self._call({"op": "ping"}).get("ok", False)
+        except RetrievalServiceError:
+            return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve vector store searches to the web workers")
+    parser.add_argument('--socket', default=os.getenv("RETRIEVAL_SOCKET", DEFAULT_SOCKET),
+                        help=f'Unix socket to listen on (default: RETRIEVAL_SOCKET or {DEFAULT_SOCKET})')
+    parser.add_argument('--docs', default="./rag", help='Documents to build the store from if it is not persisted')
+    parser.add_argument('--persist-dir', default="./chroma_db", help='Chroma persistence directory')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from .pdn_chat_rag import build_vectorstore
+
+    vectorstore = build_vectorstore(args.docs, args.persist_dir)
+    server = RetrievalServer(args.socket, VectorStoreSearch(vectorstore, vectorstore.embeddings))
+    logger.info(f"Retrieval service listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
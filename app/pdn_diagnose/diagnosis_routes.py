@@ -4,11 +4,13 @@ import os
 from collections import defaultdict
 
 from flask import Blueprint, request, render_template, jsonify, session, current_app
+from pydantic import ValidationError
 from werkzeug.exceptions import HTTPException
 
-from ..utils.answer_storage import load_answers, save_user_metadata, save_answer
-from ..utils.pdn_calculator import calculate_pdn_code
+from ..utils.answer_storage import load_answers, save_user_metadata, save_answer, save_answers, save_results
+from ..utils.pdn_calculator import get_compiled_scorer, get_pdn_result, get_running_scores
 from ..utils.questionnaire import get_question
+from ..utils.schemas import AnswerBatchIn, AnswerIn, ErrorOut, MessageOut, ProgressOut, UserInfoIn, error_messages
 from ..utils.report_generator import load_pdn_report
 from .logger import setup_logger
 from ..utils.email_sender import send_pdn_code_email
@@ -68,8 +70,14 @@ def save_user_info_api():
     logger.info("Response: %s", 200)
     
     try:
-        user_data = request.get_json()
-        email = user_data.get('email', 'anonymous')
+        user_data = UserInfoIn.model_validate(request.get_json(silent=True)).model_dump()
+    except ValidationError as e:
+        errors = error_messages(e)
+        logger.error(f"Invalid user info: {errors}")
+        return jsonify(ErrorOut(error="Invalid user information", errors=errors).model_dump(exclude_none=True)), 400
+
+    try:
+        email = user_data['email']
         save_user_metadata(user_data, email)
         session["user_data"] = user_data
         return jsonify({"message": "User information saved successfully."})
@@ -120,64 +128,61 @@ def submit_answer_route():
     logger.info("Response: %s", 200)
     
     try:
-        data = request.get_json()
-        logger.info(f"Received answer data: {data}")
-        
-        question_number = data.get('question_number')
-        selected_option_code = data.get('selected_option_code')
-        ranking = data.get('ranking')
-        email = session.get('email', 'anonymous')
-        
-        logger.debug(f"Processed data - question_number: {question_number}, selected_option_code: {selected_option_code}, ranking: {ranking}, email: {email}")
-        
-        # Validate required fields
-        if question_number is None:
-            logger.error("Missing question_number in request")
-            return jsonify({"error": "Missing question_number"}), 400
-            
-        # For ranking questions, ranking should be present
-        # For regular questions, selected_option_code should be present
-        if ranking is not None:
-            # This is a ranking question, selected_option_code can be null
-            pass
-        elif selected_option_code is None:
-            logger.error("Missing selected_option_code for regular question")
-            return jsonify({"error": "Missing selected_option_code"}), 400
-        
-        # Get question text from questions data
-        question_text = None
-        try:
-            questions = current_app.config.get('QUESTIONS_FILE', {})
-            logger.info(f" answer Questions: {questions}")
-            question_data = get_question(question_number, questions)
-            if 'question' in question_data:
-                question_text = question_data['question']
-                question_options = question_data['options']
-        except Exception as e:
-            logger.error(f"Could not get question text for question {question_number}: {e}")
-        
-        # Create answer data dictionary
-        answer_data = {
-            'selected_option_code': selected_option_code,
-            'ranking': ranking,
-            'question_options': question_options
-        }
-        
-        # Save answer with question text
-        try:
-            save_answer(email, question_number, answer_data, question_text)
-            logger.info(f"Answer saved successfully for question {question_number}")
-        except Exception as save_error:
-            logger.error(f"Error saving answer: {save_error}")
-            return jsonify({"error": f"Failed to save answer: {str(save_error)}"}), 500
-        
-        # Store in memory for current session
+        answer = AnswerIn.model_validate_json(request.get_data())
+    except ValidationError as e:
+        errors = error_messages(e)
+        logger.error(f"Invalid answer: {errors}")
+        return jsonify(ErrorOut(error="Invalid answer", errors=errors).model_dump(exclude_none=True)), 400
+
+    email = session.get('email', 'anonymous')
+    question_number = answer.question_number
+    answer_data = answer.to_answer_data()
+    logger.info(f"Received answer for question {question_number} from {email}")
+
+    try:
+        save_answer(email, question_number, answer_data)
+        logger.info(f"Answer saved successfully for question {question_number}")
+    except Exception as save_error:
+        logger.error(f"Error saving answer: {save_error}")
+        return jsonify({"error": f"Failed to save answer: {str(save_error)}"}), 500
+
+    # Store in memory for current session
+    user_answers[email][question_number] = answer_data
+
+    return jsonify(MessageOut(message="Answer saved successfully").model_dump(exclude_none=True))
+
+@pdn_diagnose_bp.route('/answers', methods=['POST'])
+def submit_answers_route():
+    """Submit several answers at once, e.g. a whole phase, with a single write"""
+    logger.debug("POST /pdn-diagnose/answers called")
+    api_usage["submit_answers"] += 1
+    logger.debug(f"API Usage: {dict(api_usage)}")
+    logger.info("Request: %s %s", request.method, request.url)
+
+    data = request.get_json(silent=True)
+    try:
+        # Every answer is checked against the question index before any is saved
+        answers = AnswerBatchIn.model_validate(data).answers
+    except ValidationError as e:
+        errors = error_messages(e, data)
+        logger.error(f"Invalid answers in batch: {errors}")
+        return jsonify(ErrorOut(error="Invalid answers", errors=errors).model_dump(exclude_none=True)), 400
+
+    email = session.get('email', 'anonymous')
+    batch = [(answer.question_number, answer.to_answer_data()) for answer in answers]
+
+    try:
+        save_answers(email, batch)
+        logger.info(f"Saved {len(batch)} answers for {email}")
+    except Exception as save_error:
+        logger.error(f"Error saving answers: {save_error}")
+        return jsonify({"error": f"Failed to save answers: {str(save_error)}"}), 500
+
+    # Store in memory for current session
+    for question_number, answer_data in batch:
         user_answers[email][question_number] = answer_data
-        
-        return jsonify({"message": "Answer saved successfully"})
-    except Exception as e:
-        logger.error(f"Error submitting answer: {e}")
-        return jsonify({"error": str(e)}), 400
+
+    return jsonify(MessageOut(message="Answers saved successfully", saved=len(batch)).model_dump())
 
 @pdn_diagnose_bp.route('/complete_questionnaire', methods=['POST'])
 def complete_questionnaire():
@@ -199,8 +204,10 @@ def complete_questionnaire():
             logger.error(f"No answers found for email: {email}")
             return jsonify({"error": "No answers found"}), 400
         
-        # Calculate PDN code
-        pdn_code = calculate_pdn_code(user_answers_data)
+        # Finalize the running scores kept with the answers and store the full result
+        pdn_result = get_running_scores(user_answers_data).finalize()
+        pdn_code = pdn_result.pdn_code
+        save_results(email, pdn_result.to_dict())
 
         logger.info(f"PDN code for {email}: {pdn_code}")
 
@@ -210,8 +217,8 @@ def complete_questionnaire():
         
         # Update CSV with the calculated PDN code
         try:
-            from ..utils.csv_metadata_handler import UserMetadataHandler
-            csv_handler = UserMetadataHandler()
+            from ..utils.csv_metadata_handler import get_metadata_handler
+            csv_handler = get_metadata_handler()
             csv_handler.update_pdn_code(email, pdn_code)
             logger.info(f"Successfully updated CSV with PDN code {pdn_code} for {email}")
         except Exception as csv_error:
@@ -223,6 +230,33 @@ def complete_questionnaire():
         logger.error(f"Error completing questionnaire: {e}")
         return jsonify({"error": str(e)}), 400
 
+@pdn_diagnose_bp.route('/progress', methods=['GET'])
+def get_progress():
+    """Get the number of scored questions answered and the provisional PDN result"""
+    logger.debug("GET /pdn-diagnose/progress called")
+    api_usage["progress"] += 1
+    logger.debug(f"API Usage: {dict(api_usage)}")
+    logger.info("Request: %s %s", request.method, request.url)
+
+    try:
+        email = session.get('email', 'anonymous')
+        total = len(get_compiled_scorer().questions)
+
+        user_answers_data = load_answers(email)
+        if not user_answers_data:
+            return jsonify(ProgressOut(answered=0, total=total, provisional=None).model_dump())
+
+        running_scores = get_running_scores(user_answers_data)
+        progress = ProgressOut(
+            answered=running_scores.answered,
+            total=total,
+            provisional=running_scores.finalize().to_dict()
+        )
+        return jsonify(progress.model_dump())
+    except Exception as e:
+        logger.error(f"Error getting questionnaire progress: {e}")
+        return jsonify({"error": str(e)}), 400
+
 @pdn_diagnose_bp.route('/pdn_report')
 def pdn_report():
     """PDN report page"""
@@ -252,8 +286,11 @@ def get_report_data():
             logger.error(f"No answers found for email: {email}")
             return jsonify({'error': 'No answers found'}), 400
         
-        # Calculate PDN code
-        pdn_code = calculate_pdn_code(user_answers_data)
+        # Use the stored result, calculating and storing it if there is none
+        pdn_result = get_pdn_result(user_answers_data)
+        pdn_code = pdn_result.pdn_code
+        if 'results' not in user_answers_data:
+            save_results(email, pdn_result.to_dict())
         
         if not pdn_code:
             logger.error(f"Could not calculate PDN code for user {email}")
@@ -276,9 +313,7 @@ def get_report_data():
                 'last_name': user_data.get('last_name', ''),
                 'email': email
             },
-            'results': {
-                'pdn_code': pdn_code,
-            }
+            'results': pdn_result.to_dict()
         }
         
         return jsonify(response_data)
@@ -337,8 +372,8 @@ def send_pdn_email():
         if not user_answers_data:
             return jsonify({"error": "No answers found"}), 400
         
-        # Calculate PDN code
-        pdn_code = calculate_pdn_code(user_answers_data)
+        # Use the stored result, calculating it if there is none
+        pdn_code = get_pdn_result(user_answers_data).pdn_code
         
         if not pdn_code:
             return jsonify({"error": "Could not calculate PDN code"}), 400
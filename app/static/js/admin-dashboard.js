@@ -0,0 +1,1471 @@
+// Utility: Get user email from modal content (assumes email is present in a data attribute or visible field)
+function getDiagnosisUserEmail() {
+    // Try to find an element with data-email or fallback to text content
+    const emailElem = document.querySelector('#questionnaireContent [data-email]');
+    if (emailElem) return emailElem.getAttribute('data-email');
+    // Fallback: try to find a visible email in the content
+    const match = document.getElementById('questionnaireContent').innerText.match(/[\w.-]+@[\w.-]+/);
+    return match ? match[0] : 'user';
+}
+
+// Main PDF export function
+function downloadDiagnosisAsPDF() {
+    const content = document.getElementById('questionnaireContent');
+    if (!content) {
+        alert('לא נמצאו נתונים לייצוא');
+        return;
+    }
+
+    // Create a new container for the complete report
+    const reportContainer = document.createElement('div');
+    reportContainer.style.cssText = `
+        font-family: 'Noto Sans Hebrew', 'Arial', sans-serif !important;
+        direction: rtl !important;
+        text-align: right !important;
+        font-size: 14px !important;
+        line-height: 1.6 !important;
+        color: #000 !important;
+        background: white !important;
+        padding: 20px !important;
+        width: 100% !important;
+        max-width: 800px !important;
+        margin: 0 auto !important;
+    `;
+    reportContainer.setAttribute('dir', 'rtl');
+    reportContainer.setAttribute('lang', 'he');
+
+    // Clone the questionnaire content
+    const questionnaireClone = content.cloneNode(true);
+
+            // Remove the user metadata section from the clone
+        const metadataSection = questionnaireClone.querySelector('.bg-gradient-to-br.from-blue-50.via-blue-50.to-blue-100');
+    if (metadataSection) {
+        metadataSection.remove();
+    }
+
+    // Find the questionnaire section and add user ID before it
+    const questionnaireSection = questionnaireClone.querySelector('.bg-white.p-8.rounded-2xl.border.border-gray-200.shadow-lg.mt-6');
+    if (questionnaireSection) {
+        // Create user ID section
+        const userIdSection = document.createElement('div');
+        userIdSection.style.cssText = `
+            background: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%);
+            padding: 20px;
+            border-radius: 12px;
+            margin-bottom: 20px;
+            border: 1px solid #d1d5db;
+            text-align: center;
+            font-family: 'Noto Sans Hebrew', 'Arial', sans-serif !important;
+            direction: rtl !important;
+        `;
+
+        const userId = getUserMetadata('user_id');
+        userIdSection.innerHTML = `
+            <div style="font-size: 16px; font-weight: bold; color: #374151; margin-bottom: 8px; font-family: 'Noto Sans Hebrew', 'Arial', sans-serif;">
+                מזהה מערכת
+            </div>
+            <div style="font-family: monospace; font-size: 18px; font-weight: bold; color: #1e40af; background: white; padding: 8px 16px; border-radius: 8px; display: inline-block; border: 1px solid #d1d5db;">
+                ${userId}
+            </div>
+        `;
+
+        // Insert the user ID section before the questionnaire section
+        questionnaireSection.parentNode.insertBefore(userIdSection, questionnaireSection);
+    }
+
+    // Apply RTL and font styles to all elements in the clone
+    const allElements = questionnaireClone.querySelectorAll('*');
+    allElements.forEach(element => {
+        element.style.fontFamily = "'Noto Sans Hebrew', 'Arial', sans-serif";
+        element.style.direction = 'rtl';
+        element.style.textAlign = 'right';
+    });
+
+    // Add the modified content to the report container
+    reportContainer.appendChild(questionnaireClone);
+
+    // Generate filename with user ID and date
+    const userId = getUserMetadata('user_id');
+    const date = new Date().toLocaleDateString('he-IL', { year: 'numeric', month: '2-digit', day: '2-digit' });
+
+    // Create filename: user_id_date.pdf
+    const filename = `${userId}_${date}.pdf`;
+
+    // PDF options with better Hebrew support
+    const opt = {
+        margin:       [0.5, 0.5, 0.5, 0.5], // inches (top, left, bottom, right)
+        filename:     filename,
+        image:        { type: 'jpeg', quality: 0.98 },
+        html2canvas:  { 
+            scale: 2, 
+            useCORS: true,
+            allowTaint: true,
+            backgroundColor: '#ffffff'
+        },
+        jsPDF:        { 
+            unit: 'in', 
+            format: 'a4', 
+            orientation: 'portrait',
+            compress: true
+        },
+        pagebreak:    { mode: ['avoid-all', 'css', 'legacy'] }
+    };
+
+    // html2pdf is loaded on first use
+    loadScript(HTML2PDF_URL).then(() => html2pdf().set(opt).from(reportContainer).save());
+}
+
+// Helper function to get user metadata from the current data
+function getUserMetadata(field) {
+    // Try to get from the current user data
+    const currentUser = getCurrentUserFromModal();
+    if (currentUser && currentUser[field]) {
+        return currentUser[field];
+    }
+
+    // Try to get from the metadata in the modal content
+    const metadataElement = document.querySelector('#questionnaireContent .font-mono.font-bold.text-blue-600.text-lg');
+    if (metadataElement && field === 'user_id') {
+        return metadataElement.textContent.trim();
+    }
+
+    // Try to get from the metadata object in the displayQuestionsWithText function
+    const metadataSection = document.querySelector('#questionnaireContent .bg-gradient-to-br.from-blue-50.via-blue-50.to-blue-100');
+    if (metadataSection) {
+        const userIdElement = metadataSection.querySelector('.font-mono.font-bold.text-blue-600.text-lg');
+        if (userIdElement && field === 'user_id') {
+            return userIdElement.textContent.trim();
+        }
+    }
+
+    // Fallback values
+    const fallbacks = {
+        'user_id': 'לא זמין',
+        'email': getDiagnosisUserEmail(),
+        'date': 'לא זמין',
+        'pdn_code': 'לא זמין',
+        'pdn_voice_code': 'לא זמין',
+        'diagnose_pdn_code': 'לא זמין',
+        'diagnose_comments': 'אין הערות'
+    };
+
+    return fallbacks[field] || 'לא זמין';
+}
+
+// Helper function to get current user data from the modal
+function getCurrentUserFromModal() {
+    const userEmail = getDiagnosisUserEmail();
+    if (userEmail && currentData) {
+        return currentData.find(user => user.email === userEmail);
+    }
+    return null;
+}
+
+let sessionToken = null;
+let currentData = [];
+let currentEditEmail = null;
+
+// Function to format timestamp
+function formatTimestamp(timestamp) {
+    if (!timestamp) return 'לא זמין';
+
+    try {
+        // Handle different timestamp formats
+        let cleanTimestamp = timestamp.replace(/_/g, ' ').trim();
+
+        // If it's already in a readable format, return as is
+        if (cleanTimestamp.includes('-') || cleanTimestamp.includes('/')) {
+            return cleanTimestamp;
+        }
+
+        // Parse timestamp in format "YYYY MM DD HH MM" or "YYYY_MM_DD_HH_MM"
+        const parts = cleanTimestamp.split(/[\s_]+/);
+
+        if (parts.length >= 5) {
+            const [year, month, day, hour, minute] = parts;
+
+            // Validate parts
+            if (year && month && day && hour && minute) {
+                // Format as Hebrew date: DD/MM/YYYY HH:MM
+                return `${day}/${month}/${year} ${hour}:${minute}`;
+            }
+        }
+
+        // If parsing fails, return the cleaned timestamp
+        return cleanTimestamp;
+    } catch (error) {
+        console.error('Error formatting timestamp:', error);
+        return timestamp.replace(/_/g, ' ');
+    }
+}
+
+// Initialize
+document.addEventListener('DOMContentLoaded', function() {
+    // Get session token from localStorage
+    sessionToken = localStorage.getItem('adminSessionToken');
+
+    // If no session token, redirect to login
+    if (!sessionToken) {
+        window.location.href = '/pdn-admin/';
+        return;
+    }
+
+    setupEventListeners();
+    loadMetadata();
+
+    // Add global error handler for 401 responses
+    window.addEventListener('unhandledrejection', function(event) {
+        if (event.reason && event.reason.status === 401) {
+            console.log('Global 401 error handler: Session expired, redirecting to login');
+            localStorage.removeItem('adminSessionToken');
+            window.location.href = '/pdn-admin/';
+        }
+    });
+});
+
+function setupEventListeners() {
+    // Search functionality
+    document.getElementById('searchInput').addEventListener('input', handleSearch);
+
+    // Red users filter
+    document.getElementById('redUsersFilter').addEventListener('change', handleFilter);
+
+    // Refresh button
+    document.getElementById('refreshBtn').addEventListener('click', loadMetadata);
+
+    // Logout button
+    document.getElementById('logoutBtn').addEventListener('click', handleLogout);
+
+    // Edit diagnose form
+    document.getElementById('editDiagnoseForm').addEventListener('submit', handleEditDiagnose);
+
+    // CSV download button
+    document.getElementById('downloadCsvBtn').addEventListener('click', function() {
+        downloadCsvFile();
+    });
+}
+
+async function handleLogout() {
+    if (sessionToken) {
+        try {
+            await fetch(`/pdn-admin/logout?session_token=${sessionToken}`);
+        } catch (error) {
+            console.error('Logout error:', error);
+        }
+    }
+    sessionToken = null;
+    // Clear session token from localStorage
+    localStorage.removeItem('adminSessionToken');
+    // Redirect to login page
+    window.location.href = '/pdn-admin/';
+}
+
+async function loadMetadata() {
+    showLoading();
+    console.log('loadMetadata sessionToken', sessionToken);
+    try {
+        const response = await fetch('/pdn-admin/metadata/csv?session_token=' + sessionToken);
+        if (response.ok) {
+            const data = await response.json();
+            currentData = data.data;
+            renderTable(currentData);
+        } else if (response.status === 401) {
+            // Session expired or invalid, redirect to login
+            console.log('Session expired, redirecting to login');
+            localStorage.removeItem('adminSessionToken');
+            window.location.href = '/pdn-admin/';
+        }else {
+            throw new Error('Failed to load metadata');
+        }
+    } catch (error) {
+        console.error('Error loading metadata:', error);
+        alert('שגיאה בטעינת הנתונים');
+    } finally {
+        hideLoading();
+    }
+}
+
+function renderTable(data) {
+    const tbody = document.getElementById('tableBody');
+    tbody.innerHTML = '';
+
+    // Update row count
+    document.getElementById('rowCount').textContent = `סה"כ שורות: ${data.length}`;
+
+    data.forEach(user => {
+        const row = document.createElement('tr');
+
+        // Check if any of the three codes are different
+        const isDifferent = (user.pdn_code !== user.diagnose_pdn_code && 
+                           user.diagnose_pdn_code !== "N/A" && 
+                           user.diagnose_pdn_code !== "") ||
+                           (user.pdn_code !== user.pdn_voice_code && 
+                           user.pdn_voice_code !== "N/A" && 
+                           user.pdn_voice_code !== "") ||
+                           (user.pdn_voice_code !== user.diagnose_pdn_code && 
+                           user.diagnose_pdn_code !== "N/A" && 
+                           user.diagnose_pdn_code !== "" &&
+                           user.pdn_voice_code !== "N/A" && 
+                           user.pdn_voice_code !== "");
+
+        // Add red background class if codes are different
+        if (isDifferent) {
+            row.classList.add('highlight-difference');
+        }
+
+        row.innerHTML = `
+            <td class="px-4 py-4">
+                <span class="px-2 py-1 bg-gray-100 text-gray-800 rounded-full text-xs font-medium font-mono">${user.user_id || 'N/A'}</span>
+            </td>
+            <td class="px-4 py-4 font-medium text-gray-900">${user.email}</td>
+            <td class="px-4 py-4 text-gray-700">${user.date}</td>
+            <td class="px-4 py-4">
+                <span class="px-2 py-1 bg-blue-100 text-blue-800 rounded-full text-xs font-medium"> ${user.pdn_code}</span>
+            </td>
+            <td class="px-4 py-4">
+                <span class="px-2 py-1 bg-blue-100 text-blue-800 rounded-full text-xs font-medium">🎤 ${user.pdn_voice_code || 'N/A'}</span>
+            </td>
+            <td class="px-4 py-4">
+                <span class="px-2 py-1 bg-green-100 text-green-800 rounded-full text-xs font-medium">🟢 ${user.diagnose_pdn_code || 'N/A'}</span>
+            </td>
+            <td class="px-4 py-4 text-gray-700 max-w-xs truncate" title="${user.diagnose_comments || ''}">${user.diagnose_comments || ''}</td>
+            <td class="px-4 py-4 text-gray-700 max-w-xs truncate" title="${user.pdn_update_comments || ''}">${user.pdn_update_comments || ''}</td>
+            <td class="px-4 py-4">
+                <div class="relative" x-data="{ open: false, loadingBtn: '', modalText: '', showModal: false }">
+                    <button @click="open = !open" 
+                            class="action-btn bg-blue-900 hover:bg-blue-900 text-white px-4 py-2 rounded-lg transition-all duration-300 flex items-center">
+                        <i > פעולות </i>
+                        <i class="fas fa-chevron-down mr-2 transition-transform" :class="{ 'rotate-180': open }"></i>
+                    </button>
+
+                    <div x-show="open" 
+                         @click.away="open = false"
+                         x-transition:enter="transition ease-out duration-100"
+                         x-transition:enter-start="transform opacity-0 scale-95"
+                         x-transition:enter-end="transform opacity-100 scale-100"
+                         x-transition:leave="transition ease-in duration-75"
+                         x-transition:leave-start="transform opacity-100 scale-100"
+                         x-transition:leave-end="transform opacity-0 scale-95"
+                         class="absolute left-0 mt-2 w-48 bg-white rounded-lg shadow-lg border border-blue-200 z-50">
+
+                        <div class="py-1">
+                            <button @click="loadingBtn = 'questionnaire'; modalText = 'טוען נתוני שאלון...'; showModal = true; viewQuestionnaire('${user.email}'); open = false" 
+                                    class="w-full text-right px-4 py-2 text-sm text-gray-700 hover:bg-blue-50 flex items-center"
+                                    :disabled="loadingBtn === 'questionnaire'">
+                                <i class="fas fa-clipboard-list ml-2"></i>
+                                צפה בשאלון
+                            </button>
+
+                            <button @click="loadingBtn = 'voice'; modalText = 'טוען הקלטה קולית...'; showModal = true; playVoice('${user.email}'); open = false" 
+                                    class="w-full text-right px-4 py-2 text-sm text-gray-700 hover:bg-blue-50 flex items-center"
+                                    :disabled="loadingBtn === 'voice'">
+                                <i class="fas fa-microphone ml-2"></i>
+                                האזן להקלטה
+                            </button>
+
+                            <button @click="loadingBtn = 'edit'; modalText = 'ערוך איבחון...'; showModal = true; editDiagnose('${user.email}'); open = false" 
+                                    class="w-full text-right px-4 py-2 text-sm text-gray-700 hover:bg-blue-50 flex items-center"
+                                    :disabled="loadingBtn === 'edit'">
+                                <i class="fas fa-edit ml-2"></i>
+                                ערוך אבחון
+                            </button>
+
+                            <button @click="loadingBtn = 'email'; modalText = 'שולח אימייל...'; showModal = true; sendEmail('${user.email}'); open = false" 
+                                    class="w-full text-right px-4 py-2 text-sm text-gray-700 hover:bg-blue-50 flex items-center"
+                                    :disabled="loadingBtn === 'email'">
+                                <i class="fas fa-envelope ml-2"></i>
+                                שלח אימייל
+                            </button>
+
+                            <button @click="loadingBtn = 'recalculate'; modalText = 'מחשב מחדש קוד פדן...'; showModal = true; recalculatePdnCode('${user.email}'); open = false" 
+                                    class="w-full text-right px-4 py-2 text-sm text-gray-700 hover:bg-blue-50 flex items-center"
+                                    :disabled="loadingBtn === 'recalculate'">
+                                <i class="fas fa-calculator ml-2"></i>
+                                חשב מחדש קוד פדן
+                            </button>
+                        </div>
+                    </div>
+                </div>
+            </td>
+        `;
+        tbody.appendChild(row);
+    });
+
+    // Initialize tooltips after rendering
+    initializeTooltips();
+}
+
+function initializeTooltips() {
+    // Remove any existing tooltip elements
+    const existingTooltips = document.querySelectorAll('.custom-tooltip');
+    existingTooltips.forEach(tooltip => tooltip.remove());
+
+    // Add event listeners to all tooltip elements
+    const tooltipElements = document.querySelectorAll('[data-tooltip]');
+    tooltipElements.forEach(element => {
+        element.addEventListener('mouseenter', showCustomTooltip);
+        element.addEventListener('mouseleave', hideCustomTooltip);
+    });
+}
+
+function showCustomTooltip(event) {
+    const element = event.target;
+    const tooltipText = element.getAttribute('data-tooltip');
+
+    if (!tooltipText) return;
+
+    // Create tooltip element
+    const tooltip = document.createElement('div');
+    tooltip.className = 'custom-tooltip';
+    tooltip.textContent = tooltipText;
+    tooltip.style.cssText = `
+        position: absolute;
+        background: rgba(0, 0, 0, 0.9);
+        color: white;
+        padding: 6px 10px;
+        border-radius: 6px;
+        font-size: 12px;
+        white-space: nowrap;
+        z-index: 99999;
+        pointer-events: none;
+        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.3);
+        opacity: 0;
+        transition: opacity 0.3s ease;
+    `;
+
+    document.body.appendChild(tooltip);
+
+    // Position tooltip
+    const rect = element.getBoundingClientRect();
+    tooltip.style.left = rect.left + (rect.width / 2) - (tooltip.offsetWidth / 2) + 'px';
+    tooltip.style.top = rect.top - tooltip.offsetHeight - 8 + 'px';
+
+    // Show tooltip
+    setTimeout(() => {
+        tooltip.style.opacity = '1';
+    }, 10);
+}
+
+function hideCustomTooltip(event) {
+    const tooltips = document.querySelectorAll('.custom-tooltip');
+    tooltips.forEach(tooltip => {
+        tooltip.style.opacity = '0';
+        setTimeout(() => {
+            if (tooltip.parentElement) {
+                tooltip.remove();
+            }
+        }, 300);
+    });
+}
+
+function handleSearch(e) {
+    applyFilters();
+}
+
+function handleFilter(e) {
+    applyFilters();
+}
+
+function applyFilters() {
+    const searchTerm = document.getElementById('searchInput').value.toLowerCase();
+    const showRedUsersOnly = document.getElementById('redUsersFilter').checked;
+
+    let filteredData = currentData.filter(user => {
+        // Email search filter
+        const matchesSearch = user.email.toLowerCase().includes(searchTerm);
+
+        // Red users filter - check if any of the three codes are different
+        const isRedUser = (user.pdn_code !== user.diagnose_pdn_code && 
+                         user.diagnose_pdn_code !== "N/A" && 
+                         user.diagnose_pdn_code !== "") ||
+                         (user.pdn_code !== user.pdn_voice_code && 
+                         user.pdn_voice_code !== "N/A" && 
+                         user.pdn_voice_code !== "") ||
+                         (user.pdn_voice_code !== user.diagnose_pdn_code && 
+                         user.diagnose_pdn_code !== "N/A" && 
+                         user.diagnose_pdn_code !== "" &&
+                         user.pdn_voice_code !== "N/A" && 
+                         user.pdn_voice_code !== "");
+
+        if (showRedUsersOnly) {
+            return matchesSearch && isRedUser;
+        } else {
+            return matchesSearch;
+        }
+    });
+
+    renderTable(filteredData);
+}
+
+async function viewQuestionnaire(email) {
+    if (!sessionToken) {
+        window.location.href = '/pdn-admin/';
+        return;
+    }
+
+    try {
+        const response = await fetch(`/pdn-admin/user/questionnaire/${email}?session_token=${sessionToken}`);
+        if (response.ok) {
+            const data = await response.json();
+            displayQuestionnaire(data);
+            // Reset loading state for this specific row
+            resetRowLoadingState(email, 'questionnaire');
+        } else if (response.status === 401) {
+            // Session expired or invalid, redirect to login
+            console.log('Session expired, redirecting to login');
+            localStorage.removeItem('adminSessionToken');
+            window.location.href = '/pdn-admin/';
+        } else {
+            throw new Error('Failed to load questionnaire');
+        }
+    } catch (error) {
+        console.error('Error loading questionnaire:', error);
+        showNotification('שגיאה בטעינת השאלון', 'error');
+        // Reset loading state for this specific row
+        resetRowLoadingState(email, 'questionnaire');
+    }
+}
+
+function displayQuestionnaire(data) {
+
+    const content = document.getElementById('questionnaireContent');
+
+    // Extract metadata and questions
+    const metadata = data.metadata || {};
+    const questions = {};
+    const questionsData = data.questions_data || {};
+
+    // Separate questions from metadata
+    Object.keys(data).forEach(key => {
+        if (key !== 'metadata' && key !== 'questions_data' && !isNaN(key)) {
+            questions[key] = data[key];
+        }
+    });
+    displayQuestionsWithText(questions, metadata, questionsData, data.scores);
+}
+
+function renderResultsSummary(results) {
+    // Stored calculation result: final scores and why the code was assigned
+    if (!results || !results.scores) {
+        return '';
+    }
+    const scoreCells = Object.entries(results.scores).map(([key, score]) => `
+        <div class="bg-white p-3 rounded-lg border border-gray-200 text-center">
+            <div class="text-sm text-gray-500">${key}</div>
+            <div class="font-bold text-gray-900 text-lg">${score}</div>
+        </div>
+    `).join('');
+    return `
+        <div class="bg-white p-8 rounded-2xl border border-gray-200 shadow-lg mt-6">
+            <h3 class="text-2xl font-bold text-gray-800 mb-4">פירוט ציונים (${results.pdn_code})</h3>
+            <div class="grid grid-cols-7 gap-3 mb-4">${scoreCells}</div>
+            <p class="text-gray-600 text-sm" dir="ltr">${results.explanation || ''}</p>
+        </div>
+    `;
+}
+
+function displayQuestionsWithText(questions, metadata, questionsData, results) {
+    const content = document.getElementById('questionnaireContent');
+
+    content.innerHTML = `
+        <div class="bg-gradient-to-br from-blue-50 via-blue-50 to-blue-100 p-8 rounded-2xl border border-blue-200 shadow-lg">
+            <div class="flex items-center justify-between mb-6">
+                <h3 class="text-2xl font-bold text-gray-800">
+                    פרטי משתמש
+                </h3>
+                <button id="downloadPdfBtn"
+                    class="flex items-center gap-3 px-6 py-3 bg-gradient-to-r from-blue-900 to-blue-900 text-white font-bold rounded-xl shadow-lg hover:from-blue-900 hover:to-blue-900 transition-all duration-300 text-base transform hover:scale-105"
+                    onclick="downloadDiagnosisAsPDF()">
+                    <i class="fas fa-file-arrow-down mr-2 text-lg"></i>
+                    הורד דוח
+                </button>
+            </div>
+
+            <div class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6 mb-6">
+                <!-- Personal Information Section -->
+                <div class="space-y-4">
+                   <div class="bg-white p-4 rounded-xl border border-gray-200 shadow-sm hover:shadow-md transition-shadow">
+                        <div class="text-sm text-gray-500 mb-1">שם פרטי</div>
+                        <div class="font-bold text-gray-900 text-lg">${ metadata["first_name"] || 'לא זמין'}</div>
+                    </div>
+                    <div class="bg-white p-4 rounded-xl border border-gray-200 shadow-sm hover:shadow-md transition-shadow">
+                        <div class="text-sm text-gray-500 mb-1">שם משפחה</div>
+                        <div class="font-bold text-gray-900 text-lg">${metadata["last_name"] || 'לא זמין'}</div>
+                    </div>
+                     <div class="bg-white p-4 rounded-xl border border-gray-200 shadow-sm hover:shadow-md transition-shadow">
+                        <div class="text-sm text-gray-500 mb-1">אימייל</div>
+                        <div class="font-bold text-gray-900 text-sm break-all">${metadata["Email"] || 'לא זמין'}</div>
+                    </div>
+                     <div class="bg-white p-4 rounded-xl border border-gray-200 shadow-sm hover:shadow-md transition-shadow">
+                        <div class="text-sm text-gray-500 mb-1">מספר טלפון</div>
+                        <div class="font-bold text-gray-900 text-lg break-all">${metadata["phone"] || 'לא זמין'}</div>
+                    </div>
+                </div>
+
+                <!-- System Information Section -->
+                <div class="space-y-4">
+                     <div class="bg-white p-4 rounded-xl border border-gray-200 shadow-sm hover:shadow-md transition-shadow">
+                        <div class="text-sm text-gray-500 mb-1">מזהה מערכת</div>
+                        <div  class="font-bold text-gray-900 text-lg break-all">${metadata["User ID"] || 'לא זמין'}</div>
+                    </div>
+                    <div class="bg-white p-4 rounded-xl border border-gray-200 shadow-sm hover:shadow-md transition-shadow">
+                        <div class="text-sm text-gray-500 mb-1">שנת לידה</div>
+                        <div class="font-bold text-gray-900 text-lg break-all">${metadata["birth_year"] || 'לא זמין'}</div>
+                    </div>
+                    <div class="bg-white p-4 rounded-xl border border-gray-200 shadow-sm hover:shadow-md transition-shadow">
+                        <div class="text-sm text-gray-500 mb-1">שפת אם</div>
+                        <div class="font-bold text-gray-900 text-lg break-all">${metadata["mother_language"] || 'לא זמין'}</div>
+                    </div>
+                    <div class="bg-white p-4 rounded-xl border border-gray-200 shadow-sm hover:shadow-md transition-shadow">
+                        <div class="text-sm text-gray-500 mb-1">מגדר</div>
+                        <div class="font-bold text-gray-900 text-lg break-all">${metadata["gender"] || 'לא זמין'}</div>
+                    </div>
+                </div>
+
+                <!-- Diagnosis Information Section -->
+                <div class="space-y-4">
+                    <div class="bg-white p-4 rounded-xl border border-gray-200 shadow-sm hover:shadow-md transition-shadow">
+                        <div class="text-sm text-gray-500 mb-1">קוד פדן</div>
+                        <div >${metadata["PDN Code"] || 'לא זמין'}</div>
+                    </div>
+                     <div class="bg-white p-4 rounded-xl border border-gray-200 shadow-sm hover:shadow-md transition-shadow">
+                        <div class="text-sm text-gray-500 mb-1">תאריך אבחון</div>
+                        <div class="font-bold text-gray-900 text-lg">${metadata["Date"] || 'לא זמין'}</div>
+                    </div>
+                     <div class="bg-white p-4 rounded-xl border border-gray-200 shadow-sm hover:shadow-md transition-shadow">
+                        <div class="text-sm text-gray-500 mb-1">השכלה</div>
+                        <div class="font-bold text-gray-900 text-lg break-all">${metadata["education"] || 'לא זמין'}</div>
+                    </div>
+                    <div class="bg-white p-4 rounded-xl border border-gray-200 shadow-sm hover:shadow-md transition-shadow">
+                        <div class="text-sm text-gray-500 mb-1">תפקיד</div>
+                        <div class="font-bold text-gray-900 text-lg break-all">${metadata["job_title"] || 'לא זמין'}</div>
+                    </div>
+                </div>
+            </div>
+        </div>
+        ${renderResultsSummary(results)}
+
+        <div class="bg-white p-8 rounded-2xl border border-gray-200 shadow-lg mt-6">
+            <h3 class="text-2xl font-bold text-gray-800 mb-6">
+                תשובות מאובחן (${Object.keys(questions).length} שאלות)
+            </h3>
+            <div class="space-y-6">
+                ${Object.entries(questions).map(([questionNumber, questionData]) => {
+                    // Handle different question types
+                    let answerDisplay = '';
+                    let codeDisplay = '';
+                    let questionText = `שאלה ${questionNumber}`;
+
+                    // Get question text from questions data
+                    if (questionsData) {
+                        // Search for question in all phases
+                        for (const phaseKey in questionsData.phases) {
+                            const phase = questionsData.phases[phaseKey];
+                            if (phase.questions && phase.questions[questionNumber]) {
+                                questionText = phase.questions[questionNumber].text;
+                                console.log(questionText);
+                                break;
+                            }
+                        }
+                    }
+
+                    // If question text is not found in questions data, try to get it from the saved answer data
+                    if (questionText === `שאלה ${questionNumber}` && questionData.question_text) {
+                        questionText = questionData.question_text;
+                    }
+
+                    if (questionData.ranking) {
+                        // Check if this is a scale question (has exactly 2 options with numeric values)
+                        const rankingEntries = Object.entries(questionData.ranking);
+
+                        if (rankingEntries.length === 2 && 
+                            typeof rankingEntries[0][1] === 'number' && 
+                            typeof rankingEntries[1][1] === 'number') {
+
+                            // This is a scale question - decode it properly
+                            const [leftCode, leftValue] = rankingEntries[0];
+                            const [rightCode, rightValue] = rankingEntries[1];
+
+                            // Get the question options to find the text labels
+                            let leftText = leftCode;
+                            let rightText = rightCode;
+
+                            if (questionData.question_options && questionData.question_options.length >= 2) {
+                                const leftOption = questionData.question_options.find(opt => opt.code === leftCode);
+                                const rightOption = questionData.question_options.find(opt => opt.code === rightCode);
+
+                                if (leftOption) leftText = leftOption.text;
+                                if (rightOption) rightText = rightOption.text;
+                            }
+
+                            // Determine the scale position and create readable description
+                            const scaleMap = [
+                                { position: 0, description: `${leftText} (במידה רבה מאוד)`, leftValue: 12, rightValue: 0 },
+                                { position: 1, description: `${leftText} (במידה רבה)`, leftValue: 10, rightValue: 2 },
+                                { position: 2, description: `${leftText} (במידה מסוימת)`, leftValue: 8, rightValue: 4 },
+                                { position: 3, description: `באמצע (ניטרלי)`, leftValue: 6, rightValue: 6 },
+                                { position: 4, description: `${rightText} (במידה מסוימת)`, leftValue: 4, rightValue: 8 },
+                                { position: 5, description: `${rightText} (במידה רבה)`, leftValue: 2, rightValue: 10 },
+                                { position: 6, description: `${rightText} (במידה רבה מאוד)`, leftValue: 0, rightValue: 12 }
+                            ];
+
+                            // Find the matching scale position
+                            const scalePosition = scaleMap.find(pos => 
+                                pos.leftValue === leftValue && pos.rightValue === rightValue
+                            );
+
+                            if (scalePosition) {
+                                // Create visual scale indicator
+                                const filledDots = '●'.repeat(scalePosition.position + 1);
+                                const emptyDots = '○'.repeat(6 - scalePosition.position);
+                                const scaleIndicator = filledDots + emptyDots;
+
+                                answerDisplay = `
+                                    <div class="space-y-2">
+                                        <div class="flex items-center justify-between text-xs text-gray-600">
+                                            <span>${leftText}</span>
+                                            <span>${rightText}</span>
+                                        </div>
+                                        <div class="flex items-center justify-center">
+                                            <span class="text-lg tracking-wider">${scaleIndicator}</span>
+                                        </div>
+                                        <div class="text-center text-sm font-medium text-blue-600">
+                                            ${scalePosition.description}
+                                        </div>
+                                    </div>
+                                `;
+                                codeDisplay = 'סולם העדפה';
+                            } else {
+                                // Fallback if exact match not found
+                                answerDisplay = `
+                                    <div class="space-y-2">
+                                        <div class="text-sm text-gray-600">
+                                            ${leftText}: ${leftValue} | ${rightText}: ${rightValue}
+                                        </div>
+                                        <div class="text-xs text-gray-500">
+                                            (לא ניתן לפענח את המיקום המדויק בסולם)
+                                        </div>
+                                    </div>
+                                `;
+                                codeDisplay = 'סולם העדפה';
+                            }
+
+                        } else {
+                            // This is a regular ranking question - use existing logic
+                            const sortedRanking = rankingEntries.sort((a, b) => a[1] - b[1]);
+
+                            let rankedTexts = [];
+                            if (questionData.question_options && questionData.question_options.length > 0) {
+                                rankedTexts = sortedRanking.map(([code, rank]) => {
+                                    const option = questionData.question_options.find(opt => opt.code === code);
+                                    return `${rank}. ${option ? option.text : code}`;
+                                });
+                            } else {
+                                rankedTexts = sortedRanking.map(([code, rank]) => `${rank}. ${code}`);
+                            }
+
+                            answerDisplay = rankedTexts.join('<br>');
+                            codeDisplay = 'דירוג';
+                        }
+                    } else if (questionData.selected_option_code) {
+                        // For questions with selected_option_code - find the actual text
+                        let selectedText = questionData.selected_option_code; // Default to code if text not found
+
+                        // Try to find the selected text from question options
+                        if (questionData.question_options && questionData.question_options.length > 0) {
+                            const selectedOption = questionData.question_options.find(option => 
+                                option.code === questionData.selected_option_code
+                            );
+                            if (selectedOption) {
+                                selectedText = selectedOption.text;
+                            }
+                        }
+
+                        answerDisplay = selectedText;
+                        codeDisplay = questionText;
+                    } else if (questionData.answer && questionData.code) {
+                        // For regular questions with answer and code
+                        let cleanAnswer = questionData.answer;
+
+                        // Clean up the answer to show only the selected option text
+                        if (questionData.question_options && questionData.question_options.length > 0) {
+                            // Try to find the selected option by matching the answer text
+                            const selectedOption = questionData.question_options.find(option => 
+                                questionData.answer.includes(option.text)
+                            );
+                            if (selectedOption) {
+                                cleanAnswer = selectedOption.text;
+                            }
+                        }
+
+                        // Remove any question text that might be mixed in
+                        if (cleanAnswer.includes('?')) {
+                            cleanAnswer = cleanAnswer.split('?').pop()?.trim() || cleanAnswer;
+                        }
+
+                        // For ranking questions, extract only the selected position
+                        const rankingMatch = cleanAnswer.match(/(\d+)\.\s*([^0-9\n]+)/);
+                        if (rankingMatch) {
+                            cleanAnswer = `${rankingMatch[1]}. ${rankingMatch[2].trim()}`;
+                        }
+
+                        answerDisplay = cleanAnswer;
+                        codeDisplay = questionText;
+                    } else {
+                        // Fallback for any other structure
+                        answerDisplay = 'לא זמין';
+                        codeDisplay = 'לא זמין';
+                    }
+
+                    return `
+                        <div class="border-b border-gray-200 pb-6 last:border-b-0">
+                            <div class="mb-4">
+                                <p class="text-gray-800 text-lg leading-relaxed">${questionNumber}. ${questionText}</p>
+                            </div>
+                            <div class="bg-gray-50 px-4 py-3 rounded-lg border border-gray-200">
+                                <p class="text-gray-600 text-sm mb-1">תשובה:</p>
+                                <p class="text-gray-800 text-sm mb-1">${answerDisplay}</p>
+                            </div>
+                        </div>
+                    `;
+                }).join('')}
+            </div>
+        </div>
+    `;
+
+    document.getElementById('questionnaireModal').style.display = 'flex';
+}
+
+async function playVoice(email) {
+    if (!sessionToken) {
+        window.location.href = '/pdn-admin/';
+        return;
+    }
+
+    try {
+        console.log('Fetching voice for email:', email); // Debug log
+
+        const response = await fetch(`/pdn-admin/user/voice/${email}?session_token=${sessionToken}`);
+        console.log('Response status:', response.status); // Debug log
+
+        if (response.ok) {
+            const data = await response.json();
+            console.log('Voice data received:', data); // Debug log
+            displayVoice(data);
+            // Reset loading state for this specific row
+            resetRowLoadingState(email, 'voice');
+        } else if (response.status === 401) {
+            // Session expired or invalid, redirect to login
+            console.log('Session expired, redirecting to login');
+            localStorage.removeItem('adminSessionToken');
+            window.location.href = '/pdn-admin/';
+        } else {
+            const errorText = await response.text();
+            console.error('Server error:', errorText); // Debug log
+            throw new Error(`Failed to load voice: ${response.status} ${errorText}`);
+        }
+    } catch (error) {
+        console.error('Error loading voice:', error);
+        showNotification('שגיאה בטעינת ההקלטה', 'error');
+        // Reset loading state for this specific row
+        resetRowLoadingState(email, 'voice');
+    }
+}
+
+function displayVoice(data) {
+    const content = document.getElementById('voiceContent');
+
+    // Check if we have the required data
+    if (!data || !data.voice_recordings || Object.keys(data.voice_recordings).length === 0) {
+        content.innerHTML = `
+            <div class="bg-red-50 p-6 rounded-xl border border-red-200">
+                <h3 class="text-lg font-semibold mb-4 text-red-800 flex items-center">
+                    <i class="fas fa-exclamation-triangle mr-2"></i>שגיאה
+                </h3>
+                <p class="text-red-700">לא נמצא קובץ הקלטה למשתמש זה</p>
+            </div>
+        `;
+        document.getElementById('voiceModal').style.display = 'flex';
+        return;
+    }
+
+    // Build HTML for multiple recordings
+    let recordingsHtml = '';
+    const recordings = data.voice_recordings;
+
+    // Helper function to create audio URL
+    function createAudioUrl(filePath) {
+        // Extract just the relative path from the full file path
+        let processedPath = filePath;
+
+        // Remove 'saved_results/' prefix if it exists
+        if (processedPath.startsWith('saved_results/')) {
+            processedPath = processedPath.substring('saved_results/'.length);
+        }
+
+        // Remove '/pdn/saved_results/' prefix if it exists
+        if (processedPath.startsWith('/pdn/saved_results/')) {
+            processedPath = processedPath.substring('/pdn/saved_results/'.length);
+        }
+
+        // Remove 'pdn/saved_results/' prefix if it exists
+        if (processedPath.startsWith('pdn/saved_results/')) {
+            processedPath = processedPath.substring('pdn/saved_results/'.length);
+        }
+
+        return `/pdn-admin/audio/${encodeURIComponent(processedPath)}?session_token=${sessionToken}`;
+    }
+
+    // Recordings are served in the container they are stored in (e.g. WebM/Opus)
+    function audioSources(recording, audioUrl) {
+        if (recording.mimetype && recording.mimetype !== 'application/octet-stream') {
+            return `<source src="${audioUrl}" type="${recording.mimetype}">`;
+        }
+        return `<source src="${audioUrl}" type="audio/wav">
+                    <source src="${audioUrl}" type="audio/mp3">
+                    <source src="${audioUrl}" type="audio/mpeg">`;
+    }
+
+    // Waveform and duration come from the recording's precomputed analysis, so
+    // nothing is downloaded until playback; clicking the waveform seeks there
+    function formatDuration(seconds) {
+        const minutes = Math.floor(seconds / 60);
+        return `${minutes}:${String(Math.floor(seconds % 60)).padStart(2, '0')}`;
+    }
+
+    function waveformHtml(recording) {
+        if (!recording.duration) {
+            return '';
+        }
+        const peaks = recording.peaks || [];
+        const bars = peaks.map((peak, i) => {
+            const height = Math.max(peak * 100, 2);
+            return `<rect x="${i}" y="${(100 - height) / 2}" width="0.8" height="${height}"></rect>`;
+        }).join('');
+        const silence = recording.silence_ratio != null
+            ? ` · שקט ${Math.round(recording.silence_ratio * 100)}%` : '';
+        return `
+                <div class="voice-waveform mb-2 cursor-pointer" data-duration="${recording.duration}">
+                    ${peaks.length ? `<svg viewBox="0 0 ${peaks.length} 100" preserveAspectRatio="none" class="w-full h-16 fill-current text-blue-600">${bars}</svg>` : ''}
+                    <div class="text-sm text-gray-600">${formatDuration(recording.duration)}${silence}</div>
+                </div>`;
+    }
+
+    // Add question1 recording if exists
+    if (recordings.question1) {
+        const audioUrl = createAudioUrl(recordings.question1.path);
+        recordingsHtml += `
+            <div class="bg-white p-6 rounded-xl border border-gray-200 mb-4">
+                <h4 class="text-lg font-semibold mb-4 text-gray-800 flex items-center">
+                    <i class="fas fa-microphone mr-2 text-blue-600"></i>שאלה 1 - חוויה חיובית
+                </h4>
+                ${waveformHtml(recordings.question1)}
+                <audio controls class="w-full" preload="${recordings.question1.duration ? 'none' : 'metadata'}">
+                    ${audioSources(recordings.question1, audioUrl)}
+                    הדפדפן שלך לא תומך בנגינת אודיו.
+                </audio>
+            </div>
+        `;
+    }
+
+    // Add question2 recording if exists
+    if (recordings.question2) {
+        const audioUrl = createAudioUrl(recordings.question2.path);
+        recordingsHtml += `
+            <div class="bg-white p-6 rounded-xl border border-gray-200 mb-4">
+                <h4 class="text-lg font-semibold mb-4 text-gray-800 flex items-center">
+                    <i class="fas fa-microphone mr-2 text-blue-600"></i>שאלה 2 - אתגר משמעותי
+                </h4>
+                ${waveformHtml(recordings.question2)}
+                <audio controls class="w-full" preload="${recordings.question2.duration ? 'none' : 'metadata'}">
+                    ${audioSources(recordings.question2, audioUrl)}
+                    הדפדפן שלך לא תומך בנגינת אודיו.
+                </audio>
+            </div>
+        `;
+    }
+
+    // Add legacy recording if exists
+    if (recordings.legacy) {
+        const audioUrl = createAudioUrl(recordings.legacy.path);
+        recordingsHtml += `
+            <div class="bg-white p-6 rounded-xl border border-gray-200 mb-4">
+                <h4 class="text-lg font-semibold mb-4 text-gray-800 flex items-center">
+                    <i class="fas fa-microphone mr-2 text-blue-900"> הקלטה קולית </i>
+                </h4>
+                ${waveformHtml(recordings.legacy)}
+                <audio controls class="w-full" preload="${recordings.legacy.duration ? 'none' : 'metadata'}">
+                    ${audioSources(recordings.legacy, audioUrl)}
+                    הדפדפן שלך לא תומך בנגינת אודיו.
+                </audio>
+            </div>
+        `;
+    }
+
+    content.innerHTML = `
+        <div class="bg-gradient-to-r from-blue-100 to-blue-100 p-6 rounded-xl border border-blue-200 mb-6">
+            <h3 class="text-lg font-semibold mb-4 text-gray-800 flex items-center">
+                <i class="fas fa-info-circle mr-2 text-blue-900"> פרטי הקלטה </i>
+            </h3>
+            <div class="grid grid-cols-2 gap-4">
+                <div><strong>אימייל:</strong> ${data.email || 'לא זמין'}</div>
+                <div><strong>מספר הקלטות:</strong> <span class="px-2 py-1 bg-blue-100 text-blue-800 rounded text-sm">${Object.keys(recordings).length}</span></div>
+            </div>
+        </div>
+        ${recordingsHtml}
+    `;
+
+    document.getElementById('voiceModal').style.display = 'flex';
+
+    content.querySelectorAll('.voice-waveform').forEach(waveform => {
+        waveform.addEventListener('click', (event) => {
+            const audioElement = waveform.nextElementSibling;
+            const rect = waveform.getBoundingClientRect();
+            const fraction = Math.min(Math.max((event.clientX - rect.left) / rect.width, 0), 1);
+            // Seeking an unloaded recording makes the browser request only that range
+            audioElement.currentTime = fraction * parseFloat(waveform.dataset.duration);
+            audioElement.play();
+        });
+    });
+
+    // Add event listeners to all audio elements for debugging
+    const audioElements = content.querySelectorAll('audio');
+    audioElements.forEach((audioElement, index) => {
+        audioElement.addEventListener('loadstart', () => console.log(`Audio ${index + 1} loading started`));
+        audioElement.addEventListener('canplay', () => console.log(`Audio ${index + 1} can play`));
+        audioElement.addEventListener('error', (e) => {
+            console.error(`Audio ${index + 1} error:`, e);
+            console.error(`Audio ${index + 1} error details:`, audioElement.error);
+        });
+        audioElement.addEventListener('loadeddata', () => console.log(`Audio ${index + 1} data loaded`));
+    });
+}
+
+function editDiagnose(email) {
+    currentEditEmail = email;
+    const user = currentData.find(u => u.email === email);
+
+    if (user) {
+        document.getElementById('diagnosePdnCode').value = user.diagnose_pdn_code;
+        document.getElementById('diagnoseComments').value = user.diagnose_comments;
+        document.getElementById('editDiagnoseModal').style.display = 'flex';
+        // Reset loading state for this specific row
+        resetRowLoadingState(email, 'edit');
+    }
+}
+
+async function handleEditDiagnose(e) {
+    e.preventDefault();
+    if (!sessionToken || !currentEditEmail) {
+        if (!sessionToken) {
+            window.location.href = '/pdn-admin/';
+        }
+        return;
+    }
+
+    showLoading();
+    try {
+        const formData = {
+            diagnose_pdn_code: document.getElementById('diagnosePdnCode').value,
+            diagnose_comments: document.getElementById('diagnoseComments').value
+        };
+
+        const response = await fetch(`/pdn-admin/user/diagnose/${currentEditEmail}?session_token=${sessionToken}`, {
+            method: 'PUT',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(formData)
+        });
+
+        if (response.ok) {
+            const data = await response.json();
+            // Update local data
+            const userIndex = currentData.findIndex(u => u.email === currentEditEmail);
+            if (userIndex !== -1) {
+                currentData[userIndex] = data.user;
+                renderTable(currentData);
+            }
+            closeModal('editDiagnoseModal');
+        } else if (response.status === 401) {
+            // Session expired or invalid, redirect to login
+            console.log('Session expired, redirecting to login');
+            localStorage.removeItem('adminSessionToken');
+            window.location.href = '/pdn-admin/';
+        } else {
+            throw new Error('Failed to update diagnose');
+        }
+    } catch (error) {
+        console.error('Error updating diagnose:', error);
+        alert('שגיאה בעדכון האבחון');
+    } finally {
+        hideLoading();
+    }
+}
+
+async function sendEmail(email) {
+    if (!sessionToken) {
+        window.location.href = '/pdn-admin/';
+        return;
+    }
+
+    // Find user data
+    const user = currentData.find(u => u.email === email);
+    if (!user) {
+        showNotification('משתמש לא נמצא', 'error');
+        resetRowLoadingState(email, 'email');
+        return;
+    }
+
+    // Check if PDN code equals diagnose code (קוד מאבחן)
+    const codesMatch = user.pdn_code === user.diagnose_pdn_code && 
+                      user.diagnose_pdn_code !== "N/A" && 
+                      user.diagnose_pdn_code !== "";
+
+    if (!codesMatch) {
+        showNotification('לא ניתן לשלוח אימייל - קוד פדן אינו תואם לקוד המאבחן', 'error');
+        resetRowLoadingState(email, 'email');
+        return;
+    }
+
+    // Prompt for admin password
+    const password = prompt('הזן סיסמת מנהל לשליחת אימייל:');
+    if (!password) {
+        resetRowLoadingState(email, 'email');
+        return;
+    }
+
+    if (password !== 'admin') {
+        showNotification('סיסמה שגויה', 'error');
+        resetRowLoadingState(email, 'email');
+        return;
+    }
+
+    try {
+        const response = await fetch(`/pdn-admin/user/send_email/${email}?session_token=${sessionToken}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ password: password })
+        });
+
+        if (response.ok) {
+            const data = await response.json();
+            showNotification(`אימייל נשלח בהצלחה ל-${email}`, 'success');
+            // Reset loading state for this specific row
+            resetRowLoadingState(email, 'email');
+        } else if (response.status === 401) {
+            // Session expired or invalid, redirect to login
+            console.log('Session expired, redirecting to login');
+            localStorage.removeItem('adminSessionToken');
+            window.location.href = '/pdn-admin/';
+        } else {
+            const errorData = await response.json();
+            throw new Error(errorData.detail || 'Failed to send email');
+        }
+    } catch (error) {
+        console.error('Error sending email:', error);
+        showNotification(`שגיאה בשליחת האימייל: ${error.message}`, 'error');
+        // Reset loading state for this specific row
+        resetRowLoadingState(email, 'email');
+    }
+}
+
+async function recalculatePdnCode(email) {
+    if (!sessionToken) {
+        window.location.href = '/pdn-admin/';
+        return;
+    }
+
+    // Find user data
+    const user = currentData.find(u => u.email === email);
+    if (!user) {
+        showNotification('משתמש לא נמצא', 'error');
+        resetRowLoadingState(email, 'recalculate');
+        return;
+    }
+
+    // Prompt for admin password
+    const password = prompt('הזן סיסמת מנהל לחישוב מחדש של קוד פדן:');
+    if (!password) {
+        resetRowLoadingState(email, 'recalculate');
+        return;
+    }
+
+    if (password !== 'admin') {
+        showNotification('סיסמה שגויה', 'error');
+        resetRowLoadingState(email, 'recalculate');
+        return;
+    }
+
+    try {
+        const response = await fetch(`/pdn-admin/user/recalculate_pdn/${email}?session_token=${sessionToken}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ password: password })
+        });
+
+        if (response.ok) {
+            const data = await response.json();
+            showNotification(`קוד פדן חושב מחדש בהצלחה: ${data.pdn_code} על ידי ${data.updated_by}`, 'success');
+
+            // Update local data
+            const userIndex = currentData.findIndex(u => u.email === email);
+            if (userIndex !== -1) {
+                currentData[userIndex].pdn_code = data.pdn_code;
+                currentData[userIndex].date = data.date;
+                // Update the PDN update comments if available
+                if (data.pdn_update_comments) {
+                    currentData[userIndex].pdn_update_comments = data.pdn_update_comments;
+                }
+                renderTable(currentData);
+            }
+
+            // Reset loading state for this specific row
+            resetRowLoadingState(email, 'recalculate');
+        } else if (response.status === 401) {
+            // Session expired or invalid, redirect to login
+            console.log('Session expired, redirecting to login');
+            localStorage.removeItem('adminSessionToken');
+            window.location.href = '/pdn-admin/';
+        } else {
+            const errorData = await response.json();
+            throw new Error(errorData.detail || 'Failed to recalculate PDN code');
+        }
+    } catch (error) {
+        console.error('Error recalculating PDN code:', error);
+        showNotification(`שגיאה בחישוב מחדש של קוד פדן: ${error.message}`, 'error');
+        // Reset loading state for this specific row
+        resetRowLoadingState(email, 'recalculate');
+    }
+}
+
+function closeModal(modalId) {
+    document.getElementById(modalId).style.display = 'none';
+    if (modalId === 'editDiagnoseModal') {
+        currentEditEmail = null;
+    }
+}
+
+function showLoading() {
+    document.getElementById('loadingSpinner').classList.remove('hidden');
+}
+
+function hideLoading() {
+    document.getElementById('loadingSpinner').classList.add('hidden');
+}
+
+// Close modals when clicking outside
+document.addEventListener('click', function(e) {
+    if (e.target.classList.contains('modal-backdrop')) {
+        e.target.style.display = 'none';
+    }
+});
+
+// Add keyboard event listeners for modal
+document.addEventListener('keydown', function(event) {
+    const questionnaireModal = document.getElementById('questionnaireModal');
+
+    // Check if questionnaire modal is visible
+    if (questionnaireModal && questionnaireModal.style.display === 'flex') {
+        // Close on Escape key
+        if (event.key === 'Escape') {
+            closeModal('questionnaireModal');
+        }
+        // Close on Enter key
+        if (event.key === 'Enter') {
+            closeModal('questionnaireModal');
+        }
+    }
+});
+
+function showNotification(message, type = 'info') {
+    // Create notification element
+    const notification = document.createElement('div');
+    notification.className = `fixed top-6 right-6 z-[9999] p-6 rounded-xl shadow-2xl transition-all duration-500 transform translate-x-full border-2`;
+
+    // Enhanced styling based on type
+    let bgColor, borderColor, icon, textColor;
+    switch(type) {
+        case 'success':
+            bgColor = 'bg-green-50';
+            borderColor = 'border-green-500';
+            icon = 'fa-check-circle';
+            textColor = 'text-green-800';
+            break;
+        case 'error':
+            bgColor = 'bg-red-50';
+            borderColor = 'border-red-500';
+            icon = 'fa-exclamation-triangle';
+            textColor = 'text-red-800';
+            break;
+        case 'warning':
+            bgColor = 'bg-yellow-50';
+            borderColor = 'border-yellow-500';
+            icon = 'fa-exclamation-circle';
+            textColor = 'text-yellow-800';
+            break;
+        default:
+            bgColor = 'bg-blue-50';
+            borderColor = 'border-blue-500';
+            icon = 'fa-info-circle';
+            textColor = 'text-blue-800';
+    }
+
+    notification.className += ` ${bgColor} ${borderColor}`;
+    notification.innerHTML = `
+        <div class="flex items-start space-x-3 space-x-reverse">
+            <div class="flex-shrink-0">
+                <i class="fas ${icon} text-xl ${textColor}"></i>
+            </div>
+            <div class="flex-1 min-w-0">
+                <p class="text-sm font-medium ${textColor} leading-5">${message}</p>
+            </div>
+            <div class="flex-shrink-0">
+                <button onclick="this.closest('.notification-item').remove()" 
+                        class="inline-flex text-gray-400 hover:text-gray-600 transition-colors duration-200">
+                    <i class="fas fa-times mr-2 text-lg"></i>
+                </button>
+            </div>
+        </div>
+    `;
+
+    // Add a unique class for easier targeting
+    notification.classList.add('notification-item');
+
+    document.body.appendChild(notification);
+
+    // Animate in with bounce effect
+    setTimeout(() => {
+        notification.classList.remove('translate-x-full');
+        notification.classList.add('animate-bounce');
+        setTimeout(() => {
+            notification.classList.remove('animate-bounce');
+        }, 1000);
+    }, 100);
+
+    // Auto remove after 8 seconds (increased from 5)
+    setTimeout(() => {
+        notification.classList.add('translate-x-full');
+        setTimeout(() => {
+            if (notification.parentElement) {
+                notification.remove();
+            }
+        }, 500);
+    }, 8000);
+
+    // Add sound for error notifications
+    if (type === 'error') {
+        // Create a simple beep sound
+        const audioContext = new (window.AudioContext || window.webkitAudioContext)();
+        const oscillator = audioContext.createOscillator();
+        const gainNode = audioContext.createGain();
+
+        oscillator.connect(gainNode);
+        gainNode.connect(audioContext.destination);
+
+        oscillator.frequency.setValueAtTime(800, audioContext.currentTime);
+        oscillator.frequency.setValueAtTime(600, audioContext.currentTime + 0.1);
+
+        gainNode.gain.setValueAtTime(0.1, audioContext.currentTime);
+        gainNode.gain.exponentialRampToValueAtTime(0.01, audioContext.currentTime + 0.2);
+
+        oscillator.start(audioContext.currentTime);
+        oscillator.stop(audioContext.currentTime + 0.2);
+    }
+}
+
+// Add this new function to reset loading state for a specific row
+function resetRowLoadingState(email, buttonType) {
+    // Find the row for this email
+    const rows = document.querySelectorAll('#tableBody tr');
+    rows.forEach(row => {
+        const emailCell = row.querySelector('td:first-child');
+        if (emailCell && emailCell.textContent.trim() === email) {
+            // Find the Alpine component in this row
+            const alpineComponent = row.querySelector('[x-data]');
+            if (alpineComponent && alpineComponent._x_dataStack && alpineComponent._x_dataStack[0]) {
+                alpineComponent._x_dataStack[0].loadingBtn = '';
+                alpineComponent._x_dataStack[0].showModal = false;
+            }
+        }
+    });
+}
+
+// Update the existing resetAlpineLoadingState function
+function resetAlpineLoadingState() {
+    // Reset all Alpine components
+    document.querySelectorAll('[x-data]').forEach(element => {
+        if (element._x_dataStack && element._x_dataStack[0]) {
+            element._x_dataStack[0].loadingBtn = '';
+            element._x_dataStack[0].showModal = false;
+        }
+    });
+}
+
+async function downloadCsvFile() {
+    try {
+        showLoading();
+        const response = await fetch(`/pdn-admin/download/csv?session_token=${sessionToken}`);
+
+        if (response.ok) {
+            // Get the blob from the response
+            const blob = await response.blob();
+
+            // Create a download link
+            const url = window.URL.createObjectURL(blob);
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = 'user_metadata.csv';
+
+            // Trigger download
+            document.body.appendChild(link);
+            link.click();
+            document.body.removeChild(link);
+
+            // Clean up the URL object
+            window.URL.revokeObjectURL(url);
+
+            showNotification('הקובץ הורד בהצלחה!', 'success');
+        } else if (response.status === 404) {
+            showNotification('קובץ CSV לא נמצא', 'error');
+        } else {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+    } catch (error) {
+        console.error('Error downloading CSV:', error);
+        showNotification('שגיאה בהורדת הקובץ', 'error');
+    } finally {
+        hideLoading();
+    }
+}
+
+function downloadTableAsCsv(data) {
+    if (!data || data.length === 0) {
+        alert('אין נתונים להורדה');
+        return;
+    }
+    // Define the columns to export
+    const columns = [
+        { key: 'email', label: 'אימייל' },
+        { key: 'date', label: 'תאריך איבחון' },
+        { key: 'pdn_code', label: 'פדן קוד' },
+        { key: 'pdn_voice_code', label: 'ניתוח קול קוד' },
+        { key: 'diagnose_pdn_code', label: 'קוד מאבחן' },
+        { key: 'diagnose_comments', label: 'הערות המאבחן' }
+    ];
+    let csvContent = columns.map(col => col.label).join(',') + '\n';
+    data.forEach(row => {
+        csvContent += columns.map(col => '"' + (row[col.key] || '').replace(/"/g, '""') + '"').join(',') + '\n';
+    });
+    const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
+    const link = document.createElement('a');
+    link.href = URL.createObjectURL(blob);
+    link.setAttribute('download', 'user_metadata.csv');
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+}
@@ -84,7 +84,143 @@ async function handleVoiceRecording(username, mediaRecorder) {
     });
 }
 
+/**
+ * Uploads a recording in chunks while it is being recorded
+ *
+ * Chunks are PUT in order as MediaRecorder produces them, each retried until
+ * the server has it, so little is left to send when recording stops. If the
+ * chunked upload fails, finish() falls back to saveUserAudio with the whole
+ * recording.
+ */
+class ChunkedAudioUpload {
+    /**
+     * @param {string} username - The name of the user
+     * @param {string} question - The question number (e.g., 'question1', 'question2')
+     */
+    constructor(username, question = 'audio') {
+        this.username = username;
+        this.question = question;
+        this.uploadId = null;
+        this.size = 0; // Bytes queued so far
+        this.failed = false;
+        this.queue = Promise.resolve();
+        this.started = null;
+    }
+
+    /**
+     * Starts the upload on the server
+     * @returns {Promise<void>}
+     */
+    start() {
+        this.started = fetch('/pdn-admin/api/audio-uploads', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ username: this.username, question: this.question })
+        }).then(async response => {
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            this.uploadId = (await response.json()).upload_id;
+        }).catch(error => {
+            console.error('Error starting chunked upload:', error);
+            this.failed = true;
+        });
+        return this.started;
+    }
+
+    /**
+     * Queues a recorded chunk, e.g. from MediaRecorder's ondataavailable
+     * @param {Blob} blob - The chunk
+     */
+    addChunk(blob) {
+        if (!blob || blob.size === 0) return;
+        const offset = this.size;
+        this.size += blob.size;
+        this.queue = this.queue
+            .then(() => this.sendChunk(blob, offset))
+            .catch(error => {
+                console.error('Error uploading audio chunk:', error);
+                this.failed = true;
+            });
+    }
+
+    /**
+     * PUTs one chunk at its offset, retrying with backoff
+     * @param {Blob} blob - The chunk
+     * @param {number} offset - Offset of the chunk's first byte
+     */
+    async sendChunk(blob, offset) {
+        await this.started;
+        if (this.failed) return;
+
+        const url = `/pdn-admin/api/audio-uploads/${this.uploadId}?offset=${offset}`;
+        for (let attempt = 0; ; attempt++) {
+            try {
+                const response = await fetch(url, { method: 'PUT', body: blob });
+                if (response.ok) return;
+                if (response.status === 409) {
+                    // The server is missing earlier bytes, the chunked upload cannot continue
+                    throw new Error(`Upload out of sync at offset ${(await response.json()).offset}`);
+                }
+                if (response.status < 500) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+            } catch (error) {
+                if (!(error instanceof TypeError) || attempt >= ChunkedAudioUpload.MAX_RETRIES) {
+                    throw error;
+                }
+            }
+            // Network error or server error, the server skips bytes it already has
+            await new Promise(resolve => setTimeout(resolve, 500 * 2 ** Math.min(attempt, 4)));
+            if (attempt >= ChunkedAudioUpload.MAX_RETRIES) {
+                throw new Error(`Giving up on chunk at offset ${offset}`);
+            }
+        }
+    }
+
+    /**
+     * Waits for the queued chunks and finalizes the upload
+     * @param {Blob} audioBlob - The whole recording, uploaded in one request if chunking failed
+     * @returns {Promise<Object>} - Response with file path and status
+     */
+    async finish(audioBlob) {
+        await this.started;
+        await this.queue;
+        if (!this.failed) {
+            try {
+                const response = await fetch(`/pdn-admin/api/audio-uploads/${this.uploadId}/finalize`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ size: this.size })
+                });
+                if (response.ok) {
+                    const result = await response.json();
+                    console.log('Audio saved successfully:', result);
+                    return result;
+                }
+                console.error('Error finalizing chunked upload, status:', response.status);
+            } catch (error) {
+                console.error('Error finalizing chunked upload:', error);
+            }
+        }
+        this.abort();
+        return saveUserAudio(this.username, audioBlob, this.question);
+    }
+
+    /**
+     * Discards the upload, e.g. for a recording that is too short
+     */
+    abort() {
+        if (this.uploadId) {
+            fetch(`/pdn-admin/api/audio-uploads/${this.uploadId}`, { method: 'DELETE' }).catch(() => {});
+        }
+    }
+}
+
+// Retries per chunk on network and server errors
+ChunkedAudioUpload.MAX_RETRIES = 5;
+
 // Export functions for use in other modules
 if (typeof module !== 'undefined' && module.exports) {
-    module.exports = { saveUserAudio, handleVoiceRecording, getTimestamp };
+    module.exports = { saveUserAudio, handleVoiceRecording, getTimestamp, ChunkedAudioUpload };
 } 
\ No newline at end of file
@@ -0,0 +1,764 @@
+// Global variables
+let isDarkMode = false;
+let messageQueue = [];
+let isProcessing = false;
+
+// Voice recording variables
+let speechRecognition = null;
+let isListening = false;
+let finalTranscript = '';
+let interimTranscript = '';
+
+// Utility functions
+function getCurrentTime() {
+    const now = new Date();
+    const hours = now.getHours().toString().padStart(2, '0');
+    const minutes = now.getMinutes().toString().padStart(2, '0');
+    return `${hours}:${minutes}`;
+}
+
+// Initialize Web Speech API
+function initializeSpeechRecognition() {
+    const SpeechRecognition = window.SpeechRecognition || window.webkitSpeechRecognition;
+
+    if (!SpeechRecognition) {
+        console.warn('Speech recognition not supported');
+        return null;
+    }
+
+    const recognition = new SpeechRecognition();
+    recognition.continuous = true;
+    recognition.interimResults = true;
+    recognition.lang = 'he-IL'; // Hebrew language
+    recognition.maxAlternatives = 1;
+
+    recognition.onstart = () => {
+        isListening = true;
+        finalTranscript = '';
+        interimTranscript = '';
+        updateMicrophoneUI(true);
+        showTranscriptionFeedback('🎤 מקשיב...');
+    };
+
+    recognition.onresult = (event) => {
+        let interimTranscript = '';
+        let finalTranscript = '';
+
+        for (let i = event.resultIndex; i < event.results.length; i++) {
+            const transcript = event.results[i][0].transcript;
+            if (event.results[i].isFinal) {
+                finalTranscript += transcript;
+            } else {
+                interimTranscript += transcript;
+            }
+        }
+
+        // Update the input field with real-time transcription
+        const userInput = document.getElementById('userInput');
+        userInput.value = finalTranscript + interimTranscript;
+
+        // Show real-time feedback
+        if (interimTranscript) {
+            showTranscriptionFeedback(`🎤 מקשיב... "${interimTranscript}"`);
+        } else if (finalTranscript) {
+            showTranscriptionFeedback(`✅ הושלם: "${finalTranscript}"`);
+        }
+    };
+
+    recognition.onerror = (event) => {
+        console.error('Speech recognition error:', event.error);
+        isListening = false;
+        updateMicrophoneUI(false);
+        hideTranscriptionFeedback();
+
+        let errorMessage = 'שגיאה בהקלטה';
+        switch (event.error) {
+            case 'no-speech':
+                errorMessage = 'לא זוהתה דיבור';
+                break;
+            case 'audio-capture':
+                errorMessage = 'בעיה במיקרופון';
+                break;
+            case 'not-allowed':
+                errorMessage = 'אין הרשאה למיקרופון';
+                break;
+            case 'network':
+                errorMessage = 'בעיית רשת';
+                break;
+        }
+        showError(errorMessage);
+    };
+
+    recognition.onend = () => {
+        isListening = false;
+        updateMicrophoneUI(false);
+        hideTranscriptionFeedback();
+
+        // If we have final transcript, send the message
+        const userInput = document.getElementById('userInput');
+        if (userInput.value.trim()) {
+            // Auto-focus on input for potential editing
+            userInput.focus();
+            userInput.setSelectionRange(userInput.value.length, userInput.value.length);
+
+            // Auto-send after a short delay
+            setTimeout(() => {
+                if (userInput.value.trim() && !isListening) {
+                    sendMessage();
+                }
+            }, 1000);
+        }
+    };
+
+    return recognition;
+}
+
+// Update microphone button UI
+function updateMicrophoneUI(isActive) {
+    const micBtn = document.getElementById('micBtn');
+    const micIcon = micBtn.querySelector('i');
+
+    if (isActive) {
+        micBtn.classList.add('recording');
+        micIcon.className = 'fas fa-stop';
+        micBtn.title = 'עצור הקלטה';
+        micBtn.setAttribute('aria-label', 'עצור הקלטה');
+    } else {
+        micBtn.classList.remove('recording');
+        micIcon.className = 'fas fa-microphone';
+        micBtn.title = 'הקלטה קולית';
+        micBtn.setAttribute('aria-label', 'הקלטה קולית');
+    }
+}
+
+// Show transcription feedback
+function showTranscriptionFeedback(message) {
+    let feedback = document.getElementById('transcriptionFeedback');
+    if (!feedback) {
+        feedback = document.createElement('div');
+        feedback.id = 'transcriptionFeedback';
+        feedback.className = 'transcription-feedback';
+        document.body.appendChild(feedback);
+    }
+
+    feedback.textContent = message;
+    feedback.classList.add('show');
+}
+
+// Hide transcription feedback
+function hideTranscriptionFeedback() {
+    const feedback = document.getElementById('transcriptionFeedback');
+    if (feedback) {
+        feedback.classList.remove('show');
+    }
+}
+
+// Voice recording and speech recognition functionality
+function toggleMicrophone() {
+    if (!speechRecognition) {
+        speechRecognition = initializeSpeechRecognition();
+        if (!speechRecognition) {
+            showError('הדפדפן שלך אינו תומך בהקלטה קולית');
+            return;
+        }
+    }
+
+    if (isListening) {
+        // Stop listening
+        speechRecognition.stop();
+    } else {
+        // Start listening
+        try {
+            speechRecognition.start();
+        } catch (error) {
+            console.error('Error starting speech recognition:', error);
+            showError('שגיאה בהתחלת ההקלטה');
+        }
+    }
+}
+
+// Security: Input sanitization function
+function sanitizeInput(input) {
+    const div = document.createElement('div');
+    div.textContent = input;
+    return div.innerHTML;
+}
+
+// Security: XSS prevention for markdown
+function safeMarkdownParse(text) {
+    // First sanitize the input
+    const sanitized = sanitizeInput(text);
+    // Then parse with marked (which should be configured to escape HTML)
+    return marked.parse(sanitized);
+}
+
+// Error handling utility
+function showError(message, duration = 5000) {
+    const errorDiv = document.createElement('div');
+    errorDiv.className = 'error-message';
+    errorDiv.innerHTML = `<i class="fas fa-exclamation-triangle"></i> ${sanitizeInput(message)}`;
+
+    const chatContainer = document.getElementById('chatContainer');
+    chatContainer.appendChild(errorDiv);
+    scrollToBottom();
+
+    setTimeout(() => {
+        if (errorDiv.parentNode) {
+            errorDiv.remove();
+        }
+    }, duration);
+}
+
+// Success handling utility
+function showSuccess(message, duration = 5000) {
+    const successDiv = document.createElement('div');
+    successDiv.className = 'success-message';
+    successDiv.innerHTML = `<i class="fas fa-check-circle"></i> ${sanitizeInput(message)}`;
+
+    const chatContainer = document.getElementById('chatContainer');
+    chatContainer.appendChild(successDiv);
+    scrollToBottom();
+
+    setTimeout(() => {
+        if (successDiv.parentNode) {
+            successDiv.remove();
+        }
+    }, duration);
+}
+
+// Enhanced scroll management
+let userScrolledUp = false;
+let lastScrollTop = 0;
+
+// Check if user has manually scrolled up
+function checkUserScroll() {
+    const chatContainer = document.getElementById('chatContainer');
+    if (!chatContainer) return;
+
+    const currentScrollTop = chatContainer.scrollTop;
+    const scrollHeight = chatContainer.scrollHeight;
+    const clientHeight = chatContainer.clientHeight;
+
+    // User is considered to have scrolled up if they're not at the bottom
+    // and the scroll position has changed (not just initial load)
+    if (lastScrollTop > 0) {
+        userScrolledUp = currentScrollTop + clientHeight < scrollHeight - 10;
+    }
+
+    lastScrollTop = currentScrollTop;
+}
+
+// Enhanced scroll to bottom with smart behavior
+function scrollToBottom(force = false) {
+    const chatContainer = document.getElementById('chatContainer');
+    if (!chatContainer) return;
+
+    // Don't auto-scroll if user manually scrolled up (unless forced)
+    if (userScrolledUp && !force) {
+        return;
+    }
+
+    // Use requestAnimationFrame to ensure DOM is updated
+    requestAnimationFrame(() => {
+        chatContainer.scrollTop = chatContainer.scrollHeight;
+        userScrolledUp = false; // Reset flag after auto-scrolling
+    });
+}
+
+// Enhanced scroll to bottom with delay
+function scrollToBottomDelayed(delay = 100, force = false) {
+    setTimeout(() => {
+        scrollToBottom(force);
+    }, delay);
+}
+
+// Smooth scroll to bottom
+function smoothScrollToBottom(force = false) {
+    const chatContainer = document.getElementById('chatContainer');
+    if (!chatContainer) return;
+
+    // Don't auto-scroll if user manually scrolled up (unless forced)
+    if (userScrolledUp && !force) {
+        return;
+    }
+
+    const lastMessage = chatContainer.lastElementChild;
+    if (lastMessage) {
+        lastMessage.scrollIntoView({ 
+            behavior: 'smooth', 
+            block: 'end',
+            inline: 'nearest'
+        });
+        userScrolledUp = false; // Reset flag after auto-scrolling
+    }
+}
+
+function handleKeyPress(event) {
+    if (event.key === 'Enter' && !event.shiftKey) {
+        event.preventDefault();
+        sendMessage();
+    } else if (event.key === 'Tab') {
+        event.preventDefault();
+        // Navigate between controls
+        const controls = ['userInput', 'micBtn', 'sendBtn'];
+        const currentIndex = controls.indexOf(document.activeElement.id);
+        const nextIndex = (currentIndex + 1) % controls.length;
+        document.getElementById(controls[nextIndex]).focus();
+    }
+}
+
+// Theme toggle with proper state management
+function toggleTheme() {
+    isDarkMode = !isDarkMode;
+    document.documentElement.setAttribute('data-theme', isDarkMode ? 'dark' : 'light');
+
+    const themeIcon = document.querySelector('.theme-toggle i');
+    themeIcon.className = isDarkMode ? 'fas fa-sun' : 'fas fa-moon';
+
+    // Save preference
+    localStorage.setItem('darkMode', isDarkMode);
+}
+
+// Enhanced export chat with PDF formatting
+function exportChat() {
+    try {
+        const chatContainer = document.getElementById('chatContainer');
+        const messages = Array.from(chatContainer.querySelectorAll('.chat-bubble'));
+
+        if (messages.length === 0) {
+            showError('אין הודעות לייצוא');
+            return;
+        }
+
+        // Create PDF content with nice formatting
+        const pdfContent = document.createElement('div');
+        pdfContent.style.cssText = `
+            direction: rtl;
+            font-family: 'Noto Sans Hebrew', 'Arial', sans-serif;
+            padding: 20px;
+            background: white;
+            color: #333;
+            line-height: 1.6;
+        `;
+
+        // Header
+        const header = document.createElement('div');
+        header.style.cssText = `
+            text-align: center;
+            margin-bottom: 30px;
+            padding-bottom: 20px;
+            border-bottom: 2px solid #6366f1;
+        `;
+        header.innerHTML = `
+            <h1 style="color: #6366f1; margin: 0 0 10px 0; font-size: 24px;">שיחת בינת קוד המקור</h1>
+            <p style="color: #666; margin: 0; font-size: 14px;">משתמש: ${USER_NAME}</p>
+            <p style="color: #666; margin: 5px 0 0 0; font-size: 14px;">תאריך: ${new Date().toLocaleDateString('he-IL')}</p>
+        `;
+        pdfContent.appendChild(header);
+
+        // Messages container
+        const messagesContainer = document.createElement('div');
+        messagesContainer.style.cssText = `
+            max-width: 100%;
+        `;
+
+        messages.forEach((msg, index) => {
+            const isUser = msg.classList.contains('user');
+            const content = msg.querySelector('.message-content').textContent;
+            const time = msg.querySelector('.message-time').textContent;
+            const sender = isUser ? USER_NAME : 'בינת קוד המקור';
+
+            const messageDiv = document.createElement('div');
+            messageDiv.style.cssText = `
+                margin-bottom: 20px;
+                padding: 15px;
+                border-radius: 10px;
+                position: relative;
+                ${isUser ? 
+                    'background: linear-gradient(135deg, #0b2e6b, #0a2a5f); color: white; margin-right: 20px;' : 
+                    'background: #f8fafc; border: 1px solid #e2e8f0; margin-left: 20px;'
+                }
+            `;
+
+            // Sender and time
+            const senderDiv = document.createElement('div');
+            senderDiv.style.cssText = `
+                font-weight: bold;
+                font-size: 12px;
+                margin-bottom: 8px;
+                opacity: 0.8;
+            `;
+            senderDiv.textContent = `${sender} • ${time}`;
+            messageDiv.appendChild(senderDiv);
+
+            // Message content
+            const contentDiv = document.createElement('div');
+            contentDiv.style.cssText = `
+                font-size: 14px;
+                white-space: pre-wrap;
+                word-wrap: break-word;
+            `;
+            contentDiv.textContent = content;
+            messageDiv.appendChild(contentDiv);
+
+            messagesContainer.appendChild(messageDiv);
+        });
+
+        pdfContent.appendChild(messagesContainer);
+
+        // Footer
+        const footer = document.createElement('div');
+        footer.style.cssText = `
+            text-align: center;
+            margin-top: 30px;
+            padding-top: 20px;
+            border-top: 1px solid #e2e8f0;
+            color: #666;
+            font-size: 12px;
+        `;
+        footer.innerHTML = `
+            <p style="margin: 0;">© 2024 PDN Center - Personal Development Navigator</p>
+            <p style="margin: 5px 0 0 0;">בינת קוד המקור - מערכת ניהול נתוני אבחון פדן</p>
+        `;
+        pdfContent.appendChild(footer);
+
+        // PDF options
+        const opt = {
+            margin: [0.5, 0.5, 0.5, 0.5],
+            filename: `chat-export-${USER_NAME}-${new Date().toISOString().split('T')[0]}.pdf`,
+            image: { type: 'jpeg', quality: 0.98 },
+            html2canvas: { 
+                scale: 2,
+                useCORS: true,
+                letterRendering: true,
+                allowTaint: true,
+                foreignObjectRendering: false
+            },
+            jsPDF: { 
+                unit: 'in', 
+                format: 'a4', 
+                orientation: 'portrait'
+            }
+        };
+
+        // Generate and download PDF, html2pdf is loaded on first use
+        loadScript(HTML2PDF_URL).then(() => html2pdf().set(opt).from(pdfContent).save()).then(() => {
+            showSuccess('השיחה יוצאה בהצלחה!');
+        }).catch((error) => {
+            console.error('PDF generation error:', error);
+            showError('שגיאה בייצוא ה-PDF');
+        });
+
+    } catch (error) {
+        console.error('Export error:', error);
+        showError('שגיאה בייצוא השיחה');
+    }
+}
+
+// Enhanced send message function with queue and error handling
+async function sendMessage() {
+    const input = document.getElementById("userInput");
+    const sendBtn = document.getElementById("sendBtn");
+    const message = input.value.trim();
+
+    if (message === "" || isProcessing) return;
+
+    // Check if user typed ""סיים שיחה" manually
+    if (message.toLowerCase().includes("סיים שיחה") || 
+        message.toLowerCase().includes("סיים") && message.toLowerCase().includes("שיחה")) {
+        handleThankYouClick();
+        return;
+    }
+
+    // Add to queue
+    messageQueue.push(message);
+    input.value = "";
+
+    // Process queue
+    if (!isProcessing) {
+        processMessageQueue();
+    }
+}
+
+async function processMessageQueue() {
+    if (messageQueue.length === 0) return;
+
+    isProcessing = true;
+    const message = messageQueue.shift();
+
+    const sendBtn = document.getElementById("sendBtn");
+    const chatContainer = document.getElementById("chatContainer");
+
+    // Show loading state
+    sendBtn.innerHTML = '<span class="loading-spinner"></span>';
+    sendBtn.disabled = true;
+
+    // Create user message bubble
+    const userBubble = document.createElement("div");
+    userBubble.className = "chat-bubble user animated";
+    userBubble.innerHTML = `
+        <div class="message-header">${USER_NAME}:</div>
+        <div class="message-content">${safeMarkdownParse(message)}</div>
+        <div class="message-time">${getCurrentTime()}</div>
+    `;
+
+    chatContainer.appendChild(userBubble);
+    scrollToBottomDelayed(50, true); // Force scroll for new user message
+
+    // Show typing indicator
+    const typing = document.createElement("div");
+    typing.className = "typing-indicator";
+    typing.innerHTML = `
+        בינת מקוד המקור מקליד/ה
+        <div class="typing-dots">
+            <span></span>
+            <span></span>
+            <span></span>
+        </div>
+    `;
+    chatContainer.appendChild(typing);
+    scrollToBottomDelayed(50, true); // Force scroll for typing indicator
+
+    try {
+        const res = await fetch("/pdn-chat-ai/chat", {
+            method: "POST",
+            headers: {
+                "Content-Type": "application/json",
+                "X-Requested-With": "XMLHttpRequest"
+            },
+            body: JSON.stringify({
+                message: sanitizeInput(message),
+                user_name: USER_NAME,
+                user_id: USER_ID
+            })
+        });
+
+        if (!res.ok) {
+            throw new Error(`HTTP error! status: ${res.status}`);
+        }
+
+        const data = await res.json();
+        typing.remove();
+
+        // Create bot message bubble
+        const botBubble = document.createElement("div");
+        botBubble.className = "chat-bubble bot animated";
+        botBubble.innerHTML = `
+            <div class="message-header">בינת קוד המקור:</div>
+            <div class="message-content">${safeMarkdownParse(data.message || data.response || 'מצטער, אירעה שגיאה. אנא נסה שוב.')}</div>
+            <div class="message-time">${getCurrentTime()}</div>
+        `;
+
+        chatContainer.appendChild(botBubble);
+        scrollToBottomDelayed(100, true); // Force scroll for bot message
+
+        // Add quick reply buttons for bot messages
+        addQuickReplies(botBubble);
+        scrollToBottomDelayed(200, true); // Force scroll after quick replies
+
+    } catch (error) {
+        console.error('Error sending message:', error);
+        typing.remove();
+        showError('שגיאה בשליחת ההודעה לשרת');
+    } finally {
+        // Restore button state
+        sendBtn.innerHTML = '<i class="fas fa-paper-plane"></i> שלח';
+        sendBtn.disabled = false;
+        isProcessing = false;
+
+        // Process next message in queue
+        if (messageQueue.length > 0) {
+            setTimeout(processMessageQueue, 100);
+        }
+    }
+}
+
+// Add quick reply buttons
+function addQuickReplies(botBubble) {
+    const quickReplies = [
+        "תוכל/י להסביר יותר על הקוד שלי?",
+        "איך אני יכול/ה להשתמש בזה בחיי היומיום?",
+        "מה השלב הבא במסע שלי?",
+        "סיים שיחה"
+    ];
+
+    const quickRepliesDiv = document.createElement("div");
+    quickRepliesDiv.className = "quick-replies";
+
+    quickReplies.forEach(reply => {
+        const button = document.createElement("button");
+        button.className = "quick-reply-btn";
+        button.textContent = reply;
+        button.onclick = () => {
+            // Special handling for "תודה על השיחה" - redirect to login
+            if (reply === "תודה על השיחה") {
+                handleThankYouClick();
+            } else {
+                document.getElementById("userInput").value = reply;
+                sendMessage();
+            }
+        };
+        quickRepliesDiv.appendChild(button);
+    });
+
+    botBubble.appendChild(quickRepliesDiv);
+}
+
+// Handle "תודה על השיחה" click - redirect to login page
+function handleThankYouClick() {
+    // Show custom confirmation modal
+    showConfirmationModal();
+}
+
+// Custom confirmation modal functions
+function showConfirmationModal() {
+    const modal = document.getElementById('confirmationModal');
+    modal.classList.add('show');
+    document.body.style.overflow = 'hidden';
+
+    // Focus on the first button for accessibility
+    setTimeout(() => {
+        modal.querySelector('.confirmation-btn.cancel').focus();
+    }, 100);
+}
+
+function hideConfirmationModal() {
+    const modal = document.getElementById('confirmationModal');
+    modal.classList.remove('show');
+    document.body.style.overflow = '';
+}
+
+function confirmLogout() {
+    hideConfirmationModal();
+
+    // Clear session storage
+    sessionStorage.removeItem('username');
+
+    // Clear any stored chat data
+    localStorage.removeItem('binat_chat_history');
+
+    // Show goodbye message before redirecting
+    const chatContainer = document.getElementById("chatContainer");
+    const goodbyeBubble = document.createElement("div");
+    goodbyeBubble.className = "chat-bubble bot animated";
+    goodbyeBubble.innerHTML = `
+        <div class="message-header">בינת קוד המקור:</div>
+        <div class="message-content">
+            🌿 תודה לך על השיחה היפה!<br>
+            בינת קוד המקור תמיד כאן בשבילך.<br>
+            עד הפעם הבאה... 💜
+        </div>
+        <div class="message-time">${getCurrentTime()}</div>
+    `;
+
+    chatContainer.appendChild(goodbyeBubble);
+    chatContainer.scrollTop = chatContainer.scrollHeight;
+
+    // Redirect after a short delay to show the goodbye message
+    setTimeout(() => {
+        window.location.href = '/pdn-chat-ai/';
+    }, 2000);
+}
+
+// Handle escape key to close modal
+document.addEventListener('keydown', function(e) {
+    if (e.key === 'Escape') {
+        hideConfirmationModal();
+    }
+});
+
+// Handle click outside modal to close
+document.addEventListener('click', function(e) {
+    const modal = document.getElementById('confirmationModal');
+    if (e.target === modal) {
+        hideConfirmationModal();
+    }
+});
+
+// Initialize chat with proper error handling
+document.addEventListener("DOMContentLoaded", function () {
+    try {
+        // Load theme preference
+        const savedTheme = localStorage.getItem('darkMode');
+        if (savedTheme === 'true') {
+            isDarkMode = true;
+            document.documentElement.setAttribute('data-theme', 'dark');
+            const themeIcon = document.querySelector('.theme-toggle i');
+            themeIcon.className = 'fas fa-sun';
+        }
+
+        // Set up scroll tracking
+        const chatContainer = document.getElementById('chatContainer');
+        if (chatContainer) {
+            chatContainer.addEventListener('scroll', checkUserScroll);
+        }
+
+        // Add welcome message
+        const initialBot = document.createElement("div");
+        initialBot.className = "chat-bubble bot animated";
+
+        const rawMessage = `🌿 שלום ${USER_NAME},\nבינת מקוד המקור ממתינה לך כאן, בקצב שלך.\n\nאם יש שאלה שלא עוזבת, דפוס שחוזר, או תחושה לא פתורה –\nבוא נסתכל עליה יחד.\nבלי למהר. בלי לשפוט. רק להבין מה פועל בך עכשיו.`;
+        const formattedMessage = rawMessage.replace(/\n/g, '<br>');
+
+        initialBot.innerHTML = `
+            <div class="message-header ">בינת קוד המקור:</div>
+            <div class="message-content">${formattedMessage}</div>
+            <div class="message-time">${getCurrentTime()}</div>
+        `;
+
+        chatContainer.appendChild(initialBot);
+        addQuickReplies(initialBot);
+
+        // Focus on input
+        document.getElementById("userInput").focus();
+
+        // Load chat history
+        loadChatHistory();
+
+    } catch (error) {
+        console.error('Initialization error:', error);
+        showError('שגיאה בטעינת הממשק');
+    }
+});
+
+// Load chat history with error handling
+async function loadChatHistory() {
+    try {
+        const response = await fetch('/pdn-chat-ai/history');
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const history = await response.json();
+
+        if (history.messages && history.messages.length > 0) {
+            const chatContainer = document.getElementById("chatContainer");
+
+            history.messages.forEach(msg => {
+                const bubble = document.createElement("div");
+                bubble.className = `chat-bubble ${msg.type} animated`;
+                bubble.innerHTML = `
+                    <div class="message-content">${safeMarkdownParse(msg.content)}</div>
+                    <div class="message-time">${msg.timestamp}</div>
+                `;
+                chatContainer.appendChild(bubble);
+            });
+            scrollToBottom();
+        }
+    } catch (error) {
+        console.error('Error loading chat history:', error);
+        // Don't show error for history loading failure
+    }
+}
+
+// Configure marked for security
+if (typeof marked !== 'undefined') {
+    marked.setOptions({
+        breaks: true,
+        gfm: true,
+        sanitize: false, // We handle sanitization manually
+        smartLists: true,
+        smartypants: true
+    });
+}
@@ -0,0 +1,29 @@
+/**
+ * Loads rarely used scripts on first use instead of with the page
+ */
+
+const HTML2PDF_URL = 'https://cdnjs.cloudflare.com/ajax/libs/html2pdf.js/0.10.1/html2pdf.bundle.min.js';
+
+const loadedScripts = {};
+
+/**
+ * Loads a script once, later calls get the same promise
+ * @param {string} src - The script URL
+ * @returns {Promise<void>} - Resolves when the script has run
+ */
+function loadScript(src) {
+    if (!loadedScripts[src]) {
+        loadedScripts[src] = new Promise((resolve, reject) => {
+            const script = document.createElement('script');
+            script.src = src;
+            script.async = true;
+            script.onload = () => resolve();
+            script.onerror = () => {
+                delete loadedScripts[src];
+                reject(new Error(`Failed to load ${src}`));
+            };
+            document.head.appendChild(script);
+        });
+    }
+    return loadedScripts[src];
+}
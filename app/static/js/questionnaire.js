@@ -0,0 +1,750 @@
+let currentQuestion = 1;
+let currentStage = '';
+let nextData = null;
+let questionHistory = []; // Array to store question history
+// Buffered answers not yet confirmed by the server, mirrored to sessionStorage
+// so a reload does not lose them
+const PENDING_ANSWERS_KEY = `pdnPendingAnswers:${currentUsername}`;
+let pendingAnswers = JSON.parse(sessionStorage.getItem(PENDING_ANSWERS_KEY) || '[]');
+// Last flush of the buffer, see flushAnswers
+let answersFlush = Promise.resolve(true);
+
+// Modal logic
+const modal = document.getElementById('instructionModal');
+const modalTitle = document.getElementById('modalTitle');
+const modalText = document.getElementById('modalText');
+document.getElementById('modalClose').onclick = () => {
+    modal.style.display = 'none';
+    document.body.style.overflow = "";
+    if (nextData) { actuallyRenderQuestion(nextData); nextData = null; }
+};
+
+// Voice record logic
+let mediaRecorder;
+let audioChunks = [];
+let recordTimer = null;
+let recordElapsed = 0;
+let recordingValid = false; // Track if recording meets duration requirements
+
+const startBtn = document.getElementById('startRecordBtn');
+const stopBtn = document.getElementById('stopRecordBtn');
+const recordStatus = document.getElementById('recordStatus');
+const audioPlayback = document.getElementById('audioPlayback');
+const visualizer = document.getElementById('visualizer');
+const uploadStatus = document.getElementById('uploadStatus');
+
+// Recordings are uploaded in chunks while recording, one chunk per timeslice
+const RECORDING_TIMESLICE_MS = 5000;
+
+// Starts a chunked upload, loading the audio handler on first use
+async function startRecordingUpload(question) {
+    await loadScript(AUDIO_HANDLER_URL);
+    const upload = new ChunkedAudioUpload(currentUsername, question);
+    upload.start();
+    return upload;
+}
+
+startBtn.onclick = async function() {
+    audioChunks = [];
+    recordingValid = false;
+    recordStatus.innerHTML = '<span class="recording">מקליט... (00:00 / 01:00-01:30)</span>';
+    startBtn.classList.add('hidden');
+    stopBtn.classList.remove('hidden');
+    stopBtn.innerText = 'סיים הקלטה';
+    stopBtn.disabled = true;
+    stopBtn.classList.add('opacity-50', 'cursor-not-allowed');
+    audioPlayback.classList.add('hidden');
+    visualizer.innerHTML = '';
+    
+    // Add visual feedback for recording state
+    const voiceArea = document.getElementById('voiceRecordArea');
+    voiceArea.classList.remove('valid', 'invalid');
+    voiceArea.classList.add('recording');
+    
+    // Add fake bars for animation
+    for(let i=0;i<5;i++){
+        const bar = document.createElement('div');
+        bar.className = 'audio-bar';
+        visualizer.appendChild(bar);
+    }
+    recordElapsed = 0;
+    try {
+        const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+        mediaRecorder = new MediaRecorder(stream);
+        const upload = await startRecordingUpload('question1');
+        mediaRecorder.ondataavailable = e => {
+            audioChunks.push(e.data);
+            upload.addChunk(e.data);
+        };
+        mediaRecorder.onstop = async e => {
+            const audioBlob = new Blob(audioChunks, { type: 'audio/webm' });
+            audioPlayback.src = URL.createObjectURL(audioBlob);
+            audioPlayback.classList.remove('hidden');
+            visualizer.innerHTML = '';
+            
+            // Check if recording duration is valid
+            if (recordElapsed >= 60 && recordElapsed <= 90) {
+                recordingValid = true;
+                recordStatus.innerHTML = '<span class="text-green-600 font-bold">✓ הקלטה תקינה (' + formatTime(recordElapsed) + ')</span>';
+                stopBtn.innerText = 'המשך לשאלה הבאה';
+                stopBtn.disabled = false;
+                stopBtn.classList.remove('opacity-50', 'cursor-not-allowed');
+                
+                // Add visual feedback for valid state
+                const voiceArea = document.getElementById('voiceRecordArea');
+                voiceArea.classList.remove('recording', 'invalid');
+                voiceArea.classList.add('valid');
+                
+                // Upload audio to backend
+                try {
+                    const result = await upload.finish(audioBlob);
+                    uploadStatus.classList.remove('hidden');
+                    uploadStatus.innerHTML = '<div class="text-green-600 font-semibold">הקלטה נשמרה בהצלחה!</div>';
+                    console.log('Audio uploaded successfully:', result);
+                } catch (error) {
+                    console.error('Failed to upload audio:', error);
+                    uploadStatus.classList.remove('hidden');
+                    uploadStatus.innerHTML = '<div class="text-red-600 font-semibold">שגיאה בשמירת ההקלטה</div>';
+                }
+            } else {
+                recordingValid = false;
+                if (recordElapsed < 60) {
+                    recordStatus.innerHTML = '<span class="text-red-600 font-bold">✗ הקלטה קצרה מדי (' + formatTime(recordElapsed) + '). נדרש לפחות דקה אחת.</span>';
+                } else {
+                    recordStatus.innerHTML = '<span class="text-red-600 font-bold">✗ הקלטה ארוכה מדי (' + formatTime(recordElapsed) + '). נדרש לכל היותר דקה וחצי.</span>';
+                }
+                stopBtn.innerText = 'נסה שוב';
+                stopBtn.disabled = false;
+                stopBtn.classList.remove('opacity-50', 'cursor-not-allowed');
+                uploadStatus.classList.add('hidden');
+                upload.abort();
+                
+                // Add visual feedback for invalid state
+                const voiceArea = document.getElementById('voiceRecordArea');
+                voiceArea.classList.remove('recording', 'valid');
+                voiceArea.classList.add('invalid');
+            }
+        };
+        mediaRecorder.start(RECORDING_TIMESLICE_MS);
+        // Timer for duration
+        recordTimer = setInterval(() => {
+            recordElapsed++;
+            let sec = recordElapsed % 60, min = Math.floor(recordElapsed / 60);
+            let statusText = `מקליט... (${("0"+min).slice(-2)}:${("0"+sec).slice(-2)} / 01:00-01:30)`;
+            
+            // Change color based on duration
+            if (recordElapsed >= 60 && recordElapsed <= 90) {
+                statusText = `<span class="text-green-600">${statusText} ✓</span>`;
+                stopBtn.disabled = false;
+                stopBtn.classList.remove('opacity-50', 'cursor-not-allowed');
+            } else if (recordElapsed > 90) {
+                statusText = `<span class="text-red-600">${statusText} ✗</span>`;
+                stopBtn.disabled = false;
+                stopBtn.classList.remove('opacity-50', 'cursor-not-allowed');
+            } else {
+                statusText = `<span class="text-orange-600">${statusText}</span>`;
+                stopBtn.disabled = true;
+                stopBtn.classList.add('opacity-50', 'cursor-not-allowed');
+            }
+            
+            recordStatus.innerHTML = statusText;
+            
+            // Auto-stop at 2 minutes to prevent excessive recording
+            if(recordElapsed >= 120) {
+                finishRecording();
+            }
+        }, 1000);
+    } catch (err) {
+        recordStatus.innerHTML = '<span class="text-red-600 font-semibold">שגיאה בגישה למיקרופון</span>';
+        stopBtn.classList.add('hidden');
+        startBtn.classList.remove('hidden');
+        visualizer.innerHTML = '';
+    }
+};
+
+function formatTime(seconds) {
+    const min = Math.floor(seconds / 60);
+    const sec = seconds % 60;
+    return `${("0"+min).slice(-2)}:${("0"+sec).slice(-2)}`;
+}
+
+function finishRecording() {
+    if (mediaRecorder && mediaRecorder.state === 'recording') {
+        mediaRecorder.stop();
+        clearInterval(recordTimer);
+    }
+}
+
+stopBtn.onclick = function() {
+    if (mediaRecorder && mediaRecorder.state === 'recording') {
+        finishRecording();
+    } else if (recordingValid) {
+        document.getElementById('voiceRecordArea').classList.add('hidden');
+        document.getElementById('voiceRecordArea2').classList.remove('hidden');
+        // Reset the second voice UI
+        resetVoiceUI2();
+    } else {
+        // Reset for retry
+        resetVoiceUI();
+    }
+};
+
+function resetVoiceUI() {
+    startBtn.classList.remove('hidden');
+    stopBtn.classList.add('hidden');
+    stopBtn.innerText = 'סיים הקלטה';
+    stopBtn.disabled = false;
+    stopBtn.classList.remove('opacity-50', 'cursor-not-allowed');
+    recordStatus.innerHTML = '';
+    audioPlayback.classList.add('hidden');
+    audioPlayback.src = '';
+    visualizer.innerHTML = '';
+    uploadStatus.classList.add('hidden');
+    recordingValid = false;
+    
+    // Clear visual feedback
+    const voiceArea = document.getElementById('voiceRecordArea');
+    voiceArea.classList.remove('recording', 'valid', 'invalid');
+    
+    if (mediaRecorder && mediaRecorder.state === 'recording') mediaRecorder.stop();
+    if (recordTimer) clearInterval(recordTimer);
+}
+
+// Second Voice Record Area Logic
+let mediaRecorder2;
+let audioChunks2 = [];
+let recordTimer2 = null;
+let recordElapsed2 = 0;
+let recordingValid2 = false; // Track if recording meets duration requirements
+
+const startBtn2 = document.getElementById('startRecordBtn2');
+const stopBtn2 = document.getElementById('stopRecordBtn2');
+const recordStatus2 = document.getElementById('recordStatus2');
+const audioPlayback2 = document.getElementById('audioPlayback2');
+const visualizer2 = document.getElementById('visualizer2');
+const uploadStatus2 = document.getElementById('uploadStatus2');
+
+startBtn2.onclick = async function() {
+    audioChunks2 = [];
+    recordingValid2 = false;
+    recordStatus2.innerHTML = '<span class="recording">מקליט... (00:00 / 01:00-01:30)</span>';
+    startBtn2.classList.add('hidden');
+    stopBtn2.classList.remove('hidden');
+    stopBtn2.innerText = 'סיים הקלטה';
+    stopBtn2.disabled = true;
+    stopBtn2.classList.add('opacity-50', 'cursor-not-allowed');
+    audioPlayback2.classList.add('hidden');
+    visualizer2.innerHTML = '';
+    
+    // Add visual feedback for recording state
+    const voiceArea2 = document.getElementById('voiceRecordArea2');
+    voiceArea2.classList.remove('valid', 'invalid');
+    voiceArea2.classList.add('recording');
+    
+    // Add fake bars for animation
+    for(let i=0;i<5;i++){
+        const bar = document.createElement('div');
+        bar.className = 'audio-bar';
+        visualizer2.appendChild(bar);
+    }
+    recordElapsed2 = 0;
+    try {
+        const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+        mediaRecorder2 = new MediaRecorder(stream);
+        const upload = await startRecordingUpload('question2');
+        mediaRecorder2.ondataavailable = e => {
+            audioChunks2.push(e.data);
+            upload.addChunk(e.data);
+        };
+        mediaRecorder2.onstop = async e => {
+            const audioBlob = new Blob(audioChunks2, { type: 'audio/webm' });
+            audioPlayback2.src = URL.createObjectURL(audioBlob);
+            audioPlayback2.classList.remove('hidden');
+            visualizer2.innerHTML = '';
+            
+            // Check if recording duration is valid
+            if (recordElapsed2 >= 60 && recordElapsed2 <= 90) {
+                recordingValid2 = true;
+                recordStatus2.innerHTML = '<span class="text-green-600 font-bold">✓ הקלטה תקינה (' + formatTime(recordElapsed2) + ')</span>';
+                stopBtn2.innerText = 'המשך לאיבחון';
+                stopBtn2.disabled = false;
+                stopBtn2.classList.remove('opacity-50', 'cursor-not-allowed');
+                
+                // Add visual feedback for valid state
+                const voiceArea2 = document.getElementById('voiceRecordArea2');
+                voiceArea2.classList.remove('recording', 'invalid');
+                voiceArea2.classList.add('valid');
+                
+                // Upload audio to backend with different filename
+                try {
+                    const result = await upload.finish(audioBlob);
+                    uploadStatus2.classList.remove('hidden');
+                    uploadStatus2.innerHTML = '<div class="text-green-600 font-semibold">הקלטה נשמרה בהצלחה!</div>';
+                    console.log('Second audio uploaded successfully:', result);
+                } catch (error) {
+                    console.error('Failed to upload second audio:', error);
+                    uploadStatus2.classList.remove('hidden');
+                    uploadStatus2.innerHTML = '<div class="text-red-600 font-semibold">שגיאה בשמירת ההקלטה</div>';
+                }
+            } else {
+                recordingValid2 = false;
+                if (recordElapsed2 < 60) {
+                    recordStatus2.innerHTML = '<span class="text-red-600 font-bold">✗ הקלטה קצרה מדי (' + formatTime(recordElapsed2) + '). נדרש לפחות דקה אחת.</span>';
+                } else {
+                    recordStatus2.innerHTML = '<span class="text-red-600 font-bold">✗ הקלטה ארוכה מדי (' + formatTime(recordElapsed2) + '). נדרש לכל היותר דקה וחצי.</span>';
+                }
+                stopBtn2.innerText = 'נסה שוב';
+                stopBtn2.disabled = false;
+                stopBtn2.classList.remove('opacity-50', 'cursor-not-allowed');
+                uploadStatus2.classList.add('hidden');
+                upload.abort();
+                
+                // Add visual feedback for invalid state
+                const voiceArea2 = document.getElementById('voiceRecordArea2');
+                voiceArea2.classList.remove('recording', 'valid');
+                voiceArea2.classList.add('invalid');
+            }
+        };
+        mediaRecorder2.start(RECORDING_TIMESLICE_MS);
+        // Timer for duration
+        recordTimer2 = setInterval(() => {
+            recordElapsed2++;
+            let sec = recordElapsed2 % 60, min = Math.floor(recordElapsed2 / 60);
+            let statusText = `מקליט... (${("0"+min).slice(-2)}:${("0"+sec).slice(-2)} / 01:00-01:30)`;
+            
+            // Change color based on duration
+            if (recordElapsed2 >= 60 && recordElapsed2 <= 90) {
+                statusText = `<span class="text-green-600">${statusText} ✓</span>`;
+                stopBtn2.disabled = false;
+                stopBtn2.classList.remove('opacity-50', 'cursor-not-allowed');
+            } else if (recordElapsed2 > 90) {
+                statusText = `<span class="text-red-600">${statusText} ✗</span>`;
+                stopBtn2.disabled = false;
+                stopBtn2.classList.remove('opacity-50', 'cursor-not-allowed');
+            } else {
+                statusText = `<span class="text-orange-600">${statusText}</span>`;
+                stopBtn2.disabled = true;
+                stopBtn2.classList.add('opacity-50', 'cursor-not-allowed');
+            }
+            
+            recordStatus2.innerHTML = statusText;
+            
+            // Auto-stop at 2 minutes to prevent excessive recording
+            if(recordElapsed2 >= 120) {
+                finishRecording2();
+            }
+        }, 1000);
+    } catch (err) {
+        recordStatus2.innerHTML = '<span class="text-red-600 font-semibold">שגיאה בגישה למיקרופון</span>';
+        stopBtn2.classList.add('hidden');
+        startBtn2.classList.remove('hidden');
+        visualizer2.innerHTML = '';
+    }
+};
+
+function finishRecording2() {
+    if (mediaRecorder2 && mediaRecorder2.state === 'recording') {
+        mediaRecorder2.stop();
+        clearInterval(recordTimer2);
+    }
+}
+
+stopBtn2.onclick = function() {
+    if (mediaRecorder2 && mediaRecorder2.state === 'recording') {
+        finishRecording2();
+    } else if (recordingValid2) {
+        document.getElementById('voiceRecordArea2').classList.add('hidden');
+        document.getElementById('questionArea').classList.remove('hidden');
+        loadQuestion(currentQuestion);
+    } else {
+        // Reset for retry
+        resetVoiceUI2();
+    }
+};
+
+function resetVoiceUI2() {
+    startBtn2.classList.remove('hidden');
+    stopBtn2.classList.add('hidden');
+    stopBtn2.innerText = 'סיים הקלטה';
+    stopBtn2.disabled = false;
+    stopBtn2.classList.remove('opacity-50', 'cursor-not-allowed');
+    recordStatus2.innerHTML = '';
+    audioPlayback2.classList.add('hidden');
+    audioPlayback2.src = '';
+    visualizer2.innerHTML = '';
+    uploadStatus2.classList.add('hidden');
+    recordingValid2 = false;
+    
+    // Clear visual feedback
+    const voiceArea2 = document.getElementById('voiceRecordArea2');
+    voiceArea2.classList.remove('recording', 'valid', 'invalid');
+    
+    if (mediaRecorder2 && mediaRecorder2.state === 'recording') mediaRecorder2.stop();
+    if (recordTimer2) clearInterval(recordTimer2);
+}
+
+// Question/Modal logic
+async function loadQuestion(questionNumber) {
+    const response = await fetch(`/pdn-diagnose/questionnaire/${questionNumber}`);
+    const data = await response.json();
+    if (data.message === "No more questions.") return completeQuestionnaire();
+    if (data.stage !== currentStage) {
+        // Phase boundary: send the previous phase's answers
+        flushAnswers();
+        currentStage = data.stage;
+        if (data.instructions) {
+          //<div id="voiceRecordArea" class="p-6 rounded-xl border border-indigo-100 bg-gradient-to-r from-purple-100 to-indigo-100 text-gray-800 shadow-sm fade-in text-right" dir="rtl">
+
+            //modalTitle.innerHTML = "<div class=' p-6 text-lg font-bold text-gray-700 ' >הסבר:</div>";
+            modalText.innerText = data.instructions;
+            modal.style.display = 'flex';
+            document.body.style.overflow = "hidden";
+            setTimeout(() => {
+                modal.classList.remove('modal-animate');
+                void modal.offsetWidth; // Force reflow
+                modal.classList.add('modal-animate');
+            }, 10);
+            nextData = data;
+            return;
+        }
+    }
+    actuallyRenderQuestion(data);
+}
+
+function actuallyRenderQuestion(data) {
+    document.getElementById('questionText').innerText = data.question;
+    const optionsDiv = document.getElementById('options');
+    optionsDiv.innerHTML = '';
+    
+    // Show/hide back button based on question history
+    const backButton = document.getElementById('backButton');
+    backButton.classList.toggle('hidden', questionHistory.length === 0);
+
+    if (['PartC','PartD'].includes(data.stage)) {
+        renderScaleQuestion(data, data.question_number);
+        return;
+    }
+    if (data.type === 'ranking') {
+        renderRankingQuestion(data, data.question_number);
+        return;
+    }
+    
+    // Create an array of buttons first
+    const buttons = data.options.map(opt => {
+        const btn = document.createElement('button');
+        btn.innerText = opt.text;
+        btn.className = 'text-lg fade-in w-full py-4 px-6 bg-gradient-to-r from-blue-900 to-blue-900 text-white font-medium rounded-xl hover:from-blue-900 hover:to-blue-900 focus:outline-none focus:ring-4 focus:ring-blue-900/50 transition-all duration-300 transform hover:scale-[1.02] active:scale-[0.98] shadow-lg';
+        btn.onclick = () => submitAnswer(data.question_number, opt.code, opt.text);
+        return btn;
+    });
+    
+    // Randomize the order of buttons
+    buttons.sort(() => Math.random() - 0.5);
+    
+    // Append the randomized buttons to the options div
+    buttons.forEach(btn => optionsDiv.appendChild(btn));
+}
+
+function renderScaleQuestion(data, questionNumber) {
+      const container = document.createElement('div');
+      container.className = 'space-y-4';
+
+      const labelsRow = document.createElement('div');
+      labelsRow.className = 'flex justify-between items-center';
+
+      const leftLabel = document.createElement('span');
+      leftLabel.textContent = data.options[0].text;
+      const rightLabel = document.createElement('span');
+      rightLabel.textContent = data.options[1].text;
+
+      labelsRow.append(leftLabel, rightLabel);
+      container.append(labelsRow);
+
+      const [lText, rText] = data.options.map(o => o.text);
+      const descriptions = [
+        lText,
+        `לרב ${lText}`,
+        `במידה מסוימת ${lText}`,
+        'באמצע',
+        `במידה מסוימת ${rText}`,
+        `לרב ${rText}`,
+        rText,
+      ];
+
+      let currentStep = null;
+
+      const stepsRow = document.createElement('div');
+      stepsRow.className = 'flex justify-between items-center py-2';
+
+      function updateSelection() {
+        buttons.forEach((btn, idx) => {
+          btn.classList.toggle('from-blue-900', idx === currentStep);
+          btn.classList.toggle('to-blue-900', idx === currentStep);
+          btn.classList.toggle('bg-gradient-to-r', idx === currentStep);
+          btn.classList.toggle('text-white', idx === currentStep);
+          btn.classList.toggle('bg-gray-200', idx !== currentStep);
+        });
+        valueDisplay.textContent = currentStep !== null ? descriptions[currentStep] : '';
+        submitBtn.disabled = currentStep === null;
+        submitBtn.classList.toggle('opacity-50', currentStep === null);
+        submitBtn.classList.toggle('cursor-not-allowed', currentStep === null);
+      }
+
+      const buttons = Array.from({length:7}, (_, idx) => {
+        const btn = document.createElement('button');
+        btn.type = 'button';
+        btn.className = 'w-8 h-8 rounded-full bg-gray-200 transition';
+        btn.setAttribute('aria-label', descriptions[idx]);
+        btn.onclick = () => {
+          currentStep = idx;
+          updateSelection();
+        };
+        stepsRow.appendChild(btn);
+        return btn;
+      });
+
+      container.append(stepsRow);
+
+      const valueDisplay = document.createElement('div');
+      valueDisplay.className = 'text-center text-xl font-bold text-blue-900';
+      container.append(valueDisplay);
+
+      const submitBtn = document.createElement('button');
+      submitBtn.type = 'button';
+      submitBtn.innerText = 'שלח תשובה';
+      submitBtn.className = 'text-lg w-full py-3 px-6 bg-gradient-to-r from-blue-900 to-blue-900 text-white rounded-xl opacity-50 cursor-not-allowed';
+      submitBtn.disabled = true;
+      submitBtn.onclick = async () => {
+        if (currentStep === null) return;
+        const leftCode  = data.options[0].code;
+        const rightCode = data.options[1].code;
+        const scaleMap = [ [12,0],[10,2],[8,4],[6,6],[4,8],[2,10],[0,12] ];
+        const [lp, rp] = scaleMap[currentStep];
+        await submitAnswer(questionNumber, null, null, {[leftCode]:lp,[rightCode]:rp});
+
+      };
+      
+      container.append(submitBtn);
+
+      document.getElementById('options').appendChild(container);
+      updateSelection();
+    }
+
+    const sampleData = {
+      options: [
+        { text: 'לא מסכים כלל', code: 'low' },
+        { text: 'מסכים מאוד', code: 'high' }
+      ]
+    };
+
+    document.addEventListener('DOMContentLoaded', () => {
+      renderScaleQuestion(sampleData, 1);
+    });
+
+
+
+    function renderRankingQuestion(data, questionNumber) {
+    const container = document.createElement('div');
+    container.className = 'glass-effect rounded-3xl shadow-lg p-8';
+
+    // Enhanced instruction container with better styling
+    const instructionContainer = document.createElement('div');
+    instructionContainer.className = 'text-center mb-6';
+    
+    const mainInstruction = document.createElement('div');
+    mainInstruction.className = 'text-white bg-gradient-to-r from-blue-900 to-blue-900 px-6 py-4 rounded-2xl text-lg font-bold shadow-sm border border-blue-900 mb-3';
+    mainInstruction.innerHTML = 'לחץ לפי סדר החשיבות';
+    
+    const subInstruction = document.createElement('div');
+    subInstruction.className = 'text-blue-900 bg-blue-100 px-4 py-2 rounded-xl text-sm font-medium italic';
+    subInstruction.innerHTML = 'לא בטוח? תמיד אפשר ללחוץ שוב ולשנות';
+    
+    instructionContainer.appendChild(mainInstruction);
+    instructionContainer.appendChild(subInstruction);
+    container.appendChild(instructionContainer);
+
+    const list = document.createElement('ul');
+    list.id = 'rankingList';
+    list.className = 'space-y-3';
+
+    const randomizedOptions = [...data.options].sort(() => Math.random() - 0.5);
+    const selectedOrder = [];
+
+    randomizedOptions.forEach(opt => {
+        const li = document.createElement('li');
+        li.className = 'ranking-item bg-white rounded-xl p-4 flex items-center gap-4 border cursor-pointer hover:shadow-md transition-all duration-200';
+        li.setAttribute('data-code', opt.code);
+
+        const numberDiv = document.createElement('span');
+        numberDiv.className = 'ranking-number w-10 h-10 rounded-full bg-gray-100 flex items-center justify-center font-bold text-gray-500';
+        numberDiv.textContent = '?';
+
+        const textSpan = document.createElement('span');
+        textSpan.className = 'flex-1 text-gray-800';
+        textSpan.textContent = opt.text;
+
+        li.appendChild(numberDiv);
+        li.appendChild(textSpan);
+
+        li.addEventListener('click', () => {
+            const code = opt.code;
+            const idx = selectedOrder.indexOf(code);
+            if (idx >= 0) {
+                selectedOrder.splice(idx, 1);
+            } else if (selectedOrder.length < 4) {
+                selectedOrder.push(code);
+            }
+            renderRanks();
+        });
+
+        list.appendChild(li);
+    });
+
+    function renderRanks() {
+        list.querySelectorAll('li').forEach(li => {
+            const code = li.getAttribute('data-code');
+            const numberDiv = li.querySelector('.ranking-number');
+            const idx = selectedOrder.indexOf(code);
+            if (idx >= 0) {
+                numberDiv.textContent = idx + 1;
+                numberDiv.className = 'ranking-number w-10 h-10 rounded-full bg-blue-100 text-white flex items-center justify-center font-bold selected';
+                li.className = 'ranking-item bg-white rounded-xl p-4 flex items-center gap-4 border-2 border-blue-300 cursor-pointer shadow-md transition-all duration-200';
+            } else {
+                numberDiv.textContent = '?';
+                numberDiv.className = 'ranking-number w-10 h-10 rounded-full bg-gray-100 flex items-center justify-center font-bold text-gray-500';
+                li.className = 'ranking-item bg-white rounded-xl p-4 flex items-center gap-4 border cursor-pointer hover:shadow-md transition-all duration-200';
+            }
+        });
+    }
+
+    container.appendChild(list);
+
+    const buttons = document.createElement('div');
+    buttons.className = 'flex gap-4 mt-8';
+
+    const submitBtn = document.createElement('button');
+    submitBtn.type = 'button';
+    submitBtn.className = 'flex-1 py-4 px-6 bg-gradient-to-r from-blue-900 to-blue-900 text-white font-semibold rounded-xl hover:from-blue-900 hover:to-blue-900 transform hover:scale-105 transition-all duration-200 shadow-lg';
+    submitBtn.textContent = 'שלח דירוג';
+
+    const errorDiv = document.createElement('div');
+    errorDiv.id = 'rankingError';
+    errorDiv.className = 'text-red-600 text-right mb-2 bg-red-50 border border-red-200 rounded-lg p-3 font-medium';
+    errorDiv.style.display = 'none';
+    document.getElementById('options').appendChild(errorDiv);
+
+    submitBtn.onclick = async () => {
+        if (selectedOrder.length < data.options.length) {
+            errorDiv.textContent = 'יש לדרג את כל האפשרויות';
+            errorDiv.style.display = 'block';
+            return;
+        } else {
+            errorDiv.style.display = 'none';
+            const result = {};
+            selectedOrder.forEach((code, index) => {
+                result[code] = index + 1;
+            });
+            await submitAnswer(questionNumber, null, null, result);
+        }
+    };
+
+    const resetBtn = document.createElement('button');
+    resetBtn.type = 'button';
+    resetBtn.className = 'flex-1 py-4 px-6 bg-gradient-to-r from-blue-900  to-blue-900  text-white font-semibold rounded-xl hover:from-blue-900 hover:to-blue-900 transform hover:scale-105 transition-all duration-200 border border-blue-900';
+    resetBtn.textContent = 'איפוס';
+
+    resetBtn.onclick = () => {
+        selectedOrder.length = 0;
+        renderRanks();
+    };
+
+    buttons.appendChild(submitBtn);
+    buttons.appendChild(resetBtn);
+
+    container.appendChild(buttons);
+    document.getElementById('options').appendChild(container);
+}
+
+async function submitAnswer(qNum, code, text, ranking = null) {
+    const questionText = document.getElementById('questionText').innerText;
+    const payload = { question_number: qNum, selected_option_code: code, selected_option_text: text, question: questionText };
+    
+    if (ranking) payload.ranking = ranking;
+
+    // Answers are buffered and sent in batches, see flushAnswers
+    pendingAnswers.push(payload);
+    storePendingAnswers();
+
+    // Store current question in history before moving to next
+    questionHistory.push(currentQuestion);
+    currentQuestion++; 
+    loadQuestion(currentQuestion);
+}
+
+function storePendingAnswers() {
+    try {
+        sessionStorage.setItem(PENDING_ANSWERS_KEY, JSON.stringify(pendingAnswers));
+    } catch (e) {
+        console.warn('Could not store pending answers', e);
+    }
+}
+
+function flushAnswers() {
+    // One flush at a time, so batches are saved in order: a flush started
+    // while another is in flight runs after it, and resolves to whether the
+    // answers buffered until then were saved
+    answersFlush = answersFlush.then(sendPendingAnswers);
+    return answersFlush;
+}
+
+async function sendPendingAnswers() {
+    if (pendingAnswers.length === 0) return true;
+    const batch = pendingAnswers;
+    pendingAnswers = [];
+    try {
+        const resp = await fetch('/pdn-diagnose/answers', {
+            method: 'POST', headers: {'Content-Type':'application/json'},
+            body: JSON.stringify({ answers: batch }), keepalive: true
+        });
+        if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+        storePendingAnswers();
+        return true;
+    } catch (e) {
+        console.error('Error sending answers:', e);
+        // Keep them, in order, for the next flush
+        pendingAnswers = batch.concat(pendingAnswers);
+        storePendingAnswers();
+        return false;
+    }
+}
+
+function flushAnswersOnHide() {
+    // fetch may be cancelled while the page is hidden or unloaded, sendBeacon is not.
+    // A beacon is not confirmed, so the answers stay buffered and stored until
+    // the next flush; saving an answer again replaces it with itself
+    if (pendingAnswers.length === 0) return;
+    const blob = new Blob([JSON.stringify({ answers: pendingAnswers })], { type: 'application/json' });
+    navigator.sendBeacon('/pdn-diagnose/answers', blob);
+}
+
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flushAnswersOnHide();
+});
+window.addEventListener('pagehide', flushAnswersOnHide);
+flushAnswers();
+
+async function completeQuestionnaire() {
+    if (!(await flushAnswers())) {
+        alert('שגיאה בשליחת התשובה, אנא נסה שוב.');
+        return;
+    }
+    const resp = await fetch('/pdn-diagnose/complete_questionnaire', { method: 'POST', headers: {'Content-Type':'application/json'} });
+    if (resp.ok) window.location.href = '/pdn-diagnose/pdn_report'; else alert('שגיאה בסיום השאלון, אנא נסה שוב.');
+}
+
+async function goBack() {
+    if (questionHistory.length > 0) {
+        currentQuestion = questionHistory.pop();
+        loadQuestion(currentQuestion);
+    }
+}
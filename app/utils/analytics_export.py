@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Export all questionnaire answers as a columnar dataset for analytics.
+
+One row per user, one column per question holding the selected option code
+(choice questions), the option codes ordered by rank (ranking questions) or
+the points given to the first option (scale questions), plus the computed
+scores and PDN code.
+
+Usage:
+    python -m app.utils.analytics_export --output analytics [--format parquet|arrow|npz] [--workers 4]
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .answer_storage import QUESTIONNAIRE_VERSION_KEY
+from .pdn_calculator import calculate_pdn_scores
+from .pdn_file_path import PDNFilePath
+from .question_index import get_question_index, KIND_CHOICE, KIND_RANKING, KIND_SCALE
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - optional dependency
+    numpy = None
+
+SCORE_TRAITS = ["A", "T", "P", "E", "D", "S", "F"]
+MANIFEST_FILENAME = "answers_manifest.json"
+MANIFEST_VERSION = 1
+
+# Below this many changed files the process pool start-up costs more than it saves
+PARALLEL_MIN_FILES = 32
+
+FORMAT_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "npz": ".npz"}
+
+
+def get_export_columns() -> List[str]:
+    """Get the dataset column names in order."""
+    question_columns = [f"q{number}" for number in get_question_index().numbers]
+    score_columns = [f"score_{trait}" for trait in SCORE_TRAITS]
+    return ["email", "questionnaire_version", "answered", "pdn_code"] + score_columns + question_columns
+
+
+def _numeric_columns() -> set:
+    """Columns holding numbers; all other columns hold strings."""
+    columns = {"answered"} | {f"score_{trait}" for trait in SCORE_TRAITS}
+    columns |= {f"q{question.number}" for question in get_question_index() if question.kind == KIND_SCALE}
+    return columns
+
+
+def _answer_value(question, answer: Dict[str, Any]) -> Any:
+    """Convert one stored answer to its column value."""
+    if question.kind == KIND_CHOICE:
+        return answer.get("selected_option_code")
+
+    ranking = answer.get("ranking")
+    if not isinstance(ranking, dict):
+        return None
+
+    if question.kind == KIND_RANKING:
+        return ">".join(code for code, _ in sorted(ranking.items(), key=lambda item: item[1]))
+
+    # Scale: points given to the first (left) option
+    return ranking.get(question.option_codes[0])
+
+
+def extract_answer_row(file_path: str) -> Dict[str, Any]:
+    """
+    Build the dataset row for one answers file.
+
+    Runs in worker processes, so it only takes and returns plain data.
+
+    Args:
+        file_path: Path to a user's answers JSON file
+
+    Returns:
+        Dictionary mapping column names to values
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        answers = json.load(f)
+
+    metadata = answers.get("metadata") or {}
+    email = metadata.get("email") or Path(file_path).name.split("_answers")[0]
+
+    row: Dict[str, Any] = {"email": email, "questionnaire_version": answers.get(QUESTIONNAIRE_VERSION_KEY),
+                           "answered": 0, "pdn_code": None}
+
+    for question in get_question_index():
+        answer = answers.get(str(question.number))
+        value = _answer_value(question, answer) if isinstance(answer, dict) else None
+        row[f"q{question.number}"] = value
+        if value is not None:
+            row["answered"] += 1
+
+    try:
+        result = calculate_pdn_scores(answers)
+        row["pdn_code"] = result["pdn_code"]
+        for trait in SCORE_TRAITS:
+            row[f"score_{trait}"] = result["scores"][trait]
+    except Exception as e:
+        # Partial or malformed questionnaires are exported without scores
+        logger.debug(f"Could not score {file_path}: {e}")
+
+    return row
+
+
+def find_answer_files(base_dir: Optional[str] = None) -> List[Path]:
+    """
+    Find one answers file per user, preferring the complete answers file.
+
+    Args:
+        base_dir: Saved results directory. Defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        List of answers file paths
+    """
+    answer_files = []
+    for user_dir in PDNFilePath(base_dir).iter_user_dirs():
+        complete_files = sorted(user_dir.glob("*_answers_.json"))
+        files = complete_files or sorted(user_dir.glob("*_answers.json"))
+        if files:
+            answer_files.append(files[0])
+    return answer_files
+
+
+def _load_manifest(manifest_path: Path, columns: List[str]) -> Dict[str, Any]:
+    """Load the incremental export manifest, discarding it if the columns changed."""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION and manifest.get("columns") == columns:
+            return manifest
+        logger.info("Analytics manifest is outdated, rescanning all answer files")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read analytics manifest {manifest_path}: {e}")
+
+    return {"version": MANIFEST_VERSION, "columns": columns, "files": {}}
+
+
+def _build_columns(rows: List[Dict[str, Any]], columns: List[str]) -> Dict[str, list]:
+    """Transpose rows into per-column value lists."""
+    return {column: [row.get(column) for row in rows] for column in columns}
+
+
+def _write_dataset(data: Dict[str, list], output_path: Path, export_format: str) -> None:
+    """Write the columns in the requested format."""
+    if export_format in ("parquet", "arrow"):
+        table = pyarrow.Table.from_pydict(data)
+        if export_format == "parquet":
+            pyarrow.parquet.write_table(table, output_path)
+        else:
+            pyarrow.feather.write_feather(table, output_path)
+        return
+
+    numeric_columns = _numeric_columns()
+    arrays = {}
+    for column, values in data.items():
+        if column in numeric_columns:
+            arrays[column] = numpy.array([math.nan if v is None else v for v in values], dtype=numpy.float64)
+        else:
+            arrays[column] = numpy.array(["" if v is None else str(v) for v in values], dtype=str)
+    numpy.savez_compressed(output_path, **arrays)
+
+
+def resolve_export_format(export_format: str = "auto") -> str:
+    """
+    Pick the output format, falling back to NumPy when pyarrow is not installed.
+
+    Raises:
+        RuntimeError: If the requested format's library is not installed
+    """
+    if export_format == "auto":
+        export_format = "parquet" if pyarrow is not None else "npz"
+
+    if export_format not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unsupported analytics export format: {export_format}")
+    if export_format in ("parquet", "arrow") and pyarrow is None:
+        raise RuntimeError(f"pyarrow is required for the {export_format} format")
+    if export_format == "npz" and numpy is None:
+        raise RuntimeError("numpy is required for the npz format")
+
+    return export_format
+
+
+def export_answers(output_dir: str, export_format: str = "auto", workers: Optional[int] = None,
+                   base_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Export all users' answers as a columnar dataset.
+
+    Answer files whose modification time is unchanged since the previous run
+    reuse the row stored in the manifest; only new or changed files are
+    parsed, in parallel with a process pool.
+
+    Args:
+        output_dir: Directory for the dataset and its manifest
+        export_format: 'parquet', 'arrow', 'npz' or 'auto'
+        workers: Number of worker processes. Defaults to the CPU count
+        base_dir: Saved results directory. Defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        Dictionary with the dataset path and row, scanned and reused counts
+    """
+    export_format = resolve_export_format(export_format)
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    columns = get_export_columns()
+    manifest_path = output_path / MANIFEST_FILENAME
+    manifest = _load_manifest(manifest_path, columns)
+    previous_files = manifest["files"]
+
+    current_files = {}
+    changed_paths = []
+    for answer_file in find_answer_files(base_dir):
+        try:
+            mtime_ns = answer_file.stat().st_mtime_ns
+        except OSError:
+            continue
+        key = str(answer_file)
+        previous = previous_files.get(key)
+        if previous and previous.get("mtime_ns") == mtime_ns:
+            current_files[key] = previous
+        else:
+            current_files[key] = {"mtime_ns": mtime_ns, "row": None}
+            changed_paths.append(key)
+
+    if len(changed_paths) >= PARALLEL_MIN_FILES and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            changed_rows = list(executor.map(_safe_extract_answer_row, changed_paths, chunksize=16))
+    else:
+        changed_rows = [_safe_extract_answer_row(path) for path in changed_paths]
+
+    for path, row in zip(changed_paths, changed_rows):
+        if row is None:
+            del current_files[path]
+        else:
+            current_files[path]["row"] = row
+
+    rows = [entry["row"] for _, entry in sorted(current_files.items())]
+    dataset_path = output_path / f"answers{FORMAT_EXTENSIONS[export_format]}"
+    _write_dataset(_build_columns(rows, columns), dataset_path, export_format)
+
+    manifest["files"] = current_files
+    tmp_manifest_path = Path(f"{manifest_path}.tmp")
+    with open(tmp_manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_manifest_path, manifest_path)
+
+    summary = {
+        "path": str(dataset_path),
+        "format": export_format,
+        "rows": len(rows),
+        "scanned": len(changed_paths),
+        "reused": len(rows) - len([row for row in changed_rows if row is not None])
+    }
+    logger.info(f"Analytics export finished: {summary}")
+    return summary
+
+
+def _safe_extract_answer_row(file_path: str) -> Optional[Dict[str, Any]]:
+    """Extract a row, returning None for unreadable files so one bad file does not stop the export."""
+    try:
+        return extract_answer_row(file_path)
+    except Exception as e:
+        logger.warning(f"Skipping unreadable answers file {file_path}: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export questionnaire answers as a columnar dataset')
+    parser.add_argument('--output', type=str, default='analytics',
+                        help='Output directory (default: analytics)')
+    parser.add_argument('--format', dest='export_format', choices=['auto'] + list(FORMAT_EXTENSIONS), default='auto',
+                        help='Dataset format (default: parquet if pyarrow is installed, else npz)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for parsing answer files (default: CPU count)')
+    parser.add_argument('--base-dir', type=str, default=None,
+                        help='Saved results directory (default: SAVED_RESULTS_DIR or saved_results)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    print(export_answers(args.output, args.export_format, args.workers, args.base_dir))
+
+
+if __name__ == '__main__':
+    main()
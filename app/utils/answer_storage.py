@@ -1,17 +1,43 @@
 import json
 import os
 from datetime import datetime
-from typing import Dict, Any, Optional
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
 
-from .csv_metadata_handler import UserMetadataHandler
+from .csv_metadata_handler import get_metadata_handler
+from .pdn_calculator import get_running_scores
 from .pdn_file_path import PDNFilePath
+from .question_index import QuestionIndex, get_question_index
+from .questionnaire_versions import ensure_current_registered, get_question_index_for_version
 
 # Initialize the utility
 pdn_file_path = PDNFilePath()
 
+# Version of the questionnaire the answers in a file were given against
+QUESTIONNAIRE_VERSION_KEY = "questionnaire_version"
 
-def save_answer(email: str, question_number: int, answer_data: dict, question_text: str = None):
+# Copies of the question that older answer files embed in every answer
+EMBEDDED_QUESTION_FIELDS = ("question_text", "question_options")
+
+
+def save_answer(email: str, question_number: int, answer_data: dict):
     """Save a single answer to the user's temp file."""
+    save_answers(email, [(question_number, answer_data)])
+
+
+def save_answers(email: str, answers: List[Tuple[int, dict]]):
+    """
+    Save several answers to the user's temp file with a single read and write.
+
+    Answers are stored compactly, as option codes and rankings only, with the
+    version of the questionnaire they were given against; question texts and
+    options are joined at read time (see expand_answers).
+
+    Args:
+        email: User's email address
+        answers: (question_number, answer_data) in submission order,
+                 a later answer to the same question replaces an earlier one
+    """
 
     # Create filename
     file_extension = ".json"
@@ -25,20 +51,44 @@ def save_answer(email: str, question_number: int, answer_data: dict, question_te
     else:
         data = {}
 
-    # Filter out None values from answer_data
-    filtered_answer_data = {k: v for k, v in answer_data.items() if v is not None}
+    version = ensure_current_registered(pdn_file_path)
+    if data.get(QUESTIONNAIRE_VERSION_KEY, version) != version:
+        # Running scores were built with another questionnaire
+        data.pop('scoring', None)
+    data[QUESTIONNAIRE_VERSION_KEY] = version
 
-    # Add question text if provided
-    if question_text:
-        filtered_answer_data['question_text'] = question_text
+    # Running scores of the answers saved so far, built for files saved without them
+    try:
+        running_scores = get_running_scores(data)
+    except Exception as e:
+        # Completion falls back to scoring all answers
+        print(f"Could not update running scores for {email}: {e}")
+        running_scores = None
 
-    data[str(question_number)] = filtered_answer_data
-
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    for question_number, answer_data in answers:
+        # Filter out None values and copies of the question
+        filtered_answer_data = {k: v for k, v in answer_data.items()
+                                if v is not None and k not in EMBEDDED_QUESTION_FIELDS}
 
+        key = str(question_number)
+        if running_scores is not None:
+            try:
+                running_scores.apply(key, filtered_answer_data, data.get(key))
+            except Exception as e:
+                print(f"Could not update running scores for {email}: {e}")
+                running_scores = None
+        data[key] = filtered_answer_data
+
+    if running_scores is not None:
+        data['scoring'] = running_scores.to_dict()
+    else:
+        data.pop('scoring', None)
 
+    # Stored results no longer match the answers
+    data.pop('results', None)
 
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
 
 
 def load_answers(email: str) -> Optional[Dict[str, Any]]:
@@ -49,7 +99,7 @@ def load_answers(email: str) -> Optional[Dict[str, Any]]:
         # Try to load the complete answers file first (with underscore suffix)
         file_extension = ".json"
         complete_filename = f"{email}_answers_{file_extension}"
-        complete_file_path = pdn_file_path.get_user_file_path(email, complete_filename)
+        complete_file_path = pdn_file_path.resolve_user_file_path(email, complete_filename)
 
         # If complete file exists, load it
         if os.path.exists(complete_file_path) and not os.path.isdir(complete_file_path):
@@ -60,7 +110,7 @@ def load_answers(email: str) -> Optional[Dict[str, Any]]:
 
         # Fallback to regular answers file
         filename = f"{email}_answers{file_extension}"
-        file_path = pdn_file_path.get_user_file_path(email, filename)
+        file_path = pdn_file_path.resolve_user_file_path(email, filename)
 
         # Check if the path exists and is a file (not a directory)
         if not os.path.exists(file_path):
@@ -94,6 +144,144 @@ def load_answers(email: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def get_answers_question_index(answers: Dict[str, Any]) -> QuestionIndex:
+    """
+    Get the questions an answers file was saved against.
+
+    Files saved before versioning, or against a version missing from the
+    versions store, use the current questionnaire.
+
+    Args:
+        answers: Answers file contents
+
+    Returns:
+        QuestionIndex of the file's questionnaire version
+    """
+    return get_question_index_for_version(answers.get(QUESTIONNAIRE_VERSION_KEY)) or get_question_index()
+
+
+def expand_answers(answers: Dict[str, Any], index: Optional[QuestionIndex] = None) -> Dict[str, Any]:
+    """
+    Join question texts and options into stored answers, for display.
+
+    Answers keep the copies embedded by older files; the others get them from
+    the questionnaire version the file was saved against.
+
+    Args:
+        answers: Answers file contents
+        index: Question index, defaults to the file's questionnaire version
+
+    Returns:
+        Copy of the answers with question_text and question_options in every answer
+    """
+    index = index or get_answers_question_index(answers)
+    expanded = dict(answers)
+    for key, answer in answers.items():
+        question = index.get(int(key)) if key.isdigit() and isinstance(answer, dict) else None
+        if question is None:
+            continue
+        expanded[key] = {**answer}
+        expanded[key].setdefault("question_text", question.text)
+        expanded[key].setdefault("question_options", question.options)
+    return expanded
+
+
+def compact_answers(answers: Dict[str, Any], index: Optional[QuestionIndex] = None) -> Tuple[Dict[str, Any], bool]:
+    """
+    Remove the question copies embedded in older answer files.
+
+    A copy is only removed if it matches the question index, so answers given
+    against another questionnaire keep the texts they were shown.
+
+    Args:
+        answers: Answers file contents
+        index: Question index, defaults to the file's questionnaire version
+
+    Returns:
+        (compact answers, whether anything changed)
+    """
+    index = index or get_answers_question_index(answers)
+    compact = dict(answers)
+    changed = False
+    all_removed = True
+    for key, answer in answers.items():
+        if not key.isdigit() or not isinstance(answer, dict):
+            continue
+        question = index.get(int(key))
+        current = {"question_text": question.text, "question_options": question.options} if question else {}
+        kept = {}
+        for field, value in answer.items():
+            if field in EMBEDDED_QUESTION_FIELDS and field in current and value == current[field]:
+                changed = True
+            else:
+                kept[field] = value
+        all_removed = all_removed and not any(field in kept for field in EMBEDDED_QUESTION_FIELDS)
+        compact[key] = kept
+
+    if all_removed and QUESTIONNAIRE_VERSION_KEY not in compact:
+        compact[QUESTIONNAIRE_VERSION_KEY] = index.version
+        changed = True
+    return compact, changed
+
+
+def get_answers_file_path(email: str, file_path_util: Optional[PDNFilePath] = None) -> Optional[Path]:
+    """
+    Get the answers file load_answers reads for a user, preferring the complete file.
+
+    Returns:
+        Path to the answers file, or None if the user has none
+    """
+    file_path_util = file_path_util or PDNFilePath()
+    for filename in (f"{email}_answers_.json", f"{email}_answers.json"):
+        file_path = file_path_util.resolve_user_file_path(email, filename)
+        if file_path.is_file():
+            return file_path
+    return None
+
+
+def save_results(email: str, results: Dict[str, Any], file_path_util: Optional[PDNFilePath] = None) -> bool:
+    """
+    Store a PDN calculation result in the user's answers file.
+
+    The result is kept under the 'results' key until the answers change, so
+    reports and the admin dashboard can show the scores without recomputing.
+    It replaces the running scores, which a later answer rebuilds from the
+    answers.
+
+    Args:
+        email: User's email address
+        results: PDNResult.to_dict() output
+        file_path_util: PDNFilePath to resolve the user's directory with
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        file_path = get_answers_file_path(email, file_path_util)
+        if file_path is None:
+            return False
+
+        # Results are scored with the current questionnaire
+        results = {**results, QUESTIONNAIRE_VERSION_KEY: get_question_index().version}
+
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get('results') == results and 'scoring' not in data:
+            return True
+
+        data['results'] = results
+        data.pop('scoring', None)
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, file_path)
+        return True
+
+    except Exception as e:
+        print(f"Error saving results for {email}: {e}")
+        return False
+
+
 
 
 
@@ -111,7 +299,7 @@ def save_user_metadata(metadata: Dict[str, Any], email: str = None) -> None:
 
     file_path = pdn_file_path.get_user_file_path(email, filename)
 
-    csv_metadata_handler = UserMetadataHandler()
+    csv_metadata_handler = get_metadata_handler()
     csv_metadata_handler.append_user_metadata(metadata)
 
     if file_path.exists():
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Rewrite existing answers files in the compact format.
+
+Older answers files embed the question text and options in every answer. The
+copies that match the current questionnaire are removed and the file is
+stamped with the questionnaire version; texts are joined at read time from
+the question index instead (see answer_storage.expand_answers).
+
+Usage:
+    python -m app.utils.answers_migration [--dry-run]
+"""
+
+import argparse
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .answer_storage import compact_answers
+from .pdn_file_path import PDNFilePath
+from .question_index import QuestionIndex
+
+logger = logging.getLogger(__name__)
+
+# Temp and complete answers files
+ANSWERS_PATTERNS = ("*_answers.json", "*_answers_.json")
+
+
+def migrate_answers_file(path: Path, index: Optional[QuestionIndex] = None,
+                         dry_run: bool = False) -> Tuple[int, int]:
+    """
+    Rewrite one answers file in the compact format.
+
+    The file is replaced atomically; files already compact are not written.
+
+    Args:
+        path: Answers file
+        index: Question index, defaults to the file's questionnaire version
+        dry_run: Only compute the new size
+
+    Returns:
+        (size before, size after) in bytes
+    """
+    raw = Path(path).read_bytes()
+    compact, changed = compact_answers(json.loads(raw), index)
+    if not changed:
+        return len(raw), len(raw)
+
+    data = json.dumps(compact, ensure_ascii=False, indent=2).encode("utf-8")
+    if not dry_run:
+        tmp_path = Path(path).with_name(Path(path).name + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    return len(raw), len(data)
+
+
+def migrate_all_answers(base_dir: Optional[str] = None, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Rewrite every user's answers files in the compact format.
+
+    Args:
+        base_dir: Saved results directory, defaults to SAVED_RESULTS_DIR
+        dry_run: Only report the sizes
+
+    Returns:
+        {"files", "migrated", "failed", "bytes_before", "bytes_after"}
+    """
+    summary = {"files": 0, "migrated": 0, "failed": 0, "bytes_before": 0, "bytes_after": 0}
+    for user_dir in PDNFilePath(base_dir).iter_user_dirs():
+        for pattern in ANSWERS_PATTERNS:
+            for path in user_dir.glob(pattern):
+                summary["files"] += 1
+                try:
+                    before, after = migrate_answers_file(path, dry_run=dry_run)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Could not migrate {path}: {e}")
+                    summary["failed"] += 1
+                    continue
+                summary["bytes_before"] += before
+                summary["bytes_after"] += after
+                if after != before:
+                    summary["migrated"] += 1
+
+    logger.info(f"Answers migration: {summary}, dry_run={dry_run}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite answers files in the compact format")
+    parser.add_argument('--dry-run', action='store_true', help='Report the size savings without writing')
+    args = parser.parse_args()
+
+    print(json.dumps(migrate_all_answers(dry_run=args.dry_run)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Compute a recording's duration, loudness, silence ratio and waveform peaks.
+
+The analysis runs once when a recording is processed and is stored in its
+metadata sidecar, so the admin dashboard can draw the waveform and show the
+duration without downloading the recording.
+
+Usage:
+    python -m app.utils.audio_analysis recording.wav
+"""
+
+import argparse
+import json
+import logging
+import subprocess
+import wave
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - optional dependency
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+# Number of waveform bars drawn by the dashboard
+PEAKS_COUNT = 200
+
+# Frames quieter than this are counted as silence
+SILENCE_DB = -40.0
+FRAME_SECONDS = 0.02
+
+# Recordings are decoded to mono at this rate when ffmpeg is used
+DECODE_SAMPLE_RATE = 16000
+FFMPEG_TIMEOUT = 120
+
+# Reported for digital silence instead of -inf
+MIN_DB = -100.0
+
+
+def _to_db(value: float) -> float:
+    return round(max(20 * float(numpy.log10(value)) if value > 0 else MIN_DB, MIN_DB), 1)
+
+
+def _decode_wav(path: Path) -> Optional[Tuple[Any, int]]:
+    try:
+        with wave.open(str(path), "rb") as wav:
+            sample_width = wav.getsampwidth()
+            channels = wav.getnchannels()
+            rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError) as e:
+        logger.warning(f"Could not decode WAV {path}: {e}")
+        return None
+
+    if sample_width == 1:
+        samples = (numpy.frombuffer(frames, dtype=numpy.uint8).astype(numpy.float32) - 128) / 128
+    elif sample_width in (2, 4):
+        dtype = numpy.int16 if sample_width == 2 else numpy.int32
+        samples = numpy.frombuffer(frames, dtype=numpy.dtype(dtype).newbyteorder("<")).astype(numpy.float32)
+        samples /= float(numpy.iinfo(dtype).max) + 1
+    else:
+        logger.warning(f"Unsupported WAV sample width in {path}: {sample_width}")
+        return None
+
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def _decode_ffmpeg(ffmpeg: str, path: Path) -> Optional[Tuple[Any, int]]:
+    try:
+        result = subprocess.run(
+            [ffmpeg, "-v", "error", "-i", str(path), "-vn", "-ac", "1", "-ar", str(DECODE_SAMPLE_RATE),
+             "-f", "s16le", "pipe:1"],
+            capture_output=True, timeout=FFMPEG_TIMEOUT, check=True
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Could not decode {path} with ffmpeg: {e}")
+        return None
+    samples = numpy.frombuffer(result.stdout, dtype="<i2").astype(numpy.float32) / 32768
+    return samples, DECODE_SAMPLE_RATE
+
+
+def decode_audio(path: Path, container: Optional[str]) -> Optional[Tuple[Any, int]]:
+    """
+    Decode a recording to mono samples in [-1, 1].
+
+    Args:
+        path: Recording file
+        container: Container name from audio_processing.sniff_container
+
+    Returns:
+        (float32 samples, sample rate), or None if the recording cannot be
+        decoded here (compressed formats need ffmpeg, see
+        audio_processing.find_ffmpeg)
+    """
+    if numpy is None:
+        return None
+    if container == "wav":
+        decoded = _decode_wav(path)
+        if decoded is not None:
+            return decoded
+    from .audio_processing import find_ffmpeg
+
+    ffmpeg = find_ffmpeg()
+    if ffmpeg:
+        return _decode_ffmpeg(ffmpeg, path)
+    return None
+
+
+def analyze_samples(samples, sample_rate: int, peaks_count: int = PEAKS_COUNT) -> Dict[str, Any]:
+    """
+    Summarize decoded samples.
+
+    Args:
+        samples: Mono float samples in [-1, 1]
+        sample_rate: Samples per second
+        peaks_count: Number of waveform peaks
+
+    Returns:
+        {"duration", "rms_db", "peak_db", "silence_ratio", "peaks"}; peaks are
+        the maximum absolute amplitude of equal slices of the recording
+    """
+    samples = numpy.asarray(samples, dtype=numpy.float32)
+    if not len(samples):
+        return {"duration": 0.0, "rms_db": MIN_DB, "peak_db": MIN_DB, "silence_ratio": 1.0, "peaks": []}
+
+    magnitude = numpy.abs(samples)
+    rms = float(numpy.sqrt(numpy.mean(numpy.square(samples, dtype=numpy.float64))))
+
+    # Loudness of short frames; a partial last frame is dropped
+    frame = max(int(sample_rate * FRAME_SECONDS), 1)
+    frames = len(samples) // frame
+    if frames:
+        frame_power = numpy.mean(numpy.square(samples[:frames * frame], dtype=numpy.float64).reshape(frames, frame),
+                                 axis=1)
+        silence_threshold = 10 ** (SILENCE_DB / 10)
+        silence_ratio = float(numpy.mean(frame_power < silence_threshold))
+    else:
+        silence_ratio = float(rms < 10 ** (SILENCE_DB / 20))
+
+    # Slice boundaries spread the remainder over the slices
+    count = min(peaks_count, len(samples))
+    bounds = numpy.linspace(0, len(samples), count + 1).astype(numpy.int64)
+    peaks = numpy.maximum.reduceat(magnitude, bounds[:-1])
+
+    return {
+        "duration": round(len(samples) / sample_rate, 3),
+        "rms_db": _to_db(rms),
+        "peak_db": _to_db(float(magnitude.max())),
+        "silence_ratio": round(silence_ratio, 3),
+        "peaks": [round(float(peak), 3) for peak in numpy.minimum(peaks, 1.0)]
+    }
+
+
+def analyze_audio(path: Path, container: Optional[str] = None,
+                  peaks_count: int = PEAKS_COUNT) -> Optional[Dict[str, Any]]:
+    """
+    Analyze a recording file.
+
+    Args:
+        path: Recording file
+        container: Container name, sniffed from the file if not given
+        peaks_count: Number of waveform peaks
+
+    Returns:
+        Analysis as returned by analyze_samples, or None if the recording cannot
+        be decoded
+    """
+    path = Path(path)
+    if container is None:
+        from .audio_processing import sniff_container
+        with open(path, "rb") as f:
+            container = sniff_container(f.read(64))
+
+    decoded = decode_audio(path, container)
+    if decoded is None:
+        return None
+    return analyze_samples(*decoded, peaks_count=peaks_count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a voice recording")
+    parser.add_argument("path", help="Recording file")
+    parser.add_argument("--peaks", type=int, default=PEAKS_COUNT, help="Number of waveform peaks")
+    args = parser.parse_args()
+
+    analysis = analyze_audio(Path(args.path), peaks_count=args.peaks)
+    if analysis is None:
+        raise SystemExit(f"Cannot decode {args.path} (numpy and, for compressed formats, ffmpeg are required)")
+    print(json.dumps(analysis))
+
+
+if __name__ == '__main__':
+    main()
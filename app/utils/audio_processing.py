@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+Post-process saved voice recordings off the request path.
+
+Recordings are saved under a fixed name such as {email}_question1.wav whatever
+the browser actually recorded (usually Opus in WebM). Processing sniffs the
+real container, stores one compact canonical copy (WebM/Opus recordings are
+kept as they are, other formats are transcoded to WebM/Opus when ffmpeg is
+available, see find_ffmpeg) and writes a {name}.meta.json sidecar with its container, codec,
+duration, size and waveform analysis (see audio_analysis). The original
+name stays the lookup key: resolve_recording maps it to the file to serve and
+its Content-Type.
+
+Usage (process all recordings of all users):
+    python -m app.utils.audio_processing
+"""
+
+import json
+import logging
+import os
+import shutil
+import struct
+import subprocess
+import threading
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import imageio_ffmpeg
+except ImportError:  # pragma: no cover - optional dependency
+    imageio_ffmpeg = None
+
+from .pdn_file_path import PDNFilePath
+
+logger = logging.getLogger(__name__)
+
+META_SUFFIX = ".meta.json"
+
+# Container -> (mimetype, canonical file suffix)
+CONTAINERS = {
+    "webm": ("audio/webm", ".webm"),
+    "matroska": ("audio/x-matroska", ".mka"),
+    "ogg": ("audio/ogg", ".ogg"),
+    "wav": ("audio/wav", ".wav"),
+    "mp4": ("audio/mp4", ".m4a"),
+    "mp3": ("audio/mpeg", ".mp3"),
+}
+UNKNOWN_MIMETYPE = "application/octet-stream"
+
+# Suffixes of saved recordings, used when processing all users
+RECORDING_SUFFIXES = {".wav", ".webm", ".ogg", ".m4a", ".mp3", ".mka"}
+
+# Transcoding target for recordings that are not Opus already (speech, mono)
+OPUS_BITRATE = "32k"
+FFMPEG_TIMEOUT = 120
+
+AUDIO_WORKERS = int(os.getenv("AUDIO_WORKERS", "2"))
+
+# EBML element IDs used to read WebM/Matroska metadata
+EBML_HEADER = 0x1A45DFA3
+EBML_DOCTYPE = 0x4282
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+CODEC_ID = 0x86
+CLUSTER = 0x1F43B675
+CLUSTER_TIMECODE = 0xE7
+BLOCK_GROUP = 0xA0
+BLOCK = 0xA1
+SIMPLE_BLOCK = 0xA3
+
+# Master elements whose children are read; their (often unknown) sizes are ignored
+EBML_MASTERS = {EBML_HEADER, SEGMENT, INFO, TRACKS, TRACK_ENTRY, CLUSTER, BLOCK_GROUP}
+
+MATROSKA_CODECS = {"A_OPUS": "opus", "A_VORBIS": "vorbis", "A_AAC": "aac", "A_MPEG/L3": "mp3"}
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+# Serializes the processing of each recording within the process
+_recording_locks: Dict[str, threading.Lock] = {}
+_recording_locks_lock = threading.Lock()
+
+
+def sniff_container(header: bytes) -> Optional[str]:
+    """
+    Identify an audio container from the first bytes of a file.
+
+    Args:
+        header: At least the first 64 bytes of the file
+
+    Returns:
+        Container name (a CONTAINERS key), or None if not recognized
+    """
+    if header.startswith(b"\x1a\x45\xdf\xa3"):
+        return "webm" if b"webm" in header[:64] else "matroska"
+    if header.startswith(b"RIFF") and header[8:12] == b"WAVE":
+        return "wav"
+    if header.startswith(b"OggS"):
+        return "ogg"
+    if header[4:8] == b"ftyp":
+        return "mp4"
+    if header.startswith(b"ID3") or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+
+def get_mimetype(container: Optional[str]) -> str:
+    """Content-Type for a container name."""
+    return CONTAINERS.get(container, (UNKNOWN_MIMETYPE, ""))[0]
+
+
+def _read_vint(data: bytes, pos: int, keep_marker: bool) -> Tuple[Optional[int], int]:
+    """Read an EBML variable-length integer, returns (value, next position); value None if unknown size."""
+    first = data[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8 or pos + length > len(data):
+        raise ValueError("Invalid EBML integer")
+
+    value = first if keep_marker else first & (mask - 1)
+    all_ones = value == mask - 1
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+        all_ones = all_ones and byte == 0xFF
+    if all_ones and not keep_marker:
+        return None, pos + length
+    return value, pos + length
+
+
+def parse_webm(data: bytes) -> Dict[str, Any]:
+    """
+    Read the codec and duration of a WebM/Matroska file.
+
+    MediaRecorder does not write a Duration, so the duration falls back to the
+    timecode of the last block. Elements are read linearly, which also works
+    for the unknown-size Segment and Cluster elements MediaRecorder writes.
+
+    Args:
+        data: File contents
+
+    Returns:
+        {"doctype", "codec", "duration"}; values are None when not found
+    """
+    info = {"doctype": None, "codec": None, "duration": None}
+    timecode_scale = 1_000_000
+    cluster_timecode = 0
+    last_block = None
+    duration = None
+
+    pos = 0
+    try:
+        while pos < len(data):
+            element_id, pos = _read_vint(data, pos, keep_marker=True)
+            size, pos = _read_vint(data, pos, keep_marker=False)
+            if element_id in EBML_MASTERS:
+                continue
+            if size is None or pos + size > len(data):
+                break
+            payload = data[pos:pos + size]
+            pos += size
+
+            if element_id == EBML_DOCTYPE:
+                info["doctype"] = payload.decode("ascii", "replace")
+            elif element_id == TIMECODE_SCALE:
+                timecode_scale = int.from_bytes(payload, "big")
+            elif element_id == DURATION and size in (4, 8):
+                duration = struct.unpack(">f" if size == 4 else ">d", payload)[0]
+            elif element_id == CODEC_ID and info["codec"] is None:
+                codec_id = payload.decode("ascii", "replace").rstrip("\x00")
+                info["codec"] = MATROSKA_CODECS.get(codec_id, codec_id)
+            elif element_id == CLUSTER_TIMECODE:
+                cluster_timecode = int.from_bytes(payload, "big")
+            elif element_id in (SIMPLE_BLOCK, BLOCK):
+                _, block_pos = _read_vint(payload, 0, keep_marker=False)
+                relative = struct.unpack(">h", payload[block_pos:block_pos + 2])[0]
+                last_block = max(last_block or 0, cluster_timecode + relative)
+    except (ValueError, IndexError, struct.error):
+        # Truncated or damaged file: keep what was read so far
+        pass
+
+    if duration is None:
+        duration = last_block
+    if duration is not None:
+        info["duration"] = round(duration * timecode_scale / 1e9, 3)
+    return info
+
+
+def _probe_with_ffprobe(path: Path) -> Dict[str, Any]:
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "a:0", "-show_entries",
+         "stream=codec_name:format=duration", "-of", "json", str(path)],
+        capture_output=True, text=True, timeout=FFMPEG_TIMEOUT, check=True
+    )
+    probe = json.loads(result.stdout)
+    streams = probe.get("streams") or [{}]
+    duration = probe.get("format", {}).get("duration")
+    return {
+        "codec": streams[0].get("codec_name"),
+        "duration": round(float(duration), 3) if duration not in (None, "N/A") else None
+    }
+
+
+def probe_audio(path: Path) -> Dict[str, Any]:
+    """
+    Get a recording's container, codec, duration and size.
+
+    WebM and WAV are read directly; other containers need ffprobe for the
+    codec and duration.
+
+    Args:
+        path: Recording file
+
+    Returns:
+        {"container", "mimetype", "codec", "duration", "size"}
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    container = sniff_container(data[:64])
+    info = {"container": container, "mimetype": get_mimetype(container), "codec": None,
+            "duration": None, "size": len(data)}
+
+    if container in ("webm", "matroska"):
+        webm = parse_webm(data)
+        info["codec"], info["duration"] = webm["codec"], webm["duration"]
+    elif container == "wav":
+        try:
+            with wave.open(str(path), "rb") as wav:
+                info["codec"] = f"pcm_s{wav.getsampwidth() * 8}le"
+                info["duration"] = round(wav.getnframes() / wav.getframerate(), 3)
+        except (wave.Error, EOFError, ZeroDivisionError) as e:
+            logger.warning(f"Could not read WAV header of {path}: {e}")
+
+    if (info["codec"] is None or info["duration"] is None) and shutil.which("ffprobe"):
+        try:
+            probed = _probe_with_ffprobe(path)
+            info["codec"] = info["codec"] or probed["codec"]
+            info["duration"] = info["duration"] if info["duration"] is not None else probed["duration"]
+        except (OSError, subprocess.SubprocessError, ValueError) as e:
+            logger.warning(f"ffprobe failed for {path}: {e}")
+    return info
+
+
+def get_meta_path(path: Path) -> Path:
+    """Sidecar metadata file of a recording, e.g. x_question1.wav.meta.json."""
+    path = Path(path)
+    return path.with_name(path.name + META_SUFFIX)
+
+
+def load_recording_meta(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Load the metadata written when a recording was processed.
+
+    Args:
+        path: Recording path under its original name
+
+    Returns:
+        Metadata dictionary, or None if the recording has not been processed
+    """
+    try:
+        with open(get_meta_path(path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def resolve_recording(path: Path) -> Optional[Tuple[Path, str]]:
+    """
+    Find the file to serve for a recording and its Content-Type.
+
+    A file under the original name is newer than any processed copy (e.g. a
+    re-recording being processed), so it is served first.
+
+    Args:
+        path: Recording path under its original name
+
+    Returns:
+        (file path, mimetype), or None if there is no such recording
+    """
+    path = Path(path)
+    if path.exists():
+        with open(path, "rb") as f:
+            return path, get_mimetype(sniff_container(f.read(64)))
+
+    meta = load_recording_meta(path)
+    if meta and meta.get("canonical"):
+        canonical = path.with_name(meta["canonical"])
+        if canonical.exists():
+            return canonical, meta.get("mimetype", UNKNOWN_MIMETYPE)
+    return None
+
+
+def find_ffmpeg() -> Optional[str]:
+    """
+    Find the ffmpeg executable: the system's, or else the static build of the
+    imageio-ffmpeg wheel, which requirements.txt installs so that hosts without
+    a system ffmpeg can still decode and transcode recordings.
+
+    Returns:
+        Path of the executable, or None if ffmpeg is not available
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None and imageio_ffmpeg is not None:
+        try:
+            ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+        except RuntimeError:
+            ffmpeg = None
+    return ffmpeg
+
+
+def _transcode_to_opus(ffmpeg: str, source: Path, target: Path) -> bool:
+    tmp_path = target.with_name(target.name + ".tmp")
+    try:
+        subprocess.run(
+            [ffmpeg, "-y", "-v", "error", "-i", str(source), "-vn", "-ac", "1",
+             "-c:a", "libopus", "-b:a", OPUS_BITRATE, "-f", "webm", str(tmp_path)],
+            capture_output=True, timeout=FFMPEG_TIMEOUT, check=True
+        )
+        os.replace(tmp_path, target)
+        return True
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.error(f"Transcoding {source} failed: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return False
+
+
+def _copy(source: Path, target: Path) -> None:
+    # A copy rather than a hard link: a link would share the inode, so a
+    # recording rewritten in place would change the canonical copy too
+    tmp_path = target.with_name(target.name + f".{os.getpid()}.tmp")
+    shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+def _file_identity(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _recording_lock(path: Path) -> threading.Lock:
+    with _recording_locks_lock:
+        return _recording_locks.setdefault(str(path), threading.Lock())
+
+
+def _remove_if_unchanged(path: Path, identity: Tuple[int, int, int]) -> bool:
+    """
+    Remove the original of a processed recording, unless a new recording was
+    saved under its name meanwhile.
+
+    The file is first moved aside, which atomically takes whatever is at the
+    path, then checked; a newer recording is put back.
+
+    Returns:
+        True if the processed file was removed
+    """
+    moved = path.with_name(path.name + f".{os.getpid()}.processed")
+    try:
+        os.replace(path, moved)
+    except FileNotFoundError:
+        return True
+    if _file_identity(moved) == identity:
+        moved.unlink()
+        return True
+    try:
+        os.link(moved, path)
+    except FileExistsError:
+        # An even newer recording arrived, the one moved aside is obsolete too
+        pass
+    moved.unlink()
+    return False
+
+
+def _store_canonical(path: Path) -> Tuple[Dict[str, Any], Path]:
+    source = probe_audio(path)
+    container = source["container"]
+    canonical = path
+
+    if container == "webm" and source["codec"] == "opus":
+        canonical = path.with_suffix(".webm")
+        if canonical != path:
+            _copy(path, canonical)
+    else:
+        ffmpeg = find_ffmpeg() if container is not None else None
+        if ffmpeg:
+            if _transcode_to_opus(ffmpeg, path, path.with_suffix(".webm")):
+                canonical = path.with_suffix(".webm")
+        if canonical == path and container is not None:
+            # No transcoder: keep the bytes, under the suffix of their real container
+            canonical = path.with_suffix(CONTAINERS[container][1])
+            if canonical != path:
+                _copy(path, canonical)
+
+    info = probe_audio(canonical) if canonical != path else source
+    meta = {
+        **info,
+        "canonical": canonical.name,
+        "source_container": container,
+        "source_size": source["size"],
+        "processed_at": datetime.now().isoformat(timespec="seconds")
+    }
+    _add_analysis(meta, canonical)
+    return meta, canonical
+
+
+def process_recording(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Store a compact canonical copy of a recording and its metadata.
+
+    The canonical copy and the sidecar are written before the original is
+    removed, so the recording can be served throughout. Processing a recording
+    that was already processed returns its stored metadata. A recording saved
+    again under the same name while it is processed is processed in its turn,
+    and is never removed in place of the older one.
+
+    Args:
+        path: Recording path under its original name
+
+    Returns:
+        The recording's metadata, or None if the recording does not exist
+    """
+    path = Path(path)
+    with _recording_lock(path):
+        while True:
+            identity = _file_identity(path)
+            if identity is None:
+                return load_recording_meta(path)
+
+            meta, canonical = _store_canonical(path)
+            if _file_identity(path) != identity:
+                logger.info(f"Recording {path.name} was replaced while it was processed, processing it again")
+                continue
+            _write_meta(path, meta)
+            if canonical == path or _remove_if_unchanged(path, identity):
+                break
+
+    logger.info(f"Processed recording {path.name}: {meta['source_container']} -> {canonical.name} "
+                f"({meta['source_size']} -> {meta['size']} bytes)")
+    return meta
+
+
+def _write_meta(path: Path, meta: Dict[str, Any]) -> None:
+    meta_path = get_meta_path(path)
+    tmp_path = meta_path.with_name(meta_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def _add_analysis(meta: Dict[str, Any], canonical: Path) -> None:
+    # Waveform peaks, loudness and silence; None when the recording cannot be decoded.
+    # Imported here so that loading the app does not load numpy
+    from .audio_analysis import analyze_audio
+
+    analysis = analyze_audio(canonical, meta["container"])
+    meta["analysis"] = analysis
+    if analysis is not None and meta.get("duration") is None:
+        meta["duration"] = analysis["duration"]
+
+
+def analyze_recording(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Add the waveform analysis to a processed recording that has none.
+
+    Recordings processed before the analysis existed, or while it could not
+    decode them, get it here.
+
+    Args:
+        path: Recording path under its original name
+
+    Returns:
+        The recording's metadata, or None if the recording has not been processed
+    """
+    meta = load_recording_meta(path)
+    if meta is None or meta.get("analysis") is not None:
+        return meta
+    canonical = Path(path).with_name(meta["canonical"])
+    if not canonical.exists():
+        return meta
+    _add_analysis(meta, canonical)
+    if meta["analysis"] is not None:
+        _write_meta(path, meta)
+    return meta
+
+
+def submit_recording(path: Path) -> Future:
+    """
+    Process a recording on the background worker pool.
+
+    Args:
+        path: Recording path under its original name
+
+    Returns:
+        Future resolving to the recording's metadata
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=AUDIO_WORKERS, thread_name_prefix="audio")
+    future = _executor.submit(process_recording, Path(path))
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def _log_failure(future: Future) -> None:
+    error = future.exception()
+    if error is not None:
+        logger.error(f"Error processing recording: {error}")
+
+
+def process_all_recordings(base_dir: Optional[str] = None) -> Dict[str, int]:
+    """
+    Process every unprocessed recording of every user, and analyze processed
+    recordings that have no analysis yet.
+
+    Args:
+        base_dir: Saved results directory, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        {"processed", "analyzed", "bytes_before", "bytes_after"}
+    """
+    summary = {"processed": 0, "analyzed": 0, "bytes_before": 0, "bytes_after": 0}
+    for user_dir in PDNFilePath(base_dir).iter_user_dirs():
+        # Canonical copies are recorded in the sidecars of their originals
+        canonical_names = set()
+        for meta_path in user_dir.glob("*" + META_SUFFIX):
+            path = meta_path.with_name(meta_path.name[:-len(META_SUFFIX)])
+            meta = load_recording_meta(path)
+            if meta and meta.get("canonical"):
+                canonical_names.add(meta["canonical"])
+                if meta.get("analysis") is None and (analyze_recording(path) or {}).get("analysis") is not None:
+                    summary["analyzed"] += 1
+
+        for path in sorted(user_dir.iterdir()):
+            if path.suffix not in RECORDING_SUFFIXES or not path.is_file() or path.name in canonical_names:
+                continue
+            meta = process_recording(path)
+            if meta:
+                summary["processed"] += 1
+                summary["bytes_before"] += meta["source_size"]
+                summary["bytes_after"] += meta["size"]
+    return summary
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    print(json.dumps(process_all_recordings()))
+
+
+if __name__ == '__main__':
+    main()
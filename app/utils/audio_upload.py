@@ -0,0 +1,293 @@
+import fcntl
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from .pdn_file_path import PDNFilePath
+
+logger = logging.getLogger(__name__)
+
+# Uploads in progress live under the saved results directory, so finishing one
+# is a rename on the same filesystem. Dot directories are not user directories.
+UPLOADS_DIRNAME = ".audio_uploads"
+STATE_FILENAME = "upload.json"
+DATA_FILENAME = "data.part"
+LOCK_FILENAME = "upload.lock"
+
+# Limits for a 60-90 second recording, with plenty of headroom
+MAX_CHUNK_BYTES = 8 * 1024 * 1024
+MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+
+# Unfinished or finished uploads older than this are removed
+STALE_UPLOAD_SECONDS = 24 * 60 * 60
+
+UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadOffsetError(ValueError):
+    """A chunk or finalize request does not match the bytes received so far."""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(message)
+        self.offset = offset
+
+
+def _uploads_dir(file_path_util: Optional[PDNFilePath] = None) -> Path:
+    return (file_path_util or PDNFilePath()).get_base_dir() / UPLOADS_DIRNAME
+
+
+def _upload_dir(upload_id: str, file_path_util: Optional[PDNFilePath] = None) -> Optional[Path]:
+    if not isinstance(upload_id, str) or not UPLOAD_ID_PATTERN.match(upload_id):
+        return None
+    return _uploads_dir(file_path_util) / upload_id
+
+
+def _read_state(upload_dir: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(upload_dir / STATE_FILENAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_state(upload_dir: Path, state: Dict[str, Any]) -> None:
+    tmp_path = upload_dir / (STATE_FILENAME + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, upload_dir / STATE_FILENAME)
+
+
+@contextmanager
+def _upload_lock(upload_dir: Path) -> Iterator[None]:
+    """
+    Hold an upload's lock, across threads and the web workers' processes.
+
+    Raises:
+        KeyError: If the upload does not exist
+    """
+    try:
+        lock_file = open(upload_dir / LOCK_FILENAME, "a")
+    except FileNotFoundError:
+        raise KeyError(upload_dir.name)
+    with lock_file:
+        # Released when the file is closed
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        yield
+
+
+def _received(upload_dir: Path) -> int:
+    try:
+        return (upload_dir / DATA_FILENAME).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def create_upload(username: str, filename: str, file_path_util: Optional[PDNFilePath] = None) -> Dict[str, Any]:
+    """
+    Start a chunked upload of a user's audio file.
+
+    Args:
+        username: User email the file belongs to
+        filename: Final filename in the user's directory
+        file_path_util: PDNFilePath to use, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        Upload state with its upload_id and offset 0
+    """
+    cleanup_stale_uploads(file_path_util=file_path_util)
+
+    upload_id = uuid.uuid4().hex
+    upload_dir = _uploads_dir(file_path_util) / upload_id
+    upload_dir.mkdir(parents=True)
+    (upload_dir / DATA_FILENAME).touch()
+
+    state = {
+        "upload_id": upload_id,
+        "username": username,
+        "filename": filename,
+        "created": time.time(),
+        "finalized": False
+    }
+    _write_state(upload_dir, state)
+    logger.info(f"Started audio upload {upload_id} for {username}: {filename}")
+    return {**state, "offset": 0}
+
+
+def get_upload(upload_id: str, file_path_util: Optional[PDNFilePath] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get the state of an upload, including the number of bytes received.
+
+    Args:
+        upload_id: Upload ID returned by create_upload
+        file_path_util: PDNFilePath to use, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        Upload state with its offset, or None if the upload does not exist
+    """
+    upload_dir = _upload_dir(upload_id, file_path_util)
+    if upload_dir is None:
+        return None
+    state = _read_state(upload_dir)
+    if state is None:
+        return None
+    return {**state, "offset": state.get("size", _received(upload_dir))}
+
+
+def write_chunk(upload_id: str, offset: int, data: bytes, file_path_util: Optional[PDNFilePath] = None) -> int:
+    """
+    Append a chunk at its byte offset.
+
+    Retrying a chunk is safe: bytes the server already has are skipped, so a
+    chunk whose response was lost can be sent again as is.
+
+    Args:
+        upload_id: Upload ID returned by create_upload
+        offset: Offset of the chunk's first byte in the file
+        data: Chunk bytes
+        file_path_util: PDNFilePath to use, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        Number of bytes received so far
+
+    Raises:
+        KeyError: If the upload does not exist
+        UploadOffsetError: If the chunk starts after the bytes received so far
+        ValueError: If the chunk or upload is too large, or already finalized
+    """
+    upload_dir = _upload_dir(upload_id, file_path_util)
+    if upload_dir is None or _read_state(upload_dir) is None:
+        raise KeyError(upload_id)
+    if len(data) > MAX_CHUNK_BYTES:
+        raise ValueError(f"Chunk larger than {MAX_CHUNK_BYTES} bytes")
+
+    with _upload_lock(upload_dir):
+        state = _read_state(upload_dir)
+        if state is None:
+            raise KeyError(upload_id)
+        if state.get("finalized"):
+            raise ValueError("Upload already finalized")
+
+        received = _received(upload_dir)
+        if offset > received:
+            raise UploadOffsetError(f"Expected offset {received}, got {offset}", received)
+
+        # Skip the part of a retried chunk that is already stored
+        data = data[received - offset:]
+        if not data:
+            return received
+        if received + len(data) > MAX_UPLOAD_BYTES:
+            raise ValueError(f"Upload larger than {MAX_UPLOAD_BYTES} bytes")
+
+        with open(upload_dir / DATA_FILENAME, "ab") as f:
+            f.write(data)
+        return received + len(data)
+
+
+def finalize_upload(upload_id: str, size: Optional[int] = None,
+                    file_path_util: Optional[PDNFilePath] = None) -> Dict[str, Any]:
+    """
+    Move a complete upload into the user's directory.
+
+    The file is renamed into place atomically, so readers never see a partial
+    recording. Finalizing again returns the same result.
+
+    Args:
+        upload_id: Upload ID returned by create_upload
+        size: Expected total size in bytes, checked if given
+        file_path_util: PDNFilePath to use, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        Upload state with the final file_path and size
+
+    Raises:
+        KeyError: If the upload does not exist
+        UploadOffsetError: If fewer or more bytes than size were received
+    """
+    file_path_util = file_path_util or PDNFilePath()
+    upload_dir = _upload_dir(upload_id, file_path_util)
+    state = _read_state(upload_dir) if upload_dir is not None else None
+    if state is None:
+        raise KeyError(upload_id)
+
+    with _upload_lock(upload_dir):
+        state = _read_state(upload_dir)
+        if state is None:
+            raise KeyError(upload_id)
+        if state.get("finalized"):
+            return {**state, "offset": state["size"]}
+
+        data_path = upload_dir / DATA_FILENAME
+        received = _received(upload_dir)
+        if size is not None and size != received:
+            raise UploadOffsetError(f"Expected {size} bytes, received {received}", received)
+
+        with open(data_path, "rb") as f:
+            os.fsync(f.fileno())
+
+        file_path = file_path_util.ensure_user_dir(state["username"]) / state["filename"]
+        os.replace(data_path, file_path)
+
+        state.update({"finalized": True, "size": received, "file_path": str(file_path)})
+        _write_state(upload_dir, state)
+
+    logger.info(f"Finished audio upload {upload_id}: {file_path} ({received} bytes)")
+    return {**state, "offset": received}
+
+
+def abort_upload(upload_id: str, file_path_util: Optional[PDNFilePath] = None) -> bool:
+    """
+    Discard an upload and the bytes received so far.
+
+    Args:
+        upload_id: Upload ID returned by create_upload
+        file_path_util: PDNFilePath to use, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        True if the upload existed
+    """
+    upload_dir = _upload_dir(upload_id, file_path_util)
+    if upload_dir is None or not upload_dir.is_dir():
+        return False
+    try:
+        with _upload_lock(upload_dir):
+            shutil.rmtree(upload_dir, ignore_errors=True)
+    except KeyError:
+        return False
+    return True
+
+
+def cleanup_stale_uploads(max_age: float = STALE_UPLOAD_SECONDS,
+                          file_path_util: Optional[PDNFilePath] = None) -> int:
+    """
+    Remove uploads started more than max_age seconds ago.
+
+    Args:
+        max_age: Age in seconds
+        file_path_util: PDNFilePath to use, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        Number of uploads removed
+    """
+    uploads_dir = _uploads_dir(file_path_util)
+    if not uploads_dir.is_dir():
+        return 0
+
+    removed = 0
+    cutoff = time.time() - max_age
+    for upload_dir in uploads_dir.iterdir():
+        try:
+            if upload_dir.is_dir() and upload_dir.stat().st_mtime < cutoff:
+                shutil.rmtree(upload_dir, ignore_errors=True)
+                removed += 1
+        except OSError as e:
+            logger.error(f"Error removing stale upload {upload_dir}: {e}")
+    if removed:
+        logger.info(f"Removed {removed} stale audio uploads")
+    return removed
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Recalculate the PDN code of every user, e.g. after a scoring change.
+
+Answers are loaded and scored in batches by a process pool, and all code
+changes are written to the metadata CSV in a single update. The full results
+of users whose code changes are only stored with their answers once that
+update has succeeded, so the answers files never get ahead of the CSV. Progress is
+reported as a stream of events, printed as NDJSON by the CLI. A rescore can
+be limited to the users who answered one questionnaire version.
+
+Usage:
+    python -m app.utils.bulk_rescore [--dry-run] [--workers 4] [--batch-size 200]
+                                     [--questionnaire-version VERSION]
+"""
+
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+from .answer_storage import QUESTIONNAIRE_VERSION_KEY, get_answers_file_path, save_results
+from .csv_metadata_handler import get_metadata_handler
+from .pdn_calculator import calculate_pdn_result
+from .pdn_file_path import PDNFilePath
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+
+# Worker processes of a recalculation started from the admin dashboard, which
+# runs inside a web worker
+WEB_RESCORE_WORKERS = int(os.getenv("WEB_RESCORE_WORKERS", "2"))
+
+
+ScoreResult = Tuple[str, Optional[str], Optional[str], Optional[str], Optional[Dict[str, Any]]]
+
+
+def score_user(email: str, base_dir: Optional[str] = None,
+               questionnaire_version: Optional[str] = None) -> ScoreResult:
+    """
+    Load and score one user's answers.
+
+    Runs in worker processes, so it only takes and returns plain data, and
+    writes nothing.
+
+    Args:
+        email: User's email address
+        base_dir: Saved results directory. Defaults to SAVED_RESULTS_DIR
+        questionnaire_version: Only score answers made with this version
+
+    Returns:
+        (email, pdn_code, error, version, result) where pdn_code is None if
+        the user has no answers, was filtered out or scoring failed, error
+        describes a failure, version is the questionnaire version of the
+        answers and result is the full PDNResult.to_dict() output
+    """
+    try:
+        file_path_util = PDNFilePath(base_dir)
+        file_path = get_answers_file_path(email, file_path_util)
+        if file_path is None:
+            return email, None, None, None, None
+
+        with open(file_path, "r", encoding="utf-8") as f:
+            answers = json.load(f)
+        if not answers:
+            return email, None, None, None, None
+
+        version = answers.get(QUESTIONNAIRE_VERSION_KEY)
+        if questionnaire_version and version != questionnaire_version:
+            return email, None, None, version, None
+
+        result = calculate_pdn_result(answers)
+        return email, result.pdn_code, None, version, result.to_dict()
+    except Exception as e:
+        return email, None, str(e), None, None
+
+
+def _score_batch(batch: List[str], base_dir: Optional[str],
+                 questionnaire_version: Optional[str]) -> List[ScoreResult]:
+    """Score a batch of users in one worker task."""
+    return [score_user(email, base_dir, questionnaire_version) for email in batch]
+
+
+def rescore_all_users(dry_run: bool = False, workers: Optional[int] = None,
+                      batch_size: int = DEFAULT_BATCH_SIZE,
+                      updated_by: str = "Bulk recalculation",
+                      questionnaire_version: Optional[str] = None) -> Generator[Dict[str, Any], None, None]:
+    """
+    Recalculate every user's PDN code and write all changes in one update.
+
+    Changed users get the new PDN code and an update comment, as with the
+    single-user recalculation, but their date is left untouched. Unless it
+    is a dry run, each user's full result is stored with their answers:
+    right away for users whose code is unchanged, and after the CSV update
+    for the others. If the update fails or the run is stopped before it
+    (e.g. the client of the streaming route disconnects), the changed users
+    keep their stored result and code.
+
+    Args:
+        dry_run: Only report which codes would change, write nothing
+        workers: Number of worker processes. Defaults to the CPU count; 1 or
+            less scores in this process
+        batch_size: Users scored per worker task and per progress event
+        updated_by: Name recorded in the PDN update comment
+        questionnaire_version: Only rescore users whose answers were made with
+            this questionnaire version; the others are counted as skipped
+
+    Yields:
+        Event dictionaries: 'start', 'change' for each user whose code
+        differs, 'error', 'progress' after each batch and a final 'done'
+    """
+    handler = get_metadata_handler()
+    file_path_util = PDNFilePath()
+    base_dir = str(file_path_util.get_base_dir())
+
+    current_codes = {}
+    for row in handler.read_all_metadata():
+        email = (row.get("Email") or "").strip()
+        if email:
+            current_codes[email] = {"user_id": row.get("User ID", ""), "pdn_code": row.get("PDN Code", "")}
+
+    emails = list(current_codes)
+    batch_size = max(1, batch_size)
+    batches = [emails[i:i + batch_size] for i in range(0, len(emails), batch_size)]
+    yield {"event": "start", "total": len(emails), "dry_run": dry_run, "questionnaire_version": questionnaire_version}
+
+    counts = {"processed": 0, "changed": 0, "unchanged": 0, "missing": 0, "skipped": 0, "errors": 0}
+    changes = {}
+    changed_results = {}
+    comment = f"Updated on {datetime.now().strftime('%d/%m/%Y %H:%M')} by {updated_by}"
+
+    with ExitStack() as stack:
+        args = (batches, [base_dir] * len(batches), [questionnaire_version] * len(batches))
+        if workers is not None and workers <= 1:
+            batch_results = map(_score_batch, *args)
+        else:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            # Runs before the executor's own exit: a stopped run drops its queued batches
+            stack.callback(executor.shutdown, wait=True, cancel_futures=True)
+            batch_results = executor.map(_score_batch, *args)
+
+        for results in batch_results:
+            for email, pdn_code, error, version, result in results:
+                counts["processed"] += 1
+                if error:
+                    counts["errors"] += 1
+                    yield {"event": "error", "email": email, "error": error}
+                elif pdn_code is None and questionnaire_version and version != questionnaire_version:
+                    counts["skipped"] += 1
+                elif pdn_code is None:
+                    counts["missing"] += 1
+                elif pdn_code == current_codes[email]["pdn_code"]:
+                    counts["unchanged"] += 1
+                    if not dry_run:
+                        save_results(email, result, file_path_util)
+                else:
+                    counts["changed"] += 1
+                    changes[email] = {"PDN Code": pdn_code, "PDN Update Comments": comment}
+                    changed_results[email] = result
+                    yield {
+                        "event": "change",
+                        "email": email,
+                        "user_id": current_codes[email]["user_id"],
+                        "old_code": current_codes[email]["pdn_code"],
+                        "new_code": pdn_code
+                    }
+
+            yield {"event": "progress", "total": len(emails), **counts}
+
+    written = False
+    if changes and not dry_run:
+        written = handler.update_users_bulk(changes)
+        if written:
+            for email, result in changed_results.items():
+                save_results(email, result, file_path_util)
+        else:
+            logger.error(f"Bulk recalculation failed to write {len(changes)} PDN code changes")
+
+    logger.info(f"Bulk recalculation finished: {counts}, dry_run={dry_run}, written={written}")
+    yield {"event": "done", "total": len(emails), "dry_run": dry_run, "written": written, **counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalculate all users' PDN codes")
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Report users whose PDN code would change without writing')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for scoring (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Users per batch (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--questionnaire-version', default=None,
+                        help='Only rescore users who answered this questionnaire version')
+    args = parser.parse_args()
+
+    for event in rescore_all_users(args.dry_run, args.workers, args.batch_size,
+                                   questionnaire_version=args.questionnaire_version):
+        print(json.dumps(event, ensure_ascii=False), flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Compress JSON, HTML and other text responses.
+
+Responses are gzip (or brotli, when installed and accepted) encoded in an
+after_request hook once they reach COMPRESS_MIN_SIZE bytes. Streamed
+responses are compressed chunk by chunk with a sync flush after each chunk,
+so clients still receive every chunk as soon as it is produced. Responses
+that already carry a Content-Encoding (precompressed assets, the gzip user
+export) and file responses are left alone.
+
+Usage (bytes saved per endpoint):
+    python -m app.utils.compression /pdn-admin/dashboard /pdn-admin/metadata
+"""
+
+import argparse
+import gzip
+import logging
+import zlib
+from typing import Dict, Iterable, List, Union
+
+from flask import current_app, request
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Text responses worth compressing
+COMPRESSIBLE_MIMETYPES = {
+    "text/html", "text/css", "text/plain", "text/csv", "text/javascript",
+    "application/javascript", "application/json", "application/x-ndjson", "image/svg+xml"
+}
+
+
+def gzip_stream(chunks: Iterable[Union[str, bytes]], level: int = 6):
+    """
+    Gzip-compress a stream of text chunks incrementally.
+
+    Each chunk is sync-flushed so the client receives data as it is produced.
+
+    Yields:
+        Compressed byte chunks forming a single gzip member
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush(zlib.Z_FINISH)
+
+
+def brotli_stream(chunks: Iterable[Union[str, bytes]], quality: int = 5):
+    """
+    Brotli-compress a stream of text chunks incrementally, flushing each chunk.
+
+    Yields:
+        Compressed byte chunks forming a single brotli stream
+    """
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def _choose_encoding() -> str:
+    accept_encodings = request.accept_encodings
+    if brotli is not None and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return ""
+
+
+def compress_response(response):
+    """
+    Compress a response if it is text, large enough and the client accepts it.
+
+    Args:
+        response: Response returned by the view
+
+    Returns:
+        The same response, compressed in place when applicable
+    """
+    config = current_app.config
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or request.method == "HEAD"
+            or "Content-Encoding" in response.headers
+            or response.direct_passthrough
+            or response.mimetype not in config["COMPRESS_MIMETYPES"]
+            or "no-transform" in response.headers.get("Cache-Control", "")):
+        return response
+
+    if response.is_streamed:
+        if not config["COMPRESS_STREAMS"]:
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = _choose_encoding()
+        if not encoding:
+            return response
+        if encoding == "br":
+            response.response = brotli_stream(response.response, config["COMPRESS_BROTLI_QUALITY"])
+        else:
+            response.response = gzip_stream(response.response, config["COMPRESS_LEVEL"])
+        response.headers.pop("Content-Length", None)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    data = response.get_data()
+    if len(data) < config["COMPRESS_MIN_SIZE"]:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = _choose_encoding()
+    if not encoding:
+        return response
+
+    if encoding == "br":
+        compressed = brotli.compress(data, quality=config["COMPRESS_BROTLI_QUALITY"])
+    else:
+        compressed = gzip.compress(data, compresslevel=config["COMPRESS_LEVEL"], mtime=0)
+    if len(compressed) >= len(data):
+        return response
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+
+    # The compressed body is a different representation of the same resource
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app) -> None:
+    """
+    Compress the app's text responses.
+
+    Settings (app.config):
+        COMPRESS_MIN_SIZE: Smallest body in bytes worth compressing (default 500)
+        COMPRESS_LEVEL: gzip level (default 6)
+        COMPRESS_BROTLI_QUALITY: brotli quality (default 5)
+        COMPRESS_STREAMS: Compress streamed responses chunk by chunk (default True)
+        COMPRESS_MIMETYPES: Mimetypes to compress
+
+    Args:
+        app: Flask application
+    """
+    app.config.setdefault("COMPRESS_MIN_SIZE", 500)
+    app.config.setdefault("COMPRESS_LEVEL", 6)
+    app.config.setdefault("COMPRESS_BROTLI_QUALITY", 5)
+    app.config.setdefault("COMPRESS_STREAMS", True)
+    app.config.setdefault("COMPRESS_MIMETYPES", COMPRESSIBLE_MIMETYPES)
+    app.after_request(compress_response)
+
+
+def measure_bytes_saved(client, paths: List[str], encoding: str = "gzip") -> Dict[str, Dict[str, int]]:
+    """
+    Measure how many bytes compression saves on each endpoint.
+
+    Args:
+        client: Flask test client of an app with compression enabled
+        paths: Paths to GET
+        encoding: Accept-Encoding to request
+
+    Returns:
+        {path: {"status", "identity", "encoded", "saved"}}
+    """
+    results = {}
+    for path in paths:
+        identity = client.get(path, headers={"Accept-Encoding": "identity"})
+        encoded = client.get(path, headers={"Accept-Encoding": encoding})
+        identity_size = len(identity.get_data())
+        encoded_size = len(encoded.get_data())
+        results[path] = {
+            "status": encoded.status_code,
+            "identity": identity_size,
+            "encoded": encoded_size,
+            "saved": identity_size - encoded_size
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure bytes saved by response compression per endpoint')
+    parser.add_argument('paths', nargs='+', help='Paths to GET, e.g. /pdn-admin/metadata')
+    parser.add_argument('--encoding', choices=['gzip', 'br'], default='gzip',
+                        help='Accept-Encoding to request (default: gzip)')
+    args = parser.parse_args()
+
+    from app.main import app
+
+    results = measure_bytes_saved(app.test_client(), args.paths, args.encoding)
+    print(f"{'endpoint':50} {'status':>6} {'identity':>10} {'encoded':>10} {'saved':>10}")
+    for path, result in results.items():
+        print(f"{path:50} {result['status']:>6} {result['identity']:>10} {result['encoded']:>10} {result['saved']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Reload config.yaml, questions.json and the PDN reports while the app runs.
+
+Each watched file is parsed and validated once, and re-read when its mtime or
+size changes. A file that fails to load or validate is logged and the last
+good version stays in use. The new value replaces the old one in a single
+assignment, then the file's subscribers are called to swap the structures
+built from it (the question index and compiled scorer, Settings, app.config,
+the RAG system).
+
+Files are polled at most every CONTENT_RELOAD_INTERVAL seconds (default 2,
+0 disables reloading) from a before_request hook, so each worker process
+picks up changes on its next request without a background thread.
+
+Usage:
+    python -m app.utils.content_registry [--check]
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+from .pdn_calculator import CompiledScorer, get_compiled_scorer
+from .question_index import QUESTIONS_PATH, QuestionIndex, set_question_index
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Watched file names
+CONFIG = "config"
+QUESTIONS = "questions"
+REPORTS = "reports"
+
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+# Keys Settings reads from config.yaml
+REQUIRED_CONFIG_KEYS = {
+    "project": ("name", "version"),
+    "rag": ("chroma_db_persist_dir", "chunk_size", "chunk_overlap", "search_k")
+}
+
+# callback(new_value, old_value)
+Subscriber = Callable[[Any, Any], None]
+
+
+def load_yaml(path: Path) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def load_json(path: Path) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def validate_config(config: Any) -> None:
+    """Raise ValueError if config.yaml lacks a section or key the app reads."""
+    if not isinstance(config, dict):
+        raise ValueError("config.yaml must be a mapping")
+    for section, keys in REQUIRED_CONFIG_KEYS.items():
+        values = config.get(section)
+        if not isinstance(values, dict):
+            raise ValueError(f"config.yaml is missing the '{section}' section")
+        missing = [key for key in keys if key not in values]
+        if missing:
+            raise ValueError(f"config.yaml '{section}' is missing {', '.join(missing)}")
+
+
+def validate_questions(questions_data: Any) -> None:
+    """Raise ValueError if questions.json cannot be indexed and scored."""
+    if not isinstance(questions_data, dict):
+        raise ValueError("questions.json must be an object")
+    index = QuestionIndex(questions_data)
+    if not len(index):
+        raise ValueError("questions.json has no scored questions")
+    try:
+        CompiledScorer(index)
+    except (KeyError, IndexError, TypeError) as e:
+        raise ValueError(f"questions.json has an option the scorer does not know: {e}")
+
+
+def validate_reports(reports_data: Any) -> None:
+    """Raise ValueError if pdn_reports.json is not a mapping of PDN codes to reports."""
+    if not isinstance(reports_data, dict) or not reports_data:
+        raise ValueError("pdn_reports.json must be a non-empty object")
+
+
+class WatchedFile:
+    """A parsed file and the stat stamp it was parsed at."""
+
+    def __init__(self, path: Path, loader: Callable[[Path], Any],
+                 validator: Optional[Callable[[Any], None]] = None):
+        self.path = Path(path)
+        self.loader = loader
+        self.validator = validator
+        self.value: Any = None
+        self.stamp: Optional[Tuple[int, int]] = None
+        self.loaded = False
+        self.subscribers: List[Subscriber] = []
+
+    def read_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(self) -> Tuple[Optional[Tuple[int, int]], Any]:
+        # Stamp first: a write during the read shows up as a change on the next check
+        stamp = self.read_stamp()
+        value = self.loader(self.path)
+        if self.validator:
+            self.validator(value)
+        return stamp, value
+
+
+class ContentRegistry:
+    """Watched files by name, reloaded when they change on disk."""
+
+    def __init__(self, interval: Optional[float] = None):
+        """
+        Args:
+            interval: Seconds between checks for changed files. Defaults to the
+                      CONTENT_RELOAD_INTERVAL environment variable or 2; 0 disables checks
+        """
+        if interval is None:
+            interval = float(os.getenv("CONTENT_RELOAD_INTERVAL", DEFAULT_RELOAD_INTERVAL))
+        self.interval = interval
+        self._files: Dict[str, WatchedFile] = {}
+        self._lock = threading.Lock()
+        self._last_check = time.monotonic()
+
+    def register(self, name: str, path: Path, loader: Callable[[Path], Any],
+                 validator: Optional[Callable[[Any], None]] = None) -> None:
+        """
+        Watch a file. It is parsed on first use.
+
+        Args:
+            name: Name to get the file's value by
+            path: File to watch
+            loader: Parses the file
+            validator: Raises ValueError if a parsed value must not be used
+        """
+        self._files[name] = WatchedFile(path, loader, validator)
+
+    def subscribe(self, name: str, callback: Subscriber) -> None:
+        """
+        Call callback(new_value, old_value) after a file is reloaded.
+
+        Args:
+            name: Watched file name
+            callback: Swaps whatever was built from the old value
+        """
+        self._files[name].subscribers.append(callback)
+
+    def get(self, name: str) -> Any:
+        """
+        Get a file's current value.
+
+        Args:
+            name: Watched file name
+
+        Returns:
+            The last valid parsed value
+
+        Raises:
+            OSError, ValueError: If the file never loaded successfully
+        """
+        watched = self._files[name]
+        if not watched.loaded:
+            with self._lock:
+                if not watched.loaded:
+                    watched.stamp, watched.value = watched.read()
+                    watched.loaded = True
+        return watched.value
+
+    def check(self, force: bool = False) -> List[str]:
+        """
+        Reload the files that changed since they were loaded.
+
+        Args:
+            force: Check now, even if the interval has not passed or is 0
+
+        Returns:
+            Names of the files that were reloaded
+        """
+        now = time.monotonic()
+        if not force and (self.interval <= 0 or now - self._last_check < self.interval):
+            return []
+        self._last_check = now
+
+        reloaded = []
+        for name, watched in self._files.items():
+            # Nothing depends on a file that was never loaded
+            if not watched.loaded or watched.read_stamp() == watched.stamp:
+                continue
+            with self._lock:
+                if watched.read_stamp() != watched.stamp and self._reload(name, watched):
+                    reloaded.append(name)
+        return reloaded
+
+    def _reload(self, name: str, watched: WatchedFile) -> bool:
+        try:
+            stamp, value = watched.read()
+        except Exception as e:
+            # Remember the stamp so a broken file is reported once, not on every check
+            watched.stamp = watched.read_stamp()
+            logger.error(f"Keeping the loaded {name}, {watched.path} is invalid: {e}")
+            return False
+
+        old_value = watched.value
+        watched.value, watched.stamp = value, stamp
+        logger.info(f"Reloaded {name} from {watched.path}")
+        for callback in watched.subscribers:
+            try:
+                callback(value, old_value)
+            except Exception as e:
+                logger.error(f"Error applying the reloaded {name} in {getattr(callback, '__qualname__', callback)}: {e}")
+        return True
+
+
+def _questions_changed(questions_data: dict, _old: dict) -> None:
+    # Swap the index first, the scorer is rebuilt from it on next use
+    set_question_index(QuestionIndex(questions_data))
+    get_compiled_scorer.cache_clear()
+
+
+# Apps kept current by init_app, held weakly so apps that are done with are not kept alive
+_apps: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def _apps_config_changed(config: dict, _old: dict) -> None:
+    for app in list(_apps):
+        app.config['PDN_CONFIG'] = config
+
+
+def _apps_questions_changed(questions_data: dict, _old: dict) -> None:
+    from . import questionnaire_versions
+
+    apps = list(_apps)
+    if not apps:
+        return
+    # Subscribed after _questions_changed, so this is the version of the new index
+    version = questionnaire_versions.ensure_current_registered()
+    for app in apps:
+        app.config['QUESTIONS_FILE'] = questions_data
+        app.config['QUESTIONNAIRE_VERSION'] = version
+
+
+_content_registry = None
+
+
+def get_content_registry() -> ContentRegistry:
+    """Get the process-wide registry of config.yaml, questions.json and pdn_reports.json."""
+    global _content_registry
+    if _content_registry is None:
+        registry = ContentRegistry()
+        registry.register(CONFIG, DATA_DIR / "config.yaml", load_yaml, validate_config)
+        registry.register(QUESTIONS, QUESTIONS_PATH, load_json, validate_questions)
+        registry.register(REPORTS, DATA_DIR / "pdn_reports.json", load_json, validate_reports)
+        registry.subscribe(QUESTIONS, _questions_changed)
+        registry.subscribe(CONFIG, _apps_config_changed)
+        registry.subscribe(QUESTIONS, _apps_questions_changed)
+        _content_registry = registry
+    return _content_registry
+
+
+def init_app(app) -> None:
+    """
+    Keep app.config in step with the watched files and check them before requests.
+
+    The registry's subscribers update every app passed here, so creating
+    more apps (e.g. in tests) does not add subscribers.
+
+    Args:
+        app: Flask app whose PDN_CONFIG, QUESTIONS_FILE and QUESTIONNAIRE_VERSION are kept current
+    """
+    registry = get_content_registry()
+    _apps.add(app)
+
+    @app.before_request
+    def check_content():
+        registry.check()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and validate config.yaml, questions.json and pdn_reports.json")
+    parser.add_argument('--check', action='store_true', help='Exit with an error if any file is invalid')
+    args = parser.parse_args()
+
+    registry = get_content_registry()
+    failed = False
+    for name in (CONFIG, QUESTIONS, REPORTS):
+        try:
+            registry.get(name)
+            print(f"{name}: ok")
+        except Exception as e:
+            failed = True
+            print(f"{name}: {e}")
+    if args.check and failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
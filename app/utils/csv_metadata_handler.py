@@ -2,10 +2,13 @@ import csv
 import json
 import logging
 import os
+import threading
 import uuid
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Generator
+from typing import Dict, Any, List, Optional, Generator, Tuple
 
+from .audio_processing import resolve_recording
+from .metadata_statistics import MetadataStatistics, get_file_signature
 from .pdn_file_path import PDNFilePath
 
 # Configure logging
@@ -21,6 +24,7 @@ class UserMetadataHandler:
         pdn_file_path = PDNFilePath()
         user_dir = pdn_file_path.get_base_dir()
         self.csv_filename = user_dir / "user_metadata.csv"
+        self.stats_filename = user_dir / "user_metadata_stats.json"
 
         self.headers = [
             "User ID",
@@ -33,10 +37,20 @@ class UserMetadataHandler:
             "PDN Update Comments"
         ]
 
-        # Cache for frequently accessed data
+        # Cache for frequently accessed data, valid while the CSV file's
+        # (mtime, size) signature is unchanged
         self._data_cache = None
-        self._cache_timestamp = None
-        self._cache_validity_seconds = 30  # Cache valid for 30 seconds
+        self._cache_signature = None
+
+        # Row indexes into the cached data
+        self._email_index: Dict[str, int] = {}
+        self._user_id_index: Dict[str, int] = {}
+
+        # Serializes read-modify-write cycles when the handler is shared
+        self._lock = threading.RLock()
+
+        # Incrementally maintained statistics, persisted next to the CSV
+        self._statistics = None
 
     def _generate_unique_id(self) -> str:
         """
@@ -56,34 +70,52 @@ class UserMetadataHandler:
         Returns:
             A unique user ID that doesn't exist in the current data
         """
-        existing_data = self._read_csv_data()
-        existing_ids = {row.get("User ID", "") for row in existing_data if row.get("User ID")}
-        
+        # Refresh the cache so the User ID index matches the file
+        self._cached_rows()
+
         # Generate IDs until we find one that doesn't exist
         while True:
             new_id = self._generate_unique_id()
-            if new_id not in existing_ids:
+            if new_id not in self._user_id_index:
                 return new_id
 
     def _is_cache_valid(self) -> bool:
-        """Check if the current cache is still valid."""
-        if self._data_cache is None or self._cache_timestamp is None:
+        """Check if the current cache still matches the CSV file on disk."""
+        if self._data_cache is None or self._cache_signature is None:
             return False
 
-        current_time = datetime.now().timestamp()
-        return (current_time - self._cache_timestamp) < self._cache_validity_seconds
+        return self._cache_signature == get_file_signature(self.csv_filename)
+
+    def _set_cache(self, data: List[Dict[str, str]]) -> None:
+        """Cache data read from or just written to the CSV file and index it."""
+        self._data_cache = data
+        self._cache_signature = get_file_signature(self.csv_filename)
+
+        self._email_index = {}
+        self._user_id_index = {}
+        for row_index, row in enumerate(data):
+            email = (row.get("Email") or "").strip()
+            if email:
+                # Keep the first row for duplicated emails, like the old linear scans
+                self._email_index.setdefault(email, row_index)
+            user_id = (row.get("User ID") or "").strip()
+            if user_id:
+                self._user_id_index.setdefault(user_id, row_index)
 
     def _invalidate_cache(self) -> None:
         """Invalidate the current cache."""
         self._data_cache = None
-        self._cache_timestamp = None
+        self._cache_signature = None
+        self._email_index = {}
+        self._user_id_index = {}
 
-    def _get_file_modification_time(self) -> float:
-        """Get the last modification time of the CSV file."""
-        try:
-            return os.path.getmtime(self.csv_filename) if os.path.exists(self.csv_filename) else 0
-        except OSError:
-            return 0
+    def _find_row_index(self, email: str) -> Optional[int]:
+        """
+        Find the index of a user's row in the cached data.
+
+        Call _cached_rows or _read_csv_data first so the index matches the current file.
+        """
+        return self._email_index.get(email.strip())
 
     def ensure_csv_exists(self) -> None:
         """Create CSV file with headers if it doesn't exist."""
@@ -161,34 +193,47 @@ class UserMetadataHandler:
         email = email.strip()
         return '@' in email and '.' in email and len(email) > 5
 
-    def _read_csv_data(self) -> List[Dict[str, str]]:
-        """Read CSV data with error handling and caching."""
-        try:
-            if not os.path.exists(self.csv_filename):
-                return []
+    def _cached_rows(self) -> List[Dict[str, str]]:
+        """
+        Get the cached rows, reading the CSV again if it changed on disk.
 
-            # Check cache validity
-            if self._is_cache_valid():
-                return self._data_cache.copy()
+        The list is the cache itself, for lookups under the lock: callers must
+        not modify it or its rows.
+        """
+        if not os.path.exists(self.csv_filename):
+            self._invalidate_cache()
+            return []
 
-            data = []
+        if not self._is_cache_valid():
             with open(self.csv_filename, 'r', encoding='utf-8') as csvfile:
                 reader = csv.DictReader(csvfile)
-                data = list(reader)
+                self._set_cache(list(reader))
 
-            # Update cache
-            self._data_cache = data
-            self._cache_timestamp = datetime.now().timestamp()
+        return self._data_cache
 
-            return data
+    def _read_csv_data(self) -> List[Dict[str, str]]:
+        """Read CSV data with error handling and caching, as a list the caller may modify."""
+        try:
+            return self._cached_rows().copy()
 
         except Exception as e:
             logger.error(f"Error reading CSV data: {e}")
             return []
 
-    def _write_csv_data(self, data: List[Dict[str, str]]) -> bool:
-        """Write data to CSV with error handling."""
+    def _write_csv_data(self, data: List[Dict[str, str]],
+                        changed_rows: Optional[List[Tuple[Optional[Dict[str, str]], Dict[str, str]]]] = None) -> bool:
+        """
+        Write data to CSV with error handling.
+
+        Args:
+            data: All rows to write
+            changed_rows: (old_row, new_row) pairs changed by this write, old_row is
+                          None for appended rows. None recomputes the statistics.
+        """
         try:
+            # Take the statistics view while it still matches the file on disk
+            statistics = self._get_statistics_view() if changed_rows is not None else None
+
             # Ensure directory exists
             os.makedirs(os.path.dirname(self.csv_filename), exist_ok=True)
 
@@ -197,14 +242,66 @@ class UserMetadataHandler:
                 writer.writeheader()
                 writer.writerows(data)
 
-            # Invalidate cache after write
-            self._invalidate_cache()
+            # The written data is the new file content
+            self._set_cache(list(data))
+
+            self._update_statistics(data, statistics, changed_rows)
             return True
 
         except Exception as e:
             logger.error(f"Error writing CSV data: {e}")
+            # Rows may have been modified in place, drop them
+            self._invalidate_cache()
+            self._statistics = None
             return False
 
+    def _get_statistics_view(self) -> MetadataStatistics:
+        """
+        Get the statistics matching the current CSV file.
+
+        Uses the in-memory view or the sidecar file when their CSV signature
+        matches the file on disk, and recomputes with a full pass otherwise.
+        """
+        signature = get_file_signature(self.csv_filename)
+
+        if self._statistics is not None and self._statistics.csv_signature == signature:
+            return self._statistics
+
+        statistics = MetadataStatistics.load(self.stats_filename)
+        if statistics is None or statistics.csv_signature != signature:
+            logger.info("Metadata statistics out of date, recomputing from CSV")
+            statistics = MetadataStatistics.from_rows(self.read_metadata_generator())
+            self._save_statistics(statistics)
+
+        self._statistics = statistics
+        return statistics
+
+    def _save_statistics(self, statistics: MetadataStatistics) -> None:
+        """Stamp statistics with the current CSV signature and persist them."""
+        statistics.csv_signature = get_file_signature(self.csv_filename)
+        try:
+            statistics.save(self.stats_filename)
+        except OSError as e:
+            logger.warning(f"Could not save metadata statistics: {e}")
+        self._statistics = statistics
+
+    def _update_statistics(self, data: List[Dict[str, str]], statistics: Optional[MetadataStatistics],
+                           changed_rows) -> None:
+        """Apply the row changes of a completed write to the statistics."""
+        try:
+            if statistics is None:
+                statistics = MetadataStatistics.from_rows(data)
+            else:
+                for old_row, new_row in changed_rows:
+                    if old_row is None:
+                        statistics.add_row(new_row)
+                    else:
+                        statistics.update_row(old_row, new_row)
+            self._save_statistics(statistics)
+        except Exception as e:
+            logger.warning(f"Could not update metadata statistics: {e}")
+            self._statistics = None
+
     def append_user_metadata(self, user_data: Dict[str, Any]) -> bool:
         """
         Append user metadata to CSV file with improved validation.
@@ -227,12 +324,22 @@ class UserMetadataHandler:
                 logger.error(f"Invalid email: {email}")
                 return False
 
+            with self._lock:
+                return self._append_user_row(email)
+
+        except Exception as e:
+            logger.error(f"Error appending metadata to CSV: {e}")
+            return False
+
+    def _append_user_row(self, email: str) -> bool:
+        """Append a new row for a validated email unless it already exists."""
+        try:
             # Ensure CSV file exists
             self.ensure_csv_exists()
 
             # Check for existing user
             existing_data = self._read_csv_data()
-            if any(row.get("Email", "").strip() == email for row in existing_data):
+            if self._find_row_index(email) is not None:
                 logger.info(f"User {email} already exists in CSV, skipping duplicate entry")
                 return True
 
@@ -252,7 +359,7 @@ class UserMetadataHandler:
             existing_data.append(new_row)
 
             # Write back to file
-            if self._write_csv_data(existing_data):
+            if self._write_csv_data(existing_data, changed_rows=[(None, new_row)]):
                 logger.info(f"Successfully added user {email} to CSV metadata")
                 return True
             else:
@@ -305,17 +412,40 @@ class UserMetadataHandler:
             return None
 
         try:
-            data = self._read_csv_data()
-            email = email.strip()
+            with self._lock:
+                rows = self._cached_rows()
+                row_index = self._find_row_index(email)
+                if row_index is None:
+                    return None
+                return dict(rows[row_index])
 
-            for row in data:
-                if row.get("Email", "").strip() == email:
-                    return row
+        except Exception as e:
+            logger.error(f"Error finding user metadata: {e}")
+            return None
 
+    def get_user_by_id(self, user_id: str) -> Optional[Dict[str, str]]:
+        """
+        Get specific user metadata by User ID.
+
+        Args:
+            user_id: User ID, e.g. UIDAB12CD
+
+        Returns:
+            Dictionary containing user metadata or None if not found
+        """
+        if not user_id:
             return None
 
+        try:
+            with self._lock:
+                rows = self._cached_rows()
+                row_index = self._user_id_index.get(user_id.strip())
+                if row_index is None:
+                    return None
+                return dict(rows[row_index])
+
         except Exception as e:
-            logger.error(f"Error finding user metadata: {e}")
+            logger.error(f"Error finding user metadata by ID: {e}")
             return None
 
     def get_user_files(self, email: str, file_type: str) -> Optional[Dict[str, Any]]:
@@ -338,7 +468,7 @@ class UserMetadataHandler:
             else:
                 filename = f"{email}_{file_type}.json"
             
-            file_path = pdn_file_path.get_user_file_path(email, filename)
+            file_path = pdn_file_path.resolve_user_file_path(email, filename)
 
             if not os.path.exists(file_path):
                 return None
@@ -365,7 +495,7 @@ class UserMetadataHandler:
         """
         try:
             pdn_file_path = PDNFilePath()
-            user_dir = pdn_file_path.get_user_dir(email)
+            user_dir = pdn_file_path.resolve_user_dir(email)
             
             # Look for the new naming format: email_question1.wav, email_question2.wav
             question1_filename = f"{email}_question1.wav"
@@ -374,11 +504,12 @@ class UserMetadataHandler:
             question1_path = user_dir / question1_filename
             question2_path = user_dir / question2_filename
             
-            # Return the first available question file, or question1 if both exist
-            if question1_path.exists():
-                return str(question1_path)
-            elif question2_path.exists():
-                return str(question2_path)
+            # Return the first available question file, or question1 if both exist;
+            # processed recordings are stored in another container
+            for question_path in (question1_path, question2_path):
+                recording = resolve_recording(question_path)
+                if recording is not None:
+                    return str(recording[0])
             
             # Fallback to old method for backward compatibility
             if file_type == "wav":
@@ -387,7 +518,7 @@ class UserMetadataHandler:
                     return str(file_path)
             else:
                 filename = f"{email}_{file_type}"
-                file_path = pdn_file_path.get_user_file_path(email, filename)
+                file_path = pdn_file_path.resolve_user_file_path(email, filename)
                 if os.path.exists(file_path):
                     return str(file_path)
 
@@ -397,6 +528,82 @@ class UserMetadataHandler:
             logger.error(f"Error finding user audio path: {e}")
             return None
 
+    def _update_user_row(self, email: str, updates: Dict[str, str]) -> Optional[bool]:
+        """
+        Apply field updates to one user's row and write the CSV.
+
+        The updated row replaces the cached one instead of being modified in
+        place, so a failed write leaves the cache untouched.
+
+        Args:
+            email: User's email address
+            updates: Field name to new value
+
+        Returns:
+            True if written, False if the write failed, None if the user was not found
+        """
+        with self._lock:
+            data = self._read_csv_data()
+            row_index = self._find_row_index(email)
+            if row_index is None:
+                logger.warning(f"User {email.strip()} not found in CSV")
+                return None
+
+            old_row = data[row_index]
+            new_row = dict(old_row)
+            new_row.update(updates)
+            data[row_index] = new_row
+
+            return self._write_csv_data(data, changed_rows=[(old_row, new_row)])
+
+    def update_users_bulk(self, updates: Dict[str, Dict[str, str]]) -> bool:
+        """
+        Apply field updates to many users with a single CSV write.
+
+        Either all updates are written or, if the write fails, none are.
+        Emails not found in the CSV are skipped with a warning.
+
+        Args:
+            updates: Email to {field name: new value}
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            invalid_fields = {field for fields in updates.values() for field in fields} - set(self.headers)
+            if invalid_fields:
+                logger.error(f"Invalid field names: {sorted(invalid_fields)}")
+                return False
+
+            if not updates:
+                return True
+
+            with self._lock:
+                data = self._read_csv_data()
+                changed_rows = []
+                for email, fields in updates.items():
+                    row_index = self._find_row_index(email)
+                    if row_index is None:
+                        logger.warning(f"User {email.strip()} not found in CSV")
+                        continue
+
+                    old_row = data[row_index]
+                    new_row = dict(old_row)
+                    new_row.update({field: str(value) for field, value in fields.items()})
+                    data[row_index] = new_row
+                    changed_rows.append((old_row, new_row))
+
+                if not self._write_csv_data(data, changed_rows=changed_rows):
+                    logger.error("Failed to write bulk metadata update")
+                    return False
+
+            logger.info(f"Successfully updated {len(changed_rows)} users in one write")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error updating user metadata in bulk: {e}")
+            return False
+
     def _update_user_field(self, email: str, field_name: str, value: str) -> bool:
         """
         Generic method to update a specific field for a user.
@@ -422,24 +629,12 @@ class UserMetadataHandler:
                 logger.error("CSV file does not exist")
                 return False
 
-            # Read current data
-            data = self._read_csv_data()
-            email = email.strip()
-
-            # Find and update user
-            updated = False
-            for row in data:
-                if row.get("Email", "").strip() == email:
-                    row[field_name] = value
-                    updated = True
-                    break
-
-            if not updated:
-                logger.warning(f"User {email} not found in CSV")
+            # Find, update and write back user
+            updated = self._update_user_row(email, {field_name: value})
+            if updated is None:
                 return False
 
-            # Write back data
-            if self._write_csv_data(data):
+            if updated:
                 logger.info(f"Successfully updated {field_name} for {email}: {value}")
                 return True
             else:
@@ -468,27 +663,13 @@ class UserMetadataHandler:
             if not os.path.exists(self.csv_filename):
                 return False
 
-            # Read current data
-            data = self._read_csv_data()
-            email = email.strip()
-
-            # Find and update user
-            updated = False
-            for row in data:
-                if row.get("Email", "").strip() == email:
-                    # Update with new data while preserving existing data
-                    for key, value in updated_data.items():
-                        if key in self.headers:
-                            row[key] = str(value)
-                    updated = True
-                    break
-
-            if not updated:
-                logger.warning(f"User {email} not found in CSV")
+            # Update with new data while preserving existing data
+            updates = {key: str(value) for key, value in updated_data.items() if key in self.headers}
+            updated = self._update_user_row(email, updates)
+            if updated is None:
                 return False
 
-            # Write back data
-            if self._write_csv_data(data):
+            if updated:
                 logger.info(f"Successfully updated metadata for {email}")
                 return True
             else:
@@ -564,25 +745,15 @@ class UserMetadataHandler:
                 logger.error("CSV file does not exist")
                 return False
 
-            # Read current data
-            data = self._read_csv_data()
-            email = email.strip()
-
-            # Find and update user
-            updated = False
-            for row in data:
-                if row.get("Email", "").strip() == email:
-                    row["Diagnose PDN Code"] = diagnose_code
-                    row["Diagnose Comments"] = diagnose_comments
-                    updated = True
-                    break
-
-            if not updated:
-                logger.warning(f"User {email} not found in CSV")
+            # Find, update and write back user
+            updated = self._update_user_row(email, {
+                "Diagnose PDN Code": diagnose_code,
+                "Diagnose Comments": diagnose_comments
+            })
+            if updated is None:
                 return False
 
-            # Write back data
-            if self._write_csv_data(data):
+            if updated:
                 logger.info(f"Successfully updated Diagnose Code for {email}: {diagnose_code}")
                 return True
             else:
@@ -596,31 +767,52 @@ class UserMetadataHandler:
     def get_statistics(self) -> Dict[str, Any]:
         """
         Get statistics about the CSV data.
-        
+
+        Served from the incrementally maintained statistics view, which is
+        updated on every metadata write.
+
         Returns:
             Dictionary containing statistics
         """
         try:
-            data = self._read_csv_data()
-
-            stats = {
-                "total_users": len(data),
-                "users_with_pdn_code": len([row for row in data if row.get("PDN Code", "").strip()]),
-                "users_with_voice_code": len([row for row in data if row.get("PDN Voice Code", "").strip()]),
-                "users_with_diagnose_code": len([row for row in data if row.get("Diagnose PDN Code", "").strip()]),
-                "users_with_comments": len([row for row in data if row.get("Diagnose Comments", "").strip()]),
-                "date_range": {
-                    "earliest": min([row.get("Date", "") for row in data if row.get("Date")], default=""),
-                    "latest": max([row.get("Date", "") for row in data if row.get("Date")], default="")
-                }
-            }
-
-            return stats
+            return self._get_statistics_view().get_summary()
 
         except Exception as e:
             logger.error(f"Error getting statistics: {e}")
             return {}
 
+    def recompute_statistics(self) -> Dict[str, Any]:
+        """
+        Recompute the statistics with a full pass over the CSV file.
+
+        Returns:
+            Dictionary containing the recomputed statistics
+        """
+        statistics = MetadataStatistics.from_rows(self.read_metadata_generator())
+        self._save_statistics(statistics)
+        logger.info(f"Recomputed metadata statistics for {statistics.total_users} users")
+        return statistics.get_summary()
+
+    def verify_statistics(self) -> bool:
+        """
+        Compare the incremental statistics with a full recompute.
+
+        The recomputed statistics replace the stored ones on mismatch.
+
+        Returns:
+            True if the incremental statistics were correct, False otherwise
+        """
+        stored = self._get_statistics_view()
+        recomputed = MetadataStatistics.from_rows(self.read_metadata_generator())
+
+        if stored == recomputed:
+            return True
+
+        logger.warning(f"Metadata statistics mismatch: stored {stored.get_summary()} "
+                       f"recomputed {recomputed.get_summary()}")
+        self._save_statistics(recomputed)
+        return False
+
     def format_date_readable(self, date_str: str) -> str:
         """
         Convert date from YYYY-MM-DD format to DD/MM/YYYY format for better readability.
@@ -681,3 +873,28 @@ class UserMetadataHandler:
             return False
 
 
+
+
+# Process-wide handlers, one per saved results directory
+_shared_handlers: Dict[str, UserMetadataHandler] = {}
+_shared_handlers_lock = threading.Lock()
+
+
+def get_metadata_handler() -> UserMetadataHandler:
+    """
+    Get the shared metadata handler for the current saved results directory.
+
+    Sharing the handler across requests keeps its row cache, email and
+    User ID indexes and statistics warm. They are refreshed whenever the
+    CSV file's modification time or size changes.
+
+    Returns:
+        UserMetadataHandler instance shared within the process
+    """
+    base_dir = str(PDNFilePath().get_base_dir().resolve())
+    with _shared_handlers_lock:
+        handler = _shared_handlers.get(base_dir)
+        if handler is None:
+            handler = UserMetadataHandler()
+            _shared_handlers[base_dir] = handler
+        return handler
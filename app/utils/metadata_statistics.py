@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained statistics over the user metadata CSV.
+
+Usage:
+    python -m app.utils.metadata_statistics [--verify]
+"""
+
+import argparse
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime, date
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# CSV fields counted as "users with <field>" when non-empty
+COUNTED_FIELDS = [
+    "PDN Code",
+    "PDN Voice Code",
+    "Diagnose PDN Code",
+    "Diagnose Comments",
+    "PDN Update Comments"
+]
+
+# Date formats found in the "Date" column, readable format first
+DATE_FORMATS = ["%d/%m/%Y", "%Y-%m-%d"]
+
+
+def parse_metadata_date(date_str: str) -> Optional[date]:
+    """
+    Parse a metadata date in DD/MM/YYYY or YYYY-MM-DD format.
+
+    Args:
+        date_str: Date string from the CSV
+
+    Returns:
+        date object, or None if the string is empty or not a known format
+    """
+    date_str = (date_str or "").strip()
+    if not date_str:
+        return None
+
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def get_file_signature(file_path: Path) -> Optional[Tuple[int, int]]:
+    """
+    Get a (mtime_ns, size) signature identifying a file version.
+
+    Returns:
+        Signature tuple, or None if the file does not exist
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class MetadataStatistics:
+    """Aggregate counters over metadata rows, updated one row at a time."""
+
+    def __init__(self):
+        self.total_users = 0
+        self.field_counts = Counter({field: 0 for field in COUNTED_FIELDS})
+        self.pdn_code_distribution = Counter()
+        self.signups_per_day = Counter()  # ISO date -> number of users
+        self.earliest: Optional[str] = None  # ISO date
+        self.latest: Optional[str] = None  # ISO date
+        self.csv_signature: Optional[Tuple[int, int]] = None
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, str]]) -> "MetadataStatistics":
+        """Build statistics with a full pass over the rows."""
+        stats = cls()
+        for row in rows:
+            stats.add_row(row)
+        return stats
+
+    def _apply(self, row: Dict[str, str], delta: int) -> None:
+        """Add (delta=1) or remove (delta=-1) one row's contribution."""
+        if not (row.get("Email") or "").strip():
+            return
+
+        self.total_users += delta
+
+        for field in COUNTED_FIELDS:
+            if (row.get(field) or "").strip():
+                self.field_counts[field] += delta
+
+        pdn_code = (row.get("PDN Code") or "").strip()
+        if pdn_code:
+            self.pdn_code_distribution[pdn_code] += delta
+            if self.pdn_code_distribution[pdn_code] <= 0:
+                del self.pdn_code_distribution[pdn_code]
+
+        signup_date = parse_metadata_date(row.get("Date", ""))
+        if signup_date is None:
+            return
+
+        day = signup_date.isoformat()
+        self.signups_per_day[day] += delta
+        if delta > 0:
+            if self.earliest is None or day < self.earliest:
+                self.earliest = day
+            if self.latest is None or day > self.latest:
+                self.latest = day
+        elif self.signups_per_day[day] <= 0:
+            del self.signups_per_day[day]
+            # Only rescan the days when a range boundary disappears
+            if day in (self.earliest, self.latest):
+                self.earliest = min(self.signups_per_day, default=None)
+                self.latest = max(self.signups_per_day, default=None)
+
+    def add_row(self, row: Dict[str, str]) -> None:
+        """Account for a new metadata row."""
+        self._apply(row, 1)
+
+    def remove_row(self, row: Dict[str, str]) -> None:
+        """Remove a metadata row's contribution."""
+        self._apply(row, -1)
+
+    def update_row(self, old_row: Dict[str, str], new_row: Dict[str, str]) -> None:
+        """Replace one row's contribution with its updated version."""
+        self._apply(old_row, -1)
+        self._apply(new_row, 1)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """
+        Get the statistics in the format returned by UserMetadataHandler.get_statistics.
+
+        Returns:
+            Dictionary containing statistics
+        """
+        def readable(day: Optional[str]) -> str:
+            return date.fromisoformat(day).strftime("%d/%m/%Y") if day else ""
+
+        return {
+            "total_users": self.total_users,
+            "users_with_pdn_code": self.field_counts["PDN Code"],
+            "users_with_voice_code": self.field_counts["PDN Voice Code"],
+            "users_with_diagnose_code": self.field_counts["Diagnose PDN Code"],
+            "users_with_comments": self.field_counts["Diagnose Comments"],
+            "users_with_update_comments": self.field_counts["PDN Update Comments"],
+            "pdn_code_distribution": dict(self.pdn_code_distribution),
+            "signups_per_day": dict(sorted(self.signups_per_day.items())),
+            "date_range": {
+                "earliest": readable(self.earliest),
+                "latest": readable(self.latest)
+            }
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the statistics for the sidecar file."""
+        return {
+            "total_users": self.total_users,
+            "field_counts": dict(self.field_counts),
+            "pdn_code_distribution": dict(self.pdn_code_distribution),
+            "signups_per_day": dict(self.signups_per_day),
+            "earliest": self.earliest,
+            "latest": self.latest,
+            "csv_signature": list(self.csv_signature) if self.csv_signature else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MetadataStatistics":
+        """Deserialize statistics written by to_dict."""
+        stats = cls()
+        stats.total_users = data.get("total_users", 0)
+        stats.field_counts.update(data.get("field_counts", {}))
+        stats.pdn_code_distribution.update(data.get("pdn_code_distribution", {}))
+        stats.signups_per_day.update(data.get("signups_per_day", {}))
+        stats.earliest = data.get("earliest")
+        stats.latest = data.get("latest")
+        signature = data.get("csv_signature")
+        stats.csv_signature = tuple(signature) if signature else None
+        return stats
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MetadataStatistics):
+            return NotImplemented
+        return self.get_summary() == other.get_summary()
+
+    def save(self, file_path: Path) -> None:
+        """Atomically write the statistics sidecar file."""
+        tmp_path = Path(f"{file_path}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path: Path) -> Optional["MetadataStatistics"]:
+        """Load the statistics sidecar file, or None if missing or unreadable."""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load metadata statistics from {file_path}: {e}")
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute user metadata statistics from the CSV')
+    parser.add_argument('--verify', action='store_true',
+                        help='Compare the stored incremental statistics with a full recompute')
+    args = parser.parse_args()
+
+    from .csv_metadata_handler import UserMetadataHandler
+
+    handler = UserMetadataHandler()
+    if args.verify:
+        matches = handler.verify_statistics()
+        print("Statistics match" if matches else "Statistics mismatch, recomputed from CSV")
+    else:
+        handler.recompute_statistics()
+
+    print(json.dumps(handler.get_statistics(), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Migrate user directories under saved_results between the flat and sharded layouts.
+
+Usage:
+    python -m app.utils.migrate_user_layout --to sharded [--dry-run]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .pdn_file_path import PDNFilePath, LAYOUTS, LAYOUT_SHARDED
+
+logger = logging.getLogger(__name__)
+
+
+def _merge_user_dir(source: Path, target: Path, dry_run: bool) -> int:
+    """
+    Move files from source into an already existing target directory.
+
+    Files that already exist in the target are left in place in the source
+    so nothing is overwritten.
+
+    Returns:
+        Number of conflicting files left behind in the source directory
+    """
+    conflicts = 0
+    for item in source.iterdir():
+        destination = target / item.name
+        if destination.exists():
+            logger.warning(f"Conflict, keeping both copies: {item} -> {destination}")
+            conflicts += 1
+            continue
+        if not dry_run:
+            os.replace(item, destination)
+
+    if not dry_run and conflicts == 0:
+        source.rmdir()
+
+    return conflicts
+
+
+def migrate_user_layout(target_layout: str = LAYOUT_SHARDED, base_dir: Optional[str] = None,
+                        dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Move every user directory into the target layout.
+
+    Directories are renamed within the same base directory, so the move is
+    cheap and the migration can be interrupted and re-run safely. Lookups
+    through PDNFilePath find users in either layout while it runs.
+
+    Args:
+        target_layout: Layout to migrate to ('flat' or 'sharded')
+        base_dir: Saved results directory. Defaults to SAVED_RESULTS_DIR
+        dry_run: Only report what would be moved
+
+    Returns:
+        Dictionary with counts of moved and merged user directories and conflicting files
+    """
+    if target_layout not in LAYOUTS:
+        raise ValueError(f"Invalid saved results layout: {target_layout}")
+
+    pdn_file_path = PDNFilePath(base_dir, layout=target_layout)
+    source_layouts = [layout for layout in LAYOUTS if layout != target_layout]
+
+    stats = {"moved": 0, "merged": 0, "conflicts": 0, "dry_run": dry_run}
+
+    for source_layout in source_layouts:
+        # Materialise the listing first since we rename while iterating
+        for source in list(pdn_file_path.iter_user_dirs(source_layout)):
+            target = pdn_file_path.get_layout_user_dir(source.name, target_layout)
+
+            if target.exists():
+                conflicts = _merge_user_dir(source, target, dry_run)
+                stats["merged"] += 1
+                stats["conflicts"] += conflicts
+                continue
+
+            logger.info(f"Moving {source} -> {target}")
+            if not dry_run:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(source), str(target))
+            stats["moved"] += 1
+
+    # Remove shard directories left empty after migrating back to flat
+    if not dry_run and target_layout != LAYOUT_SHARDED:
+        for shard in pdn_file_path.get_base_dir().iterdir():
+            if shard.is_dir() and pdn_file_path.is_shard_name(shard.name):
+                for second in list(shard.iterdir()):
+                    if second.is_dir() and not any(second.iterdir()):
+                        second.rmdir()
+                if not any(shard.iterdir()):
+                    shard.rmdir()
+
+    logger.info(f"User layout migration finished: {stats}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate saved_results user directories between layouts')
+    parser.add_argument('--to', dest='target_layout', choices=LAYOUTS, default=LAYOUT_SHARDED,
+                        help='Layout to migrate to (default: sharded)')
+    parser.add_argument('--base-dir', type=str, default=None,
+                        help='Saved results directory (default: SAVED_RESULTS_DIR or saved_results)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Only report what would be moved')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    stats = migrate_user_layout(args.target_layout, args.base_dir, args.dry_run)
+    print(stats)
+
+
+if __name__ == '__main__':
+    main()
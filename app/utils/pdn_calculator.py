@@ -1,178 +1,462 @@
 import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .question_index import get_question_index
 
 logger = logging.getLogger(__name__)
 
+# Score keys in the order used to pick the dominant trait (first wins a tie)
+SCORE_KEYS = ('A', 'T', 'P', 'E', 'D', 'S', 'F')
+SCORE_INDEX = {key: index for index, key in enumerate(SCORE_KEYS)}
+ENERGY_INDEX = {'D': 4, 'S': 5, 'F': 6}
+NO_SCORES = (0,) * len(SCORE_KEYS)
+
+# Scoring stage of each questionnaire phase, PartF is not scored
+PHASE_STAGES = {'PartA': 0, 'PartB': 1, 'PartC': 2, 'PartD': 3, 'PartE': 4}
+STAGE_NAMES = ('A', 'B', 'C', 'D', 'E')
+
+# Points per rank in Stage B (energy) and Stage E (dominant trait)
+STAGE_B_RANK_POINTS = {1: 3, 2: 2, 3: 1}
+STAGE_E_RANK_POINTS = {1: 8, 2: 4, 3: 2, 4: 0}
+
+# Stage A options adding a point to both of their traits
+STAGE_A_SCORED_OPTIONS = ('AE', 'TP')
+
+PDN_MATRIX = {
+    ('P', 'D'): 'P10', ('P', 'S'): 'P2', ('P', 'F'): 'P6',
+    ('E', 'D'): 'E1', ('E', 'S'): 'E5', ('E', 'F'): 'E9',
+    ('A', 'D'): 'A7', ('A', 'S'): 'A11', ('A', 'F'): 'A3',
+    ('T', 'D'): 'T4', ('T', 'S'): 'T8', ('T', 'F'): 'T12'
+}
+
+
+@dataclass
+class PDNResult:
+    """Outcome of a PDN calculation, with the scores that led to it."""
+
+    __slots__ = ('pdn_code', 'trait', 'energy', 'scores', 'stages', 'margins', 'explanation')
+
+    pdn_code: str
+    trait: str
+    energy: str
+    scores: Dict[str, float]  # final score per key in SCORE_KEYS
+    stages: Dict[str, Dict[str, float]]  # cumulative scores after each stage A-E
+    margins: Dict[str, Dict[str, Any]]  # lead of the trait/energy over the runner-up
+    explanation: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            'pdn_code': self.pdn_code,
+            'trait': self.trait,
+            'energy': self.energy,
+            'scores': dict(self.scores),
+            'stages': {stage: dict(scores) for stage, scores in self.stages.items()},
+            'margins': {key: dict(margin) for key, margin in self.margins.items()},
+            'explanation': self.explanation
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PDNResult":
+        """Create a result from a dictionary written by to_dict."""
+        return cls(**{field: data[field] for field in cls.__slots__})
+
+
+def _margin(keys: Tuple[str, ...], scores: list, winner: int) -> Dict[str, Any]:
+    """Describe the winner's lead over the best other key."""
+    runner_up = max((index for index in range(len(keys)) if index != winner), key=scores.__getitem__)
+    return {'runner_up': keys[runner_up], 'margin': scores[winner] - scores[runner_up]}
+
+
+def _explain(trait: str, energy: str, pdn_code: str, margins: Dict[str, Dict[str, Any]]) -> str:
+    """Summarize why the code was assigned."""
+    explanation = (f"Trait {trait} leads {margins['trait']['runner_up']} by {margins['trait']['margin']} points; "
+                   f"energy {energy} leads {margins['energy']['runner_up']} by {margins['energy']['margin']} points.")
+    if pdn_code == 'NA':
+        explanation += f" No PDN code matches trait {trait} with energy {energy}."
+    return explanation
+
+
+def _choice_contribution(code: str) -> Tuple[Tuple[int, int], ...]:
+    """Stage A (score index, points) pairs for a selected option code."""
+    if code in STAGE_A_SCORED_OPTIONS:
+        return (SCORE_INDEX[code[0]], 1), (SCORE_INDEX[code[1]], 1)
+    return ()
+
+
+def _rank_contribution(stage: int, code: str, rank) -> Tuple[Tuple[int, int], ...]:
+    """Stage B/E (score index, points) pairs for one ranked option."""
+    if stage == 1:
+        points = STAGE_B_RANK_POINTS.get(rank)
+        return ((ENERGY_INDEX[code], points),) if points else ()
+
+    points = STAGE_E_RANK_POINTS.get(rank)
+    return ((SCORE_INDEX[code], points),) if points is not None else ()
+
+
+class CompiledScorer:
+    """
+    PDN scoring with per-question contribution tables built once from questions.json.
+
+    Scoring is a single pass over the answers: each answer is looked up by its
+    key and its contribution added to its stage's scores. Answers are validated
+    against the same questions when they are submitted (see schemas.AnswerIn),
+    so every option and rank they hold has a table entry, and each question
+    only has a handful of distinct answers for code() to cache.
+    """
+
+    def __init__(self, question_index):
+        # answer key -> (stage, contribution table)
+        self.questions: Dict[str, Tuple[int, dict]] = {}
+        # answer key -> (stage, distinct answer -> score vector), filled by code()
+        self.vectors: Dict[str, Tuple[int, dict]] = {}
+
+        for question in question_index:
+            stage = PHASE_STAGES.get(question.phase)
+            if stage is None:
+                continue
+
+            if stage == 0:
+                table = {code: _choice_contribution(code) for code in question.option_codes}
+            elif stage in (1, 4):
+                ranks = STAGE_B_RANK_POINTS if stage == 1 else STAGE_E_RANK_POINTS
+                table = {(code, rank): _rank_contribution(stage, code, rank)
+                         for code in question.option_codes for rank in ranks}
+            elif stage == 3:
+                # Stage D options are trait pairs, e.g. 'TP'
+                table = {code: (SCORE_INDEX[code[0]], SCORE_INDEX[code[1]]) for code in question.option_codes}
+            else:
+                table = {}
+
+            self.questions[str(question.number)] = (stage, table)
+            self.vectors[str(question.number)] = (stage, {})
 
-def calculate_pdn_code(answers: dict) -> dict:
+    def contribution(self, key: str, answer: dict) -> Optional[Tuple[int, Sequence[Tuple[int, float]]]]:
+        """
+        Get the score contribution of one answer.
+
+        Args:
+            key: Question number as stored in the answers, e.g. '12'
+            answer: The stored answer
+
+        Returns:
+            (stage, [(score index, points), ...]), or None if the question is not scored
+        """
+        entry = self.questions.get(key)
+        if entry is None:
+            return None
+        stage, table = entry
+        return stage, _answer_contribution(stage, table, answer)
+
+    def score(self, answers: dict, trace: bool = False) -> PDNResult:
+        """
+        Calculate the PDN code and scores for a set of answers.
+
+        Args:
+            answers: Dictionary containing user's answers with question numbers as keys
+            trace: Log the per-stage scores as a single debug message
+
+        Returns:
+            PDNResult with the code, scores, stage snapshots and margins
+        """
+        stages = [[0] * 7 for _ in STAGE_NAMES]
+        questions = self.questions
+
+        for key, answer in answers.items():
+            entry = questions.get(key)
+            if entry is None:
+                continue
+            stage, table = entry
+            if stage == 0:
+                # Inlined for the most common question type
+                contribution = table[answer['selected_option_code']]
+            else:
+                contribution = _answer_contribution(stage, table, answer)
+
+            scores = stages[stage]
+            for index, points in contribution:
+                scores[index] += points
+
+        return build_result(stages, trace)
+
+    def code(self, answers: dict) -> str:
+        """
+        Calculate only the PDN code, without the stage snapshots, margins and explanation.
+
+        Each distinct answer to a question is turned into a vector of its score
+        contributions once, the scores are then the column sums of the vectors.
+
+        Args:
+            answers: Dictionary containing user's answers with question numbers as keys
+
+        Returns:
+            The PDN code, or 'NA'
+        """
+        trait_vectors = [NO_SCORES]
+        energy_vectors = [NO_SCORES]
+        vectors = self.vectors
+
+        for key, answer in answers.items():
+            entry = vectors.get(key)
+            if entry is None:
+                continue
+            stage, cache = entry
+            signature = answer['selected_option_code'] if stage == 0 else tuple(answer['ranking'].items())
+            vector = cache.get(signature)
+            if vector is None:
+                vector = cache[signature] = self._vector(key, answer)
+
+            trait_vectors.append(vector)
+            if stage == 1:
+                energy_vectors.append(vector)
+
+        totals = [sum(column) for column in zip(*trait_vectors)]
+        energy_scores = [sum(column) for column in zip(*energy_vectors)][4:]
+        trait = SCORE_KEYS[max(range(7), key=totals.__getitem__)]
+        energy = SCORE_KEYS[4 + max(range(3), key=energy_scores.__getitem__)]
+        return PDN_MATRIX.get((trait, energy), 'NA')
+
+    def _vector(self, key: str, answer: dict) -> Tuple[float, ...]:
+        """Score contributions of one answer, in SCORE_KEYS order."""
+        stage, table = self.questions[key]
+        vector = list(NO_SCORES)
+        for index, points in _answer_contribution(stage, table, answer):
+            vector[index] += points
+        return tuple(vector)
+
+
+def _answer_contribution(stage: int, table: dict, answer: dict) -> Sequence[Tuple[int, float]]:
+    """(score index, points) pairs one answer adds to its stage's scores."""
+    if stage == 0:
+        return table[answer['selected_option_code']]
+
+    if stage == 1 or stage == 4:
+        pairs = []
+        for item in answer['ranking'].items():
+            pairs.extend(table[item])
+        return pairs
+
+    if stage == 2:
+        (trait1, value1), (trait2, value2) = answer['ranking'].items()
+        difference = value1 - value2
+        if not difference:
+            return []
+        adjustment = abs(difference)
+        winner, loser = (trait1, trait2) if difference > 0 else (trait2, trait1)
+        return [(SCORE_INDEX[winner], adjustment), (SCORE_INDEX[loser], -adjustment)]
+
+    (combo1, value1), (combo2, value2) = answer['ranking'].items()
+    difference = value1 - value2
+    if not difference:
+        return []
+    adjustment = abs(difference) * 2
+    winner, loser = (combo1, combo2) if difference > 0 else (combo2, combo1)
+    pairs = []
+    for combo, points in ((winner, adjustment), (loser, -(adjustment / 2))):
+        indexes = table[combo]
+        pairs.append((indexes[0], points))
+        pairs.append((indexes[1], points))
+    return pairs
+
+
+def build_result(stages: List[List[float]], trace: bool = False) -> PDNResult:
+    """
+    Build the result from the scores each stage contributed.
+
+    Args:
+        stages: Per-stage score vectors, in STAGE_NAMES and SCORE_KEYS order
+        trace: Log the per-stage scores as a single debug message
+
+    Returns:
+        PDNResult with the code, scores, stage snapshots and margins
+    """
+    # Cumulative scores after each stage, the last one being the final scores
+    snapshots = []
+    running = [0] * 7
+    for scores in stages:
+        running = [total + points for total, points in zip(running, scores)]
+        snapshots.append(running)
+    totals = running
+
+    trait_index = max(range(7), key=totals.__getitem__)
+    energy_scores = stages[1][4:]
+    energy_index = max(range(3), key=energy_scores.__getitem__)
+    trait = SCORE_KEYS[trait_index]
+    energy = SCORE_KEYS[4 + energy_index]
+    pdn_code = PDN_MATRIX.get((trait, energy), 'NA')
+
+    margins = {
+        'trait': _margin(SCORE_KEYS, totals, trait_index),
+        'energy': _margin(SCORE_KEYS[4:], energy_scores, energy_index)
+    }
+    result = PDNResult(
+        pdn_code=pdn_code,
+        trait=trait,
+        energy=energy,
+        scores=dict(zip(SCORE_KEYS, totals)),
+        stages={name: dict(zip(SCORE_KEYS, scores)) for name, scores in zip(STAGE_NAMES, snapshots)},
+        margins=margins,
+        explanation=_explain(trait, energy, pdn_code, margins)
+    )
+
+    if trace:
+        logger.debug("PDN scoring trace: stages=%s margins=%s code=%s", result.stages, margins, pdn_code)
+
+    return result
+
+
+class RunningScores:
+    """
+    Per-stage score accumulators updated one answer at a time.
+
+    A changed answer replaces its previous contribution, which is computed
+    again from the previous answer. Stored with the answers, the accumulators
+    make the final result, or a provisional one for a partial questionnaire,
+    a constant-time computation.
+    """
+
+    __slots__ = ('stages', 'answered')
+
+    def __init__(self, stages: Optional[List[List[float]]] = None, answered: int = 0):
+        self.stages = stages or [[0] * 7 for _ in STAGE_NAMES]
+        self.answered = answered  # number of scored questions answered
+
+    @classmethod
+    def from_answers(cls, answers: dict) -> "RunningScores":
+        """Build the accumulators from all stored answers."""
+        running = cls()
+        for key, answer in answers.items():
+            running.apply(key, answer)
+        return running
+
+    def apply(self, key: str, answer: dict, previous: Optional[dict] = None) -> bool:
+        """
+        Add an answer's contribution, replacing that question's previous one.
+
+        Args:
+            key: Question number as stored in the answers, e.g. '12'
+            answer: The stored answer
+            previous: The answer it replaces, if the question was answered before
+
+        Returns:
+            True if the question is scored
+        """
+        scorer = get_compiled_scorer()
+        entry = scorer.contribution(key, answer)
+        if entry is None:
+            return False
+
+        if previous is not None:
+            stage, pairs = scorer.contribution(key, previous)
+            for index, points in pairs:
+                self.stages[stage][index] -= points
+        else:
+            self.answered += 1
+
+        stage, pairs = entry
+        for index, points in pairs:
+            self.stages[stage][index] += points
+        return True
+
+    def finalize(self, trace: bool = False) -> PDNResult:
+        """Get the result for the answers applied so far."""
+        return build_result(self.stages, trace)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {'stages': self.stages, 'answered': self.answered}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunningScores":
+        """Create accumulators from a dictionary written by to_dict."""
+        stages = [list(scores) for scores in data['stages']]
+        if len(stages) != len(STAGE_NAMES) or any(len(scores) != 7 for scores in stages):
+            raise ValueError("Malformed running scores")
+        # Files saved before the count kept every answer's contribution
+        answered = data['answered'] if 'answered' in data else len(data['contributions'])
+        return cls(stages, int(answered))
+
+
+@lru_cache(maxsize=4)
+def get_compiled_scorer(questions_path: Optional[str] = None) -> CompiledScorer:
+    """
+    Get the compiled scorer for a questions file, built once per process.
+
+    Args:
+        questions_path: Path to the questions JSON file. Defaults to app/data/questions.json
+
+    Returns:
+        CompiledScorer for the file
+    """
+    return CompiledScorer(get_question_index(questions_path))
+
+
+def calculate_pdn_code(answers: dict) -> str:
     """
     Calculate the PDN code based on user's answers.
     Args:
         answers (dict): Dictionary containing user's answers with question numbers as keys
+    Returns:
+        str: The calculated PDN code, or 'NA'
+    """
+    return get_compiled_scorer().code(answers)
+
+
+def calculate_pdn_result(answers: dict, trace: bool = False) -> PDNResult:
+    """
+    Calculate the PDN code with its scores, stage snapshots and margins.
+    Args:
+        answers (dict): Dictionary containing user's answers with question numbers as keys
+        trace (bool): Log the per-stage scores as a single debug message
+    Returns:
+        PDNResult: The calculation result
+    """
+    return get_compiled_scorer().score(answers, trace)
+
+
+def calculate_pdn_scores(answers: dict, trace: bool = False) -> dict:
+    """
+    Calculate the PDN code and trait/energy scores based on user's answers.
+    Args:
+        answers (dict): Dictionary containing user's answers with question numbers as keys
+        trace (bool): Log the per-stage scores as a single debug message
     Returns:
         dict: Dictionary containing the calculated PDN code and related information
     """
-    # Initialize result dictionary
-    result = {
-        'pdn_code': 'NA',
-        'trait': 'Undetermined',
-        'energy': 'Undetermined',
-        'scores': {'A': 0, 'T': 0, 'P': 0, 'E': 0, 'D': 0, 'S': 0, 'F': 0},
-        'explanation': ''
-    }
+    return calculate_pdn_result(answers, trace).to_dict()
 
-    # Stage A: Primary Trait Calculation
-    trait_counts = {'A': 0, 'T': 0, 'P': 0, 'E': 0}
-    # answer = data.questions
-    for i in range(1, 27):
-        if str(i) in answers:
-            answer = answers[str(i)]['selected_option_code']
-            if answer == 'AP':
-                trait_counts['A'] += 0
-                trait_counts['P'] += 0
-            elif answer == 'ET':
-                trait_counts['E'] += 0
-                trait_counts['T'] += 0
-            elif answer == 'AE':
-                trait_counts['A'] += 1
-                trait_counts['E'] += 1
-            elif answer == 'TP':
-                trait_counts['T'] += 1
-                trait_counts['P'] += 1
-
-    for trait, score in trait_counts.items():
-        result['scores'][trait] += score
-    dominant_trait = max(result['scores'], key=result['scores'].get)
-    result['trait'] = dominant_trait
-
-    logger.info("Stage A: Trait Calculation for A %s", result['scores']['A'])
-    logger.info("Stage A: Trait Calculation for T %s", result['scores']['T'])
-    logger.info("Stage A: Trait Calculation for P %s", result['scores']['P'])
-    logger.info("Stage A: Trait Calculation for E %s", result['scores']['E'])
-    logger.info("Stage A dominant trait %s", dominant_trait)
-
-    # Stage B: Energy Type Calculation
-    energy_counts = {'D': 0, 'S': 0, 'F': 0}
-    for i in range(27, 38):
-        if str(i) in answers:
-            ranking = answers[str(i)]['ranking']
-            for energy, rank in ranking.items():
-                if rank == 1:
-                    energy_counts[energy] += 3
-                elif rank == 2:
-                    energy_counts[energy] += 2
-                elif rank == 3:
-                    energy_counts[energy] += 1
-
-    result['scores'].update(energy_counts)
-    dominant_energy = max(energy_counts, key=energy_counts.get)
-    result['energy'] = dominant_energy
-
-    logger.info("Stage B: Energy Type Calculation for D %s", energy_counts['D'])
-    logger.info("Stage B: Energy Type Calculation for S %s", energy_counts['S'])
-    logger.info("Stage B: Energy Type Calculation for F %s", energy_counts['F'])
-    logger.info("Stage B dominant energy %s", dominant_energy)
-
-    # Stage C: Validation and Tie-Breaking
-    for i in range(38, 43):
-        if str(i) in answers:
-            ranking = answers[str(i)]['ranking']
-            traits = list(ranking.keys())
-            trait1, trait2 = traits
-            value1, value2 = ranking[trait1], ranking[trait2]
-
-            difference = value1 - value2
-            score_adjustment = abs(difference)
-
-            if difference > 0:
-                result['scores'][trait1] += score_adjustment
-                result['scores'][trait2] -= score_adjustment
-            elif difference < 0:
-                result['scores'][trait1] -= score_adjustment
-                result['scores'][trait2] += score_adjustment
-
-    # for trait, score in trait_counts.items():
-    #     result['scores'][trait] += score
-    dominant_trait = max(result['scores'], key=result['scores'].get)
-    result['trait'] = dominant_trait
-
-    logger.info("Stage C: Trait Calculation for A %s", result['scores']['A'])
-    logger.info("Stage C: Trait Calculation for T %s", result['scores']['T'])
-    logger.info("Stage C: Trait Calculation for P %s", result['scores']['P'])
-    logger.info("Stage C: Trait Calculation for E %s", result['scores']['E'])
-    logger.info("Stage C dominant trait %s", dominant_trait)
-
-    # Stage D: Validation and Tie-Breaking
-    for i in range(43, 57):
-        if str(i) in answers:
-            ranking = answers[str(i)]['ranking']
-            # Get the trait combinations and their rankings
-            trait_combinations = list(ranking.keys())
-            if len(trait_combinations) == 2:
-                combo1, combo2 = trait_combinations
-                value1, value2 = ranking[combo1], ranking[combo2]
-
-                difference = value1 - value2
-                score_adjustment = abs(difference) * 2
-
-                if difference > 0:
-                    # Add points to both traits in the winning combination
-                    result['scores'][combo1[0]] += score_adjustment
-                    result['scores'][combo1[1]] += score_adjustment
-                    # Subtract points from both traits in the losing combination
-                    result['scores'][combo2[0]] -= score_adjustment / 2
-                    result['scores'][combo2[1]] -= score_adjustment / 2
-                elif difference < 0:
-                    # Add points to both traits in the winning combination
-                    result['scores'][combo2[0]] += score_adjustment
-                    result['scores'][combo2[1]] += score_adjustment
-                    # Subtract points from both traits in the losing combination
-                    result['scores'][combo1[0]] -= score_adjustment / 2
-                    result['scores'][combo1[1]] -= score_adjustment / 2
-
-    # Recalculate dominant trait after all adjustments
-    dominant_trait = max(result['scores'], key=result['scores'].get)
-    result['trait'] = dominant_trait
-
-    logger.info("Stage D: Trait Calculation for A %s", result['scores']['A'])
-    logger.info("Stage D: Trait Calculation for T %s", result['scores']['T'])
-    logger.info("Stage D: Trait Calculation for P %s", result['scores']['P'])
-    logger.info("Stage D: Trait Calculation for E %s", result['scores']['E'])
-    logger.info("Stage D dominant trait %s", dominant_trait)
-
-    # StageE: Strengthen Dominant Trait
-    for i in range(57, 60):
-        if str(i) in answers:
-            ranking = answers[str(i)]['ranking']
-            for trait, rank in ranking.items():
-                if rank == 1:
-                    result['scores'][trait] += 8
-                elif rank == 2:
-                    result['scores'][trait] += 4
-                elif rank == 3:
-                    result['scores'][trait] += 2
-                elif rank == 4:
-                    result['scores'][trait] += 0
-
-    dominant_trait = max(result['scores'], key=result['scores'].get)
-    result['trait'] = dominant_trait
-
-    logger.info("Stage E: Trait Calculation for A %s", result['scores']['A'])
-    logger.info("Stage E: Trait Calculation for T %s", result['scores']['T'])
-    logger.info("Stage E: Trait Calculation for P %s", result['scores']['P'])
-    logger.info("Stage E: Trait Calculation for E %s", result['scores']['E'])
-    logger.info("Stage E dominant trait %s", dominant_trait)
-
-    # Finalizing the PDN code
-    pdn_matrix = {
-        ('P', 'D'): 'P10', ('P', 'S'): 'P2', ('P', 'F'): 'P6',
-        ('E', 'D'): 'E1', ('E', 'S'): 'E5', ('E', 'F'): 'E9',
-        ('A', 'D'): 'A7', ('A', 'S'): 'A11', ('A', 'F'): 'A3',
-        ('T', 'D'): 'T4', ('T', 'S'): 'T8', ('T', 'F'): 'T12'
-    }
 
-    pdn_code = pdn_matrix.get((result['trait'], result['energy']), 'NA')
-    result['pdn_code'] = pdn_code
+def get_pdn_result(answers: dict) -> PDNResult:
+    """
+    Get the result stored with the answers, calculating it if there is none.
+    Args:
+        answers (dict): User's answers, possibly with a stored 'results' entry
+    Returns:
+        PDNResult: The stored or calculated result
+    """
+    stored = answers.get('results')
+    if isinstance(stored, dict):
+        try:
+            return PDNResult.from_dict(stored)
+        except (KeyError, TypeError):
+            logger.warning("Ignoring malformed stored PDN results")
+    return calculate_pdn_result(answers)
 
-    logger.info("Finalizing the PDN code %s", pdn_code)
 
-    return pdn_code
+def get_running_scores(answers: dict) -> RunningScores:
+    """
+    Get the running scores stored with the answers, building them if there are none.
+    Args:
+        answers (dict): User's answers, possibly with a stored 'scoring' entry
+    Returns:
+        RunningScores: The accumulators for the answers
+    """
+    stored = answers.get('scoring')
+    if isinstance(stored, dict):
+        try:
+            return RunningScores.from_dict(stored)
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Ignoring malformed stored running scores")
+    return RunningScores.from_answers(answers)
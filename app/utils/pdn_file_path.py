@@ -1,63 +1,193 @@
+import hashlib
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, List, Optional
+
+# Storage layouts for user directories under the saved results directory
+LAYOUT_FLAT = "flat"  # saved_results/<safe_user>/
+LAYOUT_SHARDED = "sharded"  # saved_results/ab/cd/<safe_user>/
+LAYOUTS = (LAYOUT_FLAT, LAYOUT_SHARDED)
+
+# Shard directories are two lowercase hex characters (e.g. 'ab')
+_SHARD_NAME_RE = re.compile(r"^[0-9a-f]{2}$")
+
+
+@lru_cache(maxsize=1024)
+def _safe_username(user_email: str) -> str:
+    """Sanitise an email into a username, memoized for repeated lookups."""
+    safe_username = "".join(c for c in user_email if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    return safe_username.replace(' ', '_')
 
 
 class PDNFilePath:
     """Utility class for handling PDN file paths and user directories."""
 
-    def __init__(self, base_dir: Optional[str] = None):
+    def __init__(self, base_dir: Optional[str] = None, layout: Optional[str] = None):
         """
         Initialize PDNFilePath utility.
-        
+
         Args:
             base_dir: Base directory for saved results. Defaults to 'saved_results'
+            layout: User directory layout, 'flat' or 'sharded'.
+                    Defaults to the SAVED_RESULTS_LAYOUT environment variable or 'flat'
         """
         self.base_dir = Path(base_dir or os.getenv('SAVED_RESULTS_DIR', 'saved_results'))
+        self.layout = (layout or os.getenv('SAVED_RESULTS_LAYOUT', LAYOUT_FLAT)).strip().lower()
+        if self.layout not in LAYOUTS:
+            raise ValueError(f"Invalid saved results layout: {self.layout}")
 
     def get_base_dir(self) -> Path:
         """
         Get base directory.
-        
+
         Returns:
             Path object pointing to the base directory
         """
         return self.base_dir
 
-    def get_user_dir(self, user_email: str) -> Path:
+    @staticmethod
+    def get_safe_username(user_email: str) -> str:
         """
-        Get or create user directory based on email.
-        
+        Create a filesystem-safe username from an email.
+
         Args:
             user_email: User's email address
-            
+
+        Returns:
+            Username containing only alphanumerics, '-' and '_'
+        """
+        return _safe_username(user_email)
+
+    @staticmethod
+    def get_shard(safe_username: str) -> List[str]:
+        """
+        Get the two shard directory names for a safe username.
+
+        Args:
+            safe_username: Username as returned by get_safe_username
+
+        Returns:
+            List with the first and second level shard names (e.g. ['ab', 'cd'])
+        """
+        digest = hashlib.sha256(safe_username.encode("utf-8")).hexdigest()
+        return [digest[0:2], digest[2:4]]
+
+    @staticmethod
+    def is_shard_name(name: str) -> bool:
+        """Check whether a directory name is a shard directory name."""
+        return bool(_SHARD_NAME_RE.match(name))
+
+    def get_layout_user_dir(self, safe_username: str, layout: str) -> Path:
+        """
+        Get the user directory path for a specific layout without creating it.
+
+        Args:
+            safe_username: Username as returned by get_safe_username
+            layout: 'flat' or 'sharded'
+
+        Returns:
+            Path object pointing to the user's directory in that layout
+        """
+        if layout == LAYOUT_SHARDED:
+            first, second = self.get_shard(safe_username)
+            return self.base_dir / first / second / safe_username
+        return self.base_dir / safe_username
+
+    def _locate_user_dir(self, safe_username: str) -> Path:
+        """
+        Find the existing user directory in either layout.
+
+        The configured layout is checked first so that users who were already
+        migrated are found without a second lookup. If the user has no
+        directory yet, the path in the configured layout is returned.
+        """
+        primary = self.get_layout_user_dir(safe_username, self.layout)
+        if primary.is_dir():
+            return primary
+
+        for layout in LAYOUTS:
+            if layout == self.layout:
+                continue
+            candidate = self.get_layout_user_dir(safe_username, layout)
+            if candidate.is_dir():
+                return candidate
+
+        return primary
+
+    def resolve_user_dir(self, user_email: str) -> Path:
+        """
+        Resolve the user directory based on email without creating it.
+
+        Use this for read paths; the directory may not exist.
+
+        Args:
+            user_email: User's email address
+
         Returns:
             Path object pointing to the user's directory
         """
-        # Create safe username from email
-        safe_username = "".join(c for c in user_email if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_username = safe_username.replace(' ', '_')
+        return self._locate_user_dir(self.get_safe_username(user_email))
+
+    def ensure_user_dir(self, user_email: str) -> Path:
+        """
+        Resolve the user directory based on email and create it if missing.
+
+        Use this for write paths.
 
-        # Create user directory path
-        user_dir = self.base_dir / safe_username
+        Args:
+            user_email: User's email address
+
+        Returns:
+            Path object pointing to the user's directory
+        """
+        user_dir = self.resolve_user_dir(user_email)
 
         # Create directory if it doesn't exist
         user_dir.mkdir(parents=True, exist_ok=True)
 
         return user_dir
 
+    def get_user_dir(self, user_email: str) -> Path:
+        """
+        Get or create user directory based on email.
+
+        Kept for backward compatibility, equivalent to ensure_user_dir.
+
+        Args:
+            user_email: User's email address
+
+        Returns:
+            Path object pointing to the user's directory
+        """
+        return self.ensure_user_dir(user_email)
+
+    def resolve_user_file_path(self, user_email: str, filename: str) -> Path:
+        """
+        Get file path within user directory without creating the directory.
+
+        Args:
+            user_email: User's email address
+            filename: Name of the file
+
+        Returns:
+            Path object pointing to the file within user directory
+        """
+        return self.resolve_user_dir(user_email) / filename
+
     def get_user_file_path(self, user_email: str, filename: str) -> Path:
         """
-        Get file path within user directory.
-        
+        Get file path within user directory, creating the directory if missing.
+
         Args:
             user_email: User's email address
             filename: Name of the file
-            
+
         Returns:
             Path object pointing to the file within user directory
         """
-        user_dir = self.get_user_dir(user_email)
+        user_dir = self.ensure_user_dir(user_email)
         file_path = user_dir / filename
 
         return file_path
@@ -65,27 +195,55 @@ class PDNFilePath:
     def find_user_file(self, user_email: str, file_type: str) -> Optional[Path]:
         """
         Find user file based on email and file type.
-        
+
         Args:
             user_email: User's email address
             file_type: Type of file to find
-            
+
         Returns:
             Path object pointing to the file, or None if not found
         """
-        # Create safe username from email
-        safe_username = "".join(c for c in user_email if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_username = safe_username.replace(' ', '_')
-        
-        # Create user directory path without creating it
-        user_dir = self.base_dir / safe_username
-        
+        # Resolve user directory path without creating it
+        user_dir = self.resolve_user_dir(user_email)
+
         # Only search if directory exists
         if not user_dir.exists():
             return None
-        
+
         list_of_files = list(user_dir.glob(f"*{file_type}"))
         if len(list_of_files) == 0:
             return None
-        return list_of_files[0] 
-        
+        return list_of_files[0]
+
+    def iter_user_dirs(self, layout: Optional[str] = None) -> Iterator[Path]:
+        """
+        Iterate over existing user directories.
+
+        Args:
+            layout: Restrict to one layout ('flat' or 'sharded'). Defaults to both.
+
+        Yields:
+            Path objects pointing to user directories
+        """
+        if not self.base_dir.is_dir():
+            return
+
+        layouts = [layout] if layout else list(LAYOUTS)
+
+        for entry in self.base_dir.iterdir():
+            if not entry.is_dir() or entry.name.startswith('.'):
+                continue
+
+            if self.is_shard_name(entry.name):
+                # Safe usernames are derived from emails and never look like a
+                # two character hex shard, so this is a first level shard dir
+                if LAYOUT_SHARDED not in layouts:
+                    continue
+                for second in entry.iterdir():
+                    if not second.is_dir() or not self.is_shard_name(second.name):
+                        continue
+                    for user_dir in second.iterdir():
+                        if user_dir.is_dir():
+                            yield user_dir
+            elif LAYOUT_FLAT in layouts:
+                yield entry
@@ -0,0 +1,163 @@
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Default questionnaire file
+QUESTIONS_PATH = Path(__file__).parent.parent / "data" / "questions.json"
+
+# Questionnaire phases holding scored questions, in order
+QUESTION_PHASES = ["PartA", "PartB", "PartC", "PartD", "PartE", "PartF"]
+
+# Phases rendered as a 7 step scale between two options (see questionnaire.html)
+SCALE_PHASES = {"PartC", "PartD"}
+
+# Answer kinds
+KIND_CHOICE = "choice"  # selected_option_code
+KIND_RANKING = "ranking"  # ranking: {code: rank}
+KIND_SCALE = "scale"  # ranking: {left_code: points, right_code: points}
+
+# Points split between the two options of a scale question
+SCALE_TOTAL_POINTS = 12
+
+
+class QuestionInfo:
+    """Parsed information about a single questionnaire question."""
+
+    __slots__ = ("number", "phase", "kind", "text", "options", "option_codes")
+
+    def __init__(self, number: int, phase: str, kind: str, text: str, options: List[dict]):
+        self.number = number
+        self.phase = phase
+        self.kind = kind
+        self.text = text
+        self.options = options
+        self.option_codes = [option.get("code") for option in options]
+
+
+class QuestionIndex:
+    """Questions of the scored phases indexed by question number."""
+
+    def __init__(self, questions_data: dict):
+        self.questions: Dict[int, QuestionInfo] = {}
+        # Kept so the exact questionnaire behind the version can be stored
+        self.data = questions_data
+        self.version = questions_version(questions_data)
+
+        phases = questions_data.get("phases", {})
+        for phase in QUESTION_PHASES:
+            for key, question in phases.get(phase, {}).get("questions", {}).items():
+                if phase in SCALE_PHASES:
+                    kind = KIND_SCALE
+                elif question.get("type") == "ranking":
+                    kind = KIND_RANKING
+                else:
+                    kind = KIND_CHOICE
+
+                number = int(key)
+                self.questions[number] = QuestionInfo(
+                    number, phase, kind, question.get("text", ""), question.get("options", [])
+                )
+
+        self.numbers = sorted(self.questions)
+
+    def get(self, question_number: int) -> Optional[QuestionInfo]:
+        """Get a question by number, or None if it is not a scored question."""
+        return self.questions.get(question_number)
+
+    def validate_answer(self, question_number: int, selected_option_code: Optional[str],
+                        ranking: Optional[dict]) -> Optional[str]:
+        """
+        Check a submitted answer against its question.
+
+        Args:
+            question_number: Question number
+            selected_option_code: Selected option code, for choice questions
+            ranking: {code: rank} for ranking questions, {code: points} for scale questions
+
+        Returns:
+            Error message, or None if the answer is valid
+        """
+        question = self.questions.get(question_number)
+        if question is None:
+            return f"Unknown question {question_number}"
+
+        if question.kind == KIND_CHOICE:
+            if selected_option_code not in question.option_codes:
+                return f"Invalid option {selected_option_code!r} for question {question_number}"
+            return None
+
+        if not isinstance(ranking, dict) or set(ranking) != set(question.option_codes):
+            return f"Ranking for question {question_number} must cover options {question.option_codes}"
+
+        values = list(ranking.values())
+        if not all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+            return f"Ranking values for question {question_number} must be integers"
+
+        if question.kind == KIND_RANKING:
+            if sorted(values) != list(range(1, len(values) + 1)):
+                return f"Ranks for question {question_number} must be 1 to {len(values)}"
+        elif min(values) < 0 or sum(values) != SCALE_TOTAL_POINTS:
+            return f"Scale points for question {question_number} must be non-negative and add up to {SCALE_TOTAL_POINTS}"
+
+        return None
+
+    def __iter__(self):
+        return (self.questions[number] for number in self.numbers)
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+
+def questions_version(questions_data: dict) -> str:
+    """
+    Content hash identifying a questionnaire, independent of the file's formatting.
+
+    Args:
+        questions_data: Parsed questions JSON
+
+    Returns:
+        16 hex digit version, stored with answers saved against the questionnaire
+    """
+    canonical = json.dumps(questions_data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=4)
+def _load_question_index(path: str) -> QuestionIndex:
+    with open(path, "r", encoding="utf-8") as f:
+        return QuestionIndex(json.load(f))
+
+
+# Index of app/data/questions.json, replaced when the file is reloaded
+_current_index: Optional[QuestionIndex] = None
+
+
+def get_question_index(path: Optional[Path] = None) -> QuestionIndex:
+    """
+    Get the question index for a questions file, parsed once per process.
+
+    Args:
+        path: Path to the questions JSON file. Defaults to app/data/questions.json
+
+    Returns:
+        QuestionIndex for the file
+    """
+    global _current_index
+    if path is not None:
+        return _load_question_index(str(path))
+    if _current_index is None:
+        _current_index = _load_question_index(str(QUESTIONS_PATH))
+    return _current_index
+
+
+def set_question_index(index: QuestionIndex) -> None:
+    """
+    Replace the index get_question_index() returns for app/data/questions.json.
+
+    Args:
+        index: Index of the reloaded questions file
+    """
+    global _current_index
+    _current_index = index
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store of every questionnaire version.
+
+Each questions.json the app has run with is kept under the saved results
+directory as .questionnaires/<version>.json, where the version is the content
+hash from question_index.questions_version. Answers files and stored results
+carry the version they were made with, so their texts can be resolved from
+here after the questionnaire changes.
+
+Usage:
+    python -m app.utils.questionnaire_versions [--list]
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .pdn_file_path import PDNFilePath
+from .question_index import QuestionIndex, get_question_index, questions_version
+
+logger = logging.getLogger(__name__)
+
+# Dot directories are not user directories
+VERSIONS_DIRNAME = ".questionnaires"
+
+VERSION_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+
+# (saved results directory, version) registered by this process
+_registered = set()
+
+
+def _versions_dir(file_path_util: Optional[PDNFilePath] = None) -> Path:
+    return (file_path_util or PDNFilePath()).get_base_dir() / VERSIONS_DIRNAME
+
+
+def _version_path(version: str, file_path_util: Optional[PDNFilePath] = None) -> Optional[Path]:
+    if not isinstance(version, str) or not VERSION_PATTERN.match(version):
+        return None
+    return _versions_dir(file_path_util) / f"{version}.json"
+
+
+def register_questionnaire(questions_data: dict, file_path_util: Optional[PDNFilePath] = None) -> str:
+    """
+    Add a questionnaire to the store, if it is not there yet.
+
+    Args:
+        questions_data: Parsed questions JSON
+        file_path_util: PDNFilePath to use, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        The questionnaire's version
+    """
+    version = questions_version(questions_data)
+    path = _version_path(version, file_path_util)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(questions_data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        logger.info(f"Registered questionnaire version {version}")
+    return version
+
+
+def register_current_questionnaire(file_path_util: Optional[PDNFilePath] = None) -> str:
+    """
+    Add the questionnaire the app is running with to the store.
+
+    The questionnaire is the one behind the current question index, which may
+    differ from questions.json on disk until the content registry reloads it.
+
+    Args:
+        file_path_util: PDNFilePath to use, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        The current questionnaire's version
+    """
+    return register_questionnaire(get_question_index().data, file_path_util)
+
+
+def ensure_current_registered(file_path_util: Optional[PDNFilePath] = None) -> str:
+    """
+    Register the current questionnaire once per process and saved results directory.
+
+    Args:
+        file_path_util: PDNFilePath to use, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        The current questionnaire's version
+    """
+    index = get_question_index()
+    base_dir = str((file_path_util or PDNFilePath()).get_base_dir())
+    if (base_dir, index.version) in _registered:
+        return index.version
+    version = register_questionnaire(index.data, file_path_util)
+    _registered.add((base_dir, version))
+    return version
+
+
+def load_questionnaire(version: str, file_path_util: Optional[PDNFilePath] = None) -> Optional[dict]:
+    """
+    Load a stored questionnaire.
+
+    Args:
+        version: Questionnaire version
+        file_path_util: PDNFilePath to use, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        Parsed questions JSON, or None if the version is not stored
+    """
+    path = _version_path(version, file_path_util)
+    if path is None or not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=8)
+def _load_version_index(path: str) -> QuestionIndex:
+    # Stored versions never change, so they are parsed once per process
+    with open(path, "r", encoding="utf-8") as f:
+        return QuestionIndex(json.load(f))
+
+
+def get_question_index_for_version(version: Optional[str],
+                                   file_path_util: Optional[PDNFilePath] = None) -> Optional[QuestionIndex]:
+    """
+    Get the question index of a questionnaire version.
+
+    Args:
+        version: Questionnaire version; None means the current questionnaire
+        file_path_util: PDNFilePath to use, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        QuestionIndex for the version, or None if the version is not stored
+    """
+    current = get_question_index()
+    if not version or version == current.version:
+        return current
+    path = _version_path(version, file_path_util)
+    if path is None or not path.exists():
+        return None
+    return _load_version_index(str(path))
+
+
+def list_versions(file_path_util: Optional[PDNFilePath] = None) -> List[Dict[str, Any]]:
+    """
+    List the stored questionnaire versions, oldest first.
+
+    Args:
+        file_path_util: PDNFilePath to use, defaults to SAVED_RESULTS_DIR
+
+    Returns:
+        [{"version", "registered_at", "current"}]
+    """
+    versions_dir = _versions_dir(file_path_util)
+    if not versions_dir.is_dir():
+        return []
+
+    current = get_question_index().version
+    stored = sorted((path.stat().st_mtime, path.stem) for path in versions_dir.glob("*.json")
+                    if VERSION_PATTERN.match(path.stem))
+    return [{
+        "version": version,
+        "registered_at": datetime.fromtimestamp(mtime).isoformat(timespec="seconds"),
+        "current": version == current
+    } for mtime, version in stored]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Register the current questionnaire version")
+    parser.add_argument('--list', action='store_true', help='List the stored versions instead')
+    args = parser.parse_args()
+
+    if args.list:
+        for version in list_versions():
+            print(json.dumps(version))
+    else:
+        print(register_current_questionnaire())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,11 @@
-import json
-from pathlib import Path
+from .content_registry import REPORTS, get_content_registry
 
 
 def load_pdn_report(pdn_code: str) -> dict:
     """
-    Load the report data for a specific PDN code from the JSON file.
+    Load the report data for a specific PDN code from the reports JSON file.
+
+    The file is parsed once and reloaded when it changes (see content_registry).
     
     Args:
         pdn_code (str): The PDN code to get the report for
@@ -12,13 +13,8 @@ def load_pdn_report(pdn_code: str) -> dict:
     Returns:
         dict: The report data for the specified PDN code
     """
-    # Get the path to the reports JSON file
-    reports_path = Path(__file__).parent.parent / "data" / "pdn_reports.json"
-
     try:
-        # Load the JSON file
-        with open(reports_path, 'r', encoding='utf-8') as f:
-            reports_data = json.load(f)
+        reports_data = get_content_registry().get(REPORTS)
 
         # Get the report for the specific PDN code
         report = reports_data.get(pdn_code)
@@ -0,0 +1,144 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, StrictInt, ValidationError, model_validator
+from pydantic_core import PydanticCustomError
+
+from .question_index import QuestionInfo, get_question_index
+
+# Loose email check, same rule as UserMetadataHandler._validate_email plus no whitespace
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+
+class AnswerIn(BaseModel):
+    """
+    An answer to one question, as posted by the questionnaire.
+
+    The answer is checked against the question index when the model is built,
+    so a valid AnswerIn can be stored and scored without further checks.
+    """
+
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    question_number: int
+    selected_option_code: Optional[str] = None
+    # {code: rank} for ranking questions, {code: points} for scale questions
+    ranking: Optional[Dict[str, StrictInt]] = None
+
+    @model_validator(mode="after")
+    def _check_against_question(self) -> "AnswerIn":
+        error = get_question_index().validate_answer(
+            self.question_number, self.selected_option_code, self.ranking
+        )
+        if error:
+            raise PydanticCustomError("invalid_answer", "{error}", {"error": error})
+        return self
+
+    @property
+    def question(self) -> QuestionInfo:
+        """The question this answer belongs to."""
+        return get_question_index().get(self.question_number)
+
+    def to_answer_data(self) -> Dict[str, Any]:
+        """Answer as stored in the answers file: option codes only, no question copy."""
+        return {
+            "selected_option_code": self.selected_option_code,
+            "ranking": self.ranking,
+        }
+
+
+class AnswerBatchIn(BaseModel):
+    """Several answers posted at once, e.g. a whole phase."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    answers: List[AnswerIn] = Field(min_length=1)
+
+
+class UserInfoIn(BaseModel):
+    """Personal details posted by the user form."""
+
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+    first_name: str = Field(min_length=1)
+    last_name: str = Field(min_length=1)
+    email: str = Field(pattern=EMAIL_PATTERN)
+    phone: str = ""
+    birth_year: str = Field("", pattern=r"^(\d{4})?$")
+    mother_language: str = ""
+    gender: str = ""
+    education: str = ""
+    job_title: str = ""
+
+
+class DiagnoseIn(BaseModel):
+    """A reviewer's verdict on one user; fields left out keep their stored value."""
+
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+    diagnose_pdn_code: Optional[str] = None
+    diagnose_comments: Optional[str] = None
+
+
+class DiagnoseItemIn(DiagnoseIn):
+    """A verdict in a batch, with the user it belongs to."""
+
+    email: str = Field(pattern=EMAIL_PATTERN)
+
+
+class DiagnoseBatchIn(BaseModel):
+    """Several verdicts committed with one metadata write."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    diagnoses: List[DiagnoseItemIn] = Field(min_length=1, max_length=500)
+
+
+class MessageOut(BaseModel):
+    """Response of a successful request."""
+
+    message: str
+    saved: Optional[int] = None
+
+
+class ErrorOut(BaseModel):
+    """Response of a rejected request."""
+
+    error: str
+    # Field or question number -> message
+    errors: Optional[Dict[str, str]] = None
+
+
+class ProgressOut(BaseModel):
+    """Questionnaire progress with the provisional result so far."""
+
+    answered: int
+    total: int
+    provisional: Optional[Dict[str, Any]] = None
+
+
+def error_messages(error: ValidationError, data: Any = None) -> Dict[str, str]:
+    """
+    Flatten a validation error into one message per field.
+
+    Errors in a batch of answers are keyed by the question number of the
+    answer they belong to, or by its position if it has none.
+
+    Args:
+        error: Validation error raised by one of the models
+        data: The data that was validated, used to find question numbers
+
+    Returns:
+        {field or question number: message}
+    """
+    answers = data.get("answers") if isinstance(data, dict) else None
+    messages = {}
+    for detail in error.errors():
+        loc = detail["loc"]
+        if len(loc) >= 2 and loc[0] == "answers" and isinstance(loc[1], int) and isinstance(answers, list):
+            answer = answers[loc[1]]
+            question_number = answer.get("question_number") if isinstance(answer, dict) else None
+            key = str(question_number if question_number is not None else loc[1])
+        else:
+            key = ".".join(str(part) for part in loc) or "body"
+        messages.setdefault(key, detail["msg"])
+    return messages
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Build and serve fingerprinted, precompressed static assets.
+
+The build copies every file under app/static to app/dist with a content hash
+in its name (js/marked.min.js -> js/marked.min.1a2b3c4d5e6f.js), writes .gz
+and, when brotli is installed, .br variants of text assets, and records the
+mapping in dist/manifest.json. Templates link assets with asset_url(), and
+/assets/ serves the best encoding the browser accepts with an immutable
+Cache-Control, so repeat page loads are answered from the browser cache.
+
+Usage:
+    python -m app.utils.static_assets [--static-dir app/static] [--dist-dir app/dist]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from flask import abort, current_app, request, send_file, url_for
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+STATIC_DIR = Path(__file__).parent.parent / "static"
+DIST_DIR = Path(__file__).parent.parent / "dist"
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# User content written at runtime, never part of the build
+SKIP_DIRS = {"uploads"}
+
+# Assets worth compressing; images are already compressed
+COMPRESSIBLE_SUFFIXES = {".js", ".css", ".svg", ".json", ".html", ".txt", ".map"}
+
+# Encodings in order of preference, with the suffix of their variant
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+HASH_LENGTH = 12
+ONE_YEAR = 365 * 24 * 60 * 60
+
+
+def fingerprint(relative_path: str, content: bytes) -> str:
+    """Insert the content hash before the file suffix of a relative asset path."""
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    stem, suffix = os.path.splitext(relative_path)
+    return f"{stem}.{digest}{suffix}"
+
+
+def _compress(encoding: str, content: bytes) -> Optional[bytes]:
+    if encoding == "gzip":
+        return gzip.compress(content, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(content, quality=11)
+    return None
+
+
+def _write_if_changed(path: Path, content: bytes) -> bool:
+    if path.exists() and path.stat().st_size == len(content) and path.read_bytes() == content:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+    return True
+
+
+def build_assets(static_dir: Optional[Path] = None, dist_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Build fingerprinted and precompressed copies of all static assets.
+
+    Unchanged assets are not rewritten, and files left over from earlier
+    builds are removed.
+
+    Args:
+        static_dir: Source directory. Defaults to app/static
+        dist_dir: Output directory. Defaults to app/dist
+
+    Returns:
+        Build summary with the number of assets, files written and bytes saved
+        by compression
+    """
+    static_dir = Path(static_dir or STATIC_DIR)
+    dist_dir = Path(dist_dir or DIST_DIR)
+
+    assets = {}
+    keep = {MANIFEST_FILENAME}
+    written = 0
+    original_bytes = 0
+    compressed_bytes = 0
+
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith("."))
+        for name in sorted(files):
+            if name.startswith("."):
+                continue
+            source = Path(root) / name
+            relative_path = source.relative_to(static_dir).as_posix()
+            content = source.read_bytes()
+
+            hashed_path = fingerprint(relative_path, content)
+            written += _write_if_changed(dist_dir / hashed_path, content)
+            keep.add(hashed_path)
+
+            encodings = []
+            if source.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+                best = len(content)
+                for encoding, suffix in ENCODINGS:
+                    compressed = _compress(encoding, content)
+                    # Only keep variants that are actually smaller
+                    if compressed is None or len(compressed) >= len(content):
+                        continue
+                    written += _write_if_changed(dist_dir / (hashed_path + suffix), compressed)
+                    keep.add(hashed_path + suffix)
+                    encodings.append(encoding)
+                    best = min(best, len(compressed))
+                original_bytes += len(content)
+                compressed_bytes += best
+
+            assets[relative_path] = {"path": hashed_path, "encodings": encodings}
+
+    manifest = {"version": MANIFEST_VERSION, "assets": assets}
+    _write_if_changed(dist_dir / MANIFEST_FILENAME,
+                      json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+    removed = 0
+    for path in dist_dir.rglob("*"):
+        if path.is_file() and path.relative_to(dist_dir).as_posix() not in keep:
+            path.unlink()
+            removed += 1
+
+    summary = {
+        "assets": len(assets),
+        "written": written,
+        "removed": removed,
+        "bytes_saved": original_bytes - compressed_bytes,
+        "brotli": brotli is not None
+    }
+    logger.info(f"Built static assets: {summary}")
+    return summary
+
+
+def load_manifest(dist_dir: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the asset manifest written by build_assets.
+
+    Args:
+        dist_dir: Build output directory. Defaults to app/dist
+
+    Returns:
+        {logical path: {"path": hashed path, "encodings": [...]}}, empty if
+        the assets have not been built
+    """
+    manifest_path = Path(dist_dir or DIST_DIR) / MANIFEST_FILENAME
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.error(f"Error loading asset manifest {manifest_path}: {e}")
+        return {}
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        logger.error(f"Unsupported asset manifest version in {manifest_path}")
+        return {}
+    return manifest.get("assets", {})
+
+
+def asset_url(filename: str) -> str:
+    """
+    Get the URL of a static asset, fingerprinted if the assets are built.
+
+    Args:
+        filename: Path relative to app/static, e.g. 'js/marked.min.js'
+
+    Returns:
+        /assets/ URL of the hashed file, or the plain /static/ URL as fallback
+    """
+    asset = current_app.extensions["static_assets"]["manifest"].get(filename)
+    if asset is None:
+        return url_for("static", filename=filename)
+    return url_for("assets", filename=asset["path"])
+
+
+def serve_asset(filename: str):
+    """Serve a built asset in the best encoding the client accepts."""
+    state = current_app.extensions["static_assets"]
+    asset = state["by_path"].get(filename)
+    if asset is None:
+        abort(404)
+
+    dist_dir = state["dist_dir"]
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    path, encoding = dist_dir / filename, None
+    for candidate, suffix in ENCODINGS:
+        if candidate in asset["encodings"] and request.accept_encodings[candidate]:
+            path, encoding = dist_dir / (filename + suffix), candidate
+            break
+
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=True, max_age=ONE_YEAR)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if asset["encodings"]:
+        response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_app(app, dist_dir: Optional[Path] = None) -> None:
+    """
+    Register the /assets/ route and the asset_url template helper.
+
+    Args:
+        app: Flask application
+        dist_dir: Build output directory. Defaults to app/dist
+    """
+    dist_dir = Path(dist_dir or DIST_DIR)
+    manifest = load_manifest(dist_dir)
+    if not manifest:
+        logger.info("Static assets are not built, serving them unversioned from /static")
+
+    app.extensions["static_assets"] = {
+        "dist_dir": dist_dir,
+        "manifest": manifest,
+        "by_path": {asset["path"]: asset for asset in manifest.values()}
+    }
+    app.add_url_rule("/assets/<path:filename>", "assets", serve_asset)
+    app.add_template_global(asset_url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build fingerprinted and precompressed static assets')
+    parser.add_argument('--static-dir', type=str, default=None,
+                        help='Source directory (default: app/static)')
+    parser.add_argument('--dist-dir', type=str, default=None,
+                        help='Output directory (default: app/dist)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    print(json.dumps(build_assets(args.static_dir, args.dist_dir)))
+
+
+if __name__ == '__main__':
+    main()
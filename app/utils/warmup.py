@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Load the app's shared state once, before gunicorn forks its workers.
+
+warmup() parses the content files, builds the question index and compiled
+scorer, imports the prompt templates and, with WARMUP_RAG=1, the RAG modules.
+Run from gunicorn's when_ready hook with preload_app (see gunicorn.conf.py),
+this happens once in the master process. The objects are then moved out of
+the garbage collector's reach with gc.freeze(), so the workers keep sharing
+the master's pages copy-on-write instead of each building and touching its
+own copy.
+
+Only pure-Python state is shared. The RAG system itself holds a Chroma SQLite
+connection and OpenAI HTTP clients, which must not be used from two
+processes: it is never built by the warmup, and after_fork() (gunicorn's
+post_fork hook) drops one a worker inherited, so each worker builds its own
+on its first chat.
+
+GET /ready answers 503 until the warmup has finished. In a process that was
+not warmed up before fork (e.g. the development server) the first call starts
+the warmup in the background.
+
+Usage:
+    python -m app.utils.warmup [--rag]
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from flask import jsonify
+
+logger = logging.getLogger(__name__)
+
+# Warmup progress of this process, inherited by forked workers
+_status: Dict[str, Any] = {"state": "pending", "components": {}}
+_lock = threading.Lock()
+
+
+def _load_content() -> None:
+    from .content_registry import CONFIG, QUESTIONS, REPORTS, get_content_registry
+
+    registry = get_content_registry()
+    for name in (CONFIG, QUESTIONS, REPORTS):
+        registry.get(name)
+
+
+def _load_scoring() -> None:
+    from .pdn_calculator import get_compiled_scorer
+    from .question_index import get_question_index
+
+    get_question_index()
+    get_compiled_scorer()
+
+
+def _load_prompts() -> None:
+    from .. import prompts  # noqa: F401
+
+
+def _load_rag() -> None:
+    # The modules only: the RAG system's connections are opened in each worker
+    from ..pdn_chat_ai import pdn_chat_rag  # noqa: F401
+
+
+COMPONENTS: Dict[str, Callable[[], None]] = {
+    "content": _load_content,
+    "scoring": _load_scoring,
+    "prompts": _load_prompts,
+    "rag": _load_rag
+}
+
+
+def warmup(rag: Optional[bool] = None, freeze: bool = False) -> Dict[str, Any]:
+    """
+    Load the shared state of this process. Runs once; later calls return the status.
+
+    A component that fails to load is reported and left to load lazily on
+    first use, as without a warmup.
+
+    Args:
+        rag: Import the RAG modules too. Defaults to the WARMUP_RAG environment
+             variable, off unless set to 1
+        freeze: Call gc.freeze() afterwards; for the process that forks the workers
+
+    Returns:
+        Warmup status, see get_status()
+    """
+    global _status
+    with _lock:
+        if _status["state"] != "pending":
+            return get_status()
+        _status = {"state": "running", "started_at": datetime.now().isoformat(timespec="seconds"), "components": {}}
+
+    if rag is None:
+        rag = os.getenv("WARMUP_RAG", "0").lower() in ("1", "true", "yes")
+
+    for name, load in COMPONENTS.items():
+        if name == "rag" and not rag:
+            continue
+        start = time.perf_counter()
+        try:
+            load()
+            component = {"ok": True}
+        except Exception as e:
+            logger.error(f"Warmup of {name} failed: {e}")
+            component = {"ok": False, "error": str(e)}
+        component["seconds"] = round(time.perf_counter() - start, 3)
+        _status["components"][name] = component
+
+    if freeze:
+        # Collect first so that only live objects are moved to the permanent generation
+        gc.collect()
+        gc.freeze()
+        _status["frozen_objects"] = gc.get_freeze_count()
+
+    _status["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    _status["state"] = "ready"
+    logger.info(f"Warmup finished: {json.dumps(_status['components'])}")
+    return get_status()
+
+
+def after_fork() -> None:
+    """Drop the state of the master process that a worker must not share, in a forked worker."""
+    from ..pdn_chat_ai.chat_routes import reset_rag_system
+
+    reset_rag_system()
+
+
+def start_warmup() -> None:
+    """Start the warmup in a background thread, unless it has started already."""
+    if _status["state"] == "pending":
+        threading.Thread(target=warmup, name="warmup", daemon=True).start()
+
+
+def get_status() -> Dict[str, Any]:
+    """
+    Get this process's warmup status.
+
+    Returns:
+        {"state": "pending" | "running" | "ready", "components": {name: {"ok", "seconds", "error"}},
+         "started_at", "finished_at", "frozen_objects"} as far as known
+    """
+    return {**_status, "components": dict(_status["components"])}
+
+
+def is_ready() -> bool:
+    return _status["state"] == "ready"
+
+
+def ready():
+    """Readiness probe: 200 once the warmup has finished, 503 before"""
+    if not is_ready():
+        start_warmup()
+        return jsonify({"ready": False, **get_status()}), 503
+    return jsonify({"ready": True, **get_status()})
+
+
+def init_app(app) -> None:
+    """
+    Register the GET /ready readiness endpoint.
+
+    Args:
+        app: Flask app
+    """
+    app.add_url_rule("/ready", "ready", ready)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the app's shared state and report the time per component")
+    parser.add_argument('--rag', action='store_true', help='Import the RAG modules too')
+    args = parser.parse_args()
+
+    print(json.dumps(warmup(rag=args.rag), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
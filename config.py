@@ -7,17 +7,19 @@ APP_DIR = BASE_DIR / "app"
 DATA_DIR = APP_DIR / "data"
 STATIC_DIR = APP_DIR / "static"
 TEMPLATES_DIR = APP_DIR / "templates"
-SAVED_RESULTS_DIR = BASE_DIR / "saved_results"
-LOGS_DIR = BASE_DIR / "logs"
+SAVED_RESULTS_DIR = Path(os.environ.get('SAVED_RESULTS_DIR', BASE_DIR / "saved_results"))
+LOGS_DIR = Path(os.environ.get('LOGS_DIR', BASE_DIR / "logs"))
+SESSION_FILE_DIR = Path(os.environ.get('SESSION_FILE_DIR', BASE_DIR / "flask_session"))
 
 # Ensure directories exist
-LOGS_DIR.mkdir(exist_ok=True)
-SAVED_RESULTS_DIR.mkdir(exist_ok=True)
+LOGS_DIR.mkdir(parents=True, exist_ok=True)
+SAVED_RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
 # Flask configuration
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'your-very-secret-key')
     SESSION_TYPE = 'filesystem'
+    SESSION_FILE_DIR = SESSION_FILE_DIR
     DEBUG = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
     
     # File paths
@@ -0,0 +1,30 @@
+"""
+Gunicorn settings: load the app and its shared state once in the master
+process, then fork the workers, which share it copy-on-write.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Workers default to WEB_CONCURRENCY and the address to PORT, as gunicorn's own
+defaults. WARMUP_RAG=1 also imports the RAG modules in the master. The RAG
+system itself is built in each worker on its first chat, as its database
+connection and HTTP clients cannot be shared across fork.
+"""
+
+# Import app.main in the master, so the workers inherit the loaded app
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before the first worker is forked
+    from app.utils.warmup import warmup
+
+    status = warmup(freeze=True)
+    server.log.info(f"Warmup finished, components: {status['components']}")
+
+
+def post_fork(server, worker):
+    # Runs in each worker right after fork
+    from app.utils.warmup import after_fork
+
+    after_fork()
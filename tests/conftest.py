@@ -0,0 +1,29 @@
+"""
+Shared pytest setup: the app writes under a temporary directory.
+
+SAVED_RESULTS_DIR, LOGS_DIR and SESSION_FILE_DIR are set before the test
+modules import the app, so what is written at import time (e.g. the
+questionnaire version store, logs/app.log) and by code that binds the
+directory when imported (answer_storage, the blueprint loggers, Flask-Session)
+stays out of the repository. Tests that need their own saved results directory
+still set it with monkeypatch.
+"""
+
+import os
+import shutil
+import tempfile
+
+_tmp_dir = None
+
+
+def pytest_configure(config):
+    global _tmp_dir
+    _tmp_dir = tempfile.mkdtemp(prefix="pdn-tests-")
+    os.environ["SAVED_RESULTS_DIR"] = _tmp_dir
+    os.environ["LOGS_DIR"] = os.path.join(_tmp_dir, "logs")
+    os.environ["SESSION_FILE_DIR"] = os.path.join(_tmp_dir, "flask_session")
+
+
+def pytest_unconfigure(config):
+    if _tmp_dir is not None:
+        shutil.rmtree(_tmp_dir, ignore_errors=True)
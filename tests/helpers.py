@@ -0,0 +1,51 @@
+"""
+Answers builders shared by the tests.
+"""
+
+import json
+
+from app.utils.pdn_file_path import PDNFilePath
+from app.utils.question_index import get_question_index, KIND_CHOICE, KIND_RANKING, KIND_SCALE
+
+# Scale points as submitted by the questionnaire's 7 step scale
+SCALE_POINTS = [(12, 0), (10, 2), (8, 4), (6, 6), (4, 8), (2, 10), (0, 12)]
+
+
+def build_answers(email):
+    """Answer every question with its first option / ranking order"""
+    answers = {"metadata": {"email": email}}
+    for question in get_question_index():
+        codes = question.option_codes
+        if question.kind == KIND_CHOICE:
+            answers[str(question.number)] = {"selected_option_code": codes[0]}
+        elif question.kind == KIND_RANKING:
+            answers[str(question.number)] = {"ranking": {code: rank for rank, code in enumerate(codes, 1)}}
+        else:
+            answers[str(question.number)] = {"ranking": {codes[0]: 12, codes[1]: 0}}
+    return answers
+
+
+def write_answers(email, answers):
+    """Write a user's answers file under SAVED_RESULTS_DIR"""
+    path = PDNFilePath().get_user_file_path(email, f"{email}_answers_.json")
+    path.write_text(json.dumps(answers), encoding="utf-8")
+    return path
+
+
+def random_answers(rng):
+    """Answer a random subset of the questions with random valid answers"""
+    answers = {"metadata": {"email": "random@example.com"}}
+    for question in get_question_index():
+        if rng.random() < 0.1:
+            continue
+        codes = question.option_codes
+        if question.kind == KIND_CHOICE:
+            answer = {"selected_option_code": rng.choice(codes)}
+        elif question.kind == KIND_SCALE:
+            answer = {"ranking": dict(zip(codes, rng.choice(SCALE_POINTS)))}
+        else:
+            ranks = list(range(1, len(codes) + 1))
+            rng.shuffle(ranks)
+            answer = {"ranking": dict(zip(codes, ranks))}
+        answers[str(question.number)] = answer
+    return answers
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the streamed user metadata exports and their gzip
+negotiation
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.main import app
+from app.pdn_admin.admin_routes import EXPORT_FIELDS
+from app.utils.csv_metadata_handler import get_metadata_handler
+
+EMAILS = ["a@example.com", "b@example.com"]
+
+
+@pytest.fixture
+def admin(tmp_path, monkeypatch):
+    """Test client, admin session token and two users"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    handler = get_metadata_handler()
+    for email in EMAILS:
+        handler.append_user_metadata({"email": email})
+    handler.update_pdn_code("a@example.com", "P10")
+
+    client = app.test_client()
+    token = client.post("/pdn-admin/login", json={"password": "pdn"}).get_json()["session_token"]
+    return client, token
+
+
+def test_csv_and_ndjson_exports(admin):
+    """Both formats carry every user with the export fields"""
+    client, token = admin
+
+    response = client.get(f"/pdn-admin/export?session_token={token}", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert "Content-Encoding" not in response.headers
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row["email"] for row in rows] == EMAILS
+    assert list(rows[0]) == EXPORT_FIELDS
+    assert rows[0]["pdn_code"] == "P10"
+
+    response = client.get(f"/pdn-admin/metadata/csv?format=ndjson&session_token={token}",
+                          headers={"Accept-Encoding": "identity"})
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row["email"] for row in rows] == EMAILS
+    assert list(rows[1]) == EXPORT_FIELDS
+
+    assert client.get(f"/pdn-admin/export?format=xml&session_token={token}").status_code == 400
+    assert client.get("/pdn-admin/export").status_code == 401
+
+
+def test_exports_are_gzipped_when_accepted(admin):
+    """gzip is used when accepted with a non-zero quality only"""
+    client, token = admin
+    url = f"/pdn-admin/export?format=ndjson&session_token={token}"
+
+    response = client.get(url, headers={"Accept-Encoding": "gzip, deflate"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    lines = gzip.decompress(response.get_data()).decode("utf-8").splitlines()
+    assert [json.loads(line)["email"] for line in lines] == EMAILS
+
+    for refused in ("gzip;q=0", "identity, gzip;q=0"):
+        response = client.get(url, headers={"Accept-Encoding": refused})
+        assert "Content-Encoding" not in response.headers
+        assert len(response.get_data(as_text=True).splitlines()) == 2
+
+
+def test_csv_download_raw_or_merged(admin):
+    """The download is the metadata CSV file itself, or the merged export with ?merged=1"""
+    client, token = admin
+
+    response = client.get(f"/pdn-admin/download/csv?session_token={token}")
+    assert response.status_code == 200
+    assert "filename=user_metadata.csv" in response.headers["Content-Disposition"]
+    raw = get_metadata_handler().csv_filename.read_bytes()
+    body = response.get_data()
+    if response.headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    assert body == raw
+    assert list(csv.DictReader(io.StringIO(raw.decode("utf-8"))))[0]["Email"] == "a@example.com"
+
+    response = client.get(f"/pdn-admin/download/csv?merged=1&session_token={token}",
+                          headers={"Accept-Encoding": "identity"})
+    assert "filename=user_metadata.csv" in response.headers["Content-Disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert list(rows[0]) == EXPORT_FIELDS
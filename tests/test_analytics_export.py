@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the columnar analytics export of questionnaire answers
+"""
+
+import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy
+
+from app.utils.analytics_export import export_answers
+from app.utils.question_index import get_question_index
+from helpers import build_answers, write_answers
+
+
+def test_export_npz_is_incremental(tmp_path, monkeypatch):
+    """One row per user, and unchanged files are reused from the manifest"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path / "saved"))
+    write_answers("a@example.com", build_answers("a@example.com"))
+    second = write_answers("b@example.com", build_answers("b@example.com"))
+
+    output_dir = tmp_path / "analytics"
+    summary = export_answers(str(output_dir), "npz", workers=1)
+    assert summary["rows"] == 2
+    assert summary["scanned"] == 2
+
+    data = numpy.load(summary["path"])
+    assert sorted(data["email"]) == ["a@example.com", "b@example.com"]
+    assert all(code for code in data["pdn_code"])
+    first_question = get_question_index().numbers[0]
+    assert data[f"q{first_question}"][0] == get_question_index().get(first_question).option_codes[0]
+
+    summary = export_answers(str(output_dir), "npz", workers=1)
+    assert summary["scanned"] == 0
+    assert summary["reused"] == 2
+
+    answers = build_answers("b@example.com")
+    del answers[str(first_question)]
+    second.write_text(json.dumps(answers), encoding="utf-8")
+    os.utime(second, ns=(1, 1))
+
+    summary = export_answers(str(output_dir), "npz", workers=1)
+    assert summary["scanned"] == 1
+    assert summary["reused"] == 1
+    data = numpy.load(summary["path"])
+    row = list(data["email"]).index("b@example.com")
+    assert data[f"q{first_question}"][row] == ""
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script to verify compact answer storage, the read-time join of question
+texts and the migration of existing answers files
+"""
+
+import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.main import app
+from app.utils.answer_storage import expand_answers
+from app.utils.answers_migration import migrate_all_answers
+from app.utils.csv_metadata_handler import get_metadata_handler
+from app.utils.pdn_calculator import calculate_pdn_code
+from app.utils.pdn_file_path import PDNFilePath
+from app.utils.question_index import get_question_index
+from helpers import build_answers
+
+
+def build_legacy_answers(email):
+    """Answers as older versions saved them, with the question copied into each"""
+    answers = build_answers(email)
+    for question in get_question_index():
+        answers[str(question.number)].update(question_text=question.text, question_options=question.options)
+    return answers
+
+
+def write_file(email, answers):
+    path = PDNFilePath().get_user_file_path(email, f"{email}_answers.json")
+    path.write_text(json.dumps(answers, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def test_migration_compacts_files(tmp_path, monkeypatch):
+    """Migrated files are several times smaller and read back the same"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    legacy = build_legacy_answers("a@example.com")
+    path = write_file("a@example.com", legacy)
+
+    summary = migrate_all_answers(dry_run=True)
+    assert summary["migrated"] == 1
+    assert json.loads(path.read_text(encoding="utf-8")) == legacy
+
+    summary = migrate_all_answers()
+    assert summary["bytes_after"] * 5 < summary["bytes_before"]
+    compact = json.loads(path.read_text(encoding="utf-8"))
+    assert "question_text" not in compact["1"]
+    assert compact["questionnaire_version"] == get_question_index().version
+    assert expand_answers(compact) == {**legacy, "questionnaire_version": get_question_index().version}
+    assert calculate_pdn_code(compact) == calculate_pdn_code(legacy)
+
+    assert migrate_all_answers()["migrated"] == 0
+
+
+def test_answers_from_another_questionnaire_keep_their_texts(tmp_path, monkeypatch):
+    """Copies that differ from the current questionnaire are what the user saw"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    legacy = build_legacy_answers("a@example.com")
+    legacy["1"]["question_text"] = "An older wording"
+    path = write_file("a@example.com", legacy)
+
+    migrate_all_answers()
+    compact = json.loads(path.read_text(encoding="utf-8"))
+    assert compact["1"]["question_text"] == "An older wording"
+    assert "question_options" not in compact["1"] and "question_text" not in compact["2"]
+    assert "questionnaire_version" not in compact
+    assert expand_answers(compact)["1"]["question_text"] == "An older wording"
+
+
+def test_admin_view_joins_texts(tmp_path, monkeypatch):
+    """The dashboard still gets texts and options for compact files"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    get_metadata_handler().append_user_metadata({"email": "a@example.com"})
+    write_file("a@example.com", build_answers("a@example.com"))
+
+    client = app.test_client()
+    token = client.post("/pdn-admin/login", json={"password": "pdn"}).get_json()["session_token"]
+    data = client.get(f"/pdn-admin/user/questionnaire/a@example.com?session_token={token}").get_json()
+    question = get_question_index().get(1)
+    assert data["1"]["question_text"] == question.text
+    assert data["1"]["question_options"] == question.options
+
+    page = client.get(f"/pdn-admin/review-queue?session_token={token}").get_json()
+    assert "question_text" not in page["users"][0]["questionnaire"]["1"]
+    version = page["users"][0]["questionnaire_version"]
+    assert page["questionnaires"][version]["1"]["text"] == question.text
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script to verify recordings get duration, loudness, silence and waveform
+peaks once, returned by the admin voice endpoint
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy
+import pytest
+
+from app.main import app
+from app.pdn_admin import audio_routes
+from app.utils import audio_processing
+from app.utils.audio_analysis import analyze_audio, analyze_samples
+
+FIXTURES = Path(__file__).parent / "fixtures" / "audio"
+EMAIL = "a@example.com"
+
+
+def test_samples_are_summarized():
+    """Half a second of tone followed by half a second of silence"""
+    rate = 8000
+    tone = 0.5 * numpy.sin(2 * numpy.pi * 440 * numpy.arange(rate // 2) / rate)
+    samples = numpy.concatenate([tone, numpy.zeros(rate // 2)])
+
+    analysis = analyze_samples(samples, rate, peaks_count=10)
+    assert analysis["duration"] == 1.0
+    assert analysis["silence_ratio"] == 0.5
+    assert analysis["peak_db"] == -6.0
+    assert len(analysis["peaks"]) == 10
+    assert all(peak > 0.49 for peak in analysis["peaks"][:5])
+    assert analysis["peaks"][5:] == [0.0] * 5
+
+    assert analyze_samples(numpy.zeros(0), rate)["peaks"] == []
+    assert analyze_samples(numpy.zeros(100), rate)["rms_db"] == -100.0
+
+
+def test_wav_fixture_is_analyzed():
+    """The bundled WAV decodes without ffmpeg"""
+    analysis = analyze_audio(FIXTURES / "sample.wav")
+    assert analysis["duration"] == 0.25
+    assert analysis["silence_ratio"] == 0.0
+    assert len(analysis["peaks"]) == 200
+    assert max(analysis["peaks"]) <= 1.0
+
+
+@pytest.mark.skipif(audio_processing.find_ffmpeg() is None, reason="ffmpeg is not available")
+def test_webm_fixture_is_analyzed():
+    """The bundled WebM/Opus recording decodes with ffmpeg"""
+    analysis = analyze_audio(FIXTURES / "sample.webm")
+    assert analysis is not None
+    assert abs(analysis["duration"] - 0.25) < 0.05
+    assert len(analysis["peaks"]) == 200
+    assert max(analysis["peaks"]) <= 1.0
+
+
+def test_voice_endpoint_returns_waveform(tmp_path, monkeypatch):
+    """Processed recordings carry their analysis; older sidecars are backfilled"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    monkeypatch.setattr(audio_routes, "submit_recording", audio_processing.process_recording)
+    client = app.test_client()
+
+    with open(FIXTURES / "sample.wav", "rb") as f:
+        response = client.post("/pdn-admin/api/save-audio", data={
+            "username": EMAIL, "audio": (f, f"{EMAIL}_question1.wav")
+        })
+    path = Path(response.get_json()["file_path"])
+
+    token = client.post("/pdn-admin/login", json={"password": "pdn"}).get_json()["session_token"]
+    question1 = client.get(f"/pdn-admin/user/voice/{EMAIL}?session_token={token}").get_json()["voice_recordings"]["question1"]
+    assert question1["duration"] == 0.25
+    assert len(question1["peaks"]) == 200
+    assert question1["silence_ratio"] == 0.0
+
+    # A sidecar written before the analysis existed
+    meta_path = audio_processing.get_meta_path(path)
+    meta = json.loads(meta_path.read_text())
+    del meta["analysis"]
+    meta_path.write_text(json.dumps(meta))
+    assert audio_processing.process_all_recordings()["analyzed"] == 1
+    assert len(audio_processing.load_recording_meta(path)["analysis"]["peaks"]) == 200
+    assert audio_processing.process_all_recordings()["analyzed"] == 0
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test script to verify voice recordings are sniffed, stored compactly and
+served with their real Content-Type
+"""
+
+import os
+import shutil
+import sys
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.main import app
+from app.pdn_admin import audio_routes
+from app.utils import audio_processing
+from app.utils.pdn_file_path import PDNFilePath
+
+FIXTURES = Path(__file__).parent / "fixtures" / "audio"
+EMAIL = "a@example.com"
+
+
+def save_recording(tmp_path, fixture):
+    path = PDNFilePath(str(tmp_path)).ensure_user_dir(EMAIL) / f"{EMAIL}_question1.wav"
+    shutil.copy(FIXTURES / fixture, path)
+    return path
+
+
+def test_containers_are_sniffed_and_probed():
+    """WebM/Opus from MediaRecorder and PCM WAV are recognized with their duration"""
+    webm = audio_processing.probe_audio(FIXTURES / "sample.webm")
+    assert webm["container"] == "webm" and webm["codec"] == "opus"
+    assert webm["mimetype"] == "audio/webm"
+    # No Duration element: the timecode of the last block is used
+    assert webm["duration"] == 0.23
+
+    wav = audio_processing.probe_audio(FIXTURES / "sample.wav")
+    assert (wav["container"], wav["codec"], wav["duration"]) == ("wav", "pcm_s16le", 0.25)
+
+    assert audio_processing.sniff_container(b"OggS\x00") == "ogg"
+    assert audio_processing.sniff_container(b"\x00\x00\x00\x20ftypM4A ") == "mp4"
+    assert audio_processing.sniff_container(b"garbage") is None
+
+
+def test_webm_recording_is_stored_once_with_metadata(tmp_path, monkeypatch):
+    """A WebM/Opus recording saved as .wav is renamed, not transcoded"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    path = save_recording(tmp_path, "sample.webm")
+
+    meta = audio_processing.process_recording(path)
+    canonical = path.with_suffix(".webm")
+    assert not path.exists()
+    assert canonical.read_bytes() == (FIXTURES / "sample.webm").read_bytes()
+    assert meta["canonical"] == canonical.name
+    assert (meta["container"], meta["codec"], meta["duration"]) == ("webm", "opus", 0.23)
+    assert meta["size"] == meta["source_size"] == canonical.stat().st_size
+
+    assert audio_processing.resolve_recording(path) == (canonical, "audio/webm")
+    assert audio_processing.process_recording(path) == meta
+    assert audio_processing.process_all_recordings()["processed"] == 0
+
+    # A re-recording is served until it is processed
+    shutil.copy(FIXTURES / "sample.wav", path)
+    assert audio_processing.resolve_recording(path) == (path, "audio/wav")
+
+
+def replace_recording(path, fixture):
+    """Save a new recording under the name of path, as finalize_upload and save_audio do"""
+    tmp_path = path.with_name(path.name + ".upload")
+    shutil.copy(FIXTURES / fixture, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def test_recording_replaced_while_processed_is_kept(tmp_path, monkeypatch):
+    """A re-recording saved during processing is processed in turn, not removed"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    monkeypatch.setattr(audio_processing, "find_ffmpeg", lambda: None)
+    path = save_recording(tmp_path, "sample.webm")
+    probe_audio = audio_processing.probe_audio
+    calls = []
+
+    def probe_and_replace(probed):
+        info = probe_audio(probed)
+        calls.append(probed)
+        if len(calls) == 1:
+            replace_recording(path, "sample.wav")
+        return info
+
+    monkeypatch.setattr(audio_processing, "probe_audio", probe_and_replace)
+    meta = audio_processing.process_recording(path)
+    assert path.read_bytes() == (FIXTURES / "sample.wav").read_bytes()
+    assert (meta["canonical"], meta["container"]) == (path.name, "wav")
+    assert audio_processing.resolve_recording(path) == (path, "audio/wav")
+
+
+def test_recording_replaced_before_removal_is_kept(tmp_path, monkeypatch):
+    """The original is only removed if it is still the file that was processed"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    path = save_recording(tmp_path, "sample.webm")
+    write_meta = audio_processing._write_meta
+    calls = []
+
+    def write_meta_and_replace(recording, meta):
+        write_meta(recording, meta)
+        calls.append(meta)
+        if len(calls) == 1:
+            replace_recording(path, "sample.webm")
+
+    monkeypatch.setattr(audio_processing, "_write_meta", write_meta_and_replace)
+    meta = audio_processing.process_recording(path)
+    # The new recording was put back and processed again
+    assert len(calls) == 2
+    assert not path.exists()
+    assert path.with_suffix(".webm").read_bytes() == (FIXTURES / "sample.webm").read_bytes()
+    assert meta["canonical"] == path.with_suffix(".webm").name
+    assert sorted(f.name for f in path.parent.iterdir()) == sorted([path.with_suffix(".webm").name,
+                                                                    path.name + audio_processing.META_SUFFIX])
+
+
+def test_other_recordings_keep_their_bytes_without_ffmpeg(tmp_path, monkeypatch):
+    """Without a transcoder the recording is kept and described"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    monkeypatch.setattr(audio_processing, "find_ffmpeg", lambda: None)
+    path = save_recording(tmp_path, "sample.wav")
+
+    summary = audio_processing.process_all_recordings()
+    assert summary["processed"] == 1
+    assert summary["bytes_before"] == summary["bytes_after"] == path.stat().st_size
+
+    meta = audio_processing.load_recording_meta(path)
+    assert meta["canonical"] == path.name
+    assert (meta["mimetype"], meta["duration"]) == ("audio/wav", 0.25)
+    assert audio_processing.resolve_recording(path) == (path, "audio/wav")
+
+
+def test_saved_recordings_are_served_with_their_content_type(tmp_path, monkeypatch):
+    """Recordings saved through the API are processed and served as WebM"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    monkeypatch.setattr(audio_routes, "submit_recording", audio_processing.process_recording)
+    client = app.test_client()
+    recording = (FIXTURES / "sample.webm").read_bytes()
+
+    with open(FIXTURES / "sample.webm", "rb") as f:
+        response = client.post("/pdn-admin/api/save-audio", data={
+            "username": EMAIL, "audio": (f, f"{EMAIL}_question1.wav")
+        })
+    assert response.status_code == 200
+
+    token = client.post("/pdn-admin/login", json={"password": "pdn"}).get_json()["session_token"]
+    voice = client.get(f"/pdn-admin/user/voice/{EMAIL}?session_token={token}").get_json()
+    question1 = voice["voice_recordings"]["question1"]
+    assert question1["filename"] == f"{EMAIL}_question1.wav"
+    assert (question1["mimetype"], question1["duration"], question1["codec"]) == ("audio/webm", 0.23, "opus")
+
+    relative_path = Path(question1["path"]).relative_to(tmp_path)
+    response = client.get(f"/pdn-admin/audio/{relative_path}?session_token={token}")
+    assert response.mimetype == "audio/webm"
+    assert response.data == recording
+
+    # Links to the original name still work
+    original_path = relative_path.with_name(f"{EMAIL}_question1.wav")
+    response = client.get(f"/pdn-admin/audio/{original_path}?session_token={token}", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206 and response.mimetype == "audio/webm"
+    assert response.data == recording[:10]
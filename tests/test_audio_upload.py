@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script to verify chunked, resumable audio uploads
+"""
+
+import multiprocessing
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.main import app
+from app.utils.audio_upload import UPLOADS_DIRNAME, cleanup_stale_uploads, create_upload, finalize_upload, write_chunk
+from app.utils.pdn_file_path import PDNFilePath
+
+
+def test_chunks_are_appended_and_renamed_on_finalize(tmp_path, monkeypatch):
+    """Retried and overlapping chunks are stored once, gaps are rejected"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    client = app.test_client()
+    recording = os.urandom(3000)
+
+    response = client.post("/pdn-admin/api/audio-uploads", json={"username": "a@example.com", "question": "question1"})
+    assert response.status_code == 201
+    upload_id = response.get_json()["upload_id"]
+    url = f"/pdn-admin/api/audio-uploads/{upload_id}"
+
+    assert client.put(f"{url}?offset=0", data=recording[:1000]).get_json()["offset"] == 1000
+    # Retry of a chunk whose response was lost
+    assert client.put(f"{url}?offset=0", data=recording[:1000]).get_json()["offset"] == 1000
+    # A chunk starting after the received bytes tells the client where to resume
+    response = client.put(f"{url}?offset=2000", data=recording[2000:])
+    assert response.status_code == 409
+    assert response.get_json()["offset"] == 1000
+    # Overlapping resend
+    assert client.put(f"{url}?offset=500", data=recording[500:2000]).get_json()["offset"] == 2000
+    assert client.put(f"{url}?offset=2000", data=recording[2000:]).get_json()["offset"] == 3000
+    assert client.get(url).get_json()["offset"] == 3000
+
+    assert client.post(f"{url}/finalize", json={"size": 4000}).status_code == 409
+    result = client.post(f"{url}/finalize", json={"size": 3000}).get_json()
+    final_path = PDNFilePath(str(tmp_path)).resolve_user_file_path("a@example.com", "a@example.com_question1.wav")
+    assert result["file_path"] == str(final_path)
+    assert final_path.read_bytes() == recording
+
+    # Finalizing again is safe, writing after finalizing is not
+    assert client.post(f"{url}/finalize", json={"size": 3000}).get_json()["file_path"] == str(final_path)
+    assert client.put(f"{url}?offset=3000", data=b"x").status_code == 400
+    assert list(PDNFilePath(str(tmp_path)).iter_user_dirs()) == [final_path.parent]
+
+
+def test_aborted_and_stale_uploads_are_removed(tmp_path, monkeypatch):
+    """Discarded recordings leave nothing behind"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    client = app.test_client()
+
+    upload_id = client.post("/pdn-admin/api/audio-uploads", json={"username": "a@example.com"}).get_json()["upload_id"]
+    client.put(f"/pdn-admin/api/audio-uploads/{upload_id}?offset=0", data=b"short")
+    assert client.delete(f"/pdn-admin/api/audio-uploads/{upload_id}").status_code == 200
+    assert client.get(f"/pdn-admin/api/audio-uploads/{upload_id}").status_code == 404
+    assert client.get("/pdn-admin/api/audio-uploads/..%2F..").status_code == 404
+    assert client.post("/pdn-admin/api/audio-uploads", json={"username": "../a"}).status_code == 400
+
+    client.post("/pdn-admin/api/audio-uploads", json={"username": "a@example.com"})
+    assert cleanup_stale_uploads(max_age=-1) == 1
+    assert not any((tmp_path / UPLOADS_DIRNAME).iterdir())
+
+
+def send_and_finalize(base_dir, upload_id, recording, barrier, results):
+    """One web worker receiving a retried chunk, then the finalize request"""
+    file_path_util = PDNFilePath(base_dir)
+    barrier.wait()
+    offset = write_chunk(upload_id, 0, recording, file_path_util=file_path_util)
+    barrier.wait()
+    try:
+        results.put((offset, finalize_upload(upload_id, file_path_util=file_path_util)["size"]))
+    except Exception as e:
+        results.put((offset, repr(e)))
+
+
+def test_concurrent_requests_from_several_processes(tmp_path):
+    """Workers receiving the same chunk and finalize at once store and move the recording once"""
+    file_path_util = PDNFilePath(str(tmp_path))
+    upload_id = create_upload("a@example.com", "a@example.com_question1.wav", file_path_util=file_path_util)["upload_id"]
+    recording = os.urandom(256 * 1024)
+
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(4)
+    results = context.Queue()
+    workers = [context.Process(target=send_and_finalize,
+                               args=(str(tmp_path), upload_id, recording, barrier, results))
+               for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=30)
+
+    assert outcomes == [(len(recording), len(recording))] * 4
+    final_path = file_path_util.resolve_user_file_path("a@example.com", "a@example.com_question1.wav")
+    assert final_path.read_bytes() == recording
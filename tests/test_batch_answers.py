@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script to verify batch answer submission
+"""
+
+import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.main import app
+from app.utils import answer_storage
+from app.utils.pdn_calculator import calculate_pdn_code
+from app.utils.pdn_file_path import PDNFilePath
+from app.utils.question_index import get_question_index
+from helpers import build_answers
+
+
+def make_client(tmp_path, monkeypatch):
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    monkeypatch.setattr(answer_storage, "pdn_file_path", PDNFilePath(str(tmp_path)))
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session["email"] = "a@example.com"
+    return client
+
+
+def test_batch_saves_all_answers_in_one_write(tmp_path, monkeypatch):
+    """A whole questionnaire sent in batches is stored and scored like single answers"""
+    client = make_client(tmp_path, monkeypatch)
+    answers = build_answers("a@example.com")
+    batch = [{"question_number": int(key), **answer} for key, answer in answers.items() if key != "metadata"]
+
+    response = client.post("/pdn-diagnose/answers", json={"answers": batch[:30]})
+    assert response.status_code == 200
+    assert response.get_json()["saved"] == 30
+    response = client.post("/pdn-diagnose/answers", json={"answers": batch[30:]})
+    assert response.status_code == 200
+
+    progress = client.get("/pdn-diagnose/progress").get_json()
+    assert progress["answered"] == progress["total"]
+    assert progress["provisional"]["pdn_code"] == calculate_pdn_code(answers)
+
+    file_path = PDNFilePath(str(tmp_path)).resolve_user_file_path("a@example.com", "a@example.com_answers.json")
+    with open(file_path, encoding="utf-8") as f:
+        saved = json.load(f)
+    # Stored compactly, against the current questionnaire version
+    assert saved["1"] == {"selected_option_code": answers["1"]["selected_option_code"]}
+    assert saved["questionnaire_version"] == get_question_index().version
+
+
+def test_invalid_batch_saves_nothing(tmp_path, monkeypatch):
+    """One invalid answer rejects the whole batch"""
+    client = make_client(tmp_path, monkeypatch)
+    batch = [
+        {"question_number": 27, "ranking": {"D": 1, "S": 2, "F": 3}},
+        {"question_number": 28, "ranking": {"D": 1, "S": 1, "F": 3}},
+        {"question_number": 99, "selected_option_code": "AE"}
+    ]
+
+    response = client.post("/pdn-diagnose/answers", json={"answers": batch})
+    assert response.status_code == 400
+    assert set(response.get_json()["errors"]) == {"28", "99"}
+    assert client.get("/pdn-diagnose/progress").get_json()["answered"] == 0
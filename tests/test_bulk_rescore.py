@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the bulk PDN code recalculation job
+"""
+
+import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils import bulk_rescore
+from app.utils.answer_storage import get_answers_file_path
+from app.utils.bulk_rescore import rescore_all_users
+from app.utils.csv_metadata_handler import get_metadata_handler
+from app.utils.pdn_file_path import PDNFilePath
+from app.utils.pdn_calculator import calculate_pdn_code
+from helpers import build_answers, write_answers
+
+
+def test_dry_run_then_bulk_write(tmp_path, monkeypatch):
+    """Dry run reports changes without writing, a real run writes them all at once"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    handler = get_metadata_handler()
+    for email in ("a@example.com", "b@example.com", "c@example.com"):
+        handler.append_user_metadata({"email": email})
+
+    expected_code = calculate_pdn_code(build_answers("a@example.com"))
+    write_answers("a@example.com", build_answers("a@example.com"))
+    write_answers("b@example.com", build_answers("b@example.com"))
+    handler.update_pdn_code("b@example.com", expected_code)
+
+    events = list(rescore_all_users(dry_run=True, workers=1, batch_size=2))
+    assert [event["event"] for event in events].count("progress") == 2
+    changes = [event for event in events if event["event"] == "change"]
+    assert [(c["email"], c["old_code"], c["new_code"]) for c in changes] == [("a@example.com", "", expected_code)]
+    done = events[-1]
+    assert (done["changed"], done["unchanged"], done["missing"], done["written"]) == (1, 1, 1, False)
+    assert handler.get_user_by_email("a@example.com")["PDN Code"] == ""
+
+    done = list(rescore_all_users(workers=2, updated_by="tester"))[-1]
+    assert done["written"]
+    user = handler.get_user_by_email("a@example.com")
+    assert user["PDN Code"] == expected_code
+    assert user["PDN Update Comments"].endswith("by tester")
+    assert handler.verify_statistics()
+
+
+def stored_results(email):
+    with open(get_answers_file_path(email, PDNFilePath()), "r", encoding="utf-8") as f:
+        return json.load(f).get("results")
+
+
+def setup_users(monkeypatch, tmp_path):
+    """a@example.com's code changes, b@example.com's does not"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    # Scoring happens in this process
+    monkeypatch.setattr(bulk_rescore, "ProcessPoolExecutor", None)
+    handler = get_metadata_handler()
+    for email in ("a@example.com", "b@example.com"):
+        handler.append_user_metadata({"email": email})
+        write_answers(email, build_answers(email))
+    handler.update_pdn_code("b@example.com", calculate_pdn_code(build_answers("b@example.com")))
+    return handler
+
+
+def test_results_are_stored_after_the_codes(tmp_path, monkeypatch):
+    """A failed CSV update leaves the changed users' answers files untouched"""
+    handler = setup_users(monkeypatch, tmp_path)
+    update_users_bulk = type(handler).update_users_bulk
+    monkeypatch.setattr(type(handler), "update_users_bulk", lambda self, changes: False)
+
+    done = list(rescore_all_users(workers=1))[-1]
+    assert (done["changed"], done["unchanged"], done["written"]) == (1, 1, False)
+    assert stored_results("a@example.com") is None
+    assert stored_results("b@example.com")["pdn_code"] == handler.get_user_by_email("b@example.com")["PDN Code"]
+
+    monkeypatch.setattr(type(handler), "update_users_bulk", update_users_bulk)
+    assert list(rescore_all_users(workers=0))[-1]["written"]
+    assert stored_results("a@example.com")["pdn_code"] == handler.get_user_by_email("a@example.com")["PDN Code"]
+
+
+def test_stopped_run_writes_no_changes(tmp_path, monkeypatch):
+    """A client disconnecting from the streamed run leaves codes and results as they were"""
+    setup_users(monkeypatch, tmp_path)
+    events = rescore_all_users(workers=1, batch_size=1)
+    while next(events)["event"] != "change":
+        pass
+    events.close()
+
+    assert get_metadata_handler().get_user_by_email("a@example.com")["PDN Code"] == ""
+    assert stored_results("a@example.com") is None
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script to verify response compression and measure bytes saved per endpoint
+"""
+
+import gzip
+import json
+import os
+import sys
+import zlib
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, Response, jsonify
+
+from app.main import app as main_app
+from app.utils import compression
+from app.utils.csv_metadata_handler import get_metadata_handler
+from app.utils.pdn_file_path import PDNFilePath
+from helpers import build_answers
+
+
+def make_app():
+    app = Flask(__name__)
+    compression.init_app(app)
+
+    @app.route("/large")
+    def large():
+        return jsonify({"data": [{"name": "משתמש", "index": i} for i in range(200)]})
+
+    @app.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/encoded")
+    def encoded():
+        return Response(gzip.compress(b"x" * 2000), mimetype="application/json",
+                        headers={"Content-Encoding": "gzip"})
+
+    @app.route("/stream")
+    def stream():
+        return Response((json.dumps({"event": i}) + "\n" for i in range(50)), mimetype="application/x-ndjson")
+
+    return app
+
+
+def test_text_responses_are_compressed():
+    """Large responses are compressed, small and already encoded ones are not"""
+    client = make_app().test_client()
+
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    assert json.loads(gzip.decompress(response.data))["data"][0]["name"] == "משתמש"
+
+    response = client.get("/large")
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json()["data"][199]["index"] == 199
+
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+
+    response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert gzip.decompress(response.data) == b"x" * 2000
+
+
+def test_streams_are_compressed_chunk_by_chunk():
+    """Each streamed chunk can be decoded as soon as it arrives"""
+    client = make_app().test_client()
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"}, buffered=False)
+    assert response.headers["Content-Encoding"] == "gzip"
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    chunks = [decompressor.decompress(chunk) for chunk in response.response]
+    assert chunks[0] == b'{"event": 0}\n'
+    assert b"".join(chunks) == b"".join(json.dumps({"event": i}).encode() + b"\n" for i in range(50))
+
+
+def test_bytes_saved_per_endpoint(tmp_path, monkeypatch):
+    """Benchmark: admin JSON and page templates shrink by more than half"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    handler = get_metadata_handler()
+    for i in range(50):
+        email = f"user{i}@example.com"
+        handler.append_user_metadata({"email": email})
+        path = PDNFilePath().get_user_file_path(email, f"{email}_answers.json")
+        path.write_text(json.dumps(build_answers(email)), encoding="utf-8")
+
+    client = main_app.test_client()
+    token = client.post("/pdn-admin/login", json={"password": "pdn"}).get_json()["session_token"]
+    paths = [
+        "/pdn-admin/metadata",
+        f"/pdn-admin/user/questionnaire/user0@example.com?session_token={token}",
+        "/pdn-admin/dashboard",
+        "/pdn-diagnose/",
+    ]
+
+    results = compression.measure_bytes_saved(client, paths)
+    for path, result in results.items():
+        assert result["status"] == 200
+        assert result["encoded"] < result["identity"] / 2, \
+            f"{path}: {result['identity']} -> {result['encoded']} bytes"
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script to verify config.yaml, questions.json and the PDN reports are
+reloaded in place when they change, and that invalid files are not applied
+"""
+
+import gc
+import json
+import os
+import shutil
+import sys
+import weakref
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, current_app
+
+from app.utils import content_registry, question_index
+from app.utils.content_registry import (CONFIG, QUESTIONS, REPORTS, ContentRegistry, load_json,
+                                        validate_questions)
+from app.utils.pdn_calculator import get_compiled_scorer
+from app.utils.question_index import QUESTIONS_PATH, get_question_index
+from app.utils.report_generator import load_pdn_report
+
+
+def touch(path, data):
+    """Rewrite a file and move its mtime forward, as an edit a second later would"""
+    stamp = os.stat(path).st_mtime_ns if path.exists() else 0
+    path.write_text(data, encoding="utf-8")
+    os.utime(path, ns=(stamp + 10 ** 9, stamp + 10 ** 9))
+
+
+def copy_data_files(tmp_path):
+    for name in ("config.yaml", "questions.json", "pdn_reports.json"):
+        shutil.copy(content_registry.DATA_DIR / name, tmp_path / name)
+
+
+def test_changed_files_are_reloaded(tmp_path):
+    """Subscribers get the new and old value; broken files keep the last good one"""
+    path = tmp_path / "reports.json"
+    touch(path, json.dumps({"E5": "first"}))
+    registry = ContentRegistry(interval=60)
+    registry.register(REPORTS, path, load_json, content_registry.validate_reports)
+    calls = []
+    registry.subscribe(REPORTS, lambda new, old: calls.append((new, old)))
+
+    assert registry.get(REPORTS) == {"E5": "first"}
+    touch(path, json.dumps({"E5": "second"}))
+    assert registry.check() == []
+    assert registry.check(force=True) == [REPORTS]
+    assert registry.get(REPORTS) == {"E5": "second"}
+    assert calls == [({"E5": "second"}, {"E5": "first"})]
+
+    touch(path, "{not json")
+    assert registry.check(force=True) == []
+    touch(path, json.dumps({}))
+    assert registry.check(force=True) == []
+    assert registry.get(REPORTS) == {"E5": "second"}
+    assert registry.check(force=True) == []
+    assert len(calls) == 1
+
+
+def test_questions_reload_swaps_index_and_scorer(tmp_path, monkeypatch):
+    """A reworded question is picked up by the index; the scorer is rebuilt"""
+    monkeypatch.setattr(question_index, "_current_index", get_question_index())
+    path = tmp_path / "questions.json"
+    shutil.copy(QUESTIONS_PATH, path)
+    registry = ContentRegistry()
+    registry.register(QUESTIONS, path, load_json, validate_questions)
+    registry.subscribe(QUESTIONS, content_registry._questions_changed)
+    registry.get(QUESTIONS)
+
+    questions = json.loads(path.read_text(encoding="utf-8"))
+    questions["phases"]["PartA"]["questions"]["1"]["text"] = "Reworded"
+    touch(path, json.dumps(questions))
+    scorer = get_compiled_scorer()
+    assert registry.check(force=True) == [QUESTIONS]
+    assert get_question_index().get(1).text == "Reworded"
+    assert get_compiled_scorer() is not scorer
+
+    # A questionnaire without scored questions is rejected
+    touch(path, json.dumps({"phases": {}}))
+    assert registry.check(force=True) == []
+    assert get_question_index().get(1).text == "Reworded"
+    get_compiled_scorer.cache_clear()
+
+
+def test_app_config_and_reports_follow_the_files(tmp_path, monkeypatch):
+    """init_app keeps app.config current; reports are read from the registry"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path / "saved"))
+    copy_data_files(tmp_path)
+    monkeypatch.setattr(content_registry, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(content_registry, "QUESTIONS_PATH", tmp_path / "questions.json")
+    monkeypatch.setattr(content_registry, "_content_registry", None)
+    monkeypatch.setattr(content_registry, "_apps", weakref.WeakSet())
+    registry = content_registry.get_content_registry()
+    registry.interval = 1e-9
+
+    app = Flask(__name__)
+    app.config['PDN_CONFIG'] = registry.get(CONFIG)
+    content_registry.init_app(app)
+
+    @app.route("/name")
+    def name():
+        return current_app.config['PDN_CONFIG']['project']['name']
+
+    client = app.test_client()
+    original = client.get("/name").get_data(as_text=True)
+    config_path = tmp_path / "config.yaml"
+    touch(config_path, config_path.read_text(encoding="utf-8").replace(original, "Renamed", 1))
+    assert client.get("/name").get_data(as_text=True) == "Renamed"
+
+    # A config without the sections the app reads is not applied
+    touch(config_path, "project: {}\n")
+    assert client.get("/name").get_data(as_text=True) == "Renamed"
+
+    reports = json.loads((tmp_path / "pdn_reports.json").read_text(encoding="utf-8"))
+    reports["E5"] = {"title": "Updated"}
+    touch(tmp_path / "pdn_reports.json", json.dumps(reports))
+    registry.check(force=True)
+    assert load_pdn_report("unknown") == {"title": "Updated"}
+
+
+def test_apps_share_the_registry_subscribers(tmp_path, monkeypatch):
+    """More apps add no subscribers, are all updated and are not kept alive"""
+    copy_data_files(tmp_path)
+    monkeypatch.setattr(content_registry, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(content_registry, "_content_registry", None)
+    monkeypatch.setattr(content_registry, "_apps", weakref.WeakSet())
+    registry = content_registry.get_content_registry()
+    subscribers = {name: len(registry._files[name].subscribers) for name in (CONFIG, QUESTIONS)}
+
+    apps = [Flask(__name__) for _ in range(3)]
+    for app in apps:
+        content_registry.init_app(app)
+    assert {name: len(registry._files[name].subscribers) for name in (CONFIG, QUESTIONS)} == subscribers
+
+    registry.get(CONFIG)
+    config_path = tmp_path / "config.yaml"
+    touch(config_path, config_path.read_text(encoding="utf-8") + "\nextra: 1\n")
+    assert registry.check(force=True) == [CONFIG]
+    assert all(app.config['PDN_CONFIG']['extra'] == 1 for app in apps)
+
+    refs = [weakref.ref(app) for app in apps]
+    del apps, app
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+    assert not list(content_registry._apps)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the shared metadata handler and its lookup indexes
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.csv_metadata_handler import UserMetadataHandler, get_metadata_handler
+
+
+def test_shared_handler_per_directory(tmp_path, monkeypatch):
+    """The same handler is returned for the same saved results directory"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path / "one"))
+    first = get_metadata_handler()
+    assert get_metadata_handler() is first
+
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path / "two"))
+    assert get_metadata_handler() is not first
+
+
+def test_lookup_by_email_and_id(tmp_path, monkeypatch):
+    """Point lookups use the email and User ID indexes"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    handler = UserMetadataHandler()
+    handler.append_user_metadata({"email": "a@example.com"})
+    handler.append_user_metadata({"email": "b@example.com"})
+    handler.append_user_metadata({"email": "a@example.com"})
+
+    user = handler.get_user_by_email("b@example.com")
+    assert user["Email"] == "b@example.com"
+    assert handler.get_user_by_id(user["User ID"])["Email"] == "b@example.com"
+    assert handler.get_user_by_email("missing@example.com") is None
+    assert len(handler.read_all_metadata()) == 2
+
+
+def test_index_follows_external_writes(tmp_path, monkeypatch):
+    """Changes made by another handler or process are picked up via mtime and size"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    reader = UserMetadataHandler()
+    writer = UserMetadataHandler()
+
+    writer.append_user_metadata({"email": "a@example.com"})
+    assert reader.get_user_by_email("a@example.com")["PDN Code"] == ""
+
+    writer.update_pdn_code("a@example.com", "P10")
+    assert reader.get_user_by_email("a@example.com")["PDN Code"] == "P10"
+
+    writer.append_user_metadata({"email": "c@example.com"})
+    assert reader.get_user_by_email("c@example.com") is not None
+
+
+def test_lookups_do_not_copy_the_rows(tmp_path, monkeypatch):
+    """Point lookups index the cache, and the returned rows are the caller's own"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    handler = get_metadata_handler()
+    handler.append_user_metadata({"email": "a@example.com"})
+    handler.get_user_by_email("a@example.com")
+    monkeypatch.setattr(type(handler), "_read_csv_data", None)
+
+    user = handler.get_user_by_email("a@example.com")
+    assert handler.get_user_by_id(user["User ID"]) == user
+    user["PDN Code"] = "P10"
+    assert handler.get_user_by_email("a@example.com")["PDN Code"] == ""
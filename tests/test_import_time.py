@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the import-time budget: loading the app must not load
+the RAG/LangChain stack or numpy, and utility modules must not load the app
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time of app.main, about 1.5x the ~460 ms it measures; raise it for slow CI machines
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "700"))
+
+# Loaded on first use only
+DEFERRED_MODULES = ("langchain", "langchain_community", "langchain_openai", "chromadb", "openai", "numpy",
+                    "app.pdn_chat_ai.pdn_chat_rag")
+
+
+def import_times(statement, tmp_path):
+    """Run an import under python -X importtime and return {module: cumulative microseconds}"""
+    env = {**os.environ, "SAVED_RESULTS_DIR": str(tmp_path)}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_app_import_budget(tmp_path, record_property):
+    """Importing the app stays within budget and defers the heavy stacks"""
+    times = import_times("import app.main", tmp_path)
+    loaded = [name for name in times if name.split(".")[0] in DEFERRED_MODULES or name in DEFERRED_MODULES]
+    assert loaded == []
+    record_property("app_import_ms", round(times["app.main"] / 1000))
+    assert times["app.main"] / 1000 < IMPORT_TIME_BUDGET_MS
+
+
+def test_utility_import_does_not_load_app(tmp_path):
+    """Command line tools import a utility module without the blueprints"""
+    times = import_times("import app.utils.question_index", tmp_path)
+    assert "app.utils.question_index" in times
+    assert not [name for name in times if name.startswith(("app.pdn_", "app_module", "flask"))]
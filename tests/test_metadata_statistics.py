@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test script to verify incrementally maintained metadata statistics
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.csv_metadata_handler import UserMetadataHandler
+
+
+def test_statistics_follow_writes(tmp_path, monkeypatch):
+    """Statistics are updated on each write and match a full recompute"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    handler = UserMetadataHandler()
+
+    for email in ("a@example.com", "b@example.com", "c@example.com"):
+        assert handler.append_user_metadata({"email": email})
+
+    handler.update_pdn_code("a@example.com", "E5")
+    handler.update_pdn_code("b@example.com", "E5")
+    handler.update_pdn_code("b@example.com", "T4")
+    handler.update_diagnose_code("c@example.com", "A7", "looks right")
+
+    stats = handler.get_statistics()
+    assert stats["total_users"] == 3
+    assert stats["users_with_pdn_code"] == 2
+    assert stats["users_with_diagnose_code"] == 1
+    assert stats["users_with_comments"] == 1
+    assert stats["pdn_code_distribution"] == {"E5": 1, "T4": 1}
+    assert sum(stats["signups_per_day"].values()) == 3
+
+    assert handler.verify_statistics()
+
+    # A fresh handler picks the statistics up from the sidecar file
+    assert UserMetadataHandler().get_statistics() == stats
+
+
+def test_date_range_uses_real_dates(tmp_path, monkeypatch):
+    """Date range compares dates, not DD/MM/YYYY strings"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    (tmp_path / "user_metadata.csv").write_text(
+        "User ID,Email,Date,PDN Code,PDN Voice Code,Diagnose PDN Code,Diagnose Comments,PDN Update Comments\n"
+        "UID000001,a@example.com,02/01/2025,,,,,\n"
+        "UID000002,b@example.com,31/12/2024,,,,,\n"
+        "UID000003,c@example.com,15/06/2025,,,,,\n",
+        encoding="utf-8"
+    )
+
+    stats = UserMetadataHandler().get_statistics()
+    assert stats["date_range"] == {"earliest": "31/12/2024", "latest": "15/06/2025"}
+    assert list(stats["signups_per_day"]) == ["2024-12-31", "2025-01-02", "2025-06-15"]
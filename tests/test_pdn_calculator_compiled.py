@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the compiled PDN scorer against results recorded from
+the original per-stage implementation, and that the code-only path is at least
+10x faster per call than the original with production logging
+
+The reference results in fixtures/pdn_scores.json are for a seeded sequence
+of random_answers; after an intended scoring or questionnaire change, record
+them again with python -m tests.test_pdn_calculator_compiled --record.
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import random
+import sys
+import timeit
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.utils.pdn_calculator import calculate_pdn_code, calculate_pdn_scores
+from app.utils.question_index import get_question_index
+from helpers import random_answers
+
+REFERENCE_PATH = Path(__file__).parent / "fixtures" / "pdn_scores.json"
+REFERENCE_KEYS = ("pdn_code", "trait", "energy", "scores")
+
+# Log format and level of create_app
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# The original implementation logs every stage at INFO, which production runs at
+legacy_logger = logging.getLogger("tests.legacy_pdn_calculator")
+legacy_logger.setLevel(logging.INFO)
+legacy_logger.addHandler(logging.NullHandler())
+legacy_logger.propagate = False
+
+
+def legacy_calculate_pdn_scores(answers: dict) -> dict:
+    """
+    Original stage-by-stage PDN calculation, kept as the reference implementation.
+    Args:
+        answers (dict): Dictionary containing user's answers with question numbers as keys
+    Returns:
+        dict: Dictionary containing the calculated PDN code and related information
+    """
+    # Initialize result dictionary
+    result = {
+        'pdn_code': 'NA',
+        'trait': 'Undetermined',
+        'energy': 'Undetermined',
+        'scores': {'A': 0, 'T': 0, 'P': 0, 'E': 0, 'D': 0, 'S': 0, 'F': 0},
+        'explanation': ''
+    }
+
+    # Stage A: Primary Trait Calculation
+    trait_counts = {'A': 0, 'T': 0, 'P': 0, 'E': 0}
+    # answer = data.questions
+    for i in range(1, 27):
+        if str(i) in answers:
+            answer = answers[str(i)]['selected_option_code']
+            if answer == 'AP':
+                trait_counts['A'] += 0
+                trait_counts['P'] += 0
+            elif answer == 'ET':
+                trait_counts['E'] += 0
+                trait_counts['T'] += 0
+            elif answer == 'AE':
+                trait_counts['A'] += 1
+                trait_counts['E'] += 1
+            elif answer == 'TP':
+                trait_counts['T'] += 1
+                trait_counts['P'] += 1
+
+    for trait, score in trait_counts.items():
+        result['scores'][trait] += score
+    dominant_trait = max(result['scores'], key=result['scores'].get)
+    result['trait'] = dominant_trait
+
+    legacy_logger.info("Stage A: Trait Calculation for A %s", result['scores']['A'])
+    legacy_logger.info("Stage A: Trait Calculation for T %s", result['scores']['T'])
+    legacy_logger.info("Stage A: Trait Calculation for P %s", result['scores']['P'])
+    legacy_logger.info("Stage A: Trait Calculation for E %s", result['scores']['E'])
+    legacy_logger.info("Stage A dominant trait %s", dominant_trait)
+
+    # Stage B: Energy Type Calculation
+    energy_counts = {'D': 0, 'S': 0, 'F': 0}
+    for i in range(27, 38):
+        if str(i) in answers:
+            ranking = answers[str(i)]['ranking']
+            for energy, rank in ranking.items():
+                if rank == 1:
+                    energy_counts[energy] += 3
+                elif rank == 2:
+                    energy_counts[energy] += 2
+                elif rank == 3:
+                    energy_counts[energy] += 1
+
+    result['scores'].update(energy_counts)
+    dominant_energy = max(energy_counts, key=energy_counts.get)
+    result['energy'] = dominant_energy
+
+    legacy_logger.info("Stage B: Energy Type Calculation for D %s", energy_counts['D'])
+    legacy_logger.info("Stage B: Energy Type Calculation for S %s", energy_counts['S'])
+    legacy_logger.info("Stage B: Energy Type Calculation for F %s", energy_counts['F'])
+    legacy_logger.info("Stage B dominant energy %s", dominant_energy)
+
+    # Stage C: Validation and Tie-Breaking
+    for i in range(38, 43):
+        if str(i) in answers:
+            ranking = answers[str(i)]['ranking']
+            traits = list(ranking.keys())
+            trait1, trait2 = traits
+            value1, value2 = ranking[trait1], ranking[trait2]
+
+            difference = value1 - value2
+            score_adjustment = abs(difference)
+
+            if difference > 0:
+                result['scores'][trait1] += score_adjustment
+                result['scores'][trait2] -= score_adjustment
+            elif difference < 0:
+                result['scores'][trait1] -= score_adjustment
+                result['scores'][trait2] += score_adjustment
+
+    # for trait, score in trait_counts.items():
+    #     result['scores'][trait] += score
+    dominant_trait = max(result['scores'], key=result['scores'].get)
+    result['trait'] = dominant_trait
+
+    legacy_logger.info("Stage C: Trait Calculation for A %s", result['scores']['A'])
+    legacy_logger.info("Stage C: Trait Calculation for T %s", result['scores']['T'])
+    legacy_logger.info("Stage C: Trait Calculation for P %s", result['scores']['P'])
+    legacy_logger.info("Stage C: Trait Calculation for E %s", result['scores']['E'])
+    legacy_logger.info("Stage C dominant trait %s", dominant_trait)
+
+    # Stage D: Validation and Tie-Breaking
+    for i in range(43, 57):
+        if str(i) in answers:
+            ranking = answers[str(i)]['ranking']
+            # Get the trait combinations and their rankings
+            trait_combinations = list(ranking.keys())
+            if len(trait_combinations) == 2:
+                combo1, combo2 = trait_combinations
+                value1, value2 = ranking[combo1], ranking[combo2]
+
+                difference = value1 - value2
+                score_adjustment = abs(difference) * 2
+
+                if difference > 0:
+                    # Add points to both traits in the winning combination
+                    result['scores'][combo1[0]] += score_adjustment
+                    result['scores'][combo1[1]] += score_adjustment
+                    # Subtract points from both traits in the losing combination
+                    result['scores'][combo2[0]] -= score_adjustment / 2
+                    result['scores'][combo2[1]] -= score_adjustment / 2
+                elif difference < 0:
+                    # Add points to both traits in the winning combination
+                    result['scores'][combo2[0]] += score_adjustment
+                    result['scores'][combo2[1]] += score_adjustment
+                    # Subtract points from both traits in the losing combination
+                    result['scores'][combo1[0]] -= score_adjustment / 2
+                    result['scores'][combo1[1]] -= score_adjustment / 2
+
+    # Recalculate dominant trait after all adjustments
+    dominant_trait = max(result['scores'], key=result['scores'].get)
+    result['trait'] = dominant_trait
+
+    legacy_logger.info("Stage D: Trait Calculation for A %s", result['scores']['A'])
+    legacy_logger.info("Stage D: Trait Calculation for T %s", result['scores']['T'])
+    legacy_logger.info("Stage D: Trait Calculation for P %s", result['scores']['P'])
+    legacy_logger.info("Stage D: Trait Calculation for E %s", result['scores']['E'])
+    legacy_logger.info("Stage D dominant trait %s", dominant_trait)
+
+    # StageE: Strengthen Dominant Trait
+    for i in range(57, 60):
+        if str(i) in answers:
+            ranking = answers[str(i)]['ranking']
+            for trait, rank in ranking.items():
+                if rank == 1:
+                    result['scores'][trait] += 8
+                elif rank == 2:
+                    result['scores'][trait] += 4
+                elif rank == 3:
+                    result['scores'][trait] += 2
+                elif rank == 4:
+                    result['scores'][trait] += 0
+
+    dominant_trait = max(result['scores'], key=result['scores'].get)
+    result['trait'] = dominant_trait
+
+    legacy_logger.info("Stage E: Trait Calculation for A %s", result['scores']['A'])
+    legacy_logger.info("Stage E: Trait Calculation for T %s", result['scores']['T'])
+    legacy_logger.info("Stage E: Trait Calculation for P %s", result['scores']['P'])
+    legacy_logger.info("Stage E: Trait Calculation for E %s", result['scores']['E'])
+    legacy_logger.info("Stage E dominant trait %s", dominant_trait)
+
+    # Finalizing the PDN code
+    pdn_matrix = {
+        ('P', 'D'): 'P10', ('P', 'S'): 'P2', ('P', 'F'): 'P6',
+        ('E', 'D'): 'E1', ('E', 'S'): 'E5', ('E', 'F'): 'E9',
+        ('A', 'D'): 'A7', ('A', 'S'): 'A11', ('A', 'F'): 'A3',
+        ('T', 'D'): 'T4', ('T', 'S'): 'T8', ('T', 'F'): 'T12'
+    }
+
+    pdn_code = pdn_matrix.get((result['trait'], result['energy']), 'NA')
+    result['pdn_code'] = pdn_code
+
+    legacy_logger.info("Finalizing the PDN code %s", pdn_code)
+
+    return result
+
+
+def reference_result(answers):
+    result = calculate_pdn_scores(answers)
+    return {key: result[key] for key in REFERENCE_KEYS}
+
+
+def record_reference(count=500, seed=1234):
+    """Record the current scorer's results as the reference"""
+    rng = random.Random(seed)
+    reference = {
+        "questionnaire_version": get_question_index().version,
+        "seed": seed,
+        "empty": reference_result({}),
+        "results": [reference_result(random_answers(rng)) for _ in range(count)]
+    }
+    with open(REFERENCE_PATH, "w", encoding="utf-8") as f:
+        json.dump(reference, f, ensure_ascii=False)
+    return reference
+
+
+def test_compiled_scorer_matches_reference():
+    """Compiled scoring gives the recorded code, trait, energy and scores"""
+    with open(REFERENCE_PATH, "r", encoding="utf-8") as f:
+        reference = json.load(f)
+    assert reference["questionnaire_version"] == get_question_index().version, \
+        "questions.json changed, record the reference results again"
+
+    rng = random.Random(reference["seed"])
+    for expected in reference["results"]:
+        answers = random_answers(rng)
+        assert reference_result(answers) == expected
+        assert calculate_pdn_code(answers) == expected["pdn_code"]
+    assert reference_result({}) == reference["empty"]
+    assert calculate_pdn_code({}) == reference["empty"]["pdn_code"]
+    assert len({expected["pdn_code"] for expected in reference["results"]}) > 1
+
+
+def test_trace_is_a_single_debug_record(caplog):
+    """Tracing logs one debug record per call, and nothing without it"""
+    answers = random_answers(random.Random(1))
+    with caplog.at_level(logging.DEBUG, logger="app.utils.pdn_calculator"):
+        calculate_pdn_scores(answers)
+        assert not caplog.records
+        calculate_pdn_scores(answers, trace=True)
+    assert len(caplog.records) == 1
+
+
+def test_code_matches_original_implementation():
+    """The code-only path gives the original implementation's code"""
+    rng = random.Random(99)
+    for _ in range(1000):
+        answers = random_answers(rng)
+        assert calculate_pdn_code(answers) == legacy_calculate_pdn_scores(answers)["pdn_code"]
+
+
+@pytest.fixture
+def production_logging(tmp_path):
+    """Log the original implementation to a stream and a file, as create_app does"""
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler(io.StringIO()), logging.FileHandler(tmp_path / "app.log")]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        legacy_logger.addHandler(handler)
+    yield
+    for handler in handlers:
+        legacy_logger.removeHandler(handler)
+        handler.close()
+
+
+def test_code_is_10x_faster(production_logging, record_property):
+    """Microbenchmark: the code-only path is at least 10x faster per call than the original"""
+    rng = random.Random(42)
+    samples = [random_answers(rng) for _ in range(50)]
+
+    def per_call_us(calculate):
+        def run():
+            for answers in samples:
+                calculate(answers)
+        return min(timeit.repeat(run, number=5, repeat=5)) / (5 * len(samples)) * 1e6
+
+    legacy = per_call_us(legacy_calculate_pdn_scores)
+    compiled = per_call_us(calculate_pdn_code)
+    record_property("legacy_call_us", round(legacy, 1))
+    record_property("code_call_us", round(compiled, 1))
+    assert legacy / compiled >= 10
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Record the reference PDN scoring results")
+    parser.add_argument('--record', action='store_true', help=f'Write {REFERENCE_PATH.name} with the current scorer')
+    if parser.parse_args().record:
+        print(f"Recorded {len(record_reference()['results'])} results in {REFERENCE_PATH}")
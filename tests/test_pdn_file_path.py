@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script to verify user directory layouts and layout migration
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.pdn_file_path import PDNFilePath
+from app.utils.migrate_user_layout import migrate_user_layout
+
+
+def test_sharded_layout_paths(tmp_path):
+    """Sharded layout places users under two hash levels"""
+    pdn_file_path = PDNFilePath(str(tmp_path), layout="sharded")
+    user_dir = pdn_file_path.get_user_dir("user@example.com")
+
+    first, second = PDNFilePath.get_shard("userexamplecom")
+    assert user_dir == tmp_path / first / second / "userexamplecom"
+    assert user_dir.is_dir()
+
+
+def test_lookup_finds_both_layouts(tmp_path):
+    """Users stored in the other layout are still found during the transition"""
+    (tmp_path / "userexamplecom").mkdir()
+    (tmp_path / "userexamplecom" / "user@example.com_answers.json").write_text("{}")
+
+    pdn_file_path = PDNFilePath(str(tmp_path), layout="sharded")
+    assert pdn_file_path.get_user_dir("user@example.com") == tmp_path / "userexamplecom"
+    assert pdn_file_path.find_user_file("user@example.com", "_answers.json") is not None
+
+
+def test_migrate_to_sharded_and_back(tmp_path):
+    """Migration moves user directories in place and is reversible"""
+    for name in ("aexamplecom", "bexamplecom"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "answers.json").write_text("{}")
+    (tmp_path / "user_metadata.csv").write_text("User ID,Email\n")
+
+    stats = migrate_user_layout("sharded", str(tmp_path))
+    assert stats["moved"] == 2
+
+    sharded = PDNFilePath(str(tmp_path), layout="sharded")
+    assert sorted(p.name for p in sharded.iter_user_dirs("sharded")) == ["aexamplecom", "bexamplecom"]
+    assert list(sharded.iter_user_dirs("flat")) == []
+    assert (tmp_path / "user_metadata.csv").exists()
+
+    stats = migrate_user_layout("flat", str(tmp_path))
+    assert stats["moved"] == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["aexamplecom", "bexamplecom", "user_metadata.csv"]
+
+
+def test_resolve_does_not_create_directories(tmp_path):
+    """Read-only resolution never creates user directories"""
+    pdn_file_path = PDNFilePath(str(tmp_path))
+
+    user_dir = pdn_file_path.resolve_user_dir("unknown@example.com")
+    assert not user_dir.exists()
+    assert not pdn_file_path.resolve_user_file_path("unknown@example.com", "a.json").parent.exists()
+    assert list(tmp_path.iterdir()) == []
+
+    assert pdn_file_path.ensure_user_dir("unknown@example.com") == user_dir
+    assert user_dir.is_dir()
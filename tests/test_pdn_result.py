@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the structured PDN result and its persistence
+"""
+
+import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils import answer_storage
+from app.utils.answer_storage import get_answers_file_path, save_answers, save_results
+from app.utils.pdn_calculator import PDNResult, calculate_pdn_result, get_compiled_scorer, get_pdn_result, get_running_scores
+from app.utils.pdn_file_path import PDNFilePath
+from helpers import build_answers, write_answers
+
+
+def test_result_snapshots_and_margins():
+    """Stage snapshots are cumulative and end at the final scores"""
+    result = calculate_pdn_result(build_answers("a@example.com"))
+
+    assert list(result.stages) == ["A", "B", "C", "D", "E"]
+    assert result.stages["E"] == result.scores
+    assert result.stages["A"]["D"] == 0
+
+    margin = result.margins["trait"]
+    assert margin["margin"] == result.scores[result.trait] - result.scores[margin["runner_up"]]
+    assert margin["margin"] >= 0
+    assert result.trait in result.explanation
+
+    assert PDNResult.from_dict(json.loads(json.dumps(result.to_dict()))) == result
+    assert not hasattr(result, "__dict__")
+
+
+def test_results_are_stored_with_answers(tmp_path, monkeypatch):
+    """Stored results are returned without recomputing"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    answers = build_answers("a@example.com")
+    write_answers("a@example.com", answers)
+
+    stored = calculate_pdn_result(answers).to_dict()
+    stored["explanation"] = "stored"
+    assert save_results("a@example.com", stored)
+
+    with open(get_answers_file_path("a@example.com"), encoding="utf-8") as f:
+        saved_answers = json.load(f)
+    assert get_pdn_result(saved_answers).explanation == "stored"
+    assert get_pdn_result(answers).explanation != "stored"
+
+    assert not save_results("missing@example.com", stored)
+
+
+def test_running_scores_are_replaced_by_results(tmp_path, monkeypatch):
+    """Answers files keep compact running scores until the result is stored"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    monkeypatch.setattr(answer_storage, "pdn_file_path", PDNFilePath())
+    answers = build_answers("a@example.com")
+    batch = [(int(key), answer) for key, answer in answers.items() if key.isdigit()]
+    save_answers("a@example.com", batch)
+
+    path = get_answers_file_path("a@example.com")
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert set(saved["scoring"]) == {"stages", "answered"}
+    assert saved["scoring"]["answered"] == len(get_compiled_scorer().questions)
+
+    assert save_results("a@example.com", get_running_scores(saved).finalize().to_dict())
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert "scoring" not in saved
+    assert saved["results"]["pdn_code"] == calculate_pdn_result(answers).pdn_code
+
+    # A changed answer rebuilds the running scores from the stored answers
+    changed = {"ranking": {code: 4 - rank for code, rank in answers["27"]["ranking"].items()}}
+    save_answers("a@example.com", [(27, changed)])
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert "results" not in saved
+    assert saved["scoring"]["answered"] == len(get_compiled_scorer().questions)
+    assert get_running_scores(saved).finalize() == calculate_pdn_result({**answers, "27": changed})
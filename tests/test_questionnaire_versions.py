@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the questionnaire version store, version-aware question
+texts and rescoring one questionnaire version
+"""
+
+import copy
+import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.main import app
+from app.utils.answer_storage import expand_answers, get_answers_file_path, save_results
+from app.utils.bulk_rescore import rescore_all_users
+from app.utils.csv_metadata_handler import get_metadata_handler
+from app.utils.pdn_calculator import calculate_pdn_result
+from app.utils import question_index
+from app.utils.pdn_file_path import PDNFilePath
+from app.utils.question_index import QUESTIONS_PATH, QuestionIndex, get_question_index
+from app.utils.questionnaire_versions import (ensure_current_registered, get_question_index_for_version,
+                                              list_versions, load_questionnaire, register_questionnaire)
+from helpers import build_answers, write_answers
+
+
+def read_answers(email):
+    with open(get_answers_file_path(email), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def register_older_version():
+    """Store a questionnaire whose first question was worded differently"""
+    with open(QUESTIONS_PATH, "r", encoding="utf-8") as f:
+        older = json.load(f)
+    older = copy.deepcopy(older)
+    older["phases"]["PartA"]["questions"]["1"]["text"] = "An older wording"
+    return register_questionnaire(older)
+
+
+def test_versions_are_stored_once(tmp_path, monkeypatch):
+    """The current questionnaire is registered once; versions load back by hash"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    current = get_question_index().version
+    assert ensure_current_registered(PDNFilePath()) == current
+    assert [v["version"] for v in list_versions()] == [current]
+    assert load_questionnaire(current)["phases"]
+
+    older = register_older_version()
+    assert older != current
+    assert register_older_version() == older
+    assert {v["version"]: v["current"] for v in list_versions()} == {current: True, older: False}
+    assert load_questionnaire("../../etc/passwd") is None
+    assert get_question_index_for_version("0" * 16) is None
+
+
+def test_reloaded_questionnaire_is_registered(tmp_path, monkeypatch):
+    """The questionnaire behind the current index is stored, not the file on disk"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    reloaded = copy.deepcopy(get_question_index().data)
+    reloaded["phases"]["PartA"]["questions"]["1"]["text"] = "A reloaded wording"
+    monkeypatch.setattr(question_index, "_current_index", QuestionIndex(reloaded))
+
+    version = ensure_current_registered(PDNFilePath())
+    assert version == get_question_index().version
+    assert load_questionnaire(version) == reloaded
+    assert [v["version"] for v in list_versions()] == [version]
+
+
+def test_older_answers_show_their_texts(tmp_path, monkeypatch):
+    """Answers made with an older version are joined with that version's texts"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    older = register_older_version()
+    answers = {**build_answers("a@example.com"), "questionnaire_version": older}
+
+    assert get_question_index_for_version(older).get(1).text == "An older wording"
+    expanded = expand_answers(answers)
+    assert expanded["1"]["question_text"] == "An older wording"
+    assert expanded["2"]["question_text"] == get_question_index().get(2).text
+
+    get_metadata_handler().append_user_metadata({"email": "a@example.com"})
+    PDNFilePath().get_user_file_path("a@example.com", "a@example.com_answers.json").write_text(json.dumps(answers))
+    client = app.test_client()
+    token = client.post("/pdn-admin/login", json={"password": "pdn"}).get_json()["session_token"]
+    page = client.get(f"/pdn-admin/review-queue?session_token={token}").get_json()
+    assert page["users"][0]["questionnaire_version"] == older
+    assert page["questionnaires"][older]["1"]["text"] == "An older wording"
+
+
+def test_rescore_one_version(tmp_path, monkeypatch):
+    """Results are tagged with the version; a filtered rescore skips other versions"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    current = get_question_index().version
+    older = register_older_version()
+    handler = get_metadata_handler()
+    for email, version in (("a@example.com", current), ("b@example.com", older)):
+        handler.append_user_metadata({"email": email})
+        write_answers(email, {**build_answers(email), "questionnaire_version": version})
+
+    events = list(rescore_all_users(workers=1, questionnaire_version=older))
+    assert events[0]["questionnaire_version"] == older
+    assert [event["email"] for event in events if event["event"] == "change"] == ["b@example.com"]
+    assert (events[-1]["changed"], events[-1]["skipped"]) == (1, 1)
+    assert handler.get_user_by_email("a@example.com")["PDN Code"] == ""
+    assert read_answers("b@example.com")["results"]["questionnaire_version"] == current
+
+    assert save_results("a@example.com", calculate_pdn_result(build_answers("a@example.com")).to_dict())
+    assert read_answers("a@example.com")["results"]["questionnaire_version"] == current
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the retrieval service protocol, batched searches and
+the query embedding cache
+"""
+
+import os
+import sys
+import threading
+from types import SimpleNamespace
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.pdn_chat_ai.retrieval_service import (RetrievalClient, RetrievalServer, RetrievalServiceError,
+                                               VectorStoreSearch)
+
+DOCUMENTS = ["PDN codes describe traits", "Energy stages", "Traits and energies", "Voice recordings"]
+
+
+def keyword_search(queries, k):
+    """Documents containing a word of the query"""
+    return [[{"page_content": doc, "metadata": {"source": "test"}}
+             for doc in DOCUMENTS if any(word in doc.lower() for word in query.lower().split())][:k]
+            for query in queries]
+
+
+@pytest.fixture
+def client(tmp_path):
+    server = RetrievalServer(str(tmp_path / "retrieval.sock"), keyword_search)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield RetrievalClient(str(tmp_path / "retrieval.sock"), timeout=5)
+    server.shutdown()
+    server.server_close()
+    assert not (tmp_path / "retrieval.sock").exists()
+
+
+def test_batched_search(client):
+    """One request answers several queries, k documents at most each"""
+    assert client.ping()
+    results = client.search_batch(["traits", "energy", "nothing"], k=1)
+    assert [[doc["page_content"] for doc in docs] for docs in results] == [
+        ["PDN codes describe traits"], ["Energy stages"], []
+    ]
+    assert len(client.search("traits", k=5)) == 2
+    assert client.search("voice", k=5)[0]["metadata"] == {"source": "test"}
+
+
+def test_invalid_requests_are_rejected(client, tmp_path):
+    with pytest.raises(RetrievalServiceError, match="k must be"):
+        client.search("traits", k=0)
+    with pytest.raises(RetrievalServiceError, match="queries"):
+        client.search_batch([], k=3)
+    with pytest.raises(RetrievalServiceError, match="unavailable"):
+        RetrievalClient(str(tmp_path / "missing.sock")).search("traits", k=3)
+    assert not RetrievalClient(str(tmp_path / "missing.sock")).ping()
+
+
+def test_query_embeddings_are_batched_and_cached():
+    """New queries of a batch are embedded in one call; repeated queries are not embedded again"""
+    calls = []
+
+    def embed_documents(texts):
+        calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    def similarity_search_by_vector(vector, k):
+        return [SimpleNamespace(page_content=f"length {vector[0]:.0f}", metadata=None)][:k]
+
+    search = VectorStoreSearch(SimpleNamespace(similarity_search_by_vector=similarity_search_by_vector),
+                               SimpleNamespace(embed_documents=embed_documents), cache_size=2)
+    results = search(["ab", "abc", "ab"], k=3)
+    assert [docs[0]["page_content"] for docs in results] == ["length 2", "length 3", "length 2"]
+    assert results[0][0]["metadata"] == {}
+    assert calls == [["ab", "abc"]]
+
+    search(["abc", "abcd"], k=1)
+    assert calls[-1] == ["abcd"]
+    # "ab" was evicted by the cache size
+    search(["ab"], k=1)
+    assert calls[-1] == ["ab"]
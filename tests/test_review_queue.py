@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the admin review queue and batch diagnose updates
+"""
+
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.main import app
+from app.utils.csv_metadata_handler import get_metadata_handler
+from app.utils.pdn_file_path import PDNFilePath
+from helpers import build_answers
+
+FIXTURES = Path(__file__).parent / "fixtures" / "audio"
+
+
+def make_users(tmp_path, monkeypatch, count):
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    handler = get_metadata_handler()
+    emails = [f"user{i}@example.com" for i in range(count)]
+    for email in emails:
+        handler.append_user_metadata({"email": email})
+        path = PDNFilePath().get_user_file_path(email, f"{email}_answers.json")
+        path.write_text(json.dumps(build_answers(email)), encoding="utf-8")
+    return emails
+
+
+def login(client):
+    return client.post("/pdn-admin/login", json={"password": "pdn"}).get_json()["session_token"]
+
+
+def test_queue_pages_through_pending_users(tmp_path, monkeypatch):
+    """Each page has questionnaire, scores and recordings; diagnosed users are skipped"""
+    emails = make_users(tmp_path, monkeypatch, 4)
+    get_metadata_handler().update_diagnose_code(emails[1], "ATP", "done")
+    shutil.copy(FIXTURES / "sample.wav", PDNFilePath().resolve_user_dir(emails[0]) / f"{emails[0]}_question1.wav")
+    # A user who has not answered yet
+    get_metadata_handler().append_user_metadata({"email": "new@example.com"})
+
+    client = app.test_client()
+    token = login(client)
+    page = client.get(f"/pdn-admin/review-queue?session_token={token}&limit=2").get_json()
+    assert [user["email"] for user in page["users"]] == [emails[0], emails[2]]
+    assert page["next_cursor"] == emails[2]
+
+    first = page["users"][0]
+    assert first["user"]["email"] == emails[0]
+    assert first["questionnaire"]["1"] == build_answers(emails[0])["1"]
+    assert first["scores"]["pdn_code"]
+    assert first["voice_recordings"]["question1"]["mimetype"] == "audio/wav"
+    assert page["users"][1]["voice_recordings"] == {}
+
+    page = client.get(f"/pdn-admin/review-queue?session_token={token}&limit=2&after={page['next_cursor']}").get_json()
+    assert [user["email"] for user in page["users"]] == [emails[3]]
+    assert page["next_cursor"] is None
+
+    assert client.get("/pdn-admin/review-queue").status_code == 401
+
+
+def test_queue_starts_over_for_a_removed_cursor(tmp_path, monkeypatch):
+    """A cursor whose user left the CSV restarts the queue instead of ending it"""
+    emails = make_users(tmp_path, monkeypatch, 3)
+    client = app.test_client()
+    token = login(client)
+
+    page = client.get(f"/pdn-admin/review-queue?session_token={token}&limit=1").get_json()
+    assert page["cursor_reset"] is False
+    page = client.get(f"/pdn-admin/review-queue?session_token={token}&limit=1&after={page['next_cursor']}").get_json()
+    assert [user["email"] for user in page["users"]] == [emails[1]]
+    assert page["cursor_reset"] is False
+
+    page = client.get(f"/pdn-admin/review-queue?session_token={token}&limit=2&after=gone@example.com").get_json()
+    assert [user["email"] for user in page["users"]] == emails[:2]
+    assert page["next_cursor"] == emails[1]
+    assert page["cursor_reset"] is True
+
+
+def test_admin_payloads_leave_out_scoring_state(tmp_path, monkeypatch):
+    """Running scores and stored results stay in the answers file, the result is sent as scores"""
+    emails = make_users(tmp_path, monkeypatch, 1)
+    path = PDNFilePath().get_user_file_path(emails[0], f"{emails[0]}_answers.json")
+    answers = build_answers(emails[0])
+    answers["scoring"] = {"stages": [[0] * 7] * 5, "answered": 0}
+    answers["results"] = {"pdn_code": "A7", "scores": {"A": 1}}
+    path.write_text(json.dumps(answers), encoding="utf-8")
+
+    client = app.test_client()
+    token = login(client)
+    user = client.get(f"/pdn-admin/review-queue?session_token={token}").get_json()["users"][0]
+    assert "scoring" not in user["questionnaire"] and "results" not in user["questionnaire"]
+    assert user["questionnaire"]["1"] == answers["1"]
+
+    data = client.get(f"/pdn-admin/user/questionnaire/{emails[0]}?session_token={token}").get_json()
+    assert "scoring" not in data and "results" not in data
+    assert data["scores"]["pdn_code"] == "A7"
+
+
+def test_batch_diagnose_is_one_write(tmp_path, monkeypatch):
+    """Verdicts for several users are stored together, unknown users are reported"""
+    emails = make_users(tmp_path, monkeypatch, 3)
+    handler = get_metadata_handler()
+    handler.update_diagnose_code(emails[2], "", "keep me")
+
+    writes = []
+    original_write = handler._write_csv_data
+    monkeypatch.setattr(handler, "_write_csv_data", lambda *args, **kwargs: writes.append(1) or original_write(*args, **kwargs))
+
+    client = app.test_client()
+    token = login(client)
+    response = client.put(f"/pdn-admin/users/diagnose?session_token={token}", json={"diagnoses": [
+        {"email": emails[0], "diagnose_pdn_code": "ATP", "diagnose_comments": "clear"},
+        {"email": emails[2], "diagnose_pdn_code": "EDS"},
+        {"email": "missing@example.com", "diagnose_pdn_code": "ATP"}
+    ]})
+    assert response.status_code == 200
+    assert response.get_json()["updated"] == [emails[0], emails[2]]
+    assert response.get_json()["not_found"] == ["missing@example.com"]
+    assert len(writes) == 1
+
+    assert handler.get_user_by_email(emails[0])["Diagnose PDN Code"] == "ATP"
+    assert handler.get_user_by_email(emails[2])["Diagnose Comments"] == "keep me"
+    page = client.get(f"/pdn-admin/review-queue?session_token={token}").get_json()
+    assert [user["email"] for user in page["users"]] == [emails[1]]
+
+    response = client.put(f"/pdn-admin/users/diagnose?session_token={token}", json={"diagnoses": [{"email": "bad"}]})
+    assert response.status_code == 400
+    assert "diagnoses.0.email" in response.get_json()["errors"]
+
+
+def test_single_diagnose_update(tmp_path, monkeypatch):
+    """The single-user update finds the user by email and keeps fields it does not change"""
+    emails = make_users(tmp_path, monkeypatch, 2)
+    client = app.test_client()
+    token = login(client)
+
+    url = f"/pdn-admin/user/diagnose/{emails[1]}?session_token={token}"
+    assert client.put(url, json={"diagnose_pdn_code": "ATP", "diagnose_comments": "first"}).status_code == 200
+    user = client.put(url, json={"diagnose_pdn_code": "AET"}).get_json()["user"]
+    assert (user["diagnose_pdn_code"], user["diagnose_comments"]) == ("AET", "first")
+    assert get_metadata_handler().get_user_by_email(emails[1])["Diagnose Comments"] == "first"
+
+    assert client.put(f"/pdn-admin/user/diagnose/missing@example.com?session_token={token}",
+                      json={"diagnose_pdn_code": "ATP"}).status_code == 404
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script to verify running per-answer scoring matches scoring all answers
+"""
+
+import json
+import os
+import random
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.pdn_calculator import RunningScores, calculate_pdn_result, get_running_scores
+from helpers import random_answers
+
+
+def test_running_scores_match_full_scoring():
+    """Answers applied one at a time, including changed answers, give the full result"""
+    rng = random.Random(7)
+    for _ in range(200):
+        first = random_answers(rng)
+        final = random_answers(rng)
+
+        # Answer everything once, then change some answers, with a save/load in between
+        running = RunningScores()
+        answers = {}
+        for key, answer in list(first.items()) + list(final.items()):
+            running.apply(key, answer, answers.get(key))
+            answers[key] = answer
+            if rng.random() < 0.05:
+                running = RunningScores.from_dict(json.loads(json.dumps(running.to_dict())))
+
+        expected = calculate_pdn_result(answers)
+        result = running.finalize()
+        assert result.pdn_code == expected.pdn_code
+        assert result.scores == expected.scores
+        assert result.stages == expected.stages
+        assert running.answered == len([key for key in answers if key.isdigit() and int(key) < 60])
+
+
+def test_stored_running_scores_are_used():
+    """Stored accumulators are finalized without rescoring, missing ones are rebuilt"""
+    answers = random_answers(random.Random(3))
+    assert get_running_scores(answers).finalize() == calculate_pdn_result(answers)
+
+    answers["scoring"] = RunningScores().to_dict()
+    assert get_running_scores(answers).answered == 0
+
+    answers["scoring"] = {"stages": [[0]], "answered": 0}
+    assert get_running_scores(answers).finalize() == calculate_pdn_result(answers)
+
+    # Accumulators saved with every answer's contribution
+    stored = RunningScores.from_answers(answers).to_dict()
+    answers["scoring"] = {"stages": stored["stages"], "contributions": {"1": [0, []], "2": [0, []]}}
+    assert get_running_scores(answers).answered == 2
+    assert get_running_scores(answers).finalize() == calculate_pdn_result(answers)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script to verify request models reject malformed answers and user info
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from pydantic import ValidationError
+
+from app.main import app
+from app.utils import answer_storage
+from app.utils.pdn_file_path import PDNFilePath
+from app.utils.schemas import AnswerIn, UserInfoIn, error_messages
+
+
+def test_answers_are_checked_against_questions():
+    """Valid answers parse, malformed rankings and unknown options do not"""
+    answer = AnswerIn.model_validate({"question_number": "27", "ranking": {"D": 2, "S": 1, "F": 3}})
+    assert answer.question_number == 27
+    assert answer.to_answer_data() == {"selected_option_code": None, "ranking": {"D": 2, "S": 1, "F": 3}}
+    assert AnswerIn.model_validate_json(b'{"question_number": 1, "selected_option_code": "AP"}')
+
+    for data in (
+        {"question_number": 27, "ranking": {"D": "1", "S": 2, "F": 3}},
+        {"question_number": 27, "ranking": {"D": 1, "S": 2}},
+        {"question_number": 38, "ranking": {"A": 10, "T": 10}},
+        {"question_number": 1, "selected_option_code": "XX"},
+        {"selected_option_code": "AE"}
+    ):
+        with pytest.raises(ValidationError):
+            AnswerIn.model_validate(data)
+
+
+def test_user_info_is_normalized():
+    """User info is stripped and unknown fields are dropped"""
+    user_info = UserInfoIn.model_validate({
+        "first_name": " Dana ", "last_name": "Levi", "email": "dana@example.com",
+        "birth_year": "1990", "is_admin": True
+    })
+    assert user_info.first_name == "Dana"
+    assert "is_admin" not in user_info.model_dump()
+
+    with pytest.raises(ValidationError) as error:
+        UserInfoIn.model_validate({"first_name": "Dana", "last_name": "", "email": "dana"})
+    assert set(error_messages(error.value)) == {"last_name", "email"}
+
+
+def test_invalid_answer_is_not_saved(tmp_path, monkeypatch):
+    """The answer endpoint rejects bad data instead of storing it"""
+    monkeypatch.setenv("SAVED_RESULTS_DIR", str(tmp_path))
+    monkeypatch.setattr(answer_storage, "pdn_file_path", PDNFilePath(str(tmp_path)))
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session["email"] = "a@example.com"
+
+    response = client.post("/pdn-diagnose/answer", json={"question_number": 28, "ranking": {"D": 1, "S": 1, "F": 3}})
+    assert response.status_code == 400
+    assert "errors" in response.get_json()
+    response = client.post("/pdn-diagnose/answer", data="not json", content_type="application/json")
+    assert response.status_code == 400
+    assert client.get("/pdn-diagnose/progress").get_json()["answered"] == 0
+
+    response = client.post("/pdn-diagnose/answer", json={"question_number": 28, "ranking": {"D": 1, "S": 2, "F": 3}})
+    assert response.status_code == 200
+    assert client.get("/pdn-diagnose/progress").get_json()["answered"] == 1
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the static asset build and fingerprinted asset serving
+"""
+
+import gzip
+import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, render_template_string
+
+from app.utils import static_assets
+
+
+def make_static(tmp_path):
+    static_dir = tmp_path / "static"
+    (static_dir / "js").mkdir(parents=True)
+    (static_dir / "uploads").mkdir()
+    (static_dir / "js" / "app.js").write_text("console.log('pdn');\n" * 200)
+    (static_dir / "logo.png").write_bytes(b"\x89PNG" + bytes(range(256)))
+    (static_dir / "uploads" / "user.webm").write_bytes(b"audio")
+    return static_dir
+
+
+def make_app(dist_dir):
+    app = Flask(__name__)
+    static_assets.init_app(app, dist_dir)
+    return app
+
+
+def test_build_fingerprints_and_compresses(tmp_path):
+    """Assets get hashed names and smaller compressed variants, rebuilds are incremental"""
+    static_dir = make_static(tmp_path)
+    dist_dir = tmp_path / "dist"
+
+    summary = static_assets.build_assets(static_dir, dist_dir)
+    assert summary["assets"] == 2
+    assert summary["bytes_saved"] > 0
+
+    manifest = static_assets.load_manifest(dist_dir)
+    script = manifest["js/app.js"]
+    assert script["path"] != "js/app.js" and script["path"].endswith(".js")
+    assert "gzip" in script["encodings"]
+    assert manifest["logo.png"]["encodings"] == []
+    assert "uploads/user.webm" not in manifest
+
+    original = (static_dir / "js" / "app.js").read_bytes()
+    assert gzip.decompress((dist_dir / (script["path"] + ".gz")).read_bytes()) == original
+
+    assert static_assets.build_assets(static_dir, dist_dir)["written"] == 0
+
+    # A changed asset gets a new name and the old files are removed
+    (static_dir / "js" / "app.js").write_text("console.log('changed');\n" * 200)
+    static_assets.build_assets(static_dir, dist_dir)
+    assert static_assets.load_manifest(dist_dir)["js/app.js"]["path"] != script["path"]
+    assert not (dist_dir / script["path"]).exists()
+
+
+def test_assets_are_served_with_negotiated_encoding(tmp_path):
+    """Built assets are served compressed when accepted, with immutable caching"""
+    static_dir = make_static(tmp_path)
+    dist_dir = tmp_path / "dist"
+    static_assets.build_assets(static_dir, dist_dir)
+    app = make_app(dist_dir)
+
+    with app.test_request_context():
+        url = render_template_string("{{ asset_url('js/app.js') }}")
+    assert url.startswith("/assets/js/app.")
+
+    client = app.test_client()
+    response = client.get(url, headers={"Accept-Encoding": "gzip, deflate"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.mimetype == "text/javascript"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.data) == (static_dir / "js" / "app.js").read_bytes()
+
+    response = client.get(url)
+    assert "Content-Encoding" not in response.headers
+    assert response.data == (static_dir / "js" / "app.js").read_bytes()
+
+    assert client.get("/assets/js/app.js").status_code == 404
+
+
+def test_unbuilt_assets_fall_back_to_static(tmp_path):
+    """Without a build, templates link the plain static files"""
+    app = make_app(tmp_path / "dist")
+    with app.test_request_context():
+        assert render_template_string("{{ asset_url('js/app.js') }}") == "/static/js/app.js"
+
+    (tmp_path / "dist").mkdir()
+    (tmp_path / "dist" / "manifest.json").write_text(json.dumps({"version": 0, "assets": {}}))
+    assert static_assets.load_manifest(tmp_path / "dist") == {}
+
+
+def test_page_bundles_are_built_and_linked(tmp_path):
+    """The big pages link their scripts and styles as fingerprinted bundles"""
+    dist_dir = tmp_path / "dist"
+    static_assets.build_assets(dist_dir=dist_dir)
+    manifest = static_assets.load_manifest(dist_dir)
+
+    from app.main import app
+    app.extensions["static_assets"]["manifest"] = manifest
+    try:
+        client = app.test_client()
+        for path, bundle in (("/pdn-admin/dashboard", "js/admin-dashboard.js"),
+                             ("/pdn-diagnose/chat", "js/questionnaire.js")):
+            html = client.get(path).get_data(as_text=True)
+            assert f"/assets/{manifest[bundle]['path']}" in html
+            assert "html2pdf.bundle" not in html and "<style>" not in html
+    finally:
+        app.extensions["static_assets"]["manifest"] = static_assets.load_manifest()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the pre-fork warmup and the readiness endpoint
+"""
+
+import gc
+import logging
+import os
+import runpy
+import sys
+import time
+import types
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.main import app
+from app.pdn_chat_ai import chat_routes
+from app.utils import warmup
+
+GUNICORN_CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gunicorn.conf.py")
+
+
+def reset_status(monkeypatch):
+    monkeypatch.setattr(warmup, "_status", {"state": "pending", "components": {}})
+
+
+def test_warmup_loads_and_freezes(monkeypatch):
+    """Components are loaded once and the loaded objects are frozen for fork"""
+    reset_status(monkeypatch)
+    client = app.test_client()
+    try:
+        status = warmup.warmup(rag=False, freeze=True)
+        assert status["state"] == "ready"
+        assert set(status["components"]) == {"content", "scoring", "prompts"}
+        assert all(component["ok"] for component in status["components"].values())
+        assert status["frozen_objects"] > 0
+    finally:
+        gc.unfreeze()
+
+    assert warmup.warmup() == status
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.get_json()["ready"] is True
+
+
+def test_ready_starts_warmup_when_not_preloaded(monkeypatch):
+    """Without a pre-fork warmup the probe answers 503 and warms up in the background"""
+    reset_status(monkeypatch)
+    monkeypatch.setenv("WARMUP_RAG", "0")
+    monkeypatch.setitem(warmup.COMPONENTS, "broken", lambda: 1 / 0)
+    client = app.test_client()
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.get_json()["ready"] is False
+
+    deadline = time.monotonic() + 30
+    while not warmup.is_ready() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    data = client.get("/ready").get_json()
+    assert data["ready"] is True
+    assert "rag" not in data["components"]
+    assert data["components"]["broken"]["ok"] is False
+    assert data["components"]["scoring"]["ok"] is True
+
+
+def test_gunicorn_hooks_share_no_rag_connections(monkeypatch):
+    """The master never builds the RAG system, and a worker drops one it inherited"""
+    reset_status(monkeypatch)
+    monkeypatch.setenv("WARMUP_RAG", "1")
+    # Stand-in for the RAG modules and for a RAG system holding connections
+    monkeypatch.setitem(sys.modules, "app.pdn_chat_ai.pdn_chat_rag", types.ModuleType("pdn_chat_rag"))
+    built = []
+    monkeypatch.setattr(chat_routes, "get_rag_system", lambda: built.append(True))
+    stub_rag = object()
+    monkeypatch.setattr(chat_routes, "_rag_system", stub_rag)
+
+    hooks = runpy.run_path(GUNICORN_CONF)
+    assert hooks["preload_app"] is True
+    server = types.SimpleNamespace(log=logging.getLogger("gunicorn.error"))
+    try:
+        hooks["when_ready"](server)
+    finally:
+        gc.unfreeze()
+    status = warmup.get_status()
+    assert status["state"] == "ready"
+    assert status["components"]["rag"]["ok"] is True
+    assert not built
+    assert chat_routes._rag_system is stub_rag
+
+    hooks["post_fork"](server, types.SimpleNamespace(pid=os.getpid()))
+    assert chat_routes._rag_system is None